@@ -0,0 +1,48 @@
+"""Add message history indexes
+
+Phase: EXPAND
+Safe to rollback: YES
+Services compatible: All versions
+
+Revision ID: 5c1e8a4b7d21
+Revises: 182e5471b900
+Create Date: 2026-10-18 09:12:44.318207
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "5c1e8a4b7d21"
+down_revision: str | None = "182e5471b900"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Message history is read per session, context or flow, ordered by timestamp
+INDEXES = {
+    "ix_message_session_id_timestamp": ["session_id", "timestamp"],
+    "ix_message_context_id_timestamp": ["context_id", "timestamp"],
+    "ix_message_flow_id_timestamp": ["flow_id", "timestamp"],
+}
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)  # type: ignore
+    indexes_names = [index["name"] for index in inspector.get_indexes("message")]
+    with op.batch_alter_table("message", schema=None) as batch_op:
+        for name, columns in INDEXES.items():
+            if name not in indexes_names:
+                batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)  # type: ignore
+    indexes_names = [index["name"] for index in inspector.get_indexes("message")]
+    with op.batch_alter_table("message", schema=None) as batch_op:
+        for name in INDEXES:
+            if name in indexes_names:
+                batch_op.drop_index(name)
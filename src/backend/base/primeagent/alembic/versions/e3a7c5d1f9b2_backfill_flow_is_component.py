@@ -0,0 +1,50 @@
+"""Backfill flow is_component
+
+Phase: MIGRATE
+Safe to rollback: YES
+Services compatible: All versions
+
+Flow listings read is_component without loading the data of the flows, and new flows get it when
+they are written. Flows saved without it get it here, derived from their data as listings used to.
+
+Revision ID: e3a7c5d1f9b2
+Revises: 5c1e8a4b7d21
+Create Date: 2026-10-18 14:37:05.912384
+
+"""
+
+import json
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "e3a7c5d1f9b2"
+down_revision: str | None = "5c1e8a4b7d21"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)  # type: ignore
+    if "flow" not in inspector.get_table_names():
+        return
+
+    rows = conn.execute(sa.text("SELECT id, data FROM flow WHERE is_component IS NULL AND data IS NOT NULL"))
+    for flow_id, raw_data in rows.fetchall():
+        data = json.loads(raw_data) if isinstance(raw_data, str) else raw_data
+        if not data:
+            continue
+        is_component = data.get("is_component")
+        if is_component is None:
+            is_component = len(data.get("nodes", [])) == 1
+        conn.execute(
+            sa.text("UPDATE flow SET is_component = :is_component WHERE id = :id"),
+            {"is_component": bool(is_component), "id": flow_id},
+        )
+
+
+def downgrade() -> None:
+    # The backfilled values are the ones listings derived, so they are kept
+    pass
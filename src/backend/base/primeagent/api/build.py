@@ -1,5 +1,4 @@
 import asyncio
-import json
 import time
 import traceback
 import uuid
@@ -8,6 +7,7 @@ from collections.abc import AsyncIterator
 from fastapi import BackgroundTasks, HTTPException, Response
 from sqlmodel import select
 from wfx.graph.graph.base import Graph
+from wfx.graph.graph.profiler import ProfileFormat
 from wfx.graph.utils import log_vertex_build
 from wfx.log.logger import logger
 from wfx.schema.schema import InputValueRequest
@@ -24,12 +24,13 @@ from primeagent.api.utils import (
     parse_exception,
 )
 from primeagent.api.v1.schemas import FlowDataRequest, ResultDataResponse, VertexBuildResponse
-from primeagent.events.event_manager import EventManager
+from primeagent.events.event_manager import EncodedEventData, EventManager
 from primeagent.exceptions.component import ComponentBuildError
 from primeagent.schema.message import ErrorMessage
 from primeagent.schema.schema import OutputValue
 from primeagent.services.database.models.flow.model import Flow
-from primeagent.services.deps import get_chat_service, get_telemetry_service, session_scope
+from primeagent.services.deps import get_chat_service, get_settings_service, get_telemetry_service, session_scope
+from primeagent.services.job_queue.event_queue import JobEventQueue, get_batch, get_sequence_id
 from primeagent.services.job_queue.service import JobQueueNotFoundError, JobQueueService
 from primeagent.services.telemetry.schema import ComponentInputsPayload, ComponentPayload, PlaygroundPayload
 
@@ -56,6 +57,23 @@ def _log_component_input_telemetry(
             )
 
 
+def _configure_event_manager(
+    event_manager: EventManager, *, coalesce_tokens: bool | None, message_deltas: bool | None
+) -> None:
+    settings = get_settings_service().settings
+    if coalesce_tokens is None:
+        coalesce_tokens = settings.event_token_coalescing
+    if coalesce_tokens:
+        event_manager.enable_token_coalescing(
+            window=settings.event_token_coalescing_window_ms / 1000,
+            max_chars=settings.event_token_coalescing_max_chars,
+        )
+    if message_deltas is None:
+        message_deltas = settings.event_message_deltas
+    if message_deltas:
+        event_manager.enable_message_deltas(snapshot_interval=settings.event_message_delta_snapshot_interval)
+
+
 async def start_flow_build(
     *,
     flow_id: uuid.UUID,
@@ -69,15 +87,24 @@ async def start_flow_build(
     current_user: CurrentActiveUser,
     queue_service: JobQueueService,
     flow_name: str | None = None,
+    profile: ProfileFormat | None = None,
+    coalesce_tokens: bool | None = None,
+    message_deltas: bool | None = None,
 ) -> str:
     """Start the flow build process by setting up the queue and starting the build task.
 
+    Consecutive token events of a message are merged before they are sent when `coalesce_tokens` is
+    True, or when it is None and the `event_token_coalescing` setting is on. Likewise, updates of agent
+    messages are sent as "message_delta" events depending on `message_deltas` and the
+    `event_message_deltas` setting.
+
     Returns:
         the job_id.
     """
     job_id = str(uuid.uuid4())
     try:
         _, event_manager = queue_service.create_queue(job_id)
+        _configure_event_manager(event_manager, coalesce_tokens=coalesce_tokens, message_deltas=message_deltas)
         task_coro = generate_flow_events(
             flow_id=flow_id,
             background_tasks=background_tasks,
@@ -90,22 +117,72 @@ async def start_flow_build(
             log_builds=log_builds,
             current_user=current_user,
             flow_name=flow_name,
+            profile=profile,
         )
         queue_service.start_job(job_id, task_coro)
+        await queue_service.start_publishing(job_id)
     except Exception as e:
         await logger.aexception("Failed to create queue and start task")
         raise HTTPException(status_code=500, detail=str(e)) from e
     return job_id
 
 
+# Response header with the sequence id of the last event of a poll, to pass as `after` to the next one
+EVENT_CURSOR_HEADER = "X-Event-Cursor"
+
+
+def _events_after(queue: asyncio.Queue, after: int | None) -> list[bytes]:
+    """Returns the events the client missed, if it resumes from the sequence id `after`."""
+    if after is None or not isinstance(queue, JobEventQueue):
+        return []
+    return queue.events_after(after)
+
+
+def _poll_limits(queue_service: JobQueueService, max_wait: float | None, max_events: int | None) -> tuple[float, int]:
+    """Returns how long a poll waits and how many events it returns at most, capped by the settings."""
+    wait = queue_service.POLL_MAX_WAIT if max_wait is None else min(max_wait, queue_service.POLL_MAX_WAIT)
+    limit = queue_service.POLL_MAX_EVENTS
+    if max_events is not None:
+        limit = min(max_events, limit) if limit > 0 else max_events
+    return wait, limit
+
+
+def _cursor_headers(events: list[bytes], after: int | None) -> dict[str, str]:
+    if events and (cursor := get_sequence_id(events[-1])) is not None:
+        return {EVENT_CURSOR_HEADER: str(cursor)}
+    if after is not None:
+        return {EVENT_CURSOR_HEADER: str(after)}
+    return {}
+
+
 async def get_flow_events_response(
     *,
     job_id: str,
     queue_service: JobQueueService,
     event_delivery: EventDeliveryType,
+    after: int | None = None,
+    max_wait: float | None = None,
+    max_events: int | None = None,
 ):
-    """Get events for a specific build job, either as a stream or single event."""
+    """Get events for a specific build job, either as a stream or as a batch of polled events.
+
+    Events carry a sequence id as "seq". A client that lost events, for instance because its
+    connection dropped, passes the last sequence id it received as `after` to get them again.
+
+    A poll waits up to `max_wait` seconds for an event, then returns it with every other event
+    already queued, up to `max_events`. Both are capped by the job queue settings. The sequence id
+    of the last event is returned in the X-Event-Cursor header.
+    """
     try:
+        if queue_service.event_bus is not None:
+            return await get_bus_events_response(
+                job_id=job_id,
+                queue_service=queue_service,
+                event_delivery=event_delivery,
+                after=after,
+                max_wait=max_wait,
+                max_events=max_events,
+            )
         main_queue, event_manager, event_task, _ = queue_service.get_queue_data(job_id)
         if event_delivery in (EventDeliveryType.STREAMING, EventDeliveryType.DIRECT):
             if event_task is None:
@@ -115,44 +192,40 @@ async def get_flow_events_response(
                 queue=main_queue,
                 event_manager=event_manager,
                 event_task=event_task,
+                job_id=job_id,
+                queue_service=queue_service,
+                after=after,
             )
 
-        # Polling mode - get all available events
+        # Polling mode - long-poll for a batch of events
         try:
-            events: list = []
-            # Get all available events from the queue without blocking
-            while not main_queue.empty():
-                _, value, _ = await main_queue.get()
+            events = _events_after(main_queue, after)
+            wait, limit = _poll_limits(queue_service, max_wait, max_events)
+            if limit > 0 and len(events) >= limit:
+                # The next poll gets the rest of the missed events through the cursor
+                events = events[:limit]
+                batch = []
+            else:
+                # The missed events are returned right away
+                batch = await get_batch(main_queue, limit - len(events) if limit > 0 else 0, 0 if events else wait)
+            for _, value, _ in batch:
                 if value is None:
                     # End of stream, trigger end event
                     if event_task is not None:
                         event_task.cancel()
                     event_manager.on_end(data={})
-                    # Include the end event
-                    events.append(None)
                     break
-                events.append(value.decode("utf-8"))
-
-            # If no events were available, wait for one (with timeout)
-            if not events:
-                _, value, _ = await main_queue.get()
-                if value is None:
-                    # End of stream, trigger end event
-                    if event_task is not None:
-                        event_task.cancel()
-                    event_manager.on_end(data={})
-                else:
-                    events.append(value.decode("utf-8"))
+                events.append(value)
 
-            # Return as NDJSON format - each line is a complete JSON object
-            content = "\n".join([event for event in events if event is not None])
-            return Response(content=content, media_type="application/x-ndjson")
+            # Return as NDJSON format - each event is a complete JSON object followed by blank lines
+            return Response(
+                content=b"".join(events),
+                media_type="application/x-ndjson",
+                headers=_cursor_headers(events, after),
+            )
         except asyncio.CancelledError as exc:
             await logger.ainfo(f"Event polling was cancelled for job {job_id}")
             raise HTTPException(status_code=499, detail="Event polling was cancelled") from exc
-        except asyncio.TimeoutError:
-            await logger.awarning(f"Timeout while waiting for events for job {job_id}")
-            return Response(content="", media_type="application/x-ndjson")  # Return empty response instead of error
 
     except JobQueueNotFoundError as exc:
         await logger.aerror(f"Job not found: {job_id}. Error: {exc!s}")
@@ -164,27 +237,102 @@ async def get_flow_events_response(
         raise HTTPException(status_code=500, detail=f"Unexpected error: {exc!s}") from exc
 
 
+async def get_bus_events_response(
+    *,
+    job_id: str,
+    queue_service: JobQueueService,
+    event_delivery: EventDeliveryType,
+    after: int | None = None,
+    max_wait: float | None = None,
+    max_events: int | None = None,
+) -> Response:
+    """Get the events of a build job from the event bus, which any worker can do.
+
+    Streams and polls work as with the job queue, except that polls without `after` start from the
+    first event rather than from the first one no poll returned yet.
+    """
+    event_bus = queue_service.event_bus
+    if event_bus is None:
+        msg = "The job queue service has no event bus"
+        raise RuntimeError(msg)
+
+    if event_delivery == EventDeliveryType.POLLING:
+        wait, limit = _poll_limits(queue_service, max_wait, max_events)
+        result = await event_bus.read(job_id, after or 0, limit, wait)
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        events, _ = result
+        return Response(
+            content=b"".join(events), media_type="application/x-ndjson", headers=_cursor_headers(events, after)
+        )
+
+    # The first read tells whether the job exists before the response starts
+    first = await event_bus.read(job_id, after or 0, queue_service.POLL_MAX_EVENTS, 0)
+    if first is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    async def consume_and_yield() -> AsyncIterator[bytes]:
+        queue_service.attach_client(job_id)
+        cursor = after or 0
+        result: tuple[list[bytes], bool] | None = first
+        while result is not None:
+            events, finished = result
+            for event in events:
+                yield event
+            if finished:
+                break
+            if events:
+                cursor = get_sequence_id(events[-1]) or cursor
+            result = await event_bus.read(job_id, cursor, queue_service.POLL_MAX_EVENTS, queue_service.POLL_MAX_WAIT)
+
+    return DisconnectHandlerStreamingResponse(
+        consume_and_yield(),
+        media_type="application/x-ndjson",
+        # Only the worker running the job cancels it, the others have no client to detach
+        on_disconnect=lambda: queue_service.detach_client(job_id),
+    )
+
+
 async def create_flow_response(
     queue: asyncio.Queue,
     event_manager: EventManager,
     event_task: asyncio.Task,
+    *,
+    job_id: str | None = None,
+    queue_service: JobQueueService | None = None,
+    after: int | None = None,
 ) -> DisconnectHandlerStreamingResponse:
-    """Create a streaming response for the flow build process."""
+    """Create a streaming response for the flow build process.
 
-    async def consume_and_yield() -> AsyncIterator[str]:
+    The stream starts with the events after the sequence id `after`, if given. When the client
+    disconnects, the build is cancelled right away, or with a `queue_service` only if the client
+    does not reconnect within the job disconnect grace period.
+    """
+
+    async def consume_and_yield() -> AsyncIterator[bytes]:
+        if queue_service is not None and job_id is not None:
+            queue_service.attach_client(job_id)
+        for event in _events_after(queue, after):
+            yield event
         while True:
+            if getattr(queue, "finished", False) and queue.empty():
+                # Another stream already consumed the end of this one
+                break
             try:
                 event_id, value, put_time = await queue.get()
                 if value is None:
                     break
                 get_time = time.time()
-                yield value.decode("utf-8")
+                yield value
                 await logger.adebug(f"Event {event_id} consumed in {get_time - put_time:.4f}s")
             except Exception as exc:  # noqa: BLE001
                 await logger.aexception(f"Error consuming event: {exc}")
                 break
 
     def on_disconnect() -> None:
+        if queue_service is not None and job_id is not None:
+            queue_service.detach_client(job_id)
+            return
         logger.debug("Client disconnected, closing tasks")
         event_task.cancel()
         event_manager.on_end(data={})
@@ -209,12 +357,14 @@ async def generate_flow_events(
     log_builds: bool,
     current_user: CurrentActiveUser,
     flow_name: str | None = None,
+    profile: ProfileFormat | None = None,
 ) -> None:
     """Generate events for flow building process.
 
     This function handles the core flow building logic and generates appropriate events:
     - Building and validating the graph
     - Processing vertices
+    - Sending the run profile, if profiling was requested
     - Handling errors and cleanup
     """
     chat_service = get_chat_service()
@@ -245,7 +395,7 @@ async def generate_flow_events(
             components_count = len(graph.vertices)
             vertices_to_run = list(graph.vertices_to_run.union(get_top_level_vertices(graph, graph.vertices_to_run)))
 
-            await chat_service.set_cache(flow_id_str, graph)
+            await chat_service.set_graph_cache(flow_id_str, graph)
             await log_telemetry(start_time, components_count, run_id=run_id, success=True)
 
         except Exception as exc:
@@ -369,7 +519,7 @@ async def generate_flow_events(
                     artifacts=artifacts,
                 )
             else:
-                await chat_service.set_cache(flow_id_str, graph)
+                await chat_service.set_graph_cache(flow_id_str, graph)
 
             timedelta = time.perf_counter() - start_time
 
@@ -469,14 +619,15 @@ async def generate_flow_events(
             raise
 
         # send built event or error event
-        try:
-            vertex_build_response_json = vertex_build_response.model_dump_json()
-            build_data = json.loads(vertex_build_response_json)
-        except Exception as exc:
-            msg = f"Error serializing vertex build response: {exc}"
-            raise ValueError(msg) from exc
+        with graph.profile_phase(vertex_id, "events"):
+            try:
+                # Serialized once and sent as is, since build results can be large
+                build_data = vertex_build_response.model_dump_json().encode("utf-8")
+            except Exception as exc:
+                msg = f"Error serializing vertex build response: {exc}"
+                raise ValueError(msg) from exc
 
-        event_manager.on_end_vertex(data={"build_data": build_data})
+            event_manager.on_end_vertex(data=EncodedEventData(b'{"build_data": ' + build_data + b"}"))
 
         if vertex_build_response.valid and vertex_build_response.next_vertices_ids:
             tasks = []
@@ -501,6 +652,8 @@ async def generate_flow_events(
         event_manager.on_error(data=error_message.data)
         raise
 
+    if profile is not None:
+        graph.enable_profiling()
     event_manager.on_vertices_sorted(data={"ids": ids, "to_run": vertices_to_run})
 
     tasks = []
@@ -525,8 +678,12 @@ async def generate_flow_events(
         event_manager.on_error(data=error_message.data)
         raise
 
+    if profile is not None:
+        event_manager.on_profile(data={"profile": graph.get_profile(profile)})
     event_manager.on_end(data={})
     await graph.end_all_traces()
+    # The end of the stream must come after every event still waiting to be encoded
+    await event_manager.aclose()
     await event_manager.queue.put((None, None, time.time()))
 
 
@@ -1,10 +1,29 @@
+"""Detection of clients that disconnect before their response is complete.
+
+`DisconnectMiddleware` gives every HTTP request a `CancellationToken` that is cancelled when the
+ASGI server reports `http.disconnect`. The receive channel of a request is only watched once a route
+asks for its token, through the `DisconnectToken` dependency, so other routes pay nothing. Watching
+is event driven: a single task per request waits on the channel instead of polling it.
+"""
+
 import asyncio
 import typing
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Annotated, TypeVar
 
+from fastapi import Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from starlette.background import BackgroundTask
 from starlette.responses import ContentStream
-from starlette.types import Receive
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from wfx.log.logger import logger
+
+T = TypeVar("T")
+
+# Status code nginx uses for requests whose client closed the connection
+CLIENT_CLOSED_REQUEST = 499
+_SCOPE_KEY = "primeagent.disconnect"
 
 
 class DisconnectHandlerStreamingResponse(StreamingResponse):
@@ -29,3 +48,162 @@ class DisconnectHandlerStreamingResponse(StreamingResponse):
                     if asyncio.iscoroutine(coro):
                         await coro
                 break
+
+
+class CancellationToken:
+    """Tells the handlers of a request that its client disconnected.
+
+    Handlers check `cancelled`, wait for it with `wait` or register callbacks with `add_callback`.
+    """
+
+    def __init__(self) -> None:
+        self._event = asyncio.Event()
+        self._callbacks: list[Callable[[], object]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        if self._event.is_set():
+            return
+        self._event.set()
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:  # noqa: BLE001
+                logger.exception("Error in a disconnect callback")
+
+    def add_callback(self, callback: Callable[[], object]) -> Callable[[], None]:
+        """Calls `callback` once the client disconnects, or right away if it already did.
+
+        Returns a function that unregisters the callback.
+        """
+        if self.cancelled:
+            callback()
+            return lambda: None
+        self._callbacks.append(callback)
+
+        def remove() -> None:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+        return remove
+
+    async def wait(self) -> None:
+        await self._event.wait()
+
+
+class _RequestDisconnect:
+    """The receive channel of a request, watched for `http.disconnect` once the token is asked for.
+
+    While it is watched, the watcher task is the only reader of the channel and hands the body
+    messages it reads to the app.
+    """
+
+    def __init__(self, receive: Receive) -> None:
+        self._receive = receive
+        self.token = CancellationToken()
+        self.response_complete = False
+        self._pending: deque[Message] = deque()
+        self._arrived = asyncio.Event()
+        self._watcher: asyncio.Task | None = None
+
+    def watch(self) -> CancellationToken:
+        if self._watcher is None and not self.token.cancelled and not self.response_complete:
+            self._watcher = asyncio.create_task(self._watch())
+        return self.token
+
+    async def receive(self) -> Message:
+        if self._watcher is None:
+            message = await self._receive()
+            if message["type"] == "http.disconnect" and not self.response_complete:
+                self.token.cancel()
+            return message
+        while not self._pending:
+            if self.token.cancelled or self._watcher.done():
+                return {"type": "http.disconnect"}
+            self._arrived.clear()
+            await self._arrived.wait()
+        return self._pending.popleft()
+
+    async def _watch(self) -> None:
+        try:
+            while True:
+                message = await self._receive()
+                if message["type"] == "http.disconnect":
+                    # Servers also report a disconnect once the response is complete
+                    if not self.response_complete:
+                        self.token.cancel()
+                    return
+                self._pending.append(message)
+                self._arrived.set()
+        finally:
+            self._arrived.set()
+
+    async def close(self) -> None:
+        if self._watcher is not None and not self._watcher.done():
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+
+
+class DisconnectMiddleware:
+    """Gives every HTTP request a `CancellationToken` for the `DisconnectToken` dependency."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        disconnect = _RequestDisconnect(receive)
+        scope[_SCOPE_KEY] = disconnect
+
+        async def send_and_track(message: Message) -> None:
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                disconnect.response_complete = True
+            await send(message)
+
+        try:
+            await self.app(scope, disconnect.receive, send_and_track)
+        finally:
+            await disconnect.close()
+
+
+async def get_disconnect_token(request: Request) -> CancellationToken:
+    """Returns the token cancelled when the client of the request disconnects.
+
+    Without `DisconnectMiddleware` the token is never cancelled. The dependency is async so that the
+    watcher task starts on the event loop rather than in the threadpool of sync dependencies.
+    """
+    disconnect = request.scope.get(_SCOPE_KEY)
+    if disconnect is None:
+        return CancellationToken()
+    return disconnect.watch()
+
+
+DisconnectToken = Annotated[CancellationToken, Depends(get_disconnect_token)]
+
+
+async def run_until_disconnected(awaitable: Awaitable[T], token: CancellationToken) -> T:
+    """Awaits `awaitable`, but cancels it and answers 499 if the client disconnects first."""
+    task = asyncio.ensure_future(awaitable)
+    remove = token.add_callback(task.cancel)
+    try:
+        return await task
+    except asyncio.CancelledError as exc:
+        current = asyncio.current_task()
+        if token.cancelled and task.cancelled() and not (current is not None and _cancelling(current)):
+            raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Request was cancelled") from exc
+        raise
+    finally:
+        remove()
+
+
+def _cancelling(task: asyncio.Task) -> bool:
+    # Task.cancelling() only exists from Python 3.11 on
+    cancelling = getattr(task, "cancelling", None)
+    return cancelling is not None and cancelling() > 0
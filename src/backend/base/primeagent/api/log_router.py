@@ -1,12 +1,14 @@
 import asyncio
+import contextlib
 import json
 from http import HTTPStatus
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse, StreamingResponse
 from wfx.log.logger import log_buffer
 
+from primeagent.api.disconnect import CancellationToken, DisconnectToken
 from primeagent.services.auth.utils import get_current_active_user
 
 log_router = APIRouter(tags=["Log"])
@@ -15,11 +17,11 @@ log_router = APIRouter(tags=["Log"])
 NUMBER_OF_NOT_SENT_BEFORE_KEEPALIVE = 5
 
 
-async def event_generator(request: Request):
+async def event_generator(disconnect: CancellationToken):
     global log_buffer  # noqa: PLW0602
     last_read_item = None
     current_not_sent = 0
-    while not await request.is_disconnected():
+    while not disconnect.cancelled:
         to_write: list[Any] = []
         with log_buffer.get_write_lock():
             if last_read_item is None:
@@ -49,12 +51,13 @@ async def event_generator(request: Request):
                 current_not_sent = 0
                 yield "keepalive\n\n"
 
-        await asyncio.sleep(1)
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(disconnect.wait(), timeout=1)
 
 
 @log_router.get("/logs-stream", dependencies=[Depends(get_current_active_user)])
 async def stream_logs(
-    request: Request,
+    disconnect: DisconnectToken,
 ):
     """HTTP/2 Server-Sent-Event (SSE) endpoint for streaming logs.
 
@@ -69,7 +72,7 @@ async def stream_logs(
             detail="Log retrieval is disabled",
         )
 
-    return StreamingResponse(event_generator(request), media_type="text/event-stream")
+    return StreamingResponse(event_generator(disconnect), media_type="text/event-stream")
 
 
 @log_router.get("/logs", dependencies=[Depends(get_current_active_user)])
@@ -19,6 +19,7 @@ from primeagent.api.utils.core import (
     build_graph_from_data,
     build_graph_from_db,
     build_graph_from_db_no_cache,
+    build_graph_template_from_db,
     build_input_keys_response,
     cascade_delete_flow,
     check_primeagent_version,
@@ -29,6 +30,7 @@ from primeagent.api.utils.core import (
     format_syntax_error_message,
     get_causing_exception,
     get_is_component_from_data,
+    get_profile_format_from_request,
     get_suggestion_message,
     get_top_level_vertices,
     has_api_terms,
@@ -57,6 +59,7 @@ __all__ = [
     "build_graph_from_data",
     "build_graph_from_db",
     "build_graph_from_db_no_cache",
+    "build_graph_template_from_db",
     "build_input_keys_response",
     "cascade_delete_flow",
     "check_primeagent_version",
@@ -67,6 +70,7 @@ __all__ = [
     "format_syntax_error_message",
     "get_causing_exception",
     "get_is_component_from_data",
+    "get_profile_format_from_request",
     "get_suggestion_message",
     "get_top_level_vertices",
     # Functions
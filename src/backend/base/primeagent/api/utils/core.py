@@ -11,20 +11,30 @@ from fastapi_pagination import Params
 from sqlalchemy import delete
 from sqlmodel.ext.asyncio.session import AsyncSession
 from wfx.graph.graph.base import Graph
+from wfx.graph.graph.profiler import parse_profile_format
 from wfx.log.logger import logger
-from wfx.services.deps import injectable_session_scope, injectable_session_scope_readonly, session_scope
+from wfx.services.deps import (
+    get_transaction_service,
+    injectable_session_scope,
+    injectable_session_scope_readonly,
+    session_scope,
+)
 from wfx.utils.validate_cloud import raise_error_if_astra_cloud_disable_component
 
 from primeagent.services.auth.utils import get_current_active_user, get_current_active_user_mcp
-from primeagent.services.database.models.flow.model import Flow
+from primeagent.services.database.models.flow.model import Flow, get_is_component
 from primeagent.services.database.models.message.model import MessageTable
 from primeagent.services.database.models.transactions.model import TransactionTable
 from primeagent.services.database.models.user.model import User
 from primeagent.services.database.models.vertex_builds.model import VertexBuildTable
+from primeagent.services.deps import get_db_service
 from primeagent.services.store.utils import get_lf_version_from_pypi
-from primeagent.utils.constants import PRIMEAGENT_GLOBAL_VAR_HEADER_PREFIX
+from primeagent.services.transaction.service import TransactionService
+from primeagent.utils.constants import PRIMEAGENT_GLOBAL_VAR_HEADER_PREFIX, PRIMEAGENT_PROFILE_HEADER
 
 if TYPE_CHECKING:
+    from wfx.graph.graph.profiler import ProfileFormat
+
     from primeagent.services.chat.service import ChatService
     from primeagent.services.store.schema import StoreComponentCreate
 
@@ -115,11 +125,7 @@ def validate_is_component(flows: list[Flow]):
         if not flow.data or flow.is_component is not None:
             continue
 
-        is_component = get_is_component_from_data(flow.data)
-        if is_component is not None:
-            flow.is_component = is_component
-        else:
-            flow.is_component = len(flow.data.get("nodes", [])) == 1
+        flow.is_component = get_is_component(flow.data)
     return flows
 
 
@@ -215,10 +221,22 @@ async def build_graph_from_db_no_cache(flow_id: uuid.UUID, session: AsyncSession
 
 async def build_graph_from_db(flow_id: uuid.UUID, session: AsyncSession, chat_service: ChatService, **kwargs):
     graph = await build_graph_from_db_no_cache(flow_id=flow_id, session=session, **kwargs)
-    await chat_service.set_cache(str(flow_id), graph)
+    await chat_service.set_graph_cache(str(flow_id), graph)
     return graph
 
 
+async def build_graph_template_from_db(flow_id: uuid.UUID | str) -> Graph | None:
+    """Build a graph from the stored flow without starting a run.
+
+    Used to restore the run state snapshots cached by `ChatService.set_graph_cache`.
+    """
+    async with session_scope() as session:
+        flow: Flow | None = await session.get(Flow, flow_id if isinstance(flow_id, uuid.UUID) else uuid.UUID(flow_id))
+    if not flow or not flow.data:
+        return None
+    return Graph.from_payload(flow.data, str(flow_id), flow.name, str(flow.user_id))
+
+
 async def build_and_cache_graph_from_data(
     flow_id: uuid.UUID | str,
     chat_service: ChatService,
@@ -228,7 +246,7 @@ async def build_and_cache_graph_from_data(
     # Convert flow_id to str if it's UUID
     str_flow_id = str(flow_id) if isinstance(flow_id, uuid.UUID) else flow_id
     graph = Graph.from_payload(graph_data, str_flow_id)
-    await chat_service.set_cache(str_flow_id, graph)
+    await chat_service.set_graph_cache(str_flow_id, graph)
     return graph
 
 
@@ -327,6 +345,11 @@ async def cascade_delete_flow(session: AsyncSession, flow_id: uuid.UUID) -> None
         await session.exec(delete(MessageTable).where(MessageTable.flow_id == flow_id))
         await session.exec(delete(TransactionTable).where(TransactionTable.flow_id == flow_id))
         await session.exec(delete(VertexBuildTable).where(VertexBuildTable.flow_id == flow_id))
+        # Builds and transactions of the flow that were not written yet would outlive it
+        get_db_service().vertex_build_writer.discard(lambda vertex_build: vertex_build.flow_id == flow_id)
+        transaction_service = get_transaction_service()
+        if isinstance(transaction_service, TransactionService):
+            transaction_service.writer.discard(lambda transaction: transaction.flow_id == flow_id)
         await session.exec(delete(Flow).where(Flow.id == flow_id))
     except Exception as e:
         msg = f"Unable to cascade delete flow: {flow_id}"
@@ -431,6 +454,26 @@ def extract_global_variables_from_headers(headers) -> dict[str, str]:
     return variables
 
 
+def get_profile_format_from_request(headers, profile: str | None = None) -> ProfileFormat | None:
+    """Read the profiling flag of a run from the `profile` query param or the X-Primeagent-Profile header.
+
+    Args:
+        headers: HTTP headers object (e.g., from FastAPI Request.headers)
+        profile: The value of the `profile` query param, which takes precedence over the header
+
+    Returns:
+        The profile format to return ("summary", "chrome" or "speedscope"), or None if profiling is off
+
+    Raises:
+        HTTPException: If the flag is neither a boolean nor a profile format
+    """
+    value = profile if profile is not None else headers.get(PRIMEAGENT_PROFILE_HEADER)
+    try:
+        return parse_profile_format(value)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
 def raise_error_if_astra_cloud_env():
     """Raise an error if we're in an Astra cloud environment."""
     try:
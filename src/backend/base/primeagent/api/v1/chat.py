@@ -4,11 +4,11 @@ import asyncio
 import time
 import traceback
 import uuid
+from functools import partial
 from typing import TYPE_CHECKING, Annotated
 
-from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Request, status
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, Header, HTTPException, Query, Request, status
 from fastapi.responses import StreamingResponse
-from wfx.graph.graph.base import Graph
 from wfx.graph.utils import log_vertex_build
 from wfx.log.logger import logger
 from wfx.schema.schema import InputValueRequest, OutputValue
@@ -22,8 +22,10 @@ from primeagent.api.utils import (
     EventDeliveryType,
     build_and_cache_graph_from_data,
     build_graph_from_db,
+    build_graph_template_from_db,
     format_elapsed_time,
     format_exception_message,
+    get_profile_format_from_request,
     get_top_level_vertices,
     parse_exception,
     verify_public_flow_and_get_user,
@@ -102,7 +104,7 @@ async def retrieve_vertices_order(
         # and return the same structure but only with the ids
         components_count = len(graph.vertices)
         vertices_to_run = list(graph.vertices_to_run.union(get_top_level_vertices(graph, graph.vertices_to_run)))
-        await chat_service.set_cache(str(flow_id), graph)
+        await chat_service.set_graph_cache(str(flow_id), graph)
         background_tasks.add_task(
             telemetry_service.log_package_playground,
             PlaygroundPayload(
@@ -145,6 +147,10 @@ async def build_flow(
     queue_service: Annotated[JobQueueService, Depends(get_queue_service)],
     flow_name: str | None = None,
     event_delivery: EventDeliveryType = EventDeliveryType.POLLING,
+    profile: str | None = None,
+    coalesce_tokens: bool | None = None,
+    message_deltas: bool | None = None,
+    http_request: Request,
 ):
     """Build and process a flow, returning a job ID for event polling.
 
@@ -164,10 +170,19 @@ async def build_flow(
         queue_service: Queue service for job management
         flow_name: Optional name for the flow
         event_delivery: Optional event delivery type - default is streaming
+        profile: Optional profiling flag ("true" or "summary", "chrome", "speedscope"); the
+            X-Primeagent-Profile header can be used instead. The profile is sent as a "profile" event
+            before the "end" event
+        coalesce_tokens: Optional flag to merge consecutive token events of a message into fewer events.
+            Defaults to the `event_token_coalescing` setting
+        message_deltas: Optional flag to send updates of agent messages as "message_delta" events that
+            only carry what changed. Defaults to the `event_message_deltas` setting
+        http_request: The incoming HTTP request, for the profiling header
 
     Returns:
         Dict with job_id that can be used to poll for build status
     """
+    profile_format = get_profile_format_from_request(http_request.headers, profile)
     # First verify the flow exists
     async with session_scope() as session:
         flow = await session.get(Flow, flow_id)
@@ -186,6 +201,9 @@ async def build_flow(
         current_user=current_user,
         queue_service=queue_service,
         flow_name=flow_name,
+        profile=profile_format,
+        coalesce_tokens=coalesce_tokens,
+        message_deltas=message_deltas,
     )
 
     # This is required to support FE tests - we need to be able to set the event delivery to direct
@@ -204,15 +222,28 @@ async def get_build_events(
     queue_service: Annotated[JobQueueService, Depends(get_queue_service)],
     *,
     event_delivery: EventDeliveryType = EventDeliveryType.STREAMING,
+    after: int | None = None,
+    last_event_id: Annotated[int | None, Header()] = None,
+    max_wait: Annotated[float | None, Query(ge=0)] = None,
+    max_events: Annotated[int | None, Query(ge=1)] = None,
 ):
     """Get events for a specific build job.
 
     Requires authentication to prevent unauthorized access to build events.
+
+    A client that reconnects passes the "seq" of the last event it received as `after`, or in the
+    Last-Event-ID header, to get the events it missed first.
+
+    With polling, each request waits up to `max_wait` seconds for events and returns at most
+    `max_events` of them. The X-Event-Cursor header of the response is the `after` of the next poll.
     """
     return await get_flow_events_response(
         job_id=job_id,
         queue_service=queue_service,
         event_delivery=event_delivery,
+        after=after if after is not None else last_event_id,
+        max_wait=max_wait,
+        max_events=max_events,
     )
 
 
@@ -291,13 +322,10 @@ async def build_vertex(
     error_message = None
     run_id = None
     try:
-        graph: Graph = await chat_service.get_cache(flow_id_str)
-    except KeyError as exc:
-        raise HTTPException(status_code=404, detail="Graph not found") from exc
-
-    try:
-        cache = await chat_service.get_cache(flow_id_str)
-        if isinstance(cache, CacheMiss):
+        graph = await chat_service.get_graph_cache(
+            flow_id_str, load_graph=partial(build_graph_template_from_db, flow_id_str)
+        )
+        if isinstance(graph, CacheMiss):
             # If there's no cache
             await logger.awarning(f"No cache found for {flow_id_str}. Building graph starting at {vertex_id}")
 
@@ -310,7 +338,6 @@ async def build_vertex(
             run_id = str(uuid.uuid4())
             graph.set_run_id(run_id)
         else:
-            graph = cache.get("result")
             await graph.initialize_run()
             run_id = graph.run_id
         vertex = graph.get_vertex(vertex_id)
@@ -383,7 +410,7 @@ async def build_vertex(
         graph.reset_inactivated_vertices()
         graph.reset_activated_vertices()
 
-        await chat_service.set_cache(flow_id_str, graph)
+        await chat_service.set_graph_cache(flow_id_str, graph)
 
         # graph.stop_vertex tells us if the user asked
         # to stop the build of the graph at a certain vertex
@@ -438,20 +465,21 @@ async def _stream_vertex(flow_id: str, vertex_id: str, chat_service: ChatService
     graph = None
     try:
         try:
-            cache = await chat_service.get_cache(flow_id)
+            graph = await chat_service.get_graph_cache(
+                flow_id, load_graph=partial(build_graph_template_from_db, flow_id)
+            )
         except Exception as exc:  # noqa: BLE001
             await logger.aexception("Error building Component")
             yield str(StreamData(event="error", data={"error": str(exc)}))
             return
 
-        if isinstance(cache, CacheMiss):
+        if isinstance(graph, CacheMiss):
             # If there's no cache
             msg = f"No cache found for {flow_id}."
             await logger.aerror(msg)
             yield str(StreamData(event="error", data={"error": msg}))
+            graph = None
             return
-        else:
-            graph = cache.get("result")
 
         try:
             vertex: InterfaceVertex = graph.get_vertex(vertex_id)
@@ -512,7 +540,7 @@ async def _stream_vertex(flow_id: str, vertex_id: str, chat_service: ChatService
     finally:
         await logger.adebug("Closing stream")
         if graph:
-            await chat_service.set_cache(flow_id, graph)
+            await chat_service.set_graph_cache(flow_id, graph)
         yield str(StreamData(event="close", data={"message": "Stream closed"}))
 
 
@@ -562,15 +590,25 @@ async def build_vertex_stream(
 
 async def build_flow_and_stream(flow_id, inputs, background_tasks, current_user):
     queue_service = get_queue_service()
-    build_response = await build_flow(
+    async with session_scope() as session:
+        flow = await session.get(Flow, flow_id)
+        if not flow:
+            raise HTTPException(status_code=404, detail=f"Flow with id {flow_id} not found")
+
+    # Voice mode has no request to read the profiling header from, and its builds are not profiled
+    job_id = await start_flow_build(
         flow_id=flow_id,
-        inputs=inputs,
         background_tasks=background_tasks,
+        inputs=inputs,
+        data=None,
+        files=None,
+        stop_component_id=None,
+        start_component_id=None,
+        log_builds=True,
         current_user=current_user,
         queue_service=queue_service,
-        event_delivery=EventDeliveryType.STREAMING,
+        profile=None,
     )
-    job_id = build_response["job_id"]
     return await get_flow_events_response(
         job_id=job_id,
         queue_service=queue_service,
@@ -593,6 +631,8 @@ async def build_public_tmp(
     request: Request,
     queue_service: Annotated[JobQueueService, Depends(get_queue_service)],
     event_delivery: EventDeliveryType = EventDeliveryType.POLLING,
+    coalesce_tokens: bool | None = None,
+    message_deltas: bool | None = None,
 ):
     """Build a public flow without requiring authentication.
 
@@ -621,6 +661,8 @@ async def build_public_tmp(
         request: FastAPI request object (needed for cookie access)
         queue_service: Queue service for job management
         event_delivery: Optional event delivery type - default is streaming
+        coalesce_tokens: Optional flag to merge consecutive token events of a message into fewer events
+        message_deltas: Optional flag to send updates of agent messages as "message_delta" events
 
     Returns:
         Dict with job_id that can be used to poll for build status
@@ -643,6 +685,8 @@ async def build_public_tmp(
             current_user=owner_user,
             queue_service=queue_service,
             flow_name=flow_name or f"{client_id}_{flow_id}",
+            coalesce_tokens=coalesce_tokens,
+            message_deltas=message_deltas,
         )
     except Exception as exc:
         await logger.aexception("Error building public flow")
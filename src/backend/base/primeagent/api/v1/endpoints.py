@@ -21,12 +21,20 @@ from wfx.custom.utils import (
     update_component_build_config,
 )
 from wfx.graph.graph.base import Graph
+from wfx.graph.graph.template_cache import get_graph_template_cache
 from wfx.graph.schema import RunOutputs
 from wfx.log.logger import logger
 from wfx.schema.schema import InputValueRequest
 from wfx.services.settings.service import SettingsService
 
-from primeagent.api.utils import CurrentActiveUser, DbSession, extract_global_variables_from_headers, parse_value
+from primeagent.api.disconnect import CancellationToken, DisconnectToken, run_until_disconnected
+from primeagent.api.utils import (
+    CurrentActiveUser,
+    DbSession,
+    extract_global_variables_from_headers,
+    get_profile_format_from_request,
+    parse_value,
+)
 from primeagent.api.v1.schemas import (
     ConfigResponse,
     CustomComponentRequest,
@@ -55,6 +63,8 @@ from primeagent.utils.compression import compress_response
 from primeagent.utils.version import get_version_info
 
 if TYPE_CHECKING:
+    from wfx.graph.graph.profiler import ProfileFormat
+
     from primeagent.events.event_manager import EventManager
 
 router = APIRouter(tags=["Base"])
@@ -132,6 +142,41 @@ def validate_input_and_tweaks(input_request: SimplifiedAPIRequest) -> None:
             raise InvalidChatInputError(msg)
 
 
+def _get_batch_concurrency(input_request: SimplifiedAPIRequest) -> int:
+    """Returns how many inputs of a batch request to run at the same time, capped by the settings."""
+    max_concurrency = get_settings_service().settings.max_batch_run_concurrency
+    if input_request.concurrency is None:
+        return max_concurrency
+    return max(1, min(input_request.concurrency, max_concurrency))
+
+
+def _get_graph_for_run(
+    flow: Flow,
+    input_request: SimplifiedAPIRequest,
+    *,
+    stream: bool,
+    user_id: str,
+    context: dict | None,
+) -> Graph:
+    """Returns a graph ready to run, cloned from a cached template of this flow version when possible."""
+    flow_id_str = str(flow.id)
+    tweaks = input_request.tweaks or {}
+
+    def build_graph() -> Graph:
+        graph_data = process_tweaks(flow.data.copy(), tweaks, stream=stream)
+        return Graph.from_payload(
+            graph_data, flow_id=flow_id_str, user_id=user_id, flow_name=flow.name, context=context
+        )
+
+    if flow.updated_at is None:
+        return build_graph()
+    cache = get_graph_template_cache()
+    tweaks_dict = tweaks if isinstance(tweaks, dict) else tweaks.model_dump()
+    key = cache.make_key(flow_id_str, flow.updated_at, tweaks_dict, stream=stream)
+    template = cache.get_or_build(key, build_graph)
+    return template.clone_for_run(user_id=user_id, context=context)
+
+
 async def simple_run_flow(
     flow: Flow,
     input_request: SimplifiedAPIRequest,
@@ -141,6 +186,7 @@ async def simple_run_flow(
     event_manager: EventManager | None = None,
     context: dict | None = None,
     run_id: str | None = None,
+    profile: ProfileFormat | None = None,
 ):
     validate_input_and_tweaks(input_request)
     try:
@@ -150,22 +196,26 @@ async def simple_run_flow(
         if flow.data is None:
             msg = f"Flow {flow_id_str} has no data"
             raise ValueError(msg)
-        graph_data = flow.data.copy()
-        graph_data = process_tweaks(graph_data, input_request.tweaks or {}, stream=stream)
-        graph = Graph.from_payload(
-            graph_data, flow_id=flow_id_str, user_id=str(user_id), flow_name=flow.name, context=context
-        )
+        graph = _get_graph_for_run(flow, input_request, stream=stream, user_id=str(user_id), context=context)
         if run_id is None:
             run_id = str(uuid4())
         graph.set_run_id(run_id)
+        if profile is not None:
+            graph.enable_profiling()
         inputs = None
         if input_request.input_value is not None:
+            input_values = (
+                input_request.input_value
+                if isinstance(input_request.input_value, list)
+                else [input_request.input_value]
+            )
             inputs = [
                 InputValueRequest(
                     components=[],
-                    input_value=input_request.input_value,
+                    input_value=input_value,
                     type=input_request.input_type,
                 )
+                for input_value in input_values
             ]
         if input_request.output_component:
             outputs = [input_request.output_component]
@@ -187,9 +237,14 @@ async def simple_run_flow(
             outputs=outputs,
             stream=stream,
             event_manager=event_manager,
+            concurrency=_get_batch_concurrency(input_request),
         )
 
-        return RunResponse(outputs=task_result, session_id=session_id)
+        return RunResponse(
+            outputs=task_result,
+            session_id=session_id,
+            profile=graph.get_profile(profile) if profile is not None else None,
+        )
 
     except sa.exc.StatementError as exc:
         raise ValueError(str(exc)) from exc
@@ -285,6 +340,7 @@ async def run_flow_generator(
     event_manager: EventManager,
     client_consumed_queue: asyncio.Queue,
     context: dict | None = None,
+    profile: ProfileFormat | None = None,
 ) -> None:
     """Executes a flow asynchronously and manages event streaming to the client.
 
@@ -298,6 +354,7 @@ async def run_flow_generator(
         event_manager (EventManager): Manages the streaming of events to the client
         client_consumed_queue (asyncio.Queue): Tracks client consumption of events
         context (dict | None): Optional context to pass to the flow
+        profile (ProfileFormat | None): Profile the run and include the profile in the "end" event
 
     Events Generated:
         - "add_message": Sent when new messages are added during flow execution
@@ -319,6 +376,7 @@ async def run_flow_generator(
             api_key_user=api_key_user,
             event_manager=event_manager,
             context=context,
+            profile=profile,
         )
         event_manager.on_end(data={"result": result.model_dump()})
         await client_consumed_queue.get()
@@ -326,6 +384,7 @@ async def run_flow_generator(
         await logger.aerror(f"Error running flow: {e}")
         event_manager.on_error(data={"error": str(e)})
     finally:
+        await event_manager.aclose()
         await event_manager.queue.put((None, None, time.time))
 
 
@@ -355,6 +414,8 @@ async def _run_flow_internal(
     api_key_user: User | UserRead,
     context: dict | None,
     http_request: Request,
+    profile: str | None = None,
+    disconnect: CancellationToken | None = None,
 ) -> StreamingResponse | RunResponse:
     """Internal function containing the core business logic for running a flow.
 
@@ -368,6 +429,8 @@ async def _run_flow_internal(
         api_key_user (User | UserRead): Authenticated user (either from session or API key)
         context (dict | None): Optional context to pass to the flow
         http_request (Request): The incoming HTTP request for extracting global variables
+        profile (str | None): Profiling flag from the query, which overrides the X-Primeagent-Profile header
+        disconnect (CancellationToken | None): Cancelled when the client disconnects, which stops the run
 
     Returns:
         Union[StreamingResponse, RunResponse]: Either a streaming response for real-time results
@@ -389,6 +452,14 @@ async def _run_flow_internal(
     if flow is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flow not found")
 
+    profile_format = get_profile_format_from_request(http_request.headers, profile)
+    is_batch = isinstance(input_request.input_value, list) and len(input_request.input_value) > 1
+    if is_batch and profile_format is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Profiling is not supported for batch runs")
+    if is_batch and stream:
+        # The runs of a batch would send their events interleaved on the same stream
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Streaming is not supported for batch runs")
+
     # Extract request-level variables from headers with prefix X-PRIMEAGENT-GLOBAL-VAR-*
     request_variables = extract_global_variables_from_headers(http_request.headers)
 
@@ -406,6 +477,7 @@ async def _run_flow_internal(
         asyncio_queue: asyncio.Queue = asyncio.Queue()
         asyncio_queue_client_consumed: asyncio.Queue = asyncio.Queue()
         event_manager = create_stream_tokens_event_manager(queue=asyncio_queue)
+        event_manager.start_encoder()
         main_task = asyncio.create_task(
             run_flow_generator(
                 flow=flow,
@@ -414,6 +486,7 @@ async def _run_flow_internal(
                 event_manager=event_manager,
                 client_consumed_queue=asyncio_queue_client_consumed,
                 context=context,
+                profile=profile_format,
             )
         )
 
@@ -421,6 +494,10 @@ async def _run_flow_internal(
             await logger.adebug("Client disconnected, closing tasks")
             main_task.cancel()
 
+        if disconnect is not None:
+            # Stop the run as soon as the client is gone rather than once the response ends
+            disconnect.add_callback(main_task.cancel)
+
         return StreamingResponse(
             consume_and_yield(asyncio_queue, asyncio_queue_client_consumed),
             background=on_disconnect,
@@ -429,14 +506,16 @@ async def _run_flow_internal(
 
     run_id = str(uuid4())
     try:
-        result = await simple_run_flow(
+        run = simple_run_flow(
             flow=flow,
             input_request=input_request,
             stream=stream,
             api_key_user=api_key_user,
             context=context,
             run_id=run_id,
+            profile=profile_format,
         )
+        result = await (run_until_disconnected(run, disconnect) if disconnect is not None else run)
         end_time = time.perf_counter()
         background_tasks.add_task(
             telemetry_service.log_package_run,
@@ -468,6 +547,9 @@ async def _run_flow_internal(
         raise APIException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, exception=exc, flow=flow) from exc
     except InvalidChatInputError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except HTTPException:
+        # The client disconnected before the run ended
+        raise
     except Exception as exc:
         background_tasks.add_task(
             telemetry_service.log_package_run,
@@ -494,6 +576,8 @@ async def simplified_run_flow(
     api_key_user: Annotated[UserRead, Depends(api_key_security)],
     context: dict | None = None,
     http_request: Request,
+    profile: str | None = None,
+    disconnect: DisconnectToken,
 ):
     """Executes a specified flow by ID with support for streaming and telemetry (API key auth).
 
@@ -509,6 +593,9 @@ async def simplified_run_flow(
         api_key_user (UserRead): Authenticated user from API key
         context (dict | None): Optional context to pass to the flow
         http_request (Request): The incoming HTTP request for extracting global variables
+        profile (str | None): Profile the run ("true" or "summary", "chrome", "speedscope"); the
+            X-Primeagent-Profile header can be used instead
+        disconnect (CancellationToken): Cancelled when the client disconnects, which stops the run
 
     Returns:
         Union[StreamingResponse, RunResponse]: Either a streaming response for real-time results
@@ -539,6 +626,8 @@ async def simplified_run_flow(
         api_key_user=api_key_user,
         context=context,
         http_request=http_request,
+        profile=profile,
+        disconnect=disconnect,
     )
 
 
@@ -552,6 +641,8 @@ async def simplified_run_flow_session(
     api_key_user: CurrentActiveUser,
     context: dict | None = None,
     http_request: Request,
+    profile: str | None = None,
+    disconnect: DisconnectToken,
 ):
     """Executes a specified flow by ID with support for streaming and telemetry (session auth).
 
@@ -567,6 +658,9 @@ async def simplified_run_flow_session(
         api_key_user (User): Authenticated user from session
         context (dict | None): Optional context to pass to the flow
         http_request (Request): The incoming HTTP request for extracting global variables
+        profile (str | None): Profile the run ("true" or "summary", "chrome", "speedscope"); the
+            X-Primeagent-Profile header can be used instead
+        disconnect (CancellationToken): Cancelled when the client disconnects, which stops the run
 
     Returns:
         Union[StreamingResponse, RunResponse]: Either a streaming response for real-time results
@@ -605,6 +699,8 @@ async def simplified_run_flow_session(
         api_key_user=api_key_user,
         context=context,
         http_request=http_request,
+        profile=profile,
+        disconnect=disconnect,
     )
 
 
@@ -39,7 +39,11 @@ from primeagent.services.database.models.flow.model import (
     FlowRead,
     FlowUpdate,
 )
-from primeagent.services.database.models.flow.utils import get_webhook_component_in_flow
+from primeagent.services.database.models.flow.utils import (
+    get_webhook_component_in_flow,
+    select_flow_headers,
+    to_flow_headers,
+)
 from primeagent.services.database.models.folder.constants import DEFAULT_FOLDER_NAME
 from primeagent.services.database.models.folder.model import Folder
 from primeagent.services.deps import get_settings_service, get_storage_service
@@ -289,7 +293,7 @@ async def create_flow(
     return flow_read
 
 
-@router.get("/", response_model=list[FlowRead] | Page[FlowRead] | list[FlowHeader], status_code=200)
+@router.get("/", response_model=list[FlowRead] | Page[FlowRead] | list[FlowHeader] | Page[FlowHeader], status_code=200)
 async def read_flows(
     *,
     current_user: CurrentActiveUser,
@@ -318,8 +322,8 @@ async def read_flows(
         header_flows (bool, optional): Whether to return only specific headers of the flows. Defaults to False.
 
     Returns:
-        list[FlowRead] | Page[FlowRead] | list[FlowHeader]
-        A list of flows or a paginated response containing the list of flows or a list of flow headers.
+        list[FlowRead] | Page[FlowRead] | list[FlowHeader] | Page[FlowHeader]
+        A list of flows or a paginated response containing the list of flows, or the same with flow headers.
     """
     try:
         auth_settings = get_settings_service().auth_settings
@@ -339,12 +343,14 @@ async def read_flows(
         if not folder_id:
             folder_id = default_folder_id
 
+        # Headers are read from their columns only, so listing flows does not load their data
+        stmt = select_flow_headers() if header_flows else select(Flow)
         if auth_settings.AUTO_LOGIN:
-            stmt = select(Flow).where(
+            stmt = stmt.where(
                 (Flow.user_id == None) | (Flow.user_id == current_user.id)  # noqa: E711
             )
         else:
-            stmt = select(Flow).where(Flow.user_id == current_user.id)
+            stmt = stmt.where(Flow.user_id == current_user.id)
 
         if remove_example_flows:
             stmt = stmt.where(Flow.folder_id != starter_folder_id)
@@ -353,16 +359,16 @@ async def read_flows(
             stmt = stmt.where(Flow.is_component == True)  # noqa: E712
 
         if get_all:
+            if header_flows:
+                flow_headers = to_flow_headers((await session.exec(stmt)).all())
+                return compress_response(flow_headers)
+
             flows = (await session.exec(stmt)).all()
             flows = validate_is_component(flows)
             if components_only:
                 flows = [flow for flow in flows if flow.is_component]
             if remove_example_flows and starter_folder_id:
                 flows = [flow for flow in flows if flow.folder_id != starter_folder_id]
-            if header_flows:
-                # Convert to FlowHeader objects and compress the response
-                flow_headers = [FlowHeader.model_validate(flow, from_attributes=True) for flow in flows]
-                return compress_response(flow_headers)
 
             # Convert to FlowRead while session is still active to avoid detached instance errors
             flow_reads = [FlowRead.model_validate(flow, from_attributes=True) for flow in flows]
@@ -376,6 +382,9 @@ async def read_flows(
             warnings.filterwarnings(
                 "ignore", category=DeprecationWarning, module=r"fastapi_pagination\.ext\.sqlalchemy"
             )
+            if header_flows:
+                # Each row is a flow, and its JSON columns make it unhashable
+                return await apaginate(session, stmt, params=params, transformer=to_flow_headers, unique=False)
             return await apaginate(session, stmt, params=params)
 
     except Exception as e:
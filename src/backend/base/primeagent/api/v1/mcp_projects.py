@@ -223,18 +223,22 @@ async def _build_project_tools_response(
         async with session_scope() as session:
             # Fetch the project first to verify it exists and belongs to the current user
             project = (
-                await session.exec(
-                    select(Folder)
-                    .options(selectinload(Folder.flows))
-                    .where(Folder.id == project_id, Folder.user_id == current_user.id)
-                )
+                await session.exec(select(Folder).where(Folder.id == project_id, Folder.user_id == current_user.id))
             ).first()
 
             if not project:
                 raise HTTPException(status_code=404, detail="Project not found")
 
-            # Query flows in the project
-            flows_query = select(Flow).where(Flow.folder_id == project_id, Flow.is_component == False)  # noqa: E712
+            # Query the columns the tools are described with, not the data of the flows
+            flows_query = select(
+                Flow.id,
+                Flow.name,
+                Flow.description,
+                Flow.user_id,
+                Flow.mcp_enabled,
+                Flow.action_name,
+                Flow.action_description,
+            ).where(Flow.folder_id == project_id, Flow.is_component == False)  # noqa: E712
 
             # Optionally filter for MCP-enabled flows only
             if mcp_enabled:
@@ -6,11 +6,13 @@ from fastapi_pagination import Page, Params
 from fastapi_pagination.ext.sqlmodel import apaginate
 from sqlalchemy import delete
 from sqlmodel import col, select
+from wfx.services.deps import get_transaction_service
 
 from primeagent.api.utils import DbSession, custom_params
 from primeagent.schema.message import MessageResponse
 from primeagent.services.auth.utils import get_current_active_user
 from primeagent.services.database.models.flow.model import Flow
+from primeagent.services.database.models.message.crud import paginate_messages
 from primeagent.services.database.models.message.model import MessageRead, MessageTable, MessageUpdate
 from primeagent.services.database.models.transactions.crud import transform_transaction_table_for_logs
 from primeagent.services.database.models.transactions.model import TransactionLogsResponse, TransactionTable
@@ -20,6 +22,8 @@ from primeagent.services.database.models.vertex_builds.crud import (
     get_vertex_builds_by_flow_id,
 )
 from primeagent.services.database.models.vertex_builds.model import VertexBuildMapModel
+from primeagent.services.deps import get_db_service
+from primeagent.services.transaction.service import TransactionService
 
 router = APIRouter(prefix="/monitor", tags=["Monitor"])
 
@@ -27,6 +31,8 @@ router = APIRouter(prefix="/monitor", tags=["Monitor"])
 @router.get("/builds", dependencies=[Depends(get_current_active_user)])
 async def get_vertex_builds(flow_id: Annotated[UUID, Query()], session: DbSession) -> VertexBuildMapModel:
     try:
+        # Builds are written behind, so write the pending ones before reading them back
+        await get_db_service().vertex_build_writer.flush()
         vertex_builds = await get_vertex_builds_by_flow_id(session, flow_id)
         return VertexBuildMapModel.from_list_of_dicts(vertex_builds)
     except Exception as e:
@@ -36,6 +42,7 @@ async def get_vertex_builds(flow_id: Annotated[UUID, Query()], session: DbSessio
 @router.delete("/builds", status_code=204, dependencies=[Depends(get_current_active_user)])
 async def delete_vertex_builds(flow_id: Annotated[UUID, Query()], session: DbSession) -> None:
     try:
+        get_db_service().vertex_build_writer.discard(lambda vertex_build: vertex_build.flow_id == flow_id)
         await delete_vertex_builds_by_flow_id(session, flow_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -46,6 +53,8 @@ async def get_message_sessions(
     session: DbSession,
     current_user: Annotated[User, Depends(get_current_active_user)],
     flow_id: Annotated[UUID | None, Query()] = None,
+    after: Annotated[str | None, Query(description="Last session id of the previous page")] = None,
+    limit: Annotated[int | None, Query(ge=1)] = None,
 ) -> list[str]:
     try:
         # Use JOIN instead of subquery for better performance
@@ -56,6 +65,13 @@ async def get_message_sessions(
 
         if flow_id:
             stmt = stmt.where(MessageTable.flow_id == flow_id)
+        if after is not None or limit:
+            # Pages of session ids follow each other in session id order
+            stmt = stmt.order_by(MessageTable.session_id)
+            if after is not None:
+                stmt = stmt.where(MessageTable.session_id > after)
+            if limit:
+                stmt = stmt.limit(limit)
 
         session_ids = await session.exec(stmt)
         return list(session_ids)
@@ -72,7 +88,11 @@ async def get_messages(
     sender: Annotated[str | None, Query()] = None,
     sender_name: Annotated[str | None, Query()] = None,
     order_by: Annotated[str | None, Query()] = "timestamp",
+    after: Annotated[UUID | None, Query(description="Id of the last message of the previous page")] = None,
+    limit: Annotated[int | None, Query(ge=1)] = None,
 ) -> list[MessageResponse]:
+    if after is not None and order_by != "timestamp":
+        raise HTTPException(status_code=400, detail="Messages can only be paginated when ordered by timestamp")
     try:
         # Use JOIN instead of subquery for better performance
         stmt = select(MessageTable)
@@ -90,9 +110,14 @@ async def get_messages(
             stmt = stmt.where(MessageTable.sender == sender)
         if sender_name:
             stmt = stmt.where(MessageTable.sender_name == sender_name)
-        if order_by:
-            order_col = getattr(MessageTable, order_by).asc()
-            stmt = stmt.order_by(order_col)
+        if order_by == "timestamp":
+            stmt = paginate_messages(stmt, after=after, limit=limit, descending=False)
+        else:
+            if order_by:
+                order_col = getattr(MessageTable, order_by).asc()
+                stmt = stmt.order_by(order_col)
+            if limit:
+                stmt = stmt.limit(limit)
         messages = await session.exec(stmt)
         return [MessageResponse.model_validate(d, from_attributes=True) for d in messages]
     except Exception as e:
@@ -195,6 +220,10 @@ async def get_transactions(
     params: Annotated[Params | None, Depends(custom_params)],
 ) -> Page[TransactionLogsResponse]:
     try:
+        # Transactions are written behind, so write the pending ones before reading them back
+        transaction_service = get_transaction_service()
+        if isinstance(transaction_service, TransactionService):
+            await transaction_service.flush()
         stmt = (
             select(TransactionTable)
             .where(TransactionTable.flow_id == flow_id)
@@ -36,6 +36,7 @@ from primeagent.services.auth.mcp_encryption import encrypt_auth_settings
 from primeagent.services.database.models.api_key.crud import create_api_key
 from primeagent.services.database.models.api_key.model import ApiKeyCreate
 from primeagent.services.database.models.flow.model import Flow, FlowCreate, FlowRead
+from primeagent.services.database.models.flow.utils import select_flow_headers, to_flow_headers
 from primeagent.services.database.models.folder.constants import DEFAULT_FOLDER_NAME
 from primeagent.services.database.models.folder.model import (
     Folder,
@@ -44,7 +45,10 @@ from primeagent.services.database.models.folder.model import (
     FolderReadWithFlows,
     FolderUpdate,
 )
-from primeagent.services.database.models.folder.pagination_model import FolderWithPaginatedFlows
+from primeagent.services.database.models.folder.pagination_model import (
+    FolderWithPaginatedFlowHeaders,
+    FolderWithPaginatedFlows,
+)
 from primeagent.services.deps import get_service, get_settings_service, get_storage_service
 from primeagent.services.schema import ServiceType
 
@@ -236,7 +240,11 @@ async def read_projects(
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
-@router.get("/{project_id}", response_model=FolderWithPaginatedFlows | FolderReadWithFlows, status_code=200)
+@router.get(
+    "/{project_id}",
+    response_model=FolderWithPaginatedFlows | FolderWithPaginatedFlowHeaders | FolderReadWithFlows,
+    status_code=200,
+)
 async def read_project(
     *,
     session: DbSession,
@@ -248,15 +256,16 @@ async def read_project(
     is_component: bool = False,
     is_flow: bool = False,
     search: str = "",
+    header_flows: bool = False,
 ):
+    # Check if pagination is explicitly requested by the user (both page and size provided)
+    paginated = page is not None and size is not None
     try:
-        project = (
-            await session.exec(
-                select(Folder)
-                .options(selectinload(Folder.flows))
-                .where(Folder.id == project_id, Folder.user_id == current_user.id)
-            )
-        ).first()
+        stmt = select(Folder).where(Folder.id == project_id, Folder.user_id == current_user.id)
+        if not paginated:
+            # Every flow of the project is returned
+            stmt = stmt.options(selectinload(Folder.flows))
+        project = (await session.exec(stmt)).first()
     except Exception as e:
         if "No result found" in str(e):
             raise HTTPException(status_code=404, detail="Project not found") from e
@@ -266,9 +275,10 @@ async def read_project(
         raise HTTPException(status_code=404, detail="Project not found")
 
     try:
-        # Check if pagination is explicitly requested by the user (both page and size provided)
-        if page is not None and size is not None:
-            stmt = select(Flow).where(Flow.folder_id == project_id)
+        if paginated:
+            # Headers are read from their columns only, so listing flows does not load their data
+            stmt = select_flow_headers() if header_flows else select(Flow)
+            stmt = stmt.where(Flow.folder_id == project_id)
 
             if Flow.updated_at is not None:
                 stmt = stmt.order_by(Flow.updated_at.desc())  # type: ignore[attr-defined]
@@ -285,6 +295,14 @@ async def read_project(
                 warnings.filterwarnings(
                     "ignore", category=DeprecationWarning, module=r"fastapi_pagination\.ext\.sqlalchemy"
                 )
+                if header_flows:
+                    # Each row is a flow, and its JSON columns make it unhashable
+                    paginated_headers = await apaginate(
+                        session, stmt, params=params, transformer=to_flow_headers, unique=False
+                    )
+                    return FolderWithPaginatedFlowHeaders(
+                        folder=FolderRead.model_validate(project), flows=paginated_headers
+                    )
                 paginated_flows = await apaginate(session, stmt, params=params)
 
             return FolderWithPaginatedFlows(folder=FolderRead.model_validate(project), flows=paginated_flows)
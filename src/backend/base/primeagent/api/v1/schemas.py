@@ -67,6 +67,7 @@ class RunResponse(BaseModel):
 
     outputs: list[RunOutputs] | None = []
     session_id: str | None = None
+    profile: dict[str, Any] | None = None
 
     @model_serializer(mode="plain")
     def serialize(self):
@@ -80,6 +81,8 @@ class RunResponse(BaseModel):
                 else:
                     serialized_outputs.append(output)
             serialized["outputs"] = serialized_outputs
+        if self.profile is not None:
+            serialized["profile"] = self.profile
         return serialized
 
 
@@ -336,7 +339,11 @@ class VerticesBuiltResponse(BaseModel):
 
 
 class SimplifiedAPIRequest(BaseModel):
-    input_value: str | None = Field(default=None, description="The input value")
+    input_value: str | list[str] | None = Field(
+        default=None,
+        description="The input value, or a list of input values to run the flow once per value. "
+        "Lists of input values can't be streamed.",
+    )
     input_type: InputType | None = Field(default="chat", description="The input type")
     output_type: OutputType | None = Field(default="chat", description="The output type")
     output_component: str | None = Field(
@@ -345,6 +352,12 @@ class SimplifiedAPIRequest(BaseModel):
     )
     tweaks: Tweaks | None = Field(default=None, description="The tweaks")
     session_id: str | None = Field(default=None, description="The session id")
+    concurrency: int | None = Field(
+        default=None,
+        ge=1,
+        description="How many of the input values of a list to run at the same time. "
+        "Capped by the max_batch_run_concurrency setting.",
+    )
 
 
 # (alias) type ReactFlowJsonObject<NodeData = any, EdgeData = any> = {
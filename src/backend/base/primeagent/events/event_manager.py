@@ -2,6 +2,7 @@
 # This module redirects imports to the new wfx.events.event_manager module
 
 from wfx.events.event_manager import (
+    EncodedEventData,
     EventCallback,
     EventManager,
     PartialEventCallback,
@@ -10,6 +11,7 @@ from wfx.events.event_manager import (
 )
 
 __all__ = [
+    "EncodedEventData",
     "EventCallback",
     "EventManager",
     "PartialEventCallback",
@@ -27,6 +27,7 @@ from wfx.interface.utils import setup_llm_caching
 from wfx.log.logger import configure, logger
 
 from primeagent.api import health_check_router, log_router, router
+from primeagent.api.disconnect import DisconnectMiddleware
 from primeagent.api.v1.mcp_projects import init_mcp_servers
 from primeagent.initial_setup.setup import (
     copy_profile_pictures,
@@ -74,32 +75,6 @@ async def log_exception_to_telemetry(exc: Exception, context: str) -> None:
         await logger.awarning(f"Failed to log {context} exception to telemetry")
 
 
-class RequestCancelledMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app) -> None:
-        super().__init__(app)
-
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        sentinel = object()
-
-        async def cancel_handler():
-            while True:
-                if await request.is_disconnected():
-                    return sentinel
-                await asyncio.sleep(0.1)
-
-        handler_task = asyncio.create_task(call_next(request))
-        cancel_task = asyncio.create_task(cancel_handler())
-
-        done, pending = await asyncio.wait([handler_task, cancel_task], return_when=asyncio.FIRST_COMPLETED)
-
-        for task in pending:
-            task.cancel()
-
-        if cancel_task in done:
-            return Response("Request was cancelled", status_code=499)
-        return await handler_task
-
-
 class JavaScriptMIMETypeMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
         try:
@@ -424,6 +399,8 @@ def create_app():
     app.add_middleware(
         ContentSizeLimitMiddleware,
     )
+    # Routes that declare a DisconnectToken learn when their client disconnects
+    app.add_middleware(DisconnectMiddleware)
 
     setup_sentry(app)
 
@@ -444,6 +421,8 @@ def create_app():
         allow_credentials=settings.cors_allow_credentials,
         allow_methods=settings.cors_allow_methods,
         allow_headers=settings.cors_allow_headers,
+        # Long-polled build events return the cursor of the next poll in a header
+        expose_headers=["X-Event-Cursor"],
     )
     app.add_middleware(JavaScriptMIMETypeMiddleware)
 
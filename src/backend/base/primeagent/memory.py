@@ -12,8 +12,9 @@ from wfx.log.logger import logger
 from wfx.utils.async_helpers import run_until_complete
 
 from primeagent.schema.message import Message
+from primeagent.services.database.models.message.crud import paginate_messages
 from primeagent.services.database.models.message.model import MessageRead, MessageTable
-from primeagent.services.deps import session_scope
+from primeagent.services.deps import get_db_service, session_scope
 
 
 def _get_variable_query(
@@ -25,6 +26,7 @@ def _get_variable_query(
     order: str | None = "DESC",
     flow_id: UUID | None = None,
     limit: int | None = None,
+    after: UUID | str | None = None,
 ):
     stmt = select(MessageTable).where(MessageTable.error == False)  # noqa: E712
     if sender:
@@ -37,6 +39,11 @@ def _get_variable_query(
         stmt = stmt.where(MessageTable.context_id == context_id)
     if flow_id:
         stmt = stmt.where(MessageTable.flow_id == flow_id)
+    if order_by == "timestamp":
+        return paginate_messages(stmt, after=after, limit=limit, descending=order == "DESC")
+    if after is not None:
+        msg = "Messages can only be paginated with `after` when ordered by timestamp"
+        raise ValueError(msg)
     if order_by:
         col = getattr(MessageTable, order_by).desc() if order == "DESC" else getattr(MessageTable, order_by).asc()
         stmt = stmt.order_by(col)
@@ -54,6 +61,7 @@ def get_messages(
     order: str | None = "DESC",
     flow_id: UUID | None = None,
     limit: int | None = None,
+    after: UUID | str | None = None,
 ) -> list[Message]:
     """DEPRECATED - Retrieves messages from the monitor service based on the provided filters.
 
@@ -68,6 +76,8 @@ def get_messages(
         order (Optional[str]): The order in which to retrieve the messages. Defaults to "DESC".
         flow_id (Optional[UUID]): The flow ID associated with the messages.
         limit (Optional[int]): The maximum number of messages to retrieve.
+        after (Optional[UUID]): The id of the last message of the previous page. Only the messages
+            that come after it in the requested order are retrieved.
 
     Returns:
         List[Data]: A list of Data objects representing the retrieved messages.
@@ -82,6 +92,7 @@ def get_messages(
             order,
             flow_id,
             limit,
+            after,
         )
     )
 
@@ -95,6 +106,7 @@ async def aget_messages(
     order: str | None = "DESC",
     flow_id: UUID | None = None,
     limit: int | None = None,
+    after: UUID | str | None = None,
 ) -> list[Message]:
     """Retrieves messages from the monitor service based on the provided filters.
 
@@ -107,12 +119,14 @@ async def aget_messages(
         order (Optional[str]): The order in which to retrieve the messages. Defaults to "DESC".
         flow_id (Optional[UUID]): The flow ID associated with the messages.
         limit (Optional[int]): The maximum number of messages to retrieve.
+        after (Optional[UUID]): The id of the last message of the previous page. Only the messages
+            that come after it in the requested order are retrieved.
 
     Returns:
         List[Data]: A list of Data objects representing the retrieved messages.
     """
     async with session_scope() as session:
-        stmt = _get_variable_query(sender, sender_name, session_id, context_id, order_by, order, flow_id, limit)
+        stmt = _get_variable_query(sender, sender_name, session_id, context_id, order_by, order, flow_id, limit, after)
         messages = await session.exec(stmt)
         return [await Message.create(**d.model_dump()) for d in messages]
 
@@ -143,37 +157,41 @@ async def aadd_messages(messages: Message | list[Message], flow_id: str | UUID |
 
     try:
         messages_models = [MessageTable.from_message(msg, flow_id=flow_id) for msg in messages]
-        async with session_scope() as session:
-            messages_models = await aadd_messagetables(messages_models, session)
-        return [await Message.create(**message.model_dump()) for message in messages_models]
+        # Messages stored by concurrent sessions at the same time are inserted together
+        messages_models = await get_db_service().message_writer.insert(messages_models)
+        return [await Message.create(**message.model_dump()) for message in _to_message_reads(messages_models)]
     except Exception as e:
         await logger.aexception(e)
         raise
 
 
-async def aupdate_messages(messages: Message | list[Message]) -> list[Message]:
+async def aupdate_messages(messages: Message | list[Message], *, debounce: bool = False) -> list[Message]:
+    """Update stored messages.
+
+    Args:
+        messages: Message or list of messages to update.
+        debounce: If True, the update is merged with the next updates of the same messages and written
+            within `message_update_debounce` seconds, and the messages are returned as given. Use it for
+            the updates of a message that is still being produced.
+
+    Raises:
+        ValueError: If a message is not found. Not raised for debounced updates.
+    """
     if not isinstance(messages, list):
         messages = [messages]
 
-    async with session_scope() as session:
-        updated_messages: list[MessageTable] = []
-        for message in messages:
-            msg = await session.get(MessageTable, message.id)
-            if msg:
-                msg = msg.sqlmodel_update(message.model_dump(exclude_unset=True, exclude_none=True))
-                # Convert flow_id to UUID if it's a string preventing error when saving to database
-                if msg.flow_id and isinstance(msg.flow_id, str):
-                    msg.flow_id = UUID(msg.flow_id)
-                result = session.add(msg)
-                if asyncio.iscoroutine(result):
-                    await result
-                updated_messages.append(msg)
-            else:
-                error_message = f"Message with id {message.id} not found"
-                await logger.awarning(error_message)
-                raise ValueError(error_message)
-
-        return [MessageRead.model_validate(message, from_attributes=True) for message in updated_messages]
+    writer = get_db_service().message_writer
+    updates = [(message.id, message.model_dump(exclude_unset=True, exclude_none=True)) for message in messages]
+    if debounce:
+        for message_id, fields in updates:
+            writer.update_later(message_id, fields)
+        return messages
+    try:
+        updated_messages = await writer.update(updates)
+    except ValueError as e:
+        await logger.awarning(str(e))
+        raise
+    return [MessageRead.model_validate(message, from_attributes=True) for message in updated_messages]
 
 
 async def aadd_messagetables(messages: list[MessageTable], session: AsyncSession, retry_count: int = 0):
@@ -218,6 +236,10 @@ async def aadd_messagetables(messages: list[MessageTable], session: AsyncSession
         await logger.aexception(e)
         raise
 
+    return _to_message_reads(messages)
+
+
+def _to_message_reads(messages: list[MessageTable]) -> list[MessageRead]:
     new_messages = []
     for msg in messages:
         msg.properties = json.loads(msg.properties) if isinstance(msg.properties, str) else msg.properties  # type: ignore[arg-type]
@@ -254,7 +276,7 @@ async def adelete_messages(session_id: str | None = None, context_id: str | None
 
         # Determine which field to filter by
         filter_column = MessageTable.context_id if context_id else MessageTable.session_id
-        filter_value = context_id if context_id else session_id
+        filter_value = context_id or session_id
 
         stmt = (
             delete(MessageTable)
@@ -270,6 +292,7 @@ async def delete_message(id_: str) -> None:
     Args:
         id_ (str): The ID of the message to delete.
     """
+    get_db_service().message_writer.discard([id_])
     async with session_scope() as session:
         message = await session.get(MessageTable, id_)
         if message:
@@ -32,8 +32,12 @@ async def run_graph_internal(
     inputs: list[InputValueRequest] | None = None,
     outputs: list[str] | None = None,
     event_manager: EventManager | None = None,
+    concurrency: int = 1,
 ) -> tuple[list[RunOutputs], str]:
-    """Run the graph and generate the result."""
+    """Run the graph and generate the result.
+
+    With several inputs each one runs on its own copy of the graph, `concurrency` of them at a time.
+    """
     inputs = inputs or []
     effective_session_id = session_id or flow_id
     components = []
@@ -58,6 +62,7 @@ async def run_graph_internal(
         session_id=effective_session_id or "",
         fallback_to_env_vars=fallback_to_env_vars,
         event_manager=event_manager,
+        concurrency=concurrency,
     )
     return run_outputs, effective_session_id
 
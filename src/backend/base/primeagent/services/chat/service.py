@@ -1,12 +1,23 @@
+from __future__ import annotations
+
 import asyncio
 from collections import defaultdict
 from threading import RLock
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+from wfx.graph.graph.run_state import is_run_state, restore_graph, snapshot_graph
+from wfx.services.cache.utils import CACHE_MISS, CacheMiss
 
 from primeagent.services.base import Service
 from primeagent.services.cache.base import AsyncBaseCacheService, CacheService
+from primeagent.services.cache.service import AsyncInMemoryCache, ThreadingInMemoryCache
 from primeagent.services.deps import get_cache_service
 
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from wfx.graph.graph.base import Graph
+
 
 class ChatService(Service):
     """Service class for managing chat-related operations."""
@@ -55,6 +66,51 @@ class ChatService(Service):
             return await self.cache_service.get(key, lock=lock or self.async_cache_locks[key])
         return await asyncio.to_thread(self.cache_service.get, key, lock=lock or self._sync_cache_locks[key])
 
+    async def set_graph_cache(self, key: str, graph: Graph, lock: asyncio.Lock | None = None) -> bool:
+        """Cache a graph between build requests.
+
+        In-memory caches keep the graph object itself. Caches that serialize their values store a
+        compact run state snapshot instead, since pickling the whole graph on every step is much
+        slower than restoring it from the template cache when it is read.
+
+        Args:
+            key (str): The cache key, usually the flow ID.
+            graph (Graph): The graph to cache.
+            lock (Optional[asyncio.Lock], optional): The lock to use for the cache operation. Defaults to None.
+
+        Returns:
+            bool: True if the cache was set successfully, False otherwise.
+        """
+        if isinstance(self.cache_service, ThreadingInMemoryCache | AsyncInMemoryCache):
+            return await self.set_cache(key, graph, lock=lock)
+        return await self.set_cache(key, snapshot_graph(graph), lock=lock)
+
+    async def get_graph_cache(
+        self,
+        key: str,
+        lock: asyncio.Lock | None = None,
+        load_graph: Callable[[], Awaitable[Graph | None]] | None = None,
+    ) -> Graph | CacheMiss:
+        """Get a graph cached with `set_graph_cache`.
+
+        Args:
+            key (str): The cache key, usually the flow ID.
+            lock (Optional[asyncio.Lock], optional): The lock to use for the cache operation. Defaults to None.
+            load_graph (optional): A coroutine that builds the graph from the stored flow, used to restore
+                a run state snapshot when this process has no template for it.
+
+        Returns:
+            Graph | CacheMiss: The cached graph, or a cache miss if there is none or it can't be restored.
+        """
+        cache = await self.get_cache(key, lock=lock)
+        if isinstance(cache, CacheMiss):
+            return cache
+        data = cache.get("result")
+        if not is_run_state(data):
+            return data
+        graph = await restore_graph(data, self.get_cache, load_graph)
+        return CACHE_MISS if graph is None else graph
+
     async def clear_cache(self, key: str, lock: asyncio.Lock | None = None) -> None:
         """Clear the cache for a client.
 
@@ -0,0 +1,172 @@
+"""Write-behind buffering of records that are written to the database in batches.
+
+Logging a record only appends it to an in-memory buffer, so callers never wait for the database.
+A background task writes the buffered records in batches, and an optional maintenance job, such
+as pruning old records, runs periodically instead of after every write.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections import deque
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from wfx.log.logger import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+T = TypeVar("T")
+
+
+class BatchWriter(Generic[T]):
+    """Buffers records and writes them in batches from a background task.
+
+    Pending records are written once `batch_size` of them are buffered, or `flush_interval` seconds
+    after the first of them was added. At most `max_pending` records are buffered: records added
+    while the buffer is full are dropped and counted in `dropped`. A batch whose write fails is
+    dropped too, and counted in `failed`.
+
+    `maintenance` is called every `maintenance_interval` seconds while the writer runs. `stop`
+    writes what is still pending, so it must be awaited on shutdown.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write: Callable[[list[T]], Awaitable[Any]],
+        *,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_pending: int = 10_000,
+        maintenance: Callable[[], Awaitable[Any]] | None = None,
+        maintenance_interval: float = 60.0,
+    ) -> None:
+        self.name = name
+        self._write = write
+        # A batch of no records would never empty the buffer
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._maintenance = maintenance
+        self.maintenance_interval = maintenance_interval
+        self._pending: deque[T] = deque()
+        self._has_pending = asyncio.Event()
+        self._batch_ready = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._worker: asyncio.Task | None = None
+        self._maintainer: asyncio.Task | None = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def add(self, record: T) -> bool:
+        """Buffers a record to be written, starting the writer if needed.
+
+        Returns False if the record was dropped because the buffer is full.
+        """
+        if self.max_pending > 0 and len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Dropped {self.dropped} {self.name} because the database does not keep up")
+            return False
+        self._pending.append(record)
+        self._has_pending.set()
+        if len(self._pending) >= self.batch_size:
+            self._batch_ready.set()
+        self._ensure_started()
+        return True
+
+    def _ensure_started(self) -> None:
+        self._forget_other_loop()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        if self._maintenance is not None and (self._maintainer is None or self._maintainer.done()):
+            self._maintainer = asyncio.create_task(self._run_maintenance())
+
+    def _forget_other_loop(self) -> None:
+        if self._worker is None or self._worker.get_loop() is asyncio.get_running_loop():
+            return
+        # The loop that ran the writer is gone, as between tests, so its tasks and events can't be reused
+        self._has_pending = asyncio.Event()
+        self._batch_ready = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._worker = self._maintainer = None
+        if self._pending:
+            self._has_pending.set()
+        if len(self._pending) >= self.batch_size:
+            self._batch_ready.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_pending.wait()
+            if len(self._pending) < self.batch_size:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            await self.flush()
+
+    async def _run_maintenance(self) -> None:
+        while True:
+            await asyncio.sleep(self.maintenance_interval)
+            await self.run_maintenance()
+
+    async def run_maintenance(self) -> None:
+        """Runs the maintenance job now."""
+        if self._maintenance is None:
+            return
+        try:
+            await self._maintenance()
+        except Exception:  # noqa: BLE001
+            await logger.aexception(f"Error maintaining {self.name}")
+
+    async def flush(self) -> None:
+        """Writes every pending record now."""
+        self._forget_other_loop()
+        async with self._write_lock:
+            while self._pending:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                if len(self._pending) < self.batch_size:
+                    self._batch_ready.clear()
+                if not self._pending:
+                    self._has_pending.clear()
+                try:
+                    await self._write(batch)
+                    self.written += len(batch)
+                except Exception:  # noqa: BLE001
+                    self.failed += len(batch)
+                    await logger.aexception(f"Error writing {len(batch)} {self.name}")
+
+    def discard(self, predicate: Callable[[T], bool]) -> int:
+        """Removes the pending records that match the predicate and returns how many were removed."""
+        kept = [record for record in self._pending if not predicate(record)]
+        discarded = len(self._pending) - len(kept)
+        if discarded:
+            self._pending = deque(kept)
+            if len(self._pending) < self.batch_size:
+                self._batch_ready.clear()
+            if not self._pending:
+                self._has_pending.clear()
+        return discarded
+
+    async def stop(self) -> None:
+        """Stops the background tasks and writes what is still pending."""
+        self._forget_other_loop()
+        # Waiting for the lock lets a write in progress complete before the worker is cancelled
+        async with self._write_lock:
+            for task in (self._worker, self._maintainer):
+                if task is not None and not task.done():
+                    task.cancel()
+        for task in (self._worker, self._maintainer):
+            if task is not None:
+                await asyncio.gather(task, return_exceptions=True)
+        self._worker = self._maintainer = None
+        await self.flush()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
@@ -0,0 +1,228 @@
+"""Coalesced writes of chat messages.
+
+A component stores its message when it starts it and updates it while it grows, as when an agent
+adds its steps to it. The writer keeps the database work this causes small:
+
+- Messages stored at the same time, as by concurrent sessions, are inserted together, in one
+  transaction with multi-row INSERT statements. Nothing waits for more messages to arrive, so
+  storing a message takes no longer than before.
+- The updates of a message that is still being produced are merged per message id, and written as
+  one UPDATE every `debounce` seconds. Writing an update through, as when the message is complete,
+  writes the updates still pending for the message with it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+from sqlmodel import col, select
+from wfx.log.logger import logger
+
+from primeagent.services.database.models.message.model import MessageTable
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from contextlib import AbstractAsyncContextManager
+
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+def _to_uuid(message_id: UUID | str) -> UUID:
+    return message_id if isinstance(message_id, UUID) else UUID(str(message_id))
+
+
+class MessageWriter:
+    """Inserts messages in groups and coalesces the updates of each message.
+
+    `session_factory` opens the sessions the messages are written with; the writer commits them.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]],
+        *,
+        debounce: float = 0.5,
+        max_batch_size: int = 500,
+    ) -> None:
+        self._session_factory = session_factory
+        self.debounce = debounce
+        self.max_batch_size = max_batch_size
+        self._inserts: list[tuple[list[MessageTable], asyncio.Future]] = []
+        self._updates: dict[UUID, dict[str, Any]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._update_lock = asyncio.Lock()
+        self._insert_task: asyncio.Task | None = None
+        self._update_task: asyncio.Task | None = None
+        self.inserted = 0
+        self.insert_transactions = 0
+        self.updates_requested = 0
+        self.updated = 0
+        self.failed = 0
+
+    def _forget_other_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # The loop the writer ran on is gone, as between tests, so its tasks and lock can't be reused
+        self._loop = loop
+        self._update_lock = asyncio.Lock()
+        self._insert_task = self._update_task = None
+        # Nobody waits for the inserts requested on the old loop anymore
+        self._inserts.clear()
+
+    async def insert(self, messages: list[MessageTable]) -> list[MessageTable]:
+        """Inserts the messages, together with the messages stored at the same time by other tasks."""
+        self._forget_other_loop()
+        future = asyncio.get_running_loop().create_future()
+        self._inserts.append((messages, future))
+        if self._insert_task is None or self._insert_task.done():
+            self._insert_task = asyncio.create_task(self._write_inserts())
+        # The insert goes on if the caller is cancelled, as other callers' messages are written with it
+        return await asyncio.shield(future)
+
+    async def _write_inserts(self) -> None:
+        while self._inserts:
+            group: list[tuple[list[MessageTable], asyncio.Future]] = []
+            size = 0
+            while self._inserts and (not group or size + len(self._inserts[0][0]) <= self.max_batch_size):
+                messages, future = self._inserts.pop(0)
+                group.append((messages, future))
+                size += len(messages)
+            try:
+                await self._insert([message for messages, _ in group for message in messages])
+            except Exception as exc:  # noqa: BLE001
+                if len(group) == 1:
+                    self._set_exception(group[0][1], exc)
+                    continue
+                # A message that can't be inserted must not fail the messages stored with it
+                for messages, future in group:
+                    try:
+                        await self._insert(messages)
+                    except Exception as message_exc:  # noqa: BLE001
+                        self._set_exception(future, message_exc)
+                    else:
+                        self._set_result(future, messages)
+                continue
+            for messages, future in group:
+                self._set_result(future, messages)
+
+    async def _insert(self, messages: list[MessageTable]) -> None:
+        async with self._session_factory() as session:
+            session.add_all(messages)
+            await session.commit()
+        self.inserted += len(messages)
+        self.insert_transactions += 1
+
+    @staticmethod
+    def _set_result(future: asyncio.Future, messages: list[MessageTable]) -> None:
+        if not future.done():
+            future.set_result(messages)
+
+    @staticmethod
+    def _set_exception(future: asyncio.Future, exc: Exception) -> None:
+        if not future.done():
+            future.set_exception(exc)
+
+    def update_later(self, message_id: UUID | str, fields: dict[str, Any]) -> None:
+        """Merges the fields into the update pending for the message, written within `debounce` seconds."""
+        self._forget_other_loop()
+        self.updates_requested += 1
+        self._updates.setdefault(_to_uuid(message_id), {}).update(fields)
+        if self._update_task is None or self._update_task.done():
+            self._update_task = asyncio.create_task(self._write_updates_later())
+
+    async def _write_updates_later(self) -> None:
+        # Updates requested while a write is in progress find this task running, so it writes them next
+        while True:
+            await asyncio.sleep(self.debounce)
+            await self.flush()
+            if not self._updates:
+                return
+
+    async def update(self, updates: list[tuple[UUID | str, dict[str, Any]]]) -> list[MessageTable]:
+        """Writes the updates now, with the updates pending for the same messages.
+
+        Raises:
+            ValueError: If one of the messages does not exist. Nothing is written then.
+        """
+        self._forget_other_loop()
+        self.updates_requested += len(updates)
+        async with self._update_lock:
+            merged = []
+            for message_id, fields in updates:
+                uuid = _to_uuid(message_id)
+                merged.append((uuid, {**self._updates.pop(uuid, {}), **fields}))
+            return await self._update(merged, strict=True)
+
+    async def flush(self, message_ids: Iterable[UUID | str] | None = None) -> None:
+        """Writes the updates pending for the given messages, or for every message, now."""
+        self._forget_other_loop()
+        async with self._update_lock:
+            if message_ids is None:
+                updates, self._updates = list(self._updates.items()), {}
+            else:
+                uuids = {_to_uuid(message_id) for message_id in message_ids}
+                updates = [(uuid, self._updates.pop(uuid)) for uuid in uuids if uuid in self._updates]
+            if not updates:
+                return
+            try:
+                await self._update(updates, strict=False)
+            except Exception:  # noqa: BLE001
+                self.failed += len(updates)
+                await logger.aexception(f"Error writing the updates of {len(updates)} messages")
+
+    async def _update(self, updates: list[tuple[UUID, dict[str, Any]]], *, strict: bool) -> list[MessageTable]:
+        async with self._session_factory() as session:
+            stmt = select(MessageTable).where(col(MessageTable.id).in_([uuid for uuid, _ in updates]))
+            rows = {row.id: row for row in (await session.exec(stmt)).all()}
+            updated: list[MessageTable] = []
+            for uuid, fields in updates:
+                row = rows.get(uuid)
+                if row is None:
+                    if strict:
+                        msg = f"Message with id {uuid} not found"
+                        raise ValueError(msg)
+                    # The message was deleted while its update was pending
+                    continue
+                row.sqlmodel_update(fields)
+                # Convert flow_id to UUID if it's a string preventing error when saving to database
+                if row.flow_id and isinstance(row.flow_id, str):
+                    row.flow_id = UUID(row.flow_id)
+                session.add(row)
+                updated.append(row)
+            await session.commit()
+        self.updated += len(updated)
+        return updated
+
+    def discard(self, message_ids: Iterable[UUID | str]) -> None:
+        """Drops the updates pending for the messages, as when they are deleted."""
+        for message_id in message_ids:
+            self._updates.pop(_to_uuid(message_id), None)
+
+    async def stop(self) -> None:
+        """Writes what is still pending."""
+        self._forget_other_loop()
+        # Waiting for the lock lets a write in progress complete before the task is cancelled
+        async with self._update_lock:
+            if self._update_task is not None and not self._update_task.done():
+                self._update_task.cancel()
+        if self._update_task is not None:
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._update_task
+        if self._insert_task is not None:
+            await asyncio.gather(self._insert_task, return_exceptions=True)
+        self._update_task = self._insert_task = None
+        await self.flush()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pending_updates": len(self._updates),
+            "inserted": self.inserted,
+            "insert_transactions": self.insert_transactions,
+            "updates_requested": self.updates_requested,
+            "updated": self.updated,
+            "failed": self.failed,
+        }
@@ -11,7 +11,7 @@ from emoji import purely_emoji
 from fastapi import HTTPException, status
 from pydantic import BaseModel, ValidationInfo, field_serializer, field_validator
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import Text, UniqueConstraint, text
+from sqlalchemy import Text, UniqueConstraint, event, text
 from sqlmodel import JSON, Column, Field, Relationship, SQLModel
 from wfx.log.logger import logger
 
@@ -213,6 +213,24 @@ class Flow(FlowBase, table=True):  # type: ignore[call-arg]
     )
 
 
+def get_is_component(data: dict | None) -> bool | None:
+    """Returns whether a flow is a component, from the flag in its data or else from its single node."""
+    if not data:
+        return None
+    is_component = data.get("is_component")
+    if is_component is not None:
+        return is_component
+    return len(data.get("nodes", [])) == 1
+
+
+@event.listens_for(Flow, "before_insert")
+@event.listens_for(Flow, "before_update")
+def set_is_component(mapper, connection, target: Flow) -> None:  # noqa: ARG001
+    # Flow listings read is_component without loading the data, so it is derived when the flow is written
+    if target.is_component is None:
+        target.is_component = get_is_component(target.data)
+
+
 class FlowCreate(FlowBase):
     user_id: UUID | None = None
     folder_id: UUID | None = None
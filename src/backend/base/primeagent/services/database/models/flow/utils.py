@@ -1,6 +1,37 @@
+from sqlalchemy import JSON, case, type_coerce
+from sqlmodel import col, select
+from sqlmodel.sql.expression import Select
+
 from primeagent.utils.version import get_version_info
 
-from .model import Flow
+from .model import Flow, FlowHeader
+
+
+def select_flow_headers() -> Select:
+    """Selects the columns of FlowHeader without loading the data of flows that are not components.
+
+    The data of a component is part of its header, so it is selected for components only.
+    """
+    component_data = type_coerce(case((col(Flow.is_component) == True, Flow.data), else_=None), JSON)  # noqa: E712
+    return select(
+        Flow.id,
+        Flow.name,
+        Flow.folder_id,
+        Flow.is_component,
+        Flow.endpoint_name,
+        Flow.description,
+        Flow.access_type,
+        Flow.tags,
+        Flow.mcp_enabled,
+        Flow.action_name,
+        Flow.action_description,
+        component_data.label("data"),
+    )
+
+
+def to_flow_headers(rows) -> list[FlowHeader]:
+    """Converts the rows selected with `select_flow_headers` to FlowHeader objects."""
+    return [FlowHeader.model_validate(row, from_attributes=True) for row in rows]
 
 
 def get_webhook_component_in_flow(flow_data: dict):
@@ -1,5 +1,8 @@
 from uuid import UUID
 
+from sqlalchemy import tuple_
+from sqlmodel import col, select
+from sqlmodel.sql.expression import SelectOfScalar
 from wfx.utils.async_helpers import run_until_complete
 
 from primeagent.services.database.models.message.model import MessageTable, MessageUpdate
@@ -25,3 +28,35 @@ async def _update_message(message_id: UUID | str, message: MessageUpdate | dict)
 def update_message(message_id: UUID | str, message: MessageUpdate | dict):
     """DEPRECATED - Kept for backward compatibility. Do not use."""
     return run_until_complete(_update_message(message_id, message))
+
+
+def paginate_messages(
+    stmt: SelectOfScalar[MessageTable],
+    *,
+    after: UUID | str | None = None,
+    limit: int | None = None,
+    descending: bool = True,
+) -> SelectOfScalar[MessageTable]:
+    """Order messages by timestamp, keeping at most `limit` of those that come after the message `after`.
+
+    This is keyset pagination: the next page starts after the last message of the previous one, so
+    it is found through the (timestamp) indexes of the message table however deep it is, instead of
+    skipping rows with an offset. Timestamps only have second precision, so pages break ties between
+    messages with the same timestamp by id; whole listings keep them in the order the database
+    returns them, which is the order they were stored in on SQLite.
+    If the message `after` does not exist, no messages are returned.
+    """
+    timestamp, message_id = col(MessageTable.timestamp), col(MessageTable.id)
+    if after is None and not limit:
+        return stmt.order_by(timestamp.desc() if descending else timestamp.asc())
+    if after is not None:
+        if isinstance(after, str):
+            after = UUID(after)
+        anchor = select(timestamp, message_id).where(message_id == after).scalar_subquery()
+        key = tuple_(timestamp, message_id)
+        stmt = stmt.where(key < anchor if descending else key > anchor)
+    if descending:
+        stmt = stmt.order_by(timestamp.desc(), message_id.desc())
+    else:
+        stmt = stmt.order_by(timestamp.asc(), message_id.asc())
+    return stmt.limit(limit) if limit else stmt
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlmodel import col, delete, select
+from sqlmodel import col, delete, func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from wfx.log.logger import logger
 
@@ -75,6 +75,61 @@ async def log_transaction(db: AsyncSession, transaction: TransactionBase) -> Tra
     return table
 
 
+async def log_transactions(db: AsyncSession, transactions: list[TransactionBase]) -> None:
+    """Log a batch of transactions in a single transaction, without enforcing the maximum.
+
+    The transactions are written as multi-row inserts. Use `prune_transactions` to enforce the maximum.
+
+    Args:
+        db: Database session
+        transactions: Transaction data to log. Transactions without a flow_id are skipped.
+    """
+    tables = [TransactionTable(**transaction.model_dump()) for transaction in transactions if transaction.flow_id]
+    if not tables:
+        return
+    try:
+        db.add_all(tables)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
+async def prune_transactions(db: AsyncSession, flow_ids: set[UUID], max_entries: int | None = None) -> None:
+    """Delete the oldest transactions of each flow beyond the maximum number to keep.
+
+    Args:
+        db: Database session
+        flow_ids: The flows whose transactions are trimmed
+        max_entries: Maximum number of transactions to keep per flow. If None, uses system settings.
+    """
+    if not flow_ids:
+        return
+    if max_entries is None:
+        max_entries = get_settings_service().settings.max_transactions_to_keep
+
+    ranked = (
+        select(
+            TransactionTable.id,
+            func.row_number()
+            .over(partition_by=TransactionTable.flow_id, order_by=col(TransactionTable.timestamp).desc())
+            .label("position"),
+        )
+        .where(col(TransactionTable.flow_id).in_(flow_ids))
+        .subquery()
+    )
+    try:
+        await db.exec(
+            delete(TransactionTable).where(
+                col(TransactionTable.id).in_(select(ranked.c.id).where(ranked.c.position > max_entries))
+            )
+        )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
 def transform_transaction_table(
     transaction: list[TransactionTable] | TransactionTable,
 ) -> list[TransactionReadResponse] | TransactionReadResponse:
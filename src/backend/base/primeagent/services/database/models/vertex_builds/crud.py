@@ -130,6 +130,81 @@ async def log_vertex_build(
     return table
 
 
+async def log_vertex_builds(db: AsyncSession, vertex_builds: list[VertexBuildBase]) -> None:
+    """Insert a batch of vertex builds in a single transaction, without enforcing the build limits.
+
+    The builds are written as multi-row inserts. Use `prune_vertex_builds` to enforce the limits.
+
+    Args:
+        db (AsyncSession): The database session for executing queries.
+        vertex_builds (list[VertexBuildBase]): The vertex builds to insert.
+    """
+    try:
+        db.add_all([VertexBuildTable(**vertex_build.model_dump()) for vertex_build in vertex_builds])
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
+async def prune_vertex_builds(
+    db: AsyncSession,
+    *,
+    max_builds_to_keep: int | None = None,
+    max_builds_per_vertex: int | None = None,
+    flow_ids: set[UUID] | None = None,
+) -> None:
+    """Delete the oldest vertex builds beyond the per-vertex and global limits.
+
+    Args:
+        db (AsyncSession): The database session for executing queries.
+        max_builds_to_keep (int | None, optional): Maximum number of builds to keep globally.
+            If None, uses system settings.
+        max_builds_per_vertex (int | None, optional): Maximum number of builds to keep per vertex.
+            If None, uses system settings.
+        flow_ids (set[UUID] | None, optional): Only enforce the per-vertex limit for the vertices
+            of these flows. If None, it is enforced for every vertex.
+
+    Note:
+        Both limits are enforced with one statement each, rather than one per vertex, so this is
+        meant to run periodically instead of after every build.
+    """
+    settings = get_settings_service().settings
+    max_global = max_builds_to_keep or settings.max_vertex_builds_to_keep
+    max_per_vertex = max_builds_per_vertex or settings.max_vertex_builds_per_vertex
+
+    try:
+        # 1) Delete older builds of each vertex, keeping newest max_per_vertex
+        if flow_ids is None or flow_ids:
+            ranked = select(
+                VertexBuildTable.build_id,
+                func.row_number()
+                .over(
+                    partition_by=(VertexBuildTable.flow_id, VertexBuildTable.id),
+                    order_by=(col(VertexBuildTable.timestamp).desc(), col(VertexBuildTable.build_id).desc()),
+                )
+                .label("position"),
+            )
+            if flow_ids is not None:
+                ranked = ranked.where(col(VertexBuildTable.flow_id).in_(flow_ids))
+            ranked_subq = ranked.subquery()
+            older_vertex_builds = select(ranked_subq.c.build_id).where(ranked_subq.c.position > max_per_vertex)
+            await db.exec(delete(VertexBuildTable).where(col(VertexBuildTable.build_id).in_(older_vertex_builds)))
+
+        # 2) Delete older builds globally, keeping newest max_global
+        older_builds = (
+            select(VertexBuildTable.build_id)
+            .order_by(col(VertexBuildTable.timestamp).desc(), col(VertexBuildTable.build_id).desc())
+            .offset(max_global)
+        )
+        await db.exec(delete(VertexBuildTable).where(col(VertexBuildTable.build_id).in_(older_builds)))
+
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
 async def delete_vertex_builds_by_flow_id(db: AsyncSession, flow_id: UUID) -> None:
     """Delete all vertex builds associated with a specific flow ID.
 
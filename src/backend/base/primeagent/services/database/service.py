@@ -28,15 +28,22 @@ from wfx.services.deps import session_scope
 from primeagent.initial_setup.constants import STARTER_FOLDER_NAME
 from primeagent.services.base import Service
 from primeagent.services.database import models
+from primeagent.services.database.batch_writer import BatchWriter
+from primeagent.services.database.message_writer import MessageWriter
 from primeagent.services.database.models.user.crud import get_user_by_username
+from primeagent.services.database.models.vertex_builds.crud import log_vertex_builds, prune_vertex_builds
 from primeagent.services.database.session import NoopSession
 from primeagent.services.database.utils import Result, TableResults
 from primeagent.services.deps import get_settings_service
 from primeagent.services.utils import teardown_superuser
 
 if TYPE_CHECKING:
+    from uuid import UUID
+
     from wfx.services.settings.service import SettingsService
 
+    from primeagent.services.database.models.vertex_builds.model import VertexBuildBase
+
 
 class DatabaseService(Service):
     name = "database_service"
@@ -84,6 +91,39 @@ class DatabaseService(Service):
         else:
             self.alembic_log_path = Path(primeagent_dir) / alembic_log_file
 
+        # Vertex builds are written behind the builds in batches, and pruned periodically
+        settings = self.settings_service.settings
+        self._flow_ids_to_prune: set[UUID] = set()
+        self.vertex_build_writer: BatchWriter[VertexBuildBase] = BatchWriter(
+            "vertex builds",
+            self._write_vertex_builds,
+            batch_size=settings.vertex_builds_batch_size,
+            flush_interval=settings.vertex_builds_flush_interval,
+            max_pending=settings.vertex_builds_max_pending,
+            maintenance=self._prune_vertex_builds,
+            maintenance_interval=settings.vertex_builds_prune_interval,
+        )
+        # Messages stored at the same time are inserted together, and the updates of each are coalesced.
+        # They are written through session_scope, like they are read, so both use the same database.
+        self.message_writer = MessageWriter(
+            session_scope,
+            debounce=settings.message_update_debounce,
+            max_batch_size=settings.message_insert_batch_size,
+        )
+
+    async def _write_vertex_builds(self, vertex_builds: list[VertexBuildBase]) -> None:
+        async with self._with_session() as session:
+            await log_vertex_builds(session, vertex_builds)
+        self._flow_ids_to_prune.update(vertex_build.flow_id for vertex_build in vertex_builds)
+
+    async def _prune_vertex_builds(self) -> None:
+        # Only the vertices of flows built since the last prune can exceed their limit
+        flow_ids, self._flow_ids_to_prune = self._flow_ids_to_prune, set()
+        if not flow_ids:
+            return
+        async with self._with_session() as session:
+            await prune_vertex_builds(session, flow_ids=flow_ids)
+
     async def initialize_alembic_log_file(self):
         if self.alembic_log_to_stdout:
             return
@@ -503,6 +543,9 @@ class DatabaseService(Service):
 
     async def teardown(self) -> None:
         await logger.adebug("Tearing down database")
+        await self.vertex_build_writer.stop()
+        await self.vertex_build_writer.run_maintenance()
+        await self.message_writer.stop()
         try:
             settings_service = get_settings_service()
             # remove the default superuser if auto_login is enabled
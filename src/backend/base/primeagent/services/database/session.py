@@ -18,6 +18,9 @@ class NoopSession:
     async def add(self, *args, **kwargs):
         pass
 
+    def add_all(self, *args, **kwargs):
+        pass
+
     async def commit(self):
         pass
 
@@ -0,0 +1,148 @@
+"""Event buses that share the events of build jobs between workers.
+
+Without a bus, the events of a job can only be read from the worker that runs it. With one, that
+worker publishes the events it takes from the job's `JobEventQueue` and any worker can read them,
+so requests for a job's events don't have to land on the worker that started it.
+
+`RedisEventBus` keeps the events of each job in a Redis stream.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any
+
+from wfx.log.logger import logger
+
+from primeagent.services.job_queue.event_queue import get_sequence_id
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+
+class JobEventBus(ABC):
+    """Where the worker running a job publishes its events and every worker reads them from."""
+
+    @abstractmethod
+    async def open(self, job_id: str) -> None:
+        """Makes the job known to readers before its first event is published."""
+
+    @abstractmethod
+    async def publish(self, job_id: str, events: list[bytes]) -> None:
+        """Publishes events taken from the job's queue, which carry increasing sequence ids."""
+
+    @abstractmethod
+    async def finish(self, job_id: str) -> None:
+        """Publishes the end of the job's events, which are then kept for a limited time."""
+
+    @abstractmethod
+    async def read(self, job_id: str, after: int, max_events: int, timeout: float) -> tuple[list[bytes], bool] | None:
+        """Returns the events of the job whose sequence id is greater than `after`.
+
+        Waits up to `timeout` seconds for one if there are none yet, and returns at most
+        `max_events` of them, 0 meaning no limit. The boolean tells whether the end of the events
+        was reached. Returns None if the job is unknown.
+        """
+
+    async def close(self) -> None:  # noqa: B027
+        """Releases the connections of the bus."""
+
+
+class RedisEventBus(JobEventBus):
+    """Keeps the events of each job in a Redis stream.
+
+    The id of each entry is "<sequence id>-0", so that reading the events after a sequence id is a
+    single XREAD. The stream starts with a "0-1" entry that makes the job known before its first
+    event, and ends with a "<last sequence id>-2" entry. Streams keep their last `max_events`
+    events, approximately, and expire `ttl` seconds after the last publish or `finished_ttl`
+    seconds after the end of the job.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        *,
+        client: Redis | None = None,
+        prefix: str = "primeagent:job_events:",
+        max_events: int = 1000,
+        ttl: int = 3600,
+        finished_ttl: int = 300,
+    ) -> None:
+        if client is None:
+            try:
+                from redis.asyncio import StrictRedis
+            except ImportError as exc:
+                msg = "The Redis event bus requires the redis package. Install it with `pip install redis`."
+                raise ImportError(msg) from exc
+            client = StrictRedis.from_url(url or "redis://localhost:6379/0")
+        self._client = client
+        self.prefix = prefix
+        self.max_events = max_events
+        self.ttl = ttl
+        self.finished_ttl = finished_ttl
+        # job_id -> sequence id of the last published event
+        self._last_published: dict[str, int] = {}
+
+    def _key(self, job_id: str) -> str:
+        return self.prefix + job_id
+
+    async def open(self, job_id: str) -> None:
+        self._last_published[job_id] = 0
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.xadd(self._key(job_id), {"start": b""}, id="0-1")
+            pipe.expire(self._key(job_id), self.ttl)
+            await pipe.execute()
+
+    async def publish(self, job_id: str, events: list[bytes]) -> None:
+        last = self._last_published.get(job_id, 0)
+        async with self._client.pipeline(transaction=False) as pipe:
+            for event in events:
+                sequence_id = get_sequence_id(event)
+                if sequence_id is None or sequence_id <= last:
+                    logger.debug(f"Not publishing an event of job {job_id} without a new sequence id")
+                    continue
+                last = sequence_id
+                pipe.xadd(
+                    self._key(job_id),
+                    {"event": event},
+                    id=f"{sequence_id}-0",
+                    maxlen=self.max_events or None,
+                    approximate=True,
+                )
+            pipe.expire(self._key(job_id), self.ttl)
+            await pipe.execute()
+        self._last_published[job_id] = last
+
+    async def finish(self, job_id: str) -> None:
+        last = self._last_published.pop(job_id, 0)
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.xadd(self._key(job_id), {"end": b""}, id=f"{last}-2")
+            pipe.expire(self._key(job_id), self.finished_ttl)
+            await pipe.execute()
+
+    async def read(self, job_id: str, after: int, max_events: int, timeout: float) -> tuple[list[bytes], bool] | None:
+        key = self._key(job_id)
+        if not await self._client.exists(key):
+            return None
+        block = int(timeout * 1000) if timeout > 0 else None
+        # Reading from "0-1" rather than "0-0" skips the entry that opened the stream
+        start = f"{after}-0" if after > 0 else "0-1"
+        response = await self._client.xread({key: start}, count=max_events or None, block=block)
+        events: list[bytes] = []
+        finished = False
+        for _, entries in response or []:
+            for _, raw_fields in entries:
+                fields = _decode_keys(raw_fields)
+                if "event" in fields:
+                    events.append(fields["event"])
+                elif "end" in fields:
+                    finished = True
+        return events, finished
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def _decode_keys(fields: dict[Any, Any]) -> dict[str, Any]:
+    # Field names are bytes unless the client decodes responses
+    return {key.decode() if isinstance(key, bytes) else key: value for key, value in fields.items()}
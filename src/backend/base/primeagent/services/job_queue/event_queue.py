@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import deque
+from typing import Literal
+
+from wfx.log.logger import logger
+
+JobQueuePolicy = Literal["block", "coalesce", "drop_intermediate"]
+
+# Events that can be merged or dropped when the queue is full. Every other event, such as
+# "end_vertex", "end" or "error", is always queued.
+INTERMEDIATE_EVENT_TYPES = frozenset({"token"})
+
+# (event_id, encoded event or None for the end of the stream, timestamp)
+QueueItem = tuple[str | None, bytes | None, float]
+
+# Queued events start with their sequence id, e.g. b'{"seq": 12, "event": "token", "data": ...}'
+SEQUENCE_ID_PREFIX = b'{"seq": '
+
+
+def _event_type(item: QueueItem) -> str | None:
+    event_id = item[0]
+    if not event_id or item[1] is None:
+        return None
+    # Event ids are "<event_type>-<uuid>"
+    return event_id.split("-", 1)[0]
+
+
+def _is_intermediate(item: QueueItem) -> bool:
+    return _event_type(item) in INTERMEDIATE_EVENT_TYPES
+
+
+def get_sequence_id(event: bytes) -> int | None:
+    """Returns the sequence id of an event taken from a JobEventQueue."""
+    if not event.startswith(SEQUENCE_ID_PREFIX):
+        return None
+    start = len(SEQUENCE_ID_PREFIX)
+    return int(event[start : event.index(b",", start)])
+
+
+async def get_batch(queue: asyncio.Queue, max_events: int, timeout: float | None) -> list[QueueItem]:
+    """Takes up to `max_events` items from the queue, waiting up to `timeout` seconds for the first one.
+
+    Once an item is available, every other item already queued is taken too, without waiting for
+    more. The batch is empty if nothing arrived in time, and ends with the end of the stream if that
+    was taken. 0 means no limit for `max_events` and None no limit for `timeout`.
+    """
+    batch: list[QueueItem] = []
+    if queue.empty():
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout=timeout))
+        except asyncio.TimeoutError:
+            return batch
+    while (max_events <= 0 or len(batch) < max_events) and not queue.empty():
+        if batch and batch[-1][1] is None:
+            break
+        batch.append(queue.get_nowait())
+    return batch
+
+
+class _MergedTokens:
+    """The chunks merged into a queued token event, added to it once when it is taken from the queue."""
+
+    __slots__ = ("chunks", "event", "size_bytes")
+
+    def __init__(self, event: dict) -> None:
+        self.event = event
+        self.chunks: list[str] = []
+        self.size_bytes = 0
+
+    def add(self, chunk: str) -> int:
+        # The chunk takes as many bytes as it will in the merged event, where it is escaped the same way
+        size = len(json.dumps(chunk)) - 2
+        self.chunks.append(chunk)
+        self.size_bytes += size
+        return size
+
+    def encode(self) -> bytes:
+        self.event["data"]["chunk"] += "".join(self.chunks)
+        return (json.dumps(self.event) + "\n\n").encode("utf-8")
+
+
+class JobEventQueue(asyncio.Queue):
+    """The bounded queue of the encoded events of a build job.
+
+    The queue is full once it holds `max_events` events or `max_bytes` bytes of events. What happens
+    to a token event sent while it is full depends on the policy:
+
+    - "block": `put` waits until the client consumes events, and `wait_for_capacity` lets the
+      components streaming tokens wait too.
+    - "coalesce": the token is merged into the last queued token event of the same message.
+    - "drop_intermediate": the token is dropped.
+
+    Other events are always queued, even if that goes over the limits, and with "drop_intermediate"
+    the oldest queued token makes room for them. `put_nowait` never raises `QueueFull`.
+
+    Every queued event gets a sequence id, which is added to its JSON as "seq" and increases with
+    each event. Tokens dropped from the queue leave gaps. The last `replay_max_events` events taken
+    from the queue, up to `replay_max_bytes`, are kept so that a client that lost its connection can
+    get the events it missed with `events_after`.
+    """
+
+    def __init__(
+        self,
+        policy: JobQueuePolicy = "coalesce",
+        max_events: int = 0,
+        max_bytes: int = 0,
+        replay_max_events: int = 0,
+        replay_max_bytes: int = 0,
+    ) -> None:
+        super().__init__(maxsize=max_events)
+        self.policy: JobQueuePolicy = policy
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.peak_size_bytes = 0
+        self.total_events = 0
+        self.dropped_events = 0
+        self.coalesced_events = 0
+        self.last_sequence_id = 0
+        # Set once the end of the stream was taken from the queue
+        self.finished = False
+        self.replay_max_events = replay_max_events
+        self.replay_max_bytes = replay_max_bytes
+        self.replay_size_bytes = 0
+        self._replay: deque[tuple[int, bytes]] = deque()
+        # The tokens merged into queued token events, by the id of the queued item
+        self._merged: dict[int, _MergedTokens] = {}
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+    def full(self) -> bool:
+        return super().full() or (self.max_bytes > 0 and self.size_bytes >= self.max_bytes)
+
+    def _put(self, item: QueueItem) -> None:
+        item = self._add_sequence_id(item)
+        super()._put(item)
+        self.size_bytes += len(item[1] or b"")
+        self.peak_size_bytes = max(self.peak_size_bytes, self.size_bytes)
+        self.total_events += 1
+        if self.full():
+            self._not_full.clear()
+
+    def _get(self) -> QueueItem:
+        item = super()._get()
+        self.size_bytes -= len(item[1] or b"")
+        merged = self._merged.pop(id(item), None)
+        if merged is not None:
+            self.size_bytes -= merged.size_bytes
+            item = (item[0], merged.encode(), item[2])
+        if not self.full():
+            self._not_full.set()
+        if item[1] is None:
+            self.finished = True
+        elif self.replay_max_events > 0:
+            self._remember(item[1])
+        return item
+
+    def _add_sequence_id(self, item: QueueItem) -> QueueItem:
+        event_id, event, timestamp = item
+        if event is None or not event.startswith(b'{"'):
+            return item
+        self.last_sequence_id += 1
+        return event_id, b'{"seq": %d, ' % self.last_sequence_id + event[1:], timestamp
+
+    def _remember(self, event: bytes) -> None:
+        sequence_id = get_sequence_id(event)
+        if sequence_id is None:
+            return
+        self._replay.append((sequence_id, event))
+        self.replay_size_bytes += len(event)
+        while len(self._replay) > self.replay_max_events or (
+            self.replay_max_bytes > 0 and self.replay_size_bytes > self.replay_max_bytes
+        ):
+            _, evicted = self._replay.popleft()
+            self.replay_size_bytes -= len(evicted)
+
+    def events_after(self, sequence_id: int) -> list[bytes]:
+        """Returns the events already taken from the queue whose sequence id is greater than `sequence_id`.
+
+        Events older than the replay buffer are lost, so the first returned event may not directly follow
+        `sequence_id`.
+        """
+        if self._replay and self._replay[0][0] > sequence_id + 1:
+            logger.debug(f"Events {sequence_id + 1} to {self._replay[0][0] - 1} are no longer in the replay buffer")
+        return [event for event_sequence_id, event in self._replay if event_sequence_id > sequence_id]
+
+    async def put(self, item: QueueItem) -> None:
+        if self.policy == "block":
+            await super().put(item)
+        else:
+            self.put_nowait(item)
+
+    def put_nowait(self, item: QueueItem) -> None:
+        if not self.full():
+            super().put_nowait(item)
+            return
+        if not _is_intermediate(item):
+            if self.policy == "drop_intermediate":
+                self._drop_oldest_intermediate()
+            self._force_put(item)
+            return
+        if self.policy == "coalesce" and self._coalesce(item):
+            return
+        if self.policy == "drop_intermediate":
+            self.dropped_events += 1
+            return
+        # Blocking queues only make `put` wait
+        self._force_put(item)
+
+    def _force_put(self, item: QueueItem) -> None:
+        """Queues the item regardless of the limits."""
+        self._put(item)
+        self._unfinished_tasks += 1
+        self._finished.clear()
+        self._wakeup_next(self._getters)
+
+    def _drop_oldest_intermediate(self) -> None:
+        for index, queued in enumerate(self._queue):
+            if _is_intermediate(queued):
+                del self._queue[index]
+                self.size_bytes -= len(queued[1] or b"")
+                merged = self._merged.pop(id(queued), None)
+                if merged is not None:
+                    self.size_bytes -= merged.size_bytes
+                self._unfinished_tasks -= 1
+                self.dropped_events += 1
+                return
+
+    def _coalesce(self, item: QueueItem) -> bool:
+        """Merges the token into the last queued event if that is a token of the same message.
+
+        The last event is decoded once, and the merged chunks are only encoded into it when it is taken
+        from the queue, so merging a token costs the same however many were merged before.
+        """
+        if not self._queue or not _is_intermediate(self._queue[-1]):
+            return False
+        last = self._queue[-1]
+        merged = self._merged.get(id(last))
+        try:
+            event = json.loads(item[1])
+            if merged is None:
+                merged = _MergedTokens(json.loads(last[1]))
+            message_id, chunk = event["data"]["id"], event["data"]["chunk"]
+            last_message_id, last_chunk = merged.event["data"]["id"], merged.event["data"]["chunk"]
+        except (KeyError, TypeError, ValueError):
+            logger.debug("Could not coalesce token events")
+            return False
+        if last_message_id != message_id:
+            return False
+        if not isinstance(chunk, str) or not isinstance(last_chunk, str):
+            logger.debug("Could not coalesce token events")
+            return False
+        self._merged[id(last)] = merged
+        self.size_bytes += merged.add(chunk)
+        self.peak_size_bytes = max(self.peak_size_bytes, self.size_bytes)
+        self.coalesced_events += 1
+        return True
+
+    async def wait_for_capacity(self) -> None:
+        """Waits until the queue is not full, if its policy makes producers wait."""
+        if self.policy != "block":
+            return
+        while self.full():
+            await self._not_full.wait()
+
+    def stats(self) -> dict[str, int | str]:
+        """Returns the memory accounting of the queue."""
+        return {
+            "policy": self.policy,
+            "events": self.qsize(),
+            "size_bytes": self.size_bytes,
+            "peak_size_bytes": self.peak_size_bytes,
+            "total_events": self.total_events,
+            "dropped_events": self.dropped_events,
+            "coalesced_events": self.coalesced_events,
+            "last_sequence_id": self.last_sequence_id,
+            "replay_events": len(self._replay),
+            "replay_size_bytes": self.replay_size_bytes,
+        }
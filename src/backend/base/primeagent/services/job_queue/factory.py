@@ -1,11 +1,35 @@
-from primeagent.services.base import Service
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from wfx.log.logger import logger
+
 from primeagent.services.factory import ServiceFactory
+from primeagent.services.job_queue.event_bus import JobEventBus, RedisEventBus
 from primeagent.services.job_queue.service import JobQueueService
 
+if TYPE_CHECKING:
+    from primeagent.services.settings.service import SettingsService
+
 
 class JobQueueServiceFactory(ServiceFactory):
     def __init__(self):
         super().__init__(JobQueueService)
 
-    def create(self) -> Service:
-        return JobQueueService()
+    def create(self, settings_service: SettingsService):
+        settings = settings_service.settings
+        event_bus: JobEventBus | None = None
+        if settings.job_event_bus == "redis":
+            logger.debug("Sharing job events between workers through Redis")
+            url = settings.redis_url or f"redis://{settings.redis_host}:{settings.redis_port}/{settings.redis_db}"
+            # Streams hold as many events as a job queue and its replay buffer, 0 meaning no limit
+            max_events = settings.job_queue_max_events
+            if max_events:
+                max_events += settings.job_queue_replay_events
+            event_bus = RedisEventBus(
+                url,
+                max_events=max_events,
+                ttl=settings.job_event_bus_ttl,
+                finished_ttl=settings.job_queue_finished_ttl,
+            )
+        return JobQueueService(settings_service, event_bus=event_bus)
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
 import asyncio
+from typing import TYPE_CHECKING
 
 from wfx.log.logger import logger
 
 from primeagent.events.event_manager import EventManager
 from primeagent.services.base import Service
+from primeagent.services.job_queue.event_queue import JobEventQueue, get_batch
+
+if TYPE_CHECKING:
+    from primeagent.services.job_queue.event_bus import JobEventBus
+    from primeagent.services.settings.service import SettingsService
+
+# The number of events a job publishes to the event bus at once
+PUBLISH_BATCH_SIZE = 100
 
 
 class JobQueueNotFoundError(Exception):
@@ -26,10 +35,20 @@ class JobQueueService(Service):
       - Safely clean up resources by cancelling active tasks and emptying queues.
       - Automatically perform periodic cleanup of inactive or completed job queues.
 
+    Each job queue is a bounded JobEventQueue: what happens to token events while the client does not keep
+    up depends on the `job_queue_policy` setting, and the queue keeps track of the memory its events use.
+    The queue also keeps the last events it sent, so that a client that reconnects gets the ones it missed,
+    and a job whose client disconnected is only cancelled if the client is not back within
+    DISCONNECT_GRACE_PERIOD seconds (see `detach_client` and `attach_client`).
+
+    With an event bus, the events of a job are published to it once `start_publishing` was called,
+    so that any worker can serve them. A task takes them from the job's queue in batches, so the
+    queue limits and policy still apply while the bus does not keep up.
+
     The cleanup process follows a two-phase approach:
-      1. When a task is cancelled or fails, it is marked for cleanup by setting a timestamp
-      2. The actual cleanup only occurs after CLEANUP_GRACE_PERIOD seconds have elapsed
-         since the task was marked
+      1. When a task finishes, is cancelled or fails, it is marked for cleanup by setting a timestamp
+      2. The actual cleanup only occurs after CLEANUP_GRACE_PERIOD seconds (FINISHED_JOB_TTL seconds for
+         jobs that finished successfully) have elapsed since the task was marked
 
     Attributes:
         name (str): Unique identifier for the service.
@@ -47,6 +66,10 @@ class JobQueueService(Service):
               * Related systems to finish their work
               * Inspection or recovery if needed
             Default is 300 seconds (5 minutes).
+        FINISHED_JOB_TTL (int): Number of seconds the queue of a job that finished successfully is kept,
+            so that clients can still read its last events. Defaults to the `job_queue_finished_ttl` setting.
+        DISCONNECT_GRACE_PERIOD (float): Number of seconds a job keeps running after its client disconnected.
+            Defaults to the `job_disconnect_grace_period` setting.
 
     Example:
         service = JobQueueService()
@@ -61,17 +84,34 @@ class JobQueueService(Service):
 
     name = "job_queue_service"
 
-    def __init__(self) -> None:
+    def __init__(self, settings_service: SettingsService | None = None, event_bus: JobEventBus | None = None) -> None:
         """Initialize the JobQueueService.
 
         Sets up the internal registry for job queues, initializes the cleanup task, and sets the service state
         to active.
+
+        Args:
+            settings_service: The settings service with the limits of the job queues. Defaults are used without it.
+            event_bus: The bus the events of jobs are published to, if they are shared between workers.
         """
         self._queues: dict[str, tuple[asyncio.Queue, EventManager, asyncio.Task | None, float | None]] = {}
         self._cleanup_task: asyncio.Task | None = None
         self._closed = False
         self.ready = False
         self.CLEANUP_GRACE_PERIOD = 300  # 5 minutes before cleaning up marked tasks
+        settings = settings_service.settings if settings_service is not None else None
+        self.queue_policy = getattr(settings, "job_queue_policy", "coalesce")
+        self.queue_max_events = getattr(settings, "job_queue_max_events", 10_000)
+        self.queue_max_bytes = getattr(settings, "job_queue_max_bytes", 32 * 1024 * 1024)
+        self.FINISHED_JOB_TTL = getattr(settings, "job_queue_finished_ttl", 300)
+        self.queue_replay_events = getattr(settings, "job_queue_replay_events", 1000)
+        self.queue_replay_max_bytes = getattr(settings, "job_queue_replay_max_bytes", 16 * 1024 * 1024)
+        self.DISCONNECT_GRACE_PERIOD = getattr(settings, "job_disconnect_grace_period", 30.0)
+        self.POLL_MAX_WAIT = getattr(settings, "job_poll_max_wait", 25.0)
+        self.POLL_MAX_EVENTS = getattr(settings, "job_poll_max_events", 1000)
+        self._disconnect_timers: dict[str, asyncio.TimerHandle] = {}
+        self.event_bus = event_bus
+        self._publishers: dict[str, asyncio.Task] = {}
 
     def is_started(self) -> bool:
         """Check if the JobQueueService has started.
@@ -117,6 +157,8 @@ class JobQueueService(Service):
         # Clean up each registered job queue.
         for job_id in list(self._queues.keys()):
             await self.cleanup_job(job_id)
+        if self.event_bus is not None:
+            await self.event_bus.close()
         await logger.adebug("JobQueueService stopped: all job queues have been cleaned up.")
 
     async def teardown(self) -> None:
@@ -142,8 +184,16 @@ class JobQueueService(Service):
             msg = f"Queue for job_id {job_id} already exists"
             raise ValueError(msg)
 
-        main_queue: asyncio.Queue = asyncio.Queue()
+        main_queue: asyncio.Queue = JobEventQueue(
+            policy=self.queue_policy,
+            max_events=self.queue_max_events,
+            max_bytes=self.queue_max_bytes,
+            replay_max_events=self.queue_replay_events,
+            replay_max_bytes=self.queue_replay_max_bytes,
+        )
         event_manager: EventManager = self._create_default_event_manager(main_queue)
+        # Events of the job are encoded by a single task so that sending one never blocks the build
+        event_manager.start_encoder()
 
         # Register the queue without an active task.
         self._queues[job_id] = (main_queue, event_manager, None, None)
@@ -184,6 +234,37 @@ class JobQueueService(Service):
         self._queues[job_id] = (main_queue, event_manager, task, None)
         logger.debug(f"New task started for job_id {job_id}")
 
+    async def start_publishing(self, job_id: str) -> None:
+        """Publish the events of a job to the event bus, if there is one.
+
+        Once this is called, the events of the job are read from the bus rather than from its queue.
+
+        Args:
+            job_id (str): Unique identifier for the job.
+        """
+        if self.event_bus is None or job_id in self._publishers:
+            return
+        main_queue = self.get_queue_data(job_id)[0]
+        await self.event_bus.open(job_id)
+        self._publishers[job_id] = asyncio.create_task(self._publish_events(job_id, main_queue))
+
+    async def _publish_events(self, job_id: str, main_queue: asyncio.Queue) -> None:
+        if self.event_bus is None:
+            return
+        while True:
+            batch = await get_batch(main_queue, PUBLISH_BATCH_SIZE, timeout=None)
+            events = [value for _, value, _ in batch if value is not None]
+            finished = batch[-1][1] is None
+            try:
+                if events:
+                    await self.event_bus.publish(job_id, events)
+                if finished:
+                    await self.event_bus.finish(job_id)
+            except Exception:  # noqa: BLE001
+                await logger.aexception(f"Could not publish {len(events)} events of job_id {job_id}")
+            if finished:
+                return
+
     def get_queue_data(self, job_id: str) -> tuple[asyncio.Queue, EventManager, asyncio.Task | None, float | None]:
         """Retrieve the complete data structure associated with a job's queue.
 
@@ -208,14 +289,88 @@ class JobQueueService(Service):
         except KeyError as exc:
             raise JobQueueNotFoundError(job_id) from exc
 
+    def get_queue_stats(self, job_id: str) -> dict[str, int | str]:
+        """Return the memory accounting of a job's queue.
+
+        Args:
+            job_id (str): Unique identifier for the job.
+
+        Returns:
+            dict: The number and size of the queued events, the peak size, how many token events were
+            dropped or coalesced because the queue was full, and the events still waiting to be encoded.
+
+        Raises:
+            JobQueueNotFoundError: If the job_id is not found.
+        """
+        main_queue, event_manager, *_ = self.get_queue_data(job_id)
+        stats = main_queue.stats() if isinstance(main_queue, JobEventQueue) else {"events": main_queue.qsize()}
+        stats["pending_events"] = event_manager.pending_events
+        stats["pending_size_bytes"] = event_manager.pending_size_bytes()
+        return stats
+
+    def get_memory_usage(self) -> int:
+        """Return the size in bytes of the events queued, kept for replay or waiting to be encoded across all jobs.
+
+        The size of the events waiting to be encoded is approximate.
+        """
+        usage = 0
+        for main_queue, event_manager, *_ in self._queues.values():
+            usage += event_manager.pending_size_bytes()
+            if isinstance(main_queue, JobEventQueue):
+                usage += main_queue.size_bytes + main_queue.replay_size_bytes
+        return usage
+
+    def detach_client(self, job_id: str) -> None:
+        """Cancel a job once its client has been disconnected for DISCONNECT_GRACE_PERIOD seconds.
+
+        A client that reconnects to the job's events in the meantime keeps it running, see `attach_client`.
+
+        Args:
+            job_id (str): Unique identifier for the job.
+        """
+        if job_id not in self._queues:
+            return
+        _, _, task, _ = self._queues[job_id]
+        if task is None or task.done():
+            return
+        self.attach_client(job_id)
+        if self.DISCONNECT_GRACE_PERIOD <= 0:
+            self._cancel_detached_job(job_id)
+            return
+        logger.debug(f"Client of job_id {job_id} disconnected; cancelling in {self.DISCONNECT_GRACE_PERIOD}s")
+        self._disconnect_timers[job_id] = asyncio.get_running_loop().call_later(
+            self.DISCONNECT_GRACE_PERIOD, self._cancel_detached_job, job_id
+        )
+
+    def attach_client(self, job_id: str) -> None:
+        """Keep a job running now that a client reads its events again.
+
+        Args:
+            job_id (str): Unique identifier for the job.
+        """
+        if timer := self._disconnect_timers.pop(job_id, None):
+            timer.cancel()
+            logger.debug(f"Client of job_id {job_id} reconnected")
+
+    def _cancel_detached_job(self, job_id: str) -> None:
+        self._disconnect_timers.pop(job_id, None)
+        if job_id not in self._queues:
+            return
+        _, event_manager, task, _ = self._queues[job_id]
+        if task is not None and not task.done():
+            logger.debug(f"Cancelling job_id {job_id}: its client disconnected")
+            task.cancel()
+            event_manager.on_end(data={})
+
     async def cleanup_job(self, job_id: str) -> None:
         """Clean up and release resources for a specific job.
 
         The cleanup process includes:
           1. Verifying if the job's queue is registered.
           2. Cancelling the running task (if active) and awaiting its termination.
-          3. Clearing all items from the job's queue.
-          4. Removing the job's entry from the internal registry.
+          3. Stopping the event encoder task of the job's event manager.
+          4. Clearing all items from the job's queue.
+          5. Removing the job's entry from the internal registry.
 
         Args:
             job_id (str): Unique identifier for the job to be cleaned up.
@@ -225,7 +380,9 @@ class JobQueueService(Service):
             return
 
         await logger.adebug(f"Commencing cleanup for job_id {job_id}")
-        main_queue, _event_manager, task, _ = self._queues[job_id]
+        main_queue, event_manager, task, _ = self._queues[job_id]
+        if timer := self._disconnect_timers.pop(job_id, None):
+            timer.cancel()
 
         # Cancel the associated task if it is still running.
         if task and not task.done():
@@ -233,10 +390,23 @@ class JobQueueService(Service):
             task.cancel()
             await asyncio.wait([task])
             # Log any exceptions that occurred during the task's execution.
-            if exc := task.exception():
+            if not task.cancelled() and (exc := task.exception()):
                 await logger.aerror(f"Error in task for job_id {job_id}: {exc}")
             await logger.adebug(f"Task cancellation complete for job_id {job_id}")
 
+        # Stop the job's event encoder task; nobody reads the events it still has to encode
+        await event_manager.aclose(drain=False)
+
+        publisher = self._publishers.pop(job_id, None)
+        if publisher is not None and not publisher.done():
+            publisher.cancel()
+            await asyncio.wait([publisher])
+            try:
+                # Readers on other workers would otherwise wait until the stream expires
+                await self.event_bus.finish(job_id)
+            except Exception:  # noqa: BLE001
+                await logger.aexception(f"Could not publish the end of the events of job_id {job_id}")
+
         # Clear the queue since we just cancelled the task or it has completed
         items_cleared = 0
         while not main_queue.empty():
@@ -272,35 +442,35 @@ class JobQueueService(Service):
                 await logger.aerror(f"Exception encountered during periodic cleanup: {exc}")
 
     async def _cleanup_old_queues(self) -> None:
-        """Scan all registered job queues and clean up those with completed or failed tasks."""
+        """Scan all registered job queues and clean up those with finished, cancelled or failed tasks."""
         current_time = asyncio.get_running_loop().time()
 
         for job_id in list(self._queues.keys()):
             _, _, task, cleanup_time = self._queues[job_id]
-            if task:
-                await logger.adebug(
-                    f"Queue {job_id} status - Done: {task.done()}, "
-                    f"Cancelled: {task.cancelled()}, "
-                    f"Has exception: {task.exception() is not None if task.done() else 'N/A'}"
+            if not task or not task.done():
+                continue
+            # A cancelled task has no exception to ask for
+            failed = task.cancelled() or task.exception() is not None
+            await logger.adebug(f"Queue {job_id} status - Done: True, Cancelled: {task.cancelled()}, Failed: {failed}")
+
+            if cleanup_time is None:
+                # Mark for cleanup by setting the timestamp
+                self._queues[job_id] = (
+                    self._queues[job_id][0],
+                    self._queues[job_id][1],
+                    self._queues[job_id][2],
+                    current_time,
                 )
+                reason = "Task cancelled or failed" if failed else "Task finished"
+                await logger.adebug(f"Job queue for job_id {job_id} marked for cleanup - {reason}")
+            elif current_time - cleanup_time >= (self.CLEANUP_GRACE_PERIOD if failed else self.FINISHED_JOB_TTL):
+                # Enough time has passed, perform the actual cleanup
+                await logger.adebug(f"Cleaning up job_id {job_id} after grace period")
+                await self.cleanup_job(job_id)
 
-                # Check if task should be marked for cleanup
-                if task and (task.cancelled() or (task.done() and task.exception() is not None)):
-                    if cleanup_time is None:
-                        # Mark for cleanup by setting the timestamp
-                        self._queues[job_id] = (
-                            self._queues[job_id][0],
-                            self._queues[job_id][1],
-                            self._queues[job_id][2],
-                            current_time,
-                        )
-                        await logger.adebug(
-                            f"Job queue for job_id {job_id} marked for cleanup - Task cancelled or failed"
-                        )
-                    elif current_time - cleanup_time >= self.CLEANUP_GRACE_PERIOD:
-                        # Enough time has passed, perform the actual cleanup
-                        await logger.adebug(f"Cleaning up job_id {job_id} after grace period")
-                        await self.cleanup_job(job_id)
+        await logger.adebug(
+            f"Job queues hold {self.get_memory_usage()} bytes of events across {len(self._queues)} jobs"
+        )
 
     def _create_default_event_manager(self, queue: asyncio.Queue) -> EventManager:
         """Creates the default event manager with predefined events.
@@ -319,10 +489,12 @@ class JobQueueService(Service):
             ("on_error", "error"),
             ("on_end", "end"),
             ("on_message", "add_message"),
+            ("on_message_delta", "message_delta"),
             ("on_remove_message", "remove_message"),
             ("on_end_vertex", "end_vertex"),
             ("on_build_start", "build_start"),
             ("on_build_end", "build_end"),
+            ("on_profile", "profile"),
         ]
         for name, event_type in event_names_types:
             manager.register_event(name, event_type)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from functools import cached_property
 from typing import TYPE_CHECKING, Any
 from uuid import UUID
 
@@ -10,7 +11,8 @@ from wfx.services.deps import session_scope
 from wfx.services.interfaces import TransactionServiceProtocol
 
 from primeagent.services.base import Service
-from primeagent.services.database.models.transactions.crud import log_transaction as crud_log_transaction
+from primeagent.services.database.batch_writer import BatchWriter
+from primeagent.services.database.models.transactions.crud import log_transactions, prune_transactions
 from primeagent.services.database.models.transactions.model import TransactionBase
 
 if TYPE_CHECKING:
@@ -22,6 +24,10 @@ class TransactionService(Service, TransactionServiceProtocol):
 
     This service handles logging of component execution transactions to the database,
     tracking inputs, outputs, and status of each vertex build.
+
+    Transactions are buffered and written in batches by a background task, so logging one never
+    waits for the database. The transactions of each flow beyond `max_transactions_to_keep` are
+    deleted periodically rather than on every write.
     """
 
     name = "transaction_service"
@@ -33,6 +39,21 @@ class TransactionService(Service, TransactionServiceProtocol):
             settings_service: The settings service for checking if transactions are enabled.
         """
         self.settings_service = settings_service
+        self._flow_ids_to_prune: set[UUID] = set()
+
+    @cached_property
+    def writer(self) -> BatchWriter[TransactionBase]:
+        """The batch writer, created on first use so a disabled service never reads its settings."""
+        settings = self.settings_service.settings
+        return BatchWriter(
+            "transactions",
+            self._write_transactions,
+            batch_size=settings.transactions_batch_size,
+            flush_interval=settings.transactions_flush_interval,
+            max_pending=settings.transactions_max_pending,
+            maintenance=self._prune_transactions,
+            maintenance_interval=settings.transactions_prune_interval,
+        )
 
     async def log_transaction(
         self,
@@ -71,12 +92,35 @@ class TransactionService(Service, TransactionServiceProtocol):
                 flow_id=flow_uuid,
             )
 
-            async with session_scope() as session:
-                await crud_log_transaction(session, transaction)
+            self.writer.add(transaction)
 
         except Exception as exc:  # noqa: BLE001
             logger.debug(f"Error logging transaction: {exc!s}")
 
+    async def _write_transactions(self, transactions: list[TransactionBase]) -> None:
+        async with session_scope() as session:
+            await log_transactions(session, transactions)
+        self._flow_ids_to_prune.update(transaction.flow_id for transaction in transactions)
+
+    async def _prune_transactions(self) -> None:
+        # Only the flows that got transactions since the last prune can exceed the maximum
+        flow_ids, self._flow_ids_to_prune = self._flow_ids_to_prune, set()
+        if not flow_ids:
+            return
+        async with session_scope() as session:
+            await prune_transactions(session, flow_ids)
+
+    async def flush(self) -> None:
+        """Write the transactions that are still pending."""
+        if "writer" in self.__dict__:
+            await self.writer.flush()
+
+    async def teardown(self) -> None:
+        if "writer" not in self.__dict__:
+            return
+        await self.writer.stop()
+        await self.writer.run_maintenance()
+
     def is_enabled(self) -> bool:
         """Check if transaction logging is enabled.
 
@@ -15,6 +15,7 @@ from wfx.utils.constants import (
 
 # Primeagent-specific constants
 PRIMEAGENT_GLOBAL_VAR_HEADER_PREFIX = "x-primeagent-global-var-"
+PRIMEAGENT_PROFILE_HEADER = "x-primeagent-profile"
 
 __all__ = [
     "ANTHROPIC_MODELS",
@@ -28,6 +29,7 @@ __all__ = [
     "MESSAGE_SENDER_USER",
     "OPENAI_MODELS",
     "PRIMEAGENT_GLOBAL_VAR_HEADER_PREFIX",
+    "PRIMEAGENT_PROFILE_HEADER",
     "PYTHON_BASIC_TYPES",
     "REASONING_OPENAI_MODELS",
 ]
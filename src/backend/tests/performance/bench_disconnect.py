@@ -0,0 +1,143 @@
+"""Compares the idle CPU time of open requests watched for client disconnects in two ways.
+
+- "polling": a middleware polls `request.is_disconnected()` every 100 ms for every request, as the
+  RequestCancelledMiddleware that used to live in primeagent.main did.
+- "token": `DisconnectMiddleware` with a route that asks for a `DisconnectToken`, which waits on the
+  ASGI receive channel without polling.
+
+The requests stay open while nothing happens, then every client disconnects and the time it takes
+until every request was answered is measured.
+
+Run from src/backend with:
+
+    python -m tests.performance.bench_disconnect --requests 1000 5000
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI, Request, Response
+from primeagent.api.disconnect import DisconnectMiddleware, DisconnectToken, run_until_disconnected
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+
+class PollingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        sentinel = object()
+
+        async def cancel_handler():
+            while True:
+                if await request.is_disconnected():
+                    return sentinel
+                await asyncio.sleep(0.1)
+
+        handler_task = asyncio.create_task(call_next(request))
+        cancel_task = asyncio.create_task(cancel_handler())
+
+        done, pending = await asyncio.wait([handler_task, cancel_task], return_when=asyncio.FIRST_COMPLETED)
+
+        for task in pending:
+            task.cancel()
+
+        if cancel_task in done:
+            return Response("Request was cancelled", status_code=499)
+        return await handler_task
+
+
+def make_polling_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(PollingMiddleware)
+
+    @app.get("/run")
+    async def run():
+        await asyncio.Event().wait()
+
+    return app
+
+
+def make_token_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(DisconnectMiddleware)
+
+    @app.get("/run")
+    async def run(disconnect: DisconnectToken):
+        await run_until_disconnected(asyncio.Event().wait(), disconnect)
+
+    return app
+
+
+APPS = {"polling": make_polling_app, "token": make_token_app}
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0", "spec_version": "2.3"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/run",
+    "raw_path": b"/run",
+    "query_string": b"",
+    "root_path": "",
+    "headers": [],
+    "client": ("127.0.0.1", 1234),
+    "server": ("testserver", 80),
+}
+
+
+class Client:
+    def __init__(self) -> None:
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.messages.put_nowait({"type": "http.request", "body": b"", "more_body": False})
+        self.answered = asyncio.Event()
+
+    async def receive(self) -> dict:
+        return await self.messages.get()
+
+    async def send(self, message: dict) -> None:
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            self.answered.set()
+
+
+async def measure(name: str, num_requests: int, idle: float) -> dict:
+    app = APPS[name]()
+    clients = [Client() for _ in range(num_requests)]
+    requests = [asyncio.create_task(app(dict(SCOPE), client.receive, client.send)) for client in clients]
+    # Let every request reach its route before measuring
+    await asyncio.sleep(0.5)
+
+    start = time.process_time()
+    await asyncio.sleep(idle)
+    idle_cpu = time.process_time() - start
+
+    start = time.perf_counter()
+    for client in clients:
+        client.messages.put_nowait({"type": "http.disconnect"})
+    await asyncio.gather(*(client.answered.wait() for client in clients))
+    teardown = time.perf_counter() - start
+
+    # The polling middleware answers without stopping the route, which would wait forever
+    for request in requests:
+        request.cancel()
+    await asyncio.gather(*requests, return_exceptions=True)
+    return {"idle_cpu": idle_cpu, "teardown": teardown}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--idle", type=float, default=5.0, help="Seconds during which the requests are idle")
+    args = parser.parse_args()
+
+    for num_requests in args.requests:
+        for name in APPS:
+            result = asyncio.run(measure(name, num_requests, args.idle))
+            share = result["idle_cpu"] / args.idle * 100
+            print(  # noqa: T201
+                f"requests={num_requests:<6} {name:>8} idle cpu={result['idle_cpu'] * 1000:9.1f} ms ({share:5.1f}%)"
+                f"  all answered after={result['teardown'] * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
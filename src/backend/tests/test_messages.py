@@ -21,7 +21,7 @@ from primeagent.schema.properties import Properties, Source
 # Assuming you have these imports available
 from primeagent.services.database.models.message import MessageCreate, MessageRead
 from primeagent.services.database.models.message.model import MessageTable
-from primeagent.services.deps import session_scope
+from primeagent.services.deps import get_db_service, session_scope
 from primeagent.services.tracing.utils import convert_to_langchain_type
 
 
@@ -51,30 +51,88 @@ async def created_messages(async_session):  # noqa: ARG001
 def test_get_messages():
     add_messages(
         [
-            Message(text="Test message 1", sender="User", sender_name="User", session_id="session_id2"),
-            Message(text="Test message 2", sender="User", sender_name="User", session_id="session_id2"),
+            Message(
+                text="Test message 1",
+                sender="User",
+                sender_name="User",
+                session_id="session_id2",
+                timestamp="2024-01-01 10:00:00 UTC",
+            ),
+            Message(
+                text="Test message 2",
+                sender="User",
+                sender_name="User",
+                session_id="session_id2",
+                timestamp="2024-01-01 10:00:01 UTC",
+            ),
         ]
     )
     limit = 2
     messages = get_messages(sender="User", session_id="session_id2", limit=limit)
     assert len(messages) == limit
-    assert messages[0].text == "Test message 1"
-    assert messages[1].text == "Test message 2"
+    # Newest first
+    assert messages[0].text == "Test message 2"
+    assert messages[1].text == "Test message 1"
 
 
 @pytest.mark.usefixtures("client")
 async def test_aget_messages():
     await aadd_messages(
         [
-            Message(text="Test message 1", sender="User", sender_name="User", session_id="session_id2"),
-            Message(text="Test message 2", sender="User", sender_name="User", session_id="session_id2"),
+            Message(
+                text="Test message 1",
+                sender="User",
+                sender_name="User",
+                session_id="session_id2",
+                timestamp="2024-01-01 10:00:00 UTC",
+            ),
+            Message(
+                text="Test message 2",
+                sender="User",
+                sender_name="User",
+                session_id="session_id2",
+                timestamp="2024-01-01 10:00:01 UTC",
+            ),
         ]
     )
     limit = 2
     messages = await aget_messages(sender="User", session_id="session_id2", limit=limit)
     assert len(messages) == limit
-    assert messages[0].text == "Test message 1"
-    assert messages[1].text == "Test message 2"
+    # Newest first
+    assert messages[0].text == "Test message 2"
+    assert messages[1].text == "Test message 1"
+
+
+@pytest.mark.usefixtures("client")
+async def test_aget_messages_after_a_message():
+    # Messages stored within the same second share their timestamp, pages order them by id
+    await aadd_messages(
+        [
+            Message(
+                text=f"Paged message {index}",
+                sender="User",
+                sender_name="User",
+                session_id="paged_session",
+                timestamp="2024-01-01 10:00:00 UTC",
+            )
+            for index in range(5)
+        ]
+    )
+
+    pages = []
+    after = None
+    while page := await aget_messages(session_id="paged_session", limit=2, after=after):
+        pages.append(page)
+        after = page[-1].id
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [message.id for page in pages for message in page] == [
+        message.id for message in await aget_messages(session_id="paged_session", limit=10)
+    ]
+    # A whole listing keeps them in the order they were stored in
+    assert [message.text for message in await aget_messages(session_id="paged_session", order="ASC")] == [
+        f"Paged message {index}" for index in range(5)
+    ]
 
 
 @pytest.mark.usefixtures("client")
@@ -1142,3 +1200,20 @@ class TestMessageResponseFromMessage:
 
         with pytest.raises(ValueError, match="required fields"):
             MessageResponse.from_message(message)
+
+
+@pytest.mark.usefixtures("client")
+async def test_aupdate_messages_debounced_writes_the_last_update(created_message):
+    message_writer = get_db_service().message_writer
+    for step in range(3):
+        created_message.text = f"Step {step}"
+        returned = await aupdate_messages(created_message, debounce=True)
+        assert returned == [created_message]
+
+    created_message.text = "Complete"
+    (updated,) = await aupdate_messages(created_message)
+
+    assert updated.text == "Complete"
+    assert message_writer.stats()["pending_updates"] == 0
+    (stored,) = await aget_messages(session_id="session_id")
+    assert stored.text == "Complete"
@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Request
+from primeagent.api.disconnect import (
+    CLIENT_CLOSED_REQUEST,
+    CancellationToken,
+    DisconnectMiddleware,
+    DisconnectToken,
+    run_until_disconnected,
+)
+
+
+class FakeClient:
+    """The ASGI receive and send channels of one request."""
+
+    def __init__(self, body: bytes = b"") -> None:
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.messages.put_nowait({"type": "http.request", "body": body, "more_body": False})
+        self.sent: list[dict] = []
+        self.receive_calls = 0
+
+    async def receive(self) -> dict:
+        self.receive_calls += 1
+        return await self.messages.get()
+
+    async def send(self, message: dict) -> None:
+        self.sent.append(message)
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            # Servers report a disconnect once the response is complete
+            self.disconnect()
+
+    def disconnect(self) -> None:
+        self.messages.put_nowait({"type": "http.disconnect"})
+
+    @property
+    def status(self) -> int:
+        return next(message["status"] for message in self.sent if message["type"] == "http.response.start")
+
+
+def make_scope(method: str, path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.add_middleware(DisconnectMiddleware)
+    app.state.tokens = []
+    app.state.started = asyncio.Event()
+    app.state.release = asyncio.Event()
+
+    @app.post("/echo")
+    async def echo(payload: dict, disconnect: DisconnectToken):
+        app.state.tokens.append(disconnect)
+        return payload
+
+    @app.get("/wait")
+    async def wait(disconnect: DisconnectToken):
+        app.state.tokens.append(disconnect)
+        app.state.started.set()
+
+        async def work():
+            await asyncio.Event().wait()
+
+        return await run_until_disconnected(work(), disconnect)
+
+    @app.get("/plain")
+    async def plain(request: Request):
+        app.state.started.set()
+        await app.state.release.wait()
+        return {"disconnected": await request.is_disconnected()}
+
+    return app
+
+
+async def test_token_is_cancelled_when_the_client_disconnects(app):
+    client = FakeClient()
+    request = asyncio.create_task(app(make_scope("GET", "/wait"), client.receive, client.send))
+    await app.state.started.wait()
+    (token,) = app.state.tokens
+    cancelled = []
+    token.add_callback(lambda: cancelled.append(True))
+
+    client.disconnect()
+    await asyncio.wait_for(request, timeout=1)
+
+    assert token.cancelled
+    assert cancelled == [True]
+    assert client.status == CLIENT_CLOSED_REQUEST
+
+
+async def test_body_is_read_through_the_watcher(app):
+    client = FakeClient(body=b'{"value": 1}')
+
+    await asyncio.wait_for(app(make_scope("POST", "/echo"), client.receive, client.send), timeout=1)
+
+    assert client.status == 200
+    assert b"".join(message.get("body", b"") for message in client.sent) == b'{"value":1}'
+
+
+async def test_disconnect_after_the_response_does_not_cancel(app):
+    client = FakeClient(body=b"{}")
+
+    await asyncio.wait_for(app(make_scope("POST", "/echo"), client.receive, client.send), timeout=1)
+    await asyncio.sleep(0.01)
+
+    (token,) = app.state.tokens
+    assert not token.cancelled
+
+
+async def test_routes_without_the_token_do_not_watch_the_client(app):
+    client = FakeClient()
+    request = asyncio.create_task(app(make_scope("GET", "/plain"), client.receive, client.send))
+    await app.state.started.wait()
+    await asyncio.sleep(0.01)
+
+    assert client.receive_calls == 0
+    app.state.release.set()
+    await asyncio.wait_for(request, timeout=1)
+    assert client.status == 200
+
+
+async def test_run_until_disconnected_returns_the_result():
+    async def work():
+        return 42
+
+    assert await run_until_disconnected(work(), CancellationToken()) == 42
+
+
+async def test_run_until_disconnected_lets_outer_cancellation_through():
+    token = CancellationToken()
+    started = asyncio.Event()
+
+    async def work():
+        started.set()
+        await asyncio.Event().wait()
+
+    task = asyncio.create_task(run_until_disconnected(work(), token))
+    await started.wait()
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
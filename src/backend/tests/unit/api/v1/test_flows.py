@@ -59,6 +59,37 @@ async def test_read_flows(client: AsyncClient, logged_in_headers):
     assert isinstance(result, list), "The result must be a list"
 
 
+async def test_read_flow_headers_carry_the_data_of_components_only(client: AsyncClient, logged_in_headers):
+    component_data = {"nodes": [{"id": "Component-1", "data": {}}], "edges": []}
+    flows = [
+        # is_component is derived from the data when the flow is saved without it
+        {"name": "header component", "data": component_data, "is_component": None},
+        {"name": "header flow", "data": {"nodes": [{"id": "A-1"}, {"id": "B-1"}], "edges": []}},
+    ]
+    for flow in flows:
+        response = await client.post("api/v1/flows/", json=flow, headers=logged_in_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+
+    params = {"get_all": True, "header_flows": True}
+    response = await client.get("api/v1/flows/", params=params, headers=logged_in_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    headers = {header["name"]: header for header in response.json()}
+    assert headers["header component"]["is_component"] is True
+    assert headers["header component"]["data"] == component_data
+    assert headers["header flow"]["is_component"] is False
+    assert headers["header flow"]["data"] is None
+    assert "user_id" not in headers["header flow"]
+
+    params = {"get_all": False, "header_flows": True, "page": 1, "size": 50}
+    response = await client.get("api/v1/flows/", params=params, headers=logged_in_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    page = {header["name"]: header for header in response.json()["items"]}
+    assert page["header component"]["data"] == component_data
+    assert page["header flow"]["data"] is None
+
+
 async def test_read_flow(client: AsyncClient, logged_in_headers):
     basic_case = {
         "name": "string",
@@ -1392,6 +1392,31 @@ class TestReadProjectBugFix:
         assert "page" in flows
         assert "size" in flows
 
+    async def test_read_project_with_pagination_params_and_header_flows(
+        self, client: AsyncClient, logged_in_headers, basic_case
+    ):
+        """Test read_project returns flow headers, without the data of flows, when header_flows is set."""
+        create_response = await client.post("api/v1/projects/", json=basic_case, headers=logged_in_headers)
+        assert create_response.status_code == status.HTTP_201_CREATED
+        project_id = create_response.json()["id"]
+        flow = {"name": "header flow", "data": {"nodes": [], "edges": []}, "folder_id": project_id}
+        response = await client.post("api/v1/flows/", json=flow, headers=logged_in_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = await client.get(
+            f"api/v1/projects/{project_id}?page=1&size=10&header_flows=true", headers=logged_in_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        result = response.json()
+        assert result["folder"]["id"] == project_id
+        assert result["flows"]["total"] == 1
+        (header,) = result["flows"]["items"]
+        assert header["name"] == "header flow"
+        assert header["is_component"] is False
+        assert header["data"] is None
+        assert "user_id" not in header
+
     async def test_read_project_with_partial_pagination_params(
         self, client: AsyncClient, logged_in_headers, basic_case
     ):
@@ -1,12 +1,14 @@
 """Tests for transactions API endpoints and models."""
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 import pytest
 from fastapi import status
 from httpx import AsyncClient
 from primeagent.services.database.models.transactions.crud import (
+    log_transactions,
+    prune_transactions,
     transform_transaction_table,
     transform_transaction_table_for_logs,
 )
@@ -18,6 +20,7 @@ from primeagent.services.database.models.transactions.model import (
     _is_sensitive_key,
     sanitize_data,
 )
+from sqlmodel import select
 
 
 class TestTransactionModels:
@@ -524,3 +527,44 @@ class TestTransactionsEndpoint:
         assert "size" in result
         assert "pages" in result
         assert isinstance(result["items"], list)
+
+
+class TestTransactionRetention:
+    """Tests for writing transactions in batches and trimming them per flow."""
+
+    @staticmethod
+    def make_transactions(flow_id, count: int) -> list[TransactionBase]:
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        return [
+            TransactionBase(
+                vertex_id=f"vertex-{index}",
+                status="success",
+                flow_id=flow_id,
+                timestamp=start + timedelta(seconds=index),
+            )
+            for index in range(count)
+        ]
+
+    async def test_prune_transactions_keeps_the_newest_of_each_flow(self, async_session):
+        """Test that pruning keeps the newest transactions of the given flows only."""
+        flow_id, other_flow_id = uuid4(), uuid4()
+        await log_transactions(
+            async_session, self.make_transactions(flow_id, 5) + self.make_transactions(other_flow_id, 5)
+        )
+
+        await prune_transactions(async_session, {flow_id}, max_entries=2)
+
+        rows = (await async_session.exec(select(TransactionTable))).all()
+        assert sorted(row.vertex_id for row in rows if row.flow_id == flow_id) == ["vertex-3", "vertex-4"]
+        assert len([row for row in rows if row.flow_id == other_flow_id]) == 5
+
+    async def test_log_transactions_skips_transactions_without_flow(self, async_session):
+        """Test that transactions without a flow_id are not written."""
+        flow_id = uuid4()
+        transactions = self.make_transactions(flow_id, 2)
+        transactions[0].flow_id = None
+
+        await log_transactions(async_session, transactions)
+
+        rows = (await async_session.exec(select(TransactionTable).where(TransactionTable.flow_id == flow_id))).all()
+        assert [row.vertex_id for row in rows] == ["vertex-1"]
@@ -1,6 +1,6 @@
 from collections.abc import AsyncIterator
 from typing import Any
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from langchain_core.agents import AgentFinish
@@ -231,6 +231,32 @@ async def test_chain_stream_event():
     assert result.text == "streamed output"
 
 
+@pytest.mark.asyncio
+async def test_streamed_tokens_wait_for_capacity():
+    """Test that the agent waits for room in the event queue after each streamed chunk."""
+    send_message = create_mock_send_message()
+    send_token = MagicMock()
+    wait_for_capacity = AsyncMock()
+
+    events = [
+        {"event": "on_chat_model_stream", "data": {"chunk": AIMessageChunk(content=chunk)}, "start_time": 0}
+        for chunk in ("Hello", " world")
+    ]
+    agent_message = Message(
+        sender=MESSAGE_SENDER_AI,
+        sender_name="Agent",
+        properties={"icon": "Bot", "state": "partial"},
+        content_blocks=[ContentBlock(title="Agent Steps", contents=[])],
+        session_id="test_session_id",
+    )
+    await process_agent_events(
+        create_event_iterator(events), agent_message, send_message, send_token, wait_for_capacity=wait_for_capacity
+    )
+
+    assert send_token.call_count == 2
+    assert wait_for_capacity.await_count == 2
+
+
 @pytest.mark.asyncio
 async def test_multiple_events():
     """Test handling of multiple events in sequence."""
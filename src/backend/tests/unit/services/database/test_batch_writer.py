@@ -0,0 +1,99 @@
+import asyncio
+
+from primeagent.services.database.batch_writer import BatchWriter
+
+
+class Recorder:
+    def __init__(self, *, fail: bool = False) -> None:
+        self.batches: list[list[int]] = []
+        self.fail = fail
+
+    async def __call__(self, batch: list[int]) -> None:
+        if self.fail:
+            msg = "database is down"
+            raise RuntimeError(msg)
+        self.batches.append(batch)
+
+
+async def test_records_are_written_once_a_batch_is_full():
+    write = Recorder()
+    writer = BatchWriter("records", write, batch_size=3, flush_interval=60)
+
+    for record in range(4):
+        writer.add(record)
+        await asyncio.sleep(0.01)
+
+    assert write.batches == [[0, 1, 2]]
+    await writer.stop()
+    assert write.batches == [[0, 1, 2], [3]]
+
+
+async def test_records_are_written_after_the_flush_interval():
+    write = Recorder()
+    writer = BatchWriter("records", write, batch_size=100, flush_interval=0.05)
+
+    writer.add(1)
+    await asyncio.sleep(0.01)
+    assert write.batches == []
+
+    await asyncio.sleep(0.1)
+    assert write.batches == [[1]]
+    await writer.stop()
+
+
+async def test_records_beyond_max_pending_are_dropped():
+    write = Recorder()
+    writer = BatchWriter("records", write, batch_size=100, flush_interval=60, max_pending=2)
+
+    assert [writer.add(record) for record in range(3)] == [True, True, False]
+
+    await writer.stop()
+    assert write.batches == [[0, 1]]
+    assert writer.stats() == {"pending": 0, "written": 2, "dropped": 1, "failed": 0}
+
+
+async def test_failed_writes_are_counted():
+    writer = BatchWriter("records", Recorder(fail=True), batch_size=2, flush_interval=60)
+
+    writer.add(1)
+    await writer.flush()
+
+    assert writer.stats()["failed"] == 1
+
+
+async def test_pending_records_can_be_discarded():
+    write = Recorder()
+    writer = BatchWriter("records", write, batch_size=100, flush_interval=60)
+    for record in range(4):
+        writer.add(record)
+
+    assert writer.discard(lambda record: record % 2 == 0) == 2
+
+    await writer.stop()
+    assert write.batches == [[1, 3]]
+
+
+async def test_maintenance_runs_periodically():
+    runs = []
+
+    async def maintenance():
+        runs.append(True)
+
+    writer = BatchWriter("records", Recorder(), maintenance=maintenance, maintenance_interval=0.02)
+    writer.add(1)
+    await asyncio.sleep(0.07)
+    await writer.stop()
+
+    assert len(runs) >= 2
+
+
+async def test_a_batch_size_below_one_writes_records_one_at_a_time():
+    write = Recorder()
+    writer = BatchWriter("records", write, batch_size=0, flush_interval=60)
+
+    writer.add(1)
+    writer.add(2)
+    await asyncio.wait_for(writer.flush(), timeout=1)
+
+    assert write.batches == [[1], [2]]
+    await writer.stop()
@@ -0,0 +1,144 @@
+import asyncio
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+from primeagent.services.database.message_writer import MessageWriter
+from primeagent.services.database.models.message.model import MessageTable
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all, tables=[MessageTable.__table__])
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def statements(engine):
+    executed: list[str] = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, *args):  # noqa: ARG001
+        executed.append(statement.split()[0])
+
+    return executed
+
+
+def make_writer(engine, *, session_delay: float = 0, **kwargs) -> MessageWriter:
+    @asynccontextmanager
+    async def session_factory():
+        await asyncio.sleep(session_delay)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    return MessageWriter(session_factory, **kwargs)
+
+
+def make_message(text: str = "Hello", session_id: str = "session") -> MessageTable:
+    return MessageTable(text=text, sender="User", sender_name="User", session_id=session_id, files=[])
+
+
+async def read_messages(engine) -> list[MessageTable]:
+    async with AsyncSession(engine) as session:
+        return list((await session.exec(select(MessageTable))).all())
+
+
+async def test_messages_stored_at_the_same_time_are_inserted_together(engine, statements):
+    writer = make_writer(engine)
+
+    stored = await asyncio.gather(*(writer.insert([make_message(session_id=f"session-{i}")]) for i in range(5)))
+
+    assert [len(messages) for messages in stored] == [1] * 5
+    assert statements.count("INSERT") == 1
+    assert writer.stats()["insert_transactions"] == 1
+    assert len(await read_messages(engine)) == 5
+
+
+async def test_a_failed_insert_does_not_fail_the_messages_stored_with_it(engine):
+    writer = make_writer(engine)
+    (existing,) = await writer.insert([make_message()])
+    duplicate = make_message()
+    duplicate.id = existing.id
+
+    results = await asyncio.gather(
+        writer.insert([duplicate]), writer.insert([make_message("Other")]), return_exceptions=True
+    )
+
+    assert isinstance(results[0], Exception)
+    assert [message.text for message in results[1]] == ["Other"]
+    assert len(await read_messages(engine)) == 2
+
+
+async def test_updates_of_a_message_are_written_once_after_the_debounce(engine, statements):
+    writer = make_writer(engine, debounce=0.05)
+    (message,) = await writer.insert([make_message()])
+    statements.clear()
+
+    for step in range(10):
+        writer.update_later(message.id, {"text": f"Step {step}"})
+    await asyncio.sleep(0.01)
+    assert statements == []
+
+    await asyncio.sleep(0.1)
+    assert statements.count("UPDATE") == 1
+    (stored,) = await read_messages(engine)
+    assert stored.text == "Step 9"
+    assert writer.stats()["updates_requested"] == 10
+
+
+async def test_updates_requested_while_the_updates_are_written_are_written_next(engine):
+    writer = make_writer(engine, debounce=0.05, session_delay=0.1)
+    (message,) = await writer.insert([make_message()])
+
+    writer.update_later(message.id, {"text": "a"})
+    # The debounced write is waiting for its session now
+    await asyncio.sleep(0.1)
+    writer.update_later(message.id, {"text": "ab"})
+    await asyncio.sleep(0.4)
+
+    (stored,) = await read_messages(engine)
+    assert stored.text == "ab"
+    assert writer.stats()["pending_updates"] == 0
+
+
+async def test_writing_an_update_through_writes_the_pending_updates_with_it(engine, statements):
+    writer = make_writer(engine, debounce=60)
+    (message,) = await writer.insert([make_message()])
+    writer.update_later(message.id, {"text": "Partial", "category": "agent"})
+    statements.clear()
+
+    (updated,) = await writer.update([(message.id, {"text": "Complete"})])
+
+    assert (updated.text, updated.category) == ("Complete", "agent")
+    assert statements.count("UPDATE") == 1
+    await writer.stop()
+    (stored,) = await read_messages(engine)
+    assert stored.text == "Complete"
+
+
+async def test_updating_a_missing_message_raises(engine):
+    writer = make_writer(engine)
+    missing = uuid4()
+
+    with pytest.raises(ValueError, match=f"Message with id {missing} not found"):
+        await writer.update([(missing, {"text": "Hello"})])
+
+
+async def test_discarded_updates_are_not_written(engine):
+    writer = make_writer(engine, debounce=60)
+    (message,) = await writer.insert([make_message()])
+    writer.update_later(message.id, {"text": "Partial"})
+
+    writer.discard([message.id])
+    await writer.stop()
+
+    (stored,) = await read_messages(engine)
+    assert stored.text == "Hello"
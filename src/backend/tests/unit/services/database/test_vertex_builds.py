@@ -3,7 +3,11 @@ from unittest.mock import patch
 from uuid import uuid4
 
 import pytest
-from primeagent.services.database.models.vertex_builds.crud import log_vertex_build
+from primeagent.services.database.models.vertex_builds.crud import (
+    log_vertex_build,
+    log_vertex_builds,
+    prune_vertex_builds,
+)
 from primeagent.services.database.models.vertex_builds.model import VertexBuildBase, VertexBuildTable
 from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -314,3 +318,67 @@ async def test_concurrent_log_vertex_build(vertex_build_data, mock_settings):
         async with AsyncSession(engine) as session:
             count = await session.scalar(select(func.count()).select_from(VertexBuildTable))
             assert count <= mock_settings.max_vertex_builds_to_keep
+
+
+@pytest.mark.asyncio
+async def test_log_vertex_builds_inserts_the_batch(async_session: AsyncSession, timestamp_generator):
+    """Test that a batch of builds is inserted without enforcing the limits."""
+    flow_id = uuid4()
+    vertex_id = str(uuid4())
+    builds = [
+        VertexBuildBase(id=vertex_id, flow_id=flow_id, timestamp=timestamp_generator(i), artifacts={}, valid=True)
+        for i in range(5)
+    ]
+
+    await log_vertex_builds(async_session, builds)
+
+    count = await async_session.scalar(select(func.count()).select_from(VertexBuildTable))
+    assert count == 5
+
+
+@pytest.mark.asyncio
+async def test_prune_vertex_builds_keeps_the_newest_per_vertex(async_session: AsyncSession, timestamp_generator):
+    """Test that pruning keeps the newest builds of each vertex of the given flows."""
+    flow_id = uuid4()
+    other_flow_id = uuid4()
+    builds = [
+        VertexBuildBase(id=vertex_id, flow_id=flow, timestamp=timestamp_generator(i), artifacts={}, valid=True)
+        for flow in (flow_id, other_flow_id)
+        for vertex_id in ("a", "b")
+        for i in range(4)
+    ]
+    await log_vertex_builds(async_session, builds)
+
+    await prune_vertex_builds(async_session, max_builds_to_keep=100, max_builds_per_vertex=2, flow_ids={flow_id})
+
+    rows = (
+        await async_session.execute(
+            select(VertexBuildTable.flow_id, VertexBuildTable.id, VertexBuildTable.timestamp).order_by(
+                VertexBuildTable.timestamp
+            )
+        )
+    ).all()
+    for vertex_id in ("a", "b"):
+        kept = [row.timestamp for row in rows if row.flow_id == flow_id and row.id == vertex_id]
+        assert [timestamp.replace(tzinfo=timezone.utc) for timestamp in kept] == [
+            timestamp_generator(2),
+            timestamp_generator(3),
+        ]
+    # Flows that were not given are left alone
+    assert len([row for row in rows if row.flow_id == other_flow_id]) == 8
+
+
+@pytest.mark.asyncio
+async def test_prune_vertex_builds_keeps_the_newest_globally(async_session: AsyncSession, timestamp_generator):
+    """Test that pruning keeps the newest builds across every vertex."""
+    flow_id = uuid4()
+    builds = [
+        VertexBuildBase(id=str(i), flow_id=flow_id, timestamp=timestamp_generator(i), artifacts={}, valid=True)
+        for i in range(10)
+    ]
+    await log_vertex_builds(async_session, builds)
+
+    await prune_vertex_builds(async_session, max_builds_to_keep=3, max_builds_per_vertex=2)
+
+    remaining = (await async_session.scalars(select(VertexBuildTable.id).order_by(VertexBuildTable.timestamp))).all()
+    assert remaining == ["7", "8", "9"]
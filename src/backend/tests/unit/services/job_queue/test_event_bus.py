@@ -0,0 +1,166 @@
+"""Tests for sharing job events between workers through a Redis event bus."""
+
+import asyncio
+import json
+
+from primeagent.services.job_queue.event_bus import RedisEventBus
+from primeagent.services.job_queue.event_queue import get_sequence_id
+from primeagent.services.job_queue.service import JobQueueService
+from typing_extensions import Self
+
+
+def _stream_id(entry_id: str) -> tuple[int, int]:
+    milliseconds, sequence = entry_id.split("-")
+    return int(milliseconds), int(sequence)
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self.commands: list = []
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    def xadd(self, *args, **kwargs) -> None:
+        self.commands.append((self.redis.xadd, args, kwargs))
+
+    def expire(self, *args, **kwargs) -> None:
+        self.commands.append((self.redis.expire, args, kwargs))
+
+    async def execute(self) -> list:
+        return [await command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """The subset of the Redis stream commands the event bus uses."""
+
+    def __init__(self) -> None:
+        self.streams: dict[str, list[tuple[str, dict]]] = {}
+        self.ttls: dict[str, int] = {}
+        self._changed = asyncio.Condition()
+
+    def pipeline(self, *, transaction: bool = True) -> FakePipeline:
+        assert not transaction
+        return FakePipeline(self)
+
+    async def xadd(self, name, fields, id, *, maxlen=None, approximate=True):  # noqa: A002, ARG002
+        entries = self.streams.setdefault(name, [])
+        if entries and _stream_id(id) <= _stream_id(entries[-1][0]):
+            msg = "The ID specified in XADD is equal or smaller than the target stream top item"
+            raise ValueError(msg)
+        entries.append((id, {key.encode(): value for key, value in fields.items()}))
+        if maxlen is not None:
+            del entries[:-maxlen]
+        async with self._changed:
+            self._changed.notify_all()
+        return id.encode()
+
+    async def expire(self, name, seconds):
+        self.ttls[name] = seconds
+
+    async def exists(self, name):
+        return int(name in self.streams)
+
+    async def xread(self, streams, count=None, block=None):
+        ((name, last_id),) = streams.items()
+
+        def newer():
+            entries = [entry for entry in self.streams.get(name, []) if _stream_id(entry[0]) > _stream_id(last_id)]
+            return entries[:count] if count else entries
+
+        if not newer() and block is not None:
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(self._changed.wait_for(lambda: bool(newer())), block / 1000)
+                except asyncio.TimeoutError:
+                    return []
+        entries = newer()
+        return [[name.encode(), [(entry_id.encode(), fields) for entry_id, fields in entries]]] if entries else []
+
+    async def aclose(self) -> None:
+        return None
+
+
+def event(sequence_id: int, event_type: str = "end_vertex") -> bytes:
+    return b'{"seq": %d, ' % sequence_id + json.dumps({"event": event_type, "data": {}})[1:].encode() + b"\n\n"
+
+
+async def test_readers_get_the_events_after_a_sequence_id():
+    bus = RedisEventBus(client=FakeRedis())
+    await bus.open("job")
+    await bus.publish("job", [event(1), event(2), event(3)])
+
+    events, finished = await bus.read("job", after=1, max_events=0, timeout=0)
+
+    assert [get_sequence_id(value) for value in events] == [2, 3]
+    assert not finished
+
+
+async def test_readers_wait_for_the_next_event():
+    bus = RedisEventBus(client=FakeRedis())
+    await bus.open("job")
+
+    read = asyncio.create_task(bus.read("job", after=0, max_events=10, timeout=1))
+    await asyncio.sleep(0.01)
+    await bus.publish("job", [event(1)])
+
+    events, _ = await asyncio.wait_for(read, timeout=1)
+    assert [get_sequence_id(value) for value in events] == [1]
+
+
+async def test_end_of_the_events_is_read_and_shortens_the_retention():
+    redis = FakeRedis()
+    bus = RedisEventBus(client=redis, ttl=3600, finished_ttl=60)
+    await bus.open("job")
+    await bus.publish("job", [event(1)])
+    await bus.finish("job")
+
+    assert await bus.read("job", after=1, max_events=10, timeout=0) == ([], True)
+    assert redis.ttls["primeagent:job_events:job"] == 60
+
+
+async def test_streams_keep_the_last_max_events():
+    bus = RedisEventBus(client=FakeRedis(), max_events=2)
+    await bus.open("job")
+    await bus.publish("job", [event(sequence_id) for sequence_id in range(1, 6)])
+
+    events, _ = await bus.read("job", after=0, max_events=0, timeout=0)
+
+    assert [get_sequence_id(value) for value in events] == [4, 5]
+
+
+async def test_unknown_jobs_are_not_found():
+    bus = RedisEventBus(client=FakeRedis())
+
+    assert await bus.read("job", after=0, max_events=10, timeout=0) is None
+
+
+async def test_events_of_a_job_are_published_to_the_bus():
+    bus = RedisEventBus(client=FakeRedis())
+    service = JobQueueService(event_bus=bus)
+    _, event_manager = service.create_queue("job")
+
+    async def build():
+        event_manager.on_end_vertex(data={"build_data": {"id": "a"}})
+        event_manager.on_end(data={})
+        await event_manager.aclose()
+        await event_manager.queue.put((None, None, 0.0))
+
+    service.start_job("job", build())
+    await service.start_publishing("job")
+
+    # Another worker reads the events without access to the job's queue
+    reader = RedisEventBus(client=bus._client)
+    events: list[bytes] = []
+    finished = False
+    while not finished:
+        after = get_sequence_id(events[-1]) if events else 0
+        more, finished = await asyncio.wait_for(reader.read("job", after, max_events=10, timeout=1), timeout=2)
+        events += more
+
+    assert [json.loads(value)["event"] for value in events] == ["end_vertex", "end"]
+    await service.cleanup_job("job")
@@ -0,0 +1,273 @@
+"""Tests for the bounded job event queue."""
+
+import asyncio
+import json
+
+import pytest
+from primeagent.services.job_queue.event_queue import JobEventQueue, get_batch, get_sequence_id
+from primeagent.services.job_queue.service import JobQueueService
+
+
+def make_event(event_type: str, data: dict, index: int = 0) -> tuple[str, bytes, float]:
+    encoded = (json.dumps({"event": event_type, "data": data}) + "\n\n").encode("utf-8")
+    return f"{event_type}-{index}", encoded, 0.0
+
+
+def token(chunk: str, message_id: str = "m1") -> tuple[str, bytes, float]:
+    return make_event("token", {"chunk": chunk, "id": message_id})
+
+
+def drain(queue: asyncio.Queue) -> list[tuple[str, dict]]:
+    events = []
+    while not queue.empty():
+        _, value, _ = queue.get_nowait()
+        event = json.loads(value)
+        events.append((event["event"], event["data"]))
+    return events
+
+
+def test_full_queue_coalesces_tokens_of_the_same_message():
+    queue = JobEventQueue(policy="coalesce", max_events=2)
+
+    for chunk in ("a", "b", "c"):
+        queue.put_nowait(token(chunk))
+    queue.put_nowait(token("d", message_id="m2"))
+
+    assert drain(queue) == [
+        ("token", {"chunk": "a", "id": "m1"}),
+        ("token", {"chunk": "bc", "id": "m1"}),
+        ("token", {"chunk": "d", "id": "m2"}),
+    ]
+    assert queue.coalesced_events == 1
+
+
+def test_coalesced_tokens_are_encoded_once_taken_and_keep_the_byte_accounting():
+    queue = JobEventQueue(policy="coalesce", max_events=1)
+
+    queue.put_nowait(token("a"))
+    for chunk in ('"b"', "\u00e9", "\n"):
+        queue.put_nowait(token(chunk))
+    queue.put_nowait(make_event("end", {}))
+    queued_size = queue.size_bytes
+    _, merged, _ = queue.get_nowait()
+
+    assert json.loads(merged)["data"] == {"chunk": 'a"b"\u00e9\n', "id": "m1"}
+    assert queued_size - queue.size_bytes == len(merged)
+    assert queue.coalesced_events == 3
+    queue.get_nowait()
+    assert queue.size_bytes == 0
+
+
+def test_full_queue_drops_intermediate_events_but_keeps_structural_ones():
+    queue = JobEventQueue(policy="drop_intermediate", max_events=2)
+
+    queue.put_nowait(token("a"))
+    queue.put_nowait(token("b"))
+    queue.put_nowait(token("c"))
+    queue.put_nowait(make_event("end_vertex", {"build_data": {}}))
+    queue.put_nowait(make_event("error", {"error": "boom"}))
+    queue.put_nowait(make_event("end", {}))
+
+    assert [event_type for event_type, _ in drain(queue)] == ["end_vertex", "error", "end"]
+    assert queue.dropped_events == 3
+
+
+async def test_blocking_queue_makes_producers_wait():
+    queue = JobEventQueue(policy="block", max_events=1)
+    await queue.put(token("a"))
+
+    put = asyncio.create_task(queue.put(token("b")))
+    wait = asyncio.create_task(queue.wait_for_capacity())
+    await asyncio.sleep(0.01)
+    assert not put.done()
+    assert not wait.done()
+
+    queue.get_nowait()
+    await asyncio.wait_for(asyncio.gather(put, wait), timeout=1)
+    assert drain(queue) == [("token", {"chunk": "b", "id": "m1"})]
+
+
+def test_byte_limit_and_memory_accounting():
+    event = token("x" * 100)
+    queue = JobEventQueue(policy="drop_intermediate", max_bytes=len(event[1]))
+
+    queue.put_nowait(event)
+    queue.put_nowait(token("y"))
+    stats = queue.stats()
+    queue.get_nowait()
+
+    # Queued events start with their sequence id
+    queued_size = len(event[1]) + len(b'"seq": 1, ')
+    assert stats["events"] == 1
+    assert stats["size_bytes"] == queued_size
+    assert stats["dropped_events"] == 1
+    assert queue.size_bytes == 0
+    assert queue.peak_size_bytes == queued_size
+
+
+async def test_events_waiting_to_be_encoded_count_in_the_job_stats():
+    service = JobQueueService()
+    _, event_manager = service.create_queue("job")
+
+    for chunk in ("ab", "cd", "ef"):
+        event_manager.on_token(data={"chunk": chunk, "id": "m1"})
+    stats = service.get_queue_stats("job")
+
+    assert stats["pending_events"] == 3
+    assert stats["pending_size_bytes"] == 6
+    assert service.get_memory_usage() == 6
+    await service.cleanup_job("job")
+
+
+async def test_finished_jobs_are_evicted_after_their_ttl():
+    service = JobQueueService()
+    service.FINISHED_JOB_TTL = 0
+    service.create_queue("job")
+
+    async def build():
+        return None
+
+    service.start_job("job", build())
+    await asyncio.sleep(0)
+    await service._cleanup_old_queues()
+    assert "job" in service._queues
+    await service._cleanup_old_queues()
+
+    assert "job" not in service._queues
+
+
+async def test_cancelled_jobs_are_marked_for_cleanup():
+    service = JobQueueService()
+    service.create_queue("job")
+    service.start_job("job", asyncio.sleep(10))
+    await asyncio.sleep(0)
+    service._queues["job"][2].cancel()
+    await asyncio.sleep(0)
+
+    await service._cleanup_old_queues()
+
+    assert service._queues["job"][3] is not None
+    await service.cleanup_job("job")
+
+
+@pytest.mark.parametrize("policy", ["block", "coalesce", "drop_intermediate"])
+def test_put_nowait_never_raises(policy):
+    queue = JobEventQueue(policy=policy, max_events=1)
+
+    queue.put_nowait(make_event("end_vertex", {"build_data": {}}))
+    queue.put_nowait(make_event("end", {}))
+
+    assert queue.qsize() == 2
+
+
+def test_events_get_increasing_sequence_ids():
+    queue = JobEventQueue(policy="coalesce", max_events=2)
+
+    for chunk in ("a", "b", "c"):
+        queue.put_nowait(token(chunk))
+    queue.put_nowait(make_event("end", {}))
+    events = [json.loads(queue.get_nowait()[1]) for _ in range(queue.qsize())]
+
+    # "c" was merged into the queued "b" without taking a sequence id
+    assert [(event["seq"], event["data"].get("chunk")) for event in events] == [(1, "a"), (2, "bc"), (3, None)]
+    assert queue.last_sequence_id == 3
+
+
+def test_replay_returns_the_events_after_the_cursor():
+    queue = JobEventQueue(replay_max_events=3)
+
+    for index in range(5):
+        queue.put_nowait(make_event("end_vertex", {"index": index}))
+    taken = [queue.get_nowait()[1] for _ in range(4)]
+
+    assert [get_sequence_id(event) for event in taken] == [1, 2, 3, 4]
+    assert queue.events_after(2) == taken[2:]
+    # Only the last 3 events taken are kept
+    assert queue.events_after(0) == taken[1:]
+    assert queue.events_after(4) == []
+
+
+def test_replay_is_bounded_by_bytes():
+    queue = JobEventQueue(replay_max_events=100, replay_max_bytes=100)
+
+    for _ in range(3):
+        queue.put_nowait(make_event("end_vertex", {"payload": "x" * 40}))
+        queue.get_nowait()
+
+    assert [get_sequence_id(event) for event in queue.events_after(0)] == [3]
+    assert queue.replay_size_bytes <= 100
+
+
+def test_end_of_stream_marks_the_queue_finished():
+    queue = JobEventQueue()
+    queue.put_nowait((None, None, 0.0))
+
+    assert not queue.finished
+    queue.get_nowait()
+    assert queue.finished
+    assert queue.last_sequence_id == 0
+
+
+async def test_disconnected_jobs_are_cancelled_after_the_grace_period():
+    service = JobQueueService()
+    service.DISCONNECT_GRACE_PERIOD = 0.05
+    service.create_queue("job")
+    service.start_job("job", asyncio.sleep(10))
+
+    service.detach_client("job")
+    await asyncio.sleep(0.1)
+
+    assert service._queues["job"][2].cancelled()
+    await service.cleanup_job("job")
+
+
+async def test_reconnected_jobs_keep_running():
+    service = JobQueueService()
+    service.DISCONNECT_GRACE_PERIOD = 0.05
+    service.create_queue("job")
+    service.start_job("job", asyncio.sleep(10))
+
+    service.detach_client("job")
+    service.attach_client("job")
+    await asyncio.sleep(0.1)
+
+    assert not service._queues["job"][2].done()
+    await service.cleanup_job("job")
+
+
+async def test_batch_takes_every_queued_event_up_to_the_limit():
+    queue = JobEventQueue()
+    for index in range(5):
+        queue.put_nowait(make_event("end_vertex", {"index": index}, index))
+
+    batch = await get_batch(queue, max_events=3, timeout=1)
+
+    assert [get_sequence_id(value) for _, value, _ in batch] == [1, 2, 3]
+    assert queue.qsize() == 2
+
+
+async def test_batch_waits_for_the_first_event():
+    queue = JobEventQueue()
+    asyncio.get_running_loop().call_later(0.05, queue.put_nowait, make_event("end_vertex", {}))
+
+    batch = await get_batch(queue, max_events=10, timeout=1)
+
+    assert len(batch) == 1
+
+
+async def test_batch_is_empty_when_nothing_arrives_in_time():
+    queue = JobEventQueue()
+
+    assert await get_batch(queue, max_events=10, timeout=0.01) == []
+
+
+async def test_batch_stops_at_the_end_of_the_stream():
+    queue = JobEventQueue()
+    queue.put_nowait(make_event("end_vertex", {}))
+    queue.put_nowait((None, None, 0.0))
+    queue.put_nowait(make_event("end", {}))
+
+    batch = await get_batch(queue, max_events=0, timeout=1)
+
+    assert [value is None for _, value, _ in batch] == [False, True]
+    assert queue.finished
@@ -17,6 +17,10 @@ class TestTransactionService:
         settings_service = MagicMock()
         settings_service.settings = MagicMock()
         settings_service.settings.transactions_storage_enabled = True
+        settings_service.settings.transactions_batch_size = 100
+        settings_service.settings.transactions_flush_interval = 60
+        settings_service.settings.transactions_max_pending = 10
+        settings_service.settings.transactions_prune_interval = 60
         return settings_service
 
     @pytest.fixture
@@ -74,7 +78,7 @@ class TestTransactionService:
 
         with (
             patch("primeagent.services.transaction.service.session_scope") as mock_session_scope,
-            patch("primeagent.services.transaction.service.crud_log_transaction", mock_crud) as mock_log,
+            patch("primeagent.services.transaction.service.log_transactions", mock_crud) as mock_log,
         ):
             mock_session_scope.return_value.__aenter__ = AsyncMock(return_value=mock_session)
             mock_session_scope.return_value.__aexit__ = AsyncMock(return_value=None)
@@ -87,9 +91,11 @@ class TestTransactionService:
                 status="success",
             )
 
+            mock_log.assert_not_called()
+            await service.flush()
             mock_log.assert_called_once()
             call_args = mock_log.call_args
-            transaction = call_args[0][1]
+            (transaction,) = call_args[0][1]
             assert transaction.vertex_id == "test-vertex-id"
             assert transaction.status == "success"
             assert transaction.flow_id == UUID("550e8400-e29b-41d4-a716-446655440000")
@@ -102,7 +108,7 @@ class TestTransactionService:
 
         with (
             patch("primeagent.services.transaction.service.session_scope") as mock_session_scope,
-            patch("primeagent.services.transaction.service.crud_log_transaction", mock_crud),
+            patch("primeagent.services.transaction.service.log_transactions", mock_crud),
         ):
             mock_session_scope.return_value.__aenter__ = AsyncMock(return_value=mock_session)
             mock_session_scope.return_value.__aexit__ = AsyncMock(return_value=None)
@@ -114,9 +120,10 @@ class TestTransactionService:
                 outputs=None,
                 status="success",
             )
+            await service.flush()
 
             call_args = mock_crud.call_args
-            transaction = call_args[0][1]
+            (transaction,) = call_args[0][1]
             assert isinstance(transaction.flow_id, UUID)
 
     @pytest.mark.asyncio
@@ -127,7 +134,7 @@ class TestTransactionService:
 
         with (
             patch("primeagent.services.transaction.service.session_scope") as mock_session_scope,
-            patch("primeagent.services.transaction.service.crud_log_transaction", mock_crud),
+            patch("primeagent.services.transaction.service.log_transactions", mock_crud),
         ):
             mock_session_scope.return_value.__aenter__ = AsyncMock(return_value=mock_session)
             mock_session_scope.return_value.__aexit__ = AsyncMock(return_value=None)
@@ -140,9 +147,10 @@ class TestTransactionService:
                 status="error",
                 error="Something went wrong",
             )
+            await service.flush()
 
             call_args = mock_crud.call_args
-            transaction = call_args[0][1]
+            (transaction,) = call_args[0][1]
             assert transaction.status == "error"
             assert transaction.error == "Something went wrong"
 
@@ -154,7 +162,7 @@ class TestTransactionService:
 
         with (
             patch("primeagent.services.transaction.service.session_scope") as mock_session_scope,
-            patch("primeagent.services.transaction.service.crud_log_transaction", mock_crud),
+            patch("primeagent.services.transaction.service.log_transactions", mock_crud),
         ):
             mock_session_scope.return_value.__aenter__ = AsyncMock(return_value=mock_session)
             mock_session_scope.return_value.__aexit__ = AsyncMock(return_value=None)
@@ -167,9 +175,10 @@ class TestTransactionService:
                 status="success",
                 target_id="target-vertex-id",
             )
+            await service.flush()
 
             call_args = mock_crud.call_args
-            transaction = call_args[0][1]
+            (transaction,) = call_args[0][1]
             assert transaction.target_id == "target-vertex-id"
 
     @pytest.mark.asyncio
@@ -186,3 +195,50 @@ class TestTransactionService:
                 outputs={"result": "output"},
                 status="success",
             )
+            await service.flush()
+
+            assert service.writer.stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_should_drop_transactions_beyond_max_pending(self, service: TransactionService) -> None:
+        """Verify transactions are dropped and counted when too many are waiting to be written."""
+        for index in range(12):
+            await service.log_transaction(
+                flow_id="550e8400-e29b-41d4-a716-446655440000",
+                vertex_id=f"vertex-{index}",
+                inputs=None,
+                outputs=None,
+                status="success",
+            )
+
+        stats = service.writer.stats()
+        assert stats["pending"] == 10
+        assert stats["dropped"] == 2
+        service.writer.discard(lambda _: True)
+        await service.teardown()
+
+    @pytest.mark.asyncio
+    async def test_should_prune_the_flows_that_got_transactions(self, service: TransactionService) -> None:
+        """Verify pruning trims only the flows written since the last prune."""
+        mock_session = AsyncMock()
+        mock_prune = AsyncMock()
+
+        with (
+            patch("primeagent.services.transaction.service.session_scope") as mock_session_scope,
+            patch("primeagent.services.transaction.service.log_transactions", AsyncMock()),
+            patch("primeagent.services.transaction.service.prune_transactions", mock_prune),
+        ):
+            mock_session_scope.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_session_scope.return_value.__aexit__ = AsyncMock(return_value=None)
+
+            await service.log_transaction(
+                flow_id="550e8400-e29b-41d4-a716-446655440000",
+                vertex_id="test-vertex-id",
+                inputs=None,
+                outputs=None,
+                status="success",
+            )
+            await service.teardown()
+            await service.writer.run_maintenance()
+
+            mock_prune.assert_called_once_with(mock_session, {UUID("550e8400-e29b-41d4-a716-446655440000")})
@@ -432,3 +432,22 @@ async def test_cancel_build_with_cancelled_error(client, json_memory_chatbot_no_
     finally:
         # Restore the original function to avoid affecting other tests
         monkeypatch.setattr(primeagent.api.v1.chat, "cancel_flow_build", original_cancel_flow_build)
+
+
+async def test_build_flow_and_stream_without_request(
+    client, json_memory_chatbot_no_llm, logged_in_headers, active_user
+):
+    """Voice mode builds flows through build_flow_and_stream, which has no HTTP request."""
+    from fastapi import BackgroundTasks
+    from primeagent.api.v1.chat import build_flow_and_stream
+
+    flow_id = await create_flow(client, json_memory_chatbot_no_llm, logged_in_headers)
+
+    response = await build_flow_and_stream(flow_id, None, BackgroundTasks(), active_user)
+
+    events = []
+    async for chunk in response.body_iterator:
+        text = chunk.decode() if isinstance(chunk, bytes) else chunk
+        events.extend(json.loads(line)["event"] for line in text.splitlines() if line.strip())
+    assert events[-1] == "end"
+    assert "profile" not in events
@@ -488,6 +488,69 @@ async def test_successful_run_with_input_type_chat(client: AsyncClient, simple_a
     )
 
 
+@pytest.mark.benchmark
+async def test_successful_run_with_a_list_of_inputs(client: AsyncClient, simple_api_test, created_api_key):
+    headers = {"x-api-key": created_api_key.api_key}
+    flow_id = simple_api_test["id"]
+    payload = {
+        "input_type": "chat",
+        "output_type": "debug",
+        "input_value": ["value1", "value2", "value3"],
+        "concurrency": 2,
+    }
+    response = await client.post(f"/api/v1/run/{flow_id}", headers=headers, json=payload)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    outer_outputs = response.json()["outputs"]
+    assert [outputs_dict["inputs"] for outputs_dict in outer_outputs] == [
+        {"input_value": "value1"},
+        {"input_value": "value2"},
+        {"input_value": "value3"},
+    ]
+    for outputs_dict, expected_text in zip(outer_outputs, ["value1", "value2", "value3"], strict=True):
+        chat_input_outputs = [
+            output for output in outputs_dict.get("outputs") if "ChatInput" in output.get("component_id")
+        ]
+        assert [output["results"]["message"]["text"] for output in chat_input_outputs] == [expected_text]
+
+
+async def test_streaming_run_with_a_list_of_inputs_is_rejected(client: AsyncClient, simple_api_test, created_api_key):
+    headers = {"x-api-key": created_api_key.api_key}
+    payload = {"input_type": "chat", "output_type": "debug", "input_value": ["value1", "value2"]}
+
+    response = await client.post(f"/api/v1/run/{simple_api_test['id']}?stream=true", headers=headers, json=payload)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Streaming is not supported for batch runs"
+
+
+async def test_successful_run_with_profile(client: AsyncClient, simple_api_test, created_api_key):
+    headers = {"x-api-key": created_api_key.api_key, "X-Primeagent-Profile": "true"}
+    flow_id = simple_api_test["id"]
+    payload = {"input_type": "chat", "output_type": "debug", "input_value": "value1"}
+    response = await client.post(f"/api/v1/run/{flow_id}", headers=headers, json=payload)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    profile = response.json()["profile"]
+    assert profile["critical_path"]["vertices"]
+    assert all(vertex["builds"] >= 1 for vertex in profile["vertices"].values())
+
+    response = await client.post(
+        f"/api/v1/run/{flow_id}",
+        params={"profile": "chrome"},
+        headers={"x-api-key": created_api_key.api_key},
+        json=payload,
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.json()["profile"]["traceEvents"]
+
+    response = await client.post(
+        f"/api/v1/run/{flow_id}",
+        params={"profile": "flamegraph"},
+        headers={"x-api-key": created_api_key.api_key},
+        json=payload,
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.benchmark
 async def test_invalid_run_with_input_type_chat(client, simple_api_test, created_api_key):
     headers = {"x-api-key": created_api_key.api_key}
@@ -262,3 +262,65 @@ async def test_get_messages_empty_result_with_encoded_nonexistent_session(client
     assert response.status_code == 200, response.text
     messages = response.json()
     assert len(messages) == 0
+
+
+@pytest.fixture
+async def paginated_messages(session, active_user):  # noqa: ARG001
+    """Create messages of which several share a timestamp, as messages stored within a second do."""
+    async with session_scope() as _session:
+        flow = Flow(name="test_flow_for_paginated_messages", user_id=active_user.id, data={"nodes": [], "edges": []})
+        _session.add(flow)
+        await _session.flush()
+
+        timestamps = [datetime(2024, 1, 1, 10, 0, second // 2, tzinfo=timezone.utc) for second in range(7)]
+        messagetables = [
+            MessageTable(
+                text=f"Message {index}",
+                sender="User",
+                sender_name="User",
+                session_id="paginated_session",
+                timestamp=timestamp,
+                flow_id=flow.id,
+                files=[],
+            )
+            for index, timestamp in enumerate(timestamps)
+        ]
+        return await aadd_messagetables(messagetables, _session)
+
+
+@pytest.mark.api_key_required
+async def test_get_messages_in_pages_after_the_last_message(client: AsyncClient, logged_in_headers, paginated_messages):
+    # Pages order messages stored within the same second by id, as a single page does
+    one_page = await client.get(
+        "api/v1/monitor/messages", params={"session_id": "paginated_session", "limit": 100}, headers=logged_in_headers
+    )
+    assert one_page.status_code == 200, one_page.text
+
+    pages = []
+    after = None
+    while True:
+        params = {"session_id": "paginated_session", "limit": 3}
+        if after:
+            params["after"] = after
+        response = await client.get("api/v1/monitor/messages", params=params, headers=logged_in_headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        if not page:
+            break
+        pages.append(page)
+        after = page[-1]["id"]
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [message["id"] for page in pages for message in page] == [message["id"] for message in one_page.json()]
+    assert {message["id"] for page in pages for message in page} == {str(message.id) for message in paginated_messages}
+
+
+@pytest.mark.api_key_required
+async def test_get_messages_after_requires_timestamp_order(client: AsyncClient, logged_in_headers, created_message):
+    response = await client.get(
+        "api/v1/monitor/messages",
+        params={"order_by": "sender", "after": str(created_message.id)},
+        headers=logged_in_headers,
+    )
+
+    assert response.status_code == 400
@@ -23,9 +23,12 @@ export async function customPollBuildEvents(
   onEvent,
 ): Promise<void> {
   let isDone = false;
+  // Sequence id of the last event received, so that a lost poll response is sent again
+  let cursor: string | null = null;
   while (!isDone) {
+    const after = cursor !== null ? `&after=${cursor}` : "";
     const response = await fetch(
-      `${url}?event_delivery=${EventDeliveryType.POLLING}`,
+      `${url}?event_delivery=${EventDeliveryType.POLLING}${after}`,
       {
         method: "GET",
         headers: {
@@ -45,6 +48,8 @@ export async function customPollBuildEvents(
       );
     }
 
+    cursor = response.headers.get("X-Event-Cursor") ?? cursor;
+
     // Get the response text - will be NDJSON format (one JSON per line)
     const responseText = await response.text();
 
@@ -471,6 +471,137 @@ describe("useMessagesStore", () => {
     });
   });
 
+  describe("applyMessageDelta", () => {
+    const agentMessage: Message = {
+      ...mockMachineMessage,
+      content_blocks: [
+        {
+          title: "Agent Steps",
+          allow_markdown: true,
+          component: "Agent",
+          contents: [{ type: "text", text: "Input: hi" }],
+        },
+      ],
+    };
+
+    it("should append and update contents of a block", () => {
+      const { result } = renderHook(() => useMessagesStore());
+
+      act(() => {
+        result.current.addMessage(agentMessage);
+      });
+
+      act(() => {
+        result.current.applyMessageDelta({
+          id: agentMessage.id,
+          changes: [
+            {
+              op: "update",
+              block_index: 0,
+              content_index: 0,
+              content: { type: "text", text: "Input: hello" },
+            },
+            {
+              op: "append",
+              block_index: 0,
+              content_index: 1,
+              content: { type: "tool_use", name: "search", tool_input: {} },
+            },
+          ],
+        });
+      });
+
+      const contents = result.current.messages[0].content_blocks![0].contents;
+      expect(contents).toEqual([
+        { type: "text", text: "Input: hello" },
+        { type: "tool_use", name: "search", tool_input: {} },
+      ]);
+      expect(agentMessage.content_blocks![0].contents).toHaveLength(1);
+    });
+
+    it("should add blocks and update block fields", () => {
+      const { result } = renderHook(() => useMessagesStore());
+
+      act(() => {
+        result.current.addMessage(agentMessage);
+      });
+
+      act(() => {
+        result.current.applyMessageDelta({
+          id: agentMessage.id,
+          changes: [
+            { op: "update_block", block_index: 0, block: { title: "Done" } },
+            {
+              op: "append_block",
+              block_index: 1,
+              block: {
+                title: "Sources",
+                allow_markdown: false,
+                component: "Agent",
+                contents: [],
+              },
+            },
+          ],
+        });
+      });
+
+      const blocks = result.current.messages[0].content_blocks!;
+      expect(blocks.map((block) => block.title)).toEqual(["Done", "Sources"]);
+      expect(blocks[0].contents).toEqual(
+        agentMessage.content_blocks![0].contents,
+      );
+    });
+
+    it("should update text and properties when they are sent", () => {
+      const { result } = renderHook(() => useMessagesStore());
+
+      act(() => {
+        result.current.addMessage(agentMessage);
+      });
+
+      act(() => {
+        result.current.applyMessageDelta({
+          id: agentMessage.id,
+          properties: { state: "complete" },
+          changes: [],
+        });
+      });
+
+      expect(result.current.messages[0].text).toBe(agentMessage.text);
+      expect(result.current.messages[0].properties).toEqual({
+        state: "complete",
+      });
+
+      act(() => {
+        result.current.applyMessageDelta({
+          id: agentMessage.id,
+          text: "Final answer",
+          changes: [],
+        });
+      });
+
+      expect(result.current.messages[0].text).toBe("Final answer");
+    });
+
+    it("should ignore deltas of unknown messages", () => {
+      const { result } = renderHook(() => useMessagesStore());
+
+      act(() => {
+        result.current.addMessage(agentMessage);
+      });
+
+      act(() => {
+        result.current.applyMessageDelta({
+          id: "non-existent",
+          text: "Lost",
+          changes: [],
+        });
+      });
+
+      expect(result.current.messages).toEqual([agentMessage]);
+    });
+  });
+
   describe("clearMessages", () => {
     it("should clear all messages", () => {
       const { result } = renderHook(() => useMessagesStore());
@@ -1,6 +1,34 @@
 import { create } from "zustand";
+import type { ContentBlock } from "../types/chat";
+import type { MessageDelta } from "../types/messages";
 import type { MessagesStoreType } from "../types/zustand/messages";
 
+function applyContentChanges(
+  blocks: ContentBlock[],
+  changes: MessageDelta["changes"],
+): ContentBlock[] {
+  const updatedBlocks = [...blocks];
+  for (const change of changes) {
+    if (change.op === "append_block") {
+      updatedBlocks[change.block_index] = change.block;
+      continue;
+    }
+    const block = updatedBlocks[change.block_index];
+    if (!block) {
+      continue;
+    }
+    if (change.op === "update_block") {
+      updatedBlocks[change.block_index] = { ...block, ...change.block };
+      continue;
+    }
+    // Appends and updates both set the content at its index
+    const contents = [...block.contents];
+    contents[change.content_index] = change.content;
+    updatedBlocks[change.block_index] = { ...block, contents };
+  }
+  return updatedBlocks;
+}
+
 export const useMessagesStore = create<MessagesStoreType>((set, get) => ({
   displayLoadingMessage: false,
   deleteSession: (id) => {
@@ -77,6 +105,30 @@ export const useMessagesStore = create<MessagesStoreType>((set, get) => ({
       return { messages: updatedMessages };
     });
   },
+  applyMessageDelta: (delta) => {
+    // Deltas for messages that were never received are ignored until the next full message
+    set((state) => {
+      const updatedMessages = [...state.messages];
+      for (let i = state.messages.length - 1; i >= 0; i--) {
+        if (state.messages[i].id === delta.id) {
+          const message = updatedMessages[i];
+          updatedMessages[i] = {
+            ...message,
+            ...(delta.text !== undefined && { text: delta.text }),
+            ...(delta.properties !== undefined && {
+              properties: delta.properties,
+            }),
+            content_blocks: applyContentChanges(
+              message.content_blocks ?? [],
+              delta.changes,
+            ),
+          };
+          break;
+        }
+      }
+      return { messages: updatedMessages };
+    });
+  },
   clearMessages: () => {
     set(() => ({ messages: [] }));
   },
@@ -1,4 +1,4 @@
-import type { ContentBlock } from "../chat";
+import type { ContentBlock, ContentType } from "../chat";
 
 type Message = {
   flow_id: string;
@@ -17,4 +17,22 @@ type Message = {
   content_blocks?: ContentBlock[];
 };
 
-export type { Message };
+// A change to the content blocks of a message, sent in "message_delta" events
+type MessageContentChange =
+  | { op: "append_block"; block_index: number; block: ContentBlock }
+  | { op: "update_block"; block_index: number; block: Partial<ContentBlock> }
+  | {
+      op: "append" | "update";
+      block_index: number;
+      content_index: number;
+      content: ContentType;
+    };
+
+type MessageDelta = {
+  id: string;
+  properties?: any;
+  text?: string;
+  changes: MessageContentChange[];
+};
+
+export type { Message, MessageContentChange, MessageDelta };
@@ -163,6 +163,8 @@ export async function buildFlowVerticesWithFallback(
 }
 
 const MIN_VISUAL_BUILD_TIME_MS = 300;
+const MAX_EVENT_STREAM_RECONNECTS = 3;
+const EVENT_STREAM_RECONNECT_DELAY_MS = 1000;
 
 async function pollBuildEvents(
   url: string,
@@ -232,6 +234,8 @@ export async function buildFlowVertices({
     "event_delivery",
     eventDelivery ?? EventDeliveryType.POLLING,
   );
+  // Agent message updates only carry what changed
+  queryParams.append("message_deltas", "true");
 
   if (queryParams.toString()) {
     buildUrl = `${buildUrl}?${queryParams.toString()}`;
@@ -354,38 +358,60 @@ export async function buildFlowVertices({
     const verticesStartTimeMs: Map<string, number> = new Map();
 
     if (eventDelivery === EventDeliveryType.STREAMING) {
-      return performStreamingRequest({
-        method: "GET",
-        url: eventsUrl,
-        onData: async (event) => {
-          const type = event["event"];
-          const data = event["data"];
-          return await onEvent(type, data, buildResults, verticesStartTimeMs, {
-            onBuildStart,
-            onBuildUpdate,
-            onBuildComplete,
-            onBuildError,
-            onGetOrderSuccess,
-            onValidateNodes,
-          });
-        },
-        onError: (statusCode) => {
-          if (statusCode === 404) {
-            throw new Error("Build job not found");
-          }
-          throw new Error("Error processing build events");
-        },
-        onNetworkError: (error: Error) => {
-          if (error.name === "AbortError") {
-            onBuildStopped && onBuildStopped();
-            return;
-          }
-          onBuildError!("Error Building Component", [
-            "Network error. Please check the connection to the server.",
-          ]);
-        },
-        buildController,
-      });
+      // Events carry a sequence id, so a dropped stream resumes after the last event received
+      let lastSequenceId: number | undefined;
+      let reconnectAttempts = 0;
+      const streamEvents = (url: string): Promise<void> =>
+        performStreamingRequest({
+          method: "GET",
+          url,
+          onData: async (event) => {
+            if (typeof event["seq"] === "number") {
+              lastSequenceId = event["seq"];
+            }
+            reconnectAttempts = 0;
+            const type = event["event"];
+            const data = event["data"];
+            return await onEvent(type, data, buildResults, verticesStartTimeMs, {
+              onBuildStart,
+              onBuildUpdate,
+              onBuildComplete,
+              onBuildError,
+              onGetOrderSuccess,
+              onValidateNodes,
+            });
+          },
+          onError: (statusCode) => {
+            if (statusCode === 404) {
+              throw new Error("Build job not found");
+            }
+            throw new Error("Error processing build events");
+          },
+          onNetworkError: async (error: Error) => {
+            if (error.name === "AbortError") {
+              onBuildStopped && onBuildStopped();
+              return;
+            }
+            if (
+              lastSequenceId !== undefined &&
+              reconnectAttempts < MAX_EVENT_STREAM_RECONNECTS
+            ) {
+              reconnectAttempts++;
+              await new Promise((resolve) =>
+                setTimeout(resolve, EVENT_STREAM_RECONNECT_DELAY_MS),
+              );
+              if (!buildController.signal.aborted) {
+                return streamEvents(`${eventsUrl}?after=${lastSequenceId}`);
+              }
+              return;
+            }
+            onBuildError!("Error Building Component", [
+              "Network error. Please check the connection to the server.",
+            ]);
+          },
+          buildController,
+        });
+      return streamEvents(eventsUrl);
     } else {
       const callbacks = {
         onBuildStart,
@@ -560,6 +586,11 @@ async function onEvent(
       useMessagesStore.getState().addMessage(data);
       return true;
     }
+    case "message_delta": {
+      // Only the content blocks of an agent message that changed
+      useMessagesStore.getState().applyMessageDelta(data);
+      return true;
+    }
     case "token": {
       // Use flushSync with a timeout to avoid React batching issues.
       setTimeout(() => {
@@ -123,6 +123,27 @@ def run_command_wrapper(
         show_default=True,
         help="Include detailed timing information in output",
     ),
+    inputs_file: str | None = typer.Option(
+        None,
+        "--inputs-file",
+        help="Run the graph once per input in this file: a JSON list of strings or one input per line",
+    ),
+    concurrency: int = typer.Option(
+        1,
+        "--concurrency",
+        min=1,
+        help="Number of inputs from --inputs-file to run at the same time",
+    ),
+    profile: bool = typer.Option(
+        default=False,
+        show_default=True,
+        help="Profile the run and add a per-component phase breakdown to the JSON output",
+    ),
+    profile_format: str = typer.Option(
+        "summary",
+        "--profile-format",
+        help="Format of the profile: summary, chrome (Chrome trace) or speedscope",
+    ),
 ) -> None:
     """Run a flow directly (lazy-loaded)."""
     from pathlib import Path
@@ -144,6 +165,10 @@ def run_command_wrapper(
         verbose_detailed=verbose_detailed,
         verbose_full=verbose_full,
         timing=timing,
+        inputs_file=Path(inputs_file) if inputs_file else None,
+        concurrency=concurrency,
+        profile=profile,
+        profile_format=profile_format,
     )
 
 
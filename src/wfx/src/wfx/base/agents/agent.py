@@ -35,6 +35,7 @@ DEFAULT_AGENT_NAME = "Agent ({tools_names})"
 
 class LCAgentComponent(Component):
     trace_type = "agent"
+    resource_class = "llm"
     _base_inputs: list[InputTypes] = [
         MessageInput(
             name="input_value",
@@ -272,6 +273,7 @@ class LCAgentComponent(Component):
                 agent_message,
                 cast("SendMessageFunctionType", self.send_message),
                 on_token_callback,
+                wait_for_capacity=self._event_manager.wait_for_capacity if self._event_manager else None,
             )
         except ExceptionWithMessageError as e:
             # Only delete message from database if it has an ID (was stored)
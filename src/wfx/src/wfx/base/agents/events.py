@@ -1,6 +1,5 @@
 # Add helper functions for each event type
-import asyncio
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Awaitable, Callable
 from time import perf_counter
 from typing import Any, Protocol
 
@@ -316,8 +315,7 @@ async def handle_on_chain_stream(
         # Note: we should expect the callback, but we keep it optional for backwards compatibility
         # as of v1.6.5
         if output_text and output_text.strip() and send_token_callback and message_id:
-            await asyncio.to_thread(
-                send_token_callback,
+            send_token_callback(
                 data={
                     "chunk": output_text,
                     "id": str(message_id),
@@ -377,8 +375,13 @@ async def process_agent_events(
     agent_message: Message,
     send_message_callback: SendMessageFunctionType,
     send_token_callback: OnTokenFunctionType | None = None,
+    wait_for_capacity: Callable[[], Awaitable[None]] | None = None,
 ) -> Message:
-    """Process agent events and return the final output."""
+    """Process agent events and return the final output.
+
+    `wait_for_capacity` is awaited after each streamed chunk, so that a client consuming the tokens
+    slowly slows the agent down, see `EventManager.wait_for_capacity`.
+    """
     if isinstance(agent_message.properties, dict):
         agent_message.properties.update({"icon": "Bot", "state": "partial"})
     else:
@@ -417,6 +420,8 @@ async def process_agent_events(
                         had_streaming=had_streaming,
                         message_id=initial_message_id,
                     )
+                    if wait_for_capacity is not None:
+                        await wait_for_capacity()
                 else:
                     agent_message, start_time = await chain_handler(
                         event, agent_message, send_message_callback, None, start_time, had_streaming=had_streaming
@@ -39,6 +39,8 @@ def check_cached_vector_store(f):
 
 
 class LCVectorStoreComponent(Component):
+    # Ingesting and searching embed the documents and the query
+    resource_class = "embedding"
     # Used to ensure a single vector store is built for each run of the flow
     _cached_vector_store: VectorStore | None = None
 
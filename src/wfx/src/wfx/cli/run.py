@@ -47,6 +47,33 @@ def _check_langchain_version_compatibility(error_message: str) -> str | None:
     return None
 
 
+def read_input_values(inputs_file: Path) -> list[str]:
+    """Read the inputs of a batch run: a JSON list of strings or one input per line."""
+    try:
+        content = inputs_file.read_text(encoding="utf-8")
+    except OSError as e:
+        msg = f"Could not read inputs file '{inputs_file}': {e}"
+        raise RunError(msg, e) from e
+    if content.lstrip().startswith("["):
+        try:
+            values = json.loads(content)
+        except json.JSONDecodeError as e:
+            msg = f"Invalid JSON in inputs file '{inputs_file}': {e}"
+            raise RunError(msg, e) from e
+        return [value if isinstance(value, str) else json.dumps(value) for value in values]
+    return [line for line in content.splitlines() if line.strip()]
+
+
+def get_profile_format(profile_format: str) -> str:
+    """Validate the --profile-format option."""
+    from wfx.graph.graph.profiler import PROFILE_FORMATS
+
+    if profile_format not in PROFILE_FORMATS:
+        msg = f"Invalid profile format '{profile_format}'. Expected one of: {', '.join(PROFILE_FORMATS)}"
+        raise RunError(msg, None)
+    return profile_format
+
+
 @partial(syncify, raise_sync_error=False)
 async def run(
     script_path: Path | None = typer.Argument(  # noqa: B008
@@ -102,6 +129,27 @@ async def run(
         show_default=True,
         help="Include detailed timing information in output",
     ),
+    inputs_file: Path | None = typer.Option(
+        None,
+        "--inputs-file",
+        help="Run the graph once per input in this file: a JSON list of strings or one input per line",
+    ),
+    concurrency: int = typer.Option(
+        1,
+        "--concurrency",
+        min=1,
+        help="Number of inputs from --inputs-file to run at the same time",
+    ),
+    profile: bool = typer.Option(
+        default=False,
+        show_default=True,
+        help="Profile the run and add a per-component phase breakdown to the JSON output",
+    ),
+    profile_format: str = typer.Option(
+        "summary",
+        "--profile-format",
+        help="Format of the profile: summary, chrome (Chrome trace) or speedscope",
+    ),
 ) -> None:
     """Execute a Primeagent graph script or JSON flow and return the result.
 
@@ -121,11 +169,17 @@ async def run(
         stdin: Read JSON flow content from stdin
         check_variables: Check global variables for environment compatibility
         timing: Include detailed timing information in output
+        inputs_file: File with the inputs of a batch run
+        concurrency: Number of inputs of a batch run to run at the same time
+        profile: Profile the run and add the profile to the JSON output
+        profile_format: Format of the profile (summary, chrome or speedscope)
     """
     # Determine verbosity for output formatting
     verbosity = 3 if verbose_full else (2 if verbose_detailed else (1 if verbose else 0))
 
     try:
+        input_values = read_input_values(inputs_file) if isinstance(inputs_file, Path) else None
+        profile_as = get_profile_format(profile_format) if profile is True else None
         result = await run_flow(
             script_path=script_path,
             input_value=input_value,
@@ -139,6 +193,9 @@ async def run(
             verbose_full=verbose_full,
             timing=timing,
             global_variables=None,
+            input_values=input_values,
+            concurrency=concurrency,
+            profile=profile_as,
         )
 
         # Output based on format
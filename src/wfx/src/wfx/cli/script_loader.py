@@ -17,6 +17,7 @@ import typer
 
 if TYPE_CHECKING:
     from wfx.graph import Graph
+    from wfx.graph.schema import RunOutputs
     from wfx.schema.message import Message
 
 
@@ -202,6 +203,22 @@ def extract_structured_result(results: list, *, extract_text: bool = True) -> di
     return {"text": "No response generated", "type": "error", "success": False}
 
 
+def extract_structured_run_outputs(run_outputs: "RunOutputs") -> dict:
+    """Extract structured result data from the outputs of one `Graph.arun` run."""
+    for output in run_outputs.outputs:
+        if output is None or output.component_display_name != "Chat Output":
+            continue
+        message = (output.results or {}).get("message")
+        return {
+            "result": message.text if hasattr(message, "text") else message,
+            "type": "message",
+            "component": output.component_display_name,
+            "component_id": output.component_id,
+            "success": True,
+        }
+    return {"text": "No response generated", "type": "error", "success": False}
+
+
 def find_graph_variable(script_path: Path) -> dict | None:
     """Parse a Python script and find the 'graph' variable assignment or 'get_graph' function.
 
@@ -4,6 +4,7 @@ import ast
 import asyncio
 import inspect
 from collections.abc import AsyncIterator, Iterator
+from contextlib import aclosing, nullcontext
 from copy import deepcopy
 from textwrap import dedent
 from typing import TYPE_CHECKING, Any, ClassVar, NamedTuple, get_type_hints
@@ -22,6 +23,7 @@ from wfx.base.tools.constants import (
     TOOLS_METADATA_INPUT_NAME,
 )
 from wfx.custom.tree_visitor import RequiredInputsVisitor
+from wfx.events.message_deltas import MessageDeltaTracker
 from wfx.exceptions.component import StreamingError
 from wfx.field_typing import Tool  # noqa: TC001
 
@@ -39,7 +41,7 @@ from wfx.schema.properties import Source
 from wfx.serialization.serialization import serialize
 from wfx.template.field.base import UNDEFINED, Input, Output
 from wfx.template.frontend_node.custom_components import ComponentFrontendNode
-from wfx.utils.async_helpers import run_until_complete
+from wfx.utils.async_helpers import LoopBlockMonitor, iterate_in_thread, run_until_complete
 from wfx.utils.util import find_closest_match
 
 from .custom_component import CustomComponent
@@ -137,6 +139,8 @@ class Component(CustomComponent):
         self._event_manager: EventManager | None = None
         self._state_model = None
         self._telemetry_input_values: dict[str, Any] | None = None
+        # Loop blocking measured while the last message was streamed in a profiled run, see LoopBlockMonitor
+        self._stream_metrics: dict[str, float | int] | None = None
 
         # Process input kwargs
         inputs = {}
@@ -382,14 +386,16 @@ class Component(CustomComponent):
         kwargs["inputs"] = deepcopy(self.__inputs, memo)
         new_component = type(self)(**kwargs)
         new_component._code = self._code
-        new_component._outputs_map = self._outputs_map
-        new_component._inputs = self._inputs
+        # The connections are shared, but everything a build writes to is copied so the two
+        # components can be built independently (e.g. by concurrent runs of cloned graphs)
+        new_component._outputs_map = {name: output.model_copy() for name, output in self._outputs_map.items()}
+        new_component._inputs = deepcopy(self._inputs, memo)
         new_component._edges = self._edges
         new_component._components = self._components
-        new_component._parameters = self._parameters
-        new_component._attributes = self._attributes
-        new_component._output_logs = self._output_logs
-        new_component._logs = self._logs  # type: ignore[attr-defined]
+        new_component._parameters = dict(self._parameters)
+        new_component._attributes = dict(self._attributes)
+        new_component._output_logs = dict(self._output_logs)
+        new_component._logs = list(self._logs)  # type: ignore[attr-defined]
         memo[id(self)] = new_component
         return new_component
 
@@ -1667,6 +1673,11 @@ class Component(CustomComponent):
                 )
                 raise ValueError(msg)
 
+            if await self._send_message_update(message, id_=id_):
+                # The message is not copied so that the next update can tell what changed
+                self._stored_message_id = message.get_id()
+                return message
+
             # Create a fresh Message instance for consistency with normal flow
             stored_message = await Message.create(**message.model_dump())
             self._stored_message_id = stored_message.get_id()
@@ -1680,6 +1691,9 @@ class Component(CustomComponent):
             # After _store_message, the message should always have an ID
             # but we use get_id() for safety
             self._stored_message_id = stored_message.get_id()
+            if (tracker := self._get_message_delta_tracker()) is not None and self._stored_message_id:
+                # The next update of the message is sent whole
+                tracker.forget(str(self._stored_message_id))
             try:
                 complete_message = ""
                 if (
@@ -1709,6 +1723,9 @@ class Component(CustomComponent):
         return stored_message
 
     async def _store_message(self, message: Message) -> Message:
+        if message.has_id() and getattr(message.properties, "state", None) == "partial":
+            # The message is still being produced, so its updates are merged and written together
+            return await self._update_stored_message(message, debounce=True)
         flow_id: str | None = None
         if hasattr(self, "graph"):
             # Convert UUID to str if needed
@@ -1733,23 +1750,41 @@ class Component(CustomComponent):
 
             category = category or data_dict.get("category", None)
 
-            def _send_event():
-                match category:
-                    case "error":
-                        self._event_manager.on_error(data=data_dict)
-                    case "remove_message":
-                        # Check if id exists in data_dict before accessing it
-                        if "id" in data_dict:
-                            self._event_manager.on_remove_message(data={"id": data_dict["id"]})
-                        else:
-                            # If no id, try to get it from the message object or id_ parameter
-                            message_id = getattr(message, "id", None) or id_
-                            if message_id:
-                                self._event_manager.on_remove_message(data={"id": message_id})
-                    case _:
-                        self._event_manager.on_message(data=data_dict)
-
-            await asyncio.to_thread(_send_event)
+            # Sending an event does not block: the event manager only queues it for encoding
+            match category:
+                case "error":
+                    self._event_manager.on_error(data=data_dict)
+                case "remove_message":
+                    # Check if id exists in data_dict before accessing it
+                    if "id" in data_dict:
+                        self._event_manager.on_remove_message(data={"id": data_dict["id"]})
+                    else:
+                        # If no id, try to get it from the message object or id_ parameter
+                        message_id = getattr(message, "id", None) or id_
+                        if message_id:
+                            self._event_manager.on_remove_message(data={"id": message_id})
+                case _:
+                    self._event_manager.on_message(data=data_dict)
+
+    def _get_message_delta_tracker(self) -> MessageDeltaTracker | None:
+        tracker = getattr(self._event_manager, "message_delta_tracker", None)
+        return tracker if isinstance(tracker, MessageDeltaTracker) else None
+
+    async def _send_message_update(self, message: Message, id_: str | None = None) -> bool:
+        """Sends only what changed in a message since it was last sent, if the client asked for deltas.
+
+        Returns False if message deltas are off, in which case nothing was sent.
+        """
+        tracker = self._get_message_delta_tracker()
+        message_id = id_ or message.get_id()
+        if tracker is None or not message_id or message.category in {"error", "remove_message"}:
+            return False
+        delta = tracker.diff(str(message_id), message)
+        if delta is None:
+            await self._send_message_event(message, id_=id_)
+        else:
+            self._event_manager.on_message_delta(data=delta)
+        return True
 
     def _should_stream_message(self, stored_message: Message, original_message: Message) -> bool:
         return bool(
@@ -1759,8 +1794,11 @@ class Component(CustomComponent):
             and not isinstance(original_message.text, str)
         )
 
-    async def _update_stored_message(self, message: Message) -> Message:
-        """Update the stored message."""
+    async def _update_stored_message(self, message: Message, *, debounce: bool = False) -> Message:
+        """Update the stored message.
+
+        With `debounce`, the update is merged with the next updates of the message before it is written.
+        """
         if hasattr(self, "_vertex") and self._vertex is not None and hasattr(self._vertex, "graph"):
             flow_id = (
                 UUID(self._vertex.graph.flow_id)
@@ -1770,7 +1808,7 @@ class Component(CustomComponent):
 
             message.flow_id = flow_id
 
-        message_tables = await aupdate_messages(message)
+        message_tables = await aupdate_messages(message, debounce=debounce)
         if not message_tables:
             msg = "Failed to update message"
             raise ValueError(msg)
@@ -1788,49 +1826,56 @@ class Component(CustomComponent):
             msg = "Message must have an ID to stream. Messages only have IDs after being stored in the database."
             raise ValueError(msg)
 
-        if isinstance(iterator, AsyncIterator):
-            return await self._handle_async_iterator(iterator, message_id, message)
+        # Lazy import to avoid circular dependency
+        from wfx.graph.graph.profiler import RunProfiler
+
+        # Loop blocking is only measured for profiled runs, as the monitor wakes up every few milliseconds
+        profiler = getattr(self._vertex.graph, "profiler", None) if self._vertex is not None else None
+        monitor = LoopBlockMonitor() if isinstance(profiler, RunProfiler) else None
         try:
-            complete_message = ""
-            first_chunk = True
-            for chunk in iterator:
-                complete_message = await self._process_chunk(
-                    chunk.content, complete_message, message_id, message, first_chunk=first_chunk
-                )
-                first_chunk = False
-        except Exception as e:
-            raise StreamingError(cause=e, source=message.properties.source) from e
-        else:
-            return complete_message
+            async with monitor or nullcontext():
+                if isinstance(iterator, AsyncIterator):
+                    return await self._handle_async_iterator(iterator, message_id, message)
+                # Sync iterators, such as the streams of sync LLM clients, block on every read
+                chunks = iterate_in_thread(iterator)
+                try:
+                    async with aclosing(chunks):
+                        return await self._handle_async_iterator(chunks, message_id, message)
+                except Exception as e:
+                    raise StreamingError(cause=e, source=message.properties.source) from e
+        finally:
+            self._flush_token_events()
+            if monitor is not None:
+                self._stream_metrics = monitor.metrics()
+                profiler.record_loop_blocking(self._vertex.id, self._stream_metrics)
+
+    def _flush_token_events(self) -> None:
+        """Sends the tokens the event manager is still coalescing once the stream ends."""
+        if self._event_manager:
+            self._event_manager.flush()
 
     async def _handle_async_iterator(self, iterator: AsyncIterator, message_id: str, message: Message) -> str:
-        complete_message = ""
-        first_chunk = True
+        chunks: list[str] = []
         async for chunk in iterator:
-            complete_message = await self._process_chunk(
-                chunk.content, complete_message, message_id, message, first_chunk=first_chunk
-            )
-            first_chunk = False
-        return complete_message
+            await self._process_chunk(chunk.content, chunks, message_id, message)
+        return "".join(chunks)
 
-    async def _process_chunk(
-        self, chunk: str, complete_message: str, message_id: str, message: Message, *, first_chunk: bool = False
-    ) -> str:
-        complete_message += chunk
+    async def _process_chunk(self, chunk: str, chunks: list[str], message_id: str, message: Message) -> None:
+        """Adds the chunk to the chunks streamed so far and sends it as a token event."""
+        chunks.append(chunk)
         if self._event_manager:
-            if first_chunk:
+            if len(chunks) == 1:
                 # Send the initial message only on the first chunk
                 msg_copy = message.model_copy()
-                msg_copy.text = complete_message
+                msg_copy.text = chunk
                 await self._send_message_event(msg_copy, id_=message_id)
-            await asyncio.to_thread(
-                self._event_manager.on_token,
+            self._event_manager.on_token(
                 data={
                     "chunk": chunk,
                     "id": str(message_id),
                 },
             )
-        return complete_message
+            await self._event_manager.wait_for_capacity()
 
     async def send_error(
         self,
@@ -72,6 +72,10 @@ class CustomComponent(BaseComponent):
     priority: int | None = None
     """The priority of the component in the category. Lower priority means it will be displayed first. Defaults to None.
     """
+    resource_class: str | None = None
+    """The resource the component's build consumes (e.g. "llm", "embedding", "http" or "cpu"). Builds of the same
+    resource class are limited by the flow's resource_limits and the resource_class_limits setting. Defaults to None.
+    """
 
     def __init__(self, **data) -> None:
         """Initializes a new instance of the CustomComponent class.
@@ -1,12 +1,131 @@
-from typing import TYPE_CHECKING
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
 
 from wfx.custom import validate
 
 if TYPE_CHECKING:
     from wfx.custom.custom_component.custom_component import CustomComponent
 
+DEFAULT_COMPILED_CLASS_CACHE_SIZE = 256
 
-def eval_custom_component_code(code: str) -> type["CustomComponent"]:
-    """Evaluate custom component code."""
-    class_name = validate.extract_class_name(code)
-    return validate.create_class(code, class_name)
+
+class CompiledClassCache:
+    """A process-wide LRU cache of compiled custom component code.
+
+    Creating a class from code means parsing it, importing everything it imports and executing the
+    class body. Parsing and importing only depend on the code string, so their result is stored under
+    a hash of the code and reused by every vertex (and every run) that uses the same code. Only the
+    class body runs again, so that each class has its own class attributes: components add inputs
+    to their class's `inputs`, for example.
+
+    Attributes:
+        max_size (int): Maximum number of compiled classes to keep. 0 disables the cache.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that had to compile the code.
+        evictions (int): Number of compiled classes dropped to honour max_size.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_COMPILED_CLASS_CACHE_SIZE) -> None:
+        self._cache: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.RLock()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def code_hash(code: str) -> str:
+        return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+    def get(self, code: str) -> Any | None:
+        """Returns the compilation of this exact code, or None if it is not cached."""
+        key = self.code_hash(code)
+        with self._lock:
+            compiled = self._cache.get(key)
+            if compiled is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return compiled
+
+    def set(self, code: str, compiled: Any) -> None:
+        if self.max_size <= 0:
+            return
+        key = self.code_hash(code)
+        with self._lock:
+            self._cache[key] = compiled
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, code: str) -> None:
+        """Drops the compilation of this code so that the next lookup compiles it again."""
+        with self._lock:
+            self._cache.pop(self.code_hash(code), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, code: str) -> bool:
+        return self.code_hash(code) in self._cache
+
+
+def _get_configured_cache_size() -> int:
+    from wfx.services.deps import get_settings_service
+
+    settings_service = get_settings_service()
+    if settings_service is None:
+        return DEFAULT_COMPILED_CLASS_CACHE_SIZE
+    return getattr(settings_service.settings, "compiled_class_cache_size", DEFAULT_COMPILED_CLASS_CACHE_SIZE)
+
+
+_compiled_class_cache: CompiledClassCache | None = None
+_compiled_class_cache_lock = threading.Lock()
+
+
+def get_compiled_class_cache() -> CompiledClassCache:
+    """Returns the process-wide compiled class cache, creating it on first use."""
+    global _compiled_class_cache  # noqa: PLW0603
+    if _compiled_class_cache is None:
+        with _compiled_class_cache_lock:
+            if _compiled_class_cache is None:
+                _compiled_class_cache = CompiledClassCache(max_size=_get_configured_cache_size())
+    return _compiled_class_cache
+
+
+def eval_custom_component_code(code: str, *, use_cache: bool = True) -> type["CustomComponent"]:
+    """Evaluate custom component code.
+
+    The compiled code is cached by the hash of the code, so evaluating the same code again doesn't
+    parse it or run its imports again. Each call still returns a new class, so that the vertices
+    built from the same code don't share class attributes. Pass `use_cache=False` to force a fresh
+    compilation; it then replaces the cached one.
+    """
+    cache = get_compiled_class_cache()
+    compiled = cache.get(code) if use_cache else None
+    if compiled is None:
+        class_name = validate.extract_class_name(code)
+        compiled = validate.compile_class(code, class_name)
+        cache.set(code, compiled)
+    return validate.build_class(compiled)
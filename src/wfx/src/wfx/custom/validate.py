@@ -251,6 +251,25 @@ def create_class(code, class_name):
     Raises:
         ValueError: If the code contains syntax errors or the class definition is invalid
     """
+    return build_class(compile_class(code, class_name))
+
+
+def compile_class(code, class_name):
+    """Parses the code, runs its imports and compiles the class, without creating it.
+
+    `build_class` creates classes from the result, so the code can be compiled once and each class
+    created from it gets its own class attributes.
+
+    Args:
+        code: String containing the Python code defining the class
+        class_name: Name of the class to be compiled
+
+    Returns:
+        A tuple of the class name, the compiled class code and the global scope it runs in
+
+    Raises:
+        ValueError: If the code contains syntax errors or its imports fail
+    """
     if not hasattr(ast, "TypeIgnore"):
         ast.TypeIgnore = create_type_ignore_class()
 
@@ -261,15 +280,33 @@ def create_class(code, class_name):
     )
 
     code = DEFAULT_IMPORT_STRING + "\n" + code
-    try:
+    with _class_creation_errors():
         module = ast.parse(code)
         exec_globals = prepare_global_scope(module)
 
         class_code = extract_class_code(module, class_name)
         compiled_class = compile_class_code(class_code)
+    return class_name, compiled_class, exec_globals
+
 
-        return build_class_constructor(compiled_class, exec_globals, class_name)
+def build_class(compiled):
+    """Creates a new class from the result of `compile_class`.
 
+    The class body runs in a copy of the global scope, so classes built from the same compilation
+    don't share anything they define.
+
+    Raises:
+        ValueError: If the class definition is invalid
+    """
+    class_name, compiled_class, exec_globals = compiled
+    with _class_creation_errors():
+        return build_class_constructor(compiled_class, exec_globals.copy(), class_name)
+
+
+@contextlib.contextmanager
+def _class_creation_errors():
+    try:
+        yield
     except SyntaxError as e:
         msg = f"Syntax error in code: {e!s}"
         raise ValueError(msg) from e
@@ -1,21 +1,30 @@
 from __future__ import annotations
 
+import asyncio
 import inspect
 import json
+import threading
 import time
 import uuid
+from collections import deque
 from functools import partial
 from typing import TYPE_CHECKING
 
 from fastapi.encoders import jsonable_encoder
 from typing_extensions import Protocol
 
+from wfx.events.message_deltas import DEFAULT_SNAPSHOT_INTERVAL, MessageDeltaTracker
 from wfx.log.logger import logger
 
 if TYPE_CHECKING:
     # Lightweight type stub for log types
     LoggableType = dict | str | int | float | bool | list | None
 
+DEFAULT_TOKEN_COALESCING_WINDOW = 0.03
+DEFAULT_TOKEN_COALESCING_MAX_CHARS = 256
+# Producers waiting for capacity also wait while more events than this wait for the encoder task
+DEFAULT_MAX_PENDING_EVENTS = 100
+
 
 class EventCallback(Protocol):
     def __call__(self, *, manager: EventManager, event_type: str, data: LoggableType): ...
@@ -25,10 +34,164 @@ class PartialEventCallback(Protocol):
     def __call__(self, *, data: LoggableType): ...
 
 
+class EncodedEventData(bytes):
+    """Event data that is already serialized to JSON.
+
+    It is put in the event as is, without encoding it again, e.g. for large build results serialized
+    with `model_dump_json`.
+    """
+
+
+class _TokenBuffer:
+    """The token chunks of a message waiting to be sent as one token event."""
+
+    def __init__(self, message_id: str, started_at: float) -> None:
+        self.message_id = message_id
+        self.started_at = started_at
+        self.chunks: list[str] = []
+        self.size = 0
+
+    def add(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+
+
 class EventManager:
     def __init__(self, queue):
         self.queue = queue
         self.events: dict[str, PartialEventCallback] = {}
+        self.coalesce_tokens = False
+        self.token_coalescing_window = DEFAULT_TOKEN_COALESCING_WINDOW
+        self.token_coalescing_max_chars = DEFAULT_TOKEN_COALESCING_MAX_CHARS
+        self._token_buffer: _TokenBuffer | None = None
+        self._token_lock = threading.RLock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._flush_scheduled = False
+        # Events waiting for the encoder task, as (event_type, data, timestamp)
+        self._pending: deque[tuple[str, LoggableType, float]] = deque()
+        self.max_pending_events = DEFAULT_MAX_PENDING_EVENTS
+        self._wakeup: asyncio.Event | None = None
+        # Set by the encoder task once at most `max_pending_events` events are pending
+        self._drained: asyncio.Event | None = None
+        self._encoder_task: asyncio.Task | None = None
+        self._closing = False
+        self.message_delta_tracker: MessageDeltaTracker | None = None
+
+    def enable_message_deltas(self, snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL) -> None:
+        """Sends updates of messages that were already sent as "message_delta" events.
+
+        Deltas carry only the content blocks that changed, and every `snapshot_interval` updates the
+        whole message is sent again. See `wfx.events.message_deltas`.
+        """
+        self.message_delta_tracker = MessageDeltaTracker(snapshot_interval)
+
+    def start_encoder(self) -> None:
+        """Moves the encoding of the events to a task of the running event loop.
+
+        Once started, sending an event only appends it to a list of pending events, which the encoder
+        task serializes and puts on the queue in order. Events can be sent from the loop or from worker
+        threads. Call `aclose` to send the pending events and stop the task.
+        """
+        if self._encoder_task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._closing = False
+        self._encoder_task = self._loop.create_task(self._run_encoder())
+
+    async def aclose(self, *, drain: bool = True) -> None:
+        """Sends the buffered tokens and the pending events, then stops the encoder task.
+
+        With `drain=False` the task is cancelled and the pending events are dropped instead, e.g. when
+        nobody consumes the queue anymore. Events sent afterwards are encoded right away.
+        """
+        task = self._encoder_task
+        if not drain:
+            self._token_buffer = None
+            self._pending.clear()
+            if task is not None:
+                task.cancel()
+                await asyncio.wait([task])
+            self._encoder_task = None
+            return
+        self.flush()
+        if task is None:
+            return
+        if not task.done():
+            self._closing = True
+            self._wake_encoder()
+            try:
+                await asyncio.wait([task])
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+        self._encoder_task = None
+        # Events sent while the task was being cancelled
+        while self._pending:
+            self._encode_event(*self._pending.popleft())
+
+    async def _run_encoder(self) -> None:
+        wakeup, drained = self._wakeup, self._drained
+        if wakeup is None or drained is None:
+            return
+        try:
+            while True:
+                await wakeup.wait()
+                wakeup.clear()
+                while self._pending:
+                    event_type, data, timestamp = self._pending.popleft()
+                    if len(self._pending) <= self.max_pending_events:
+                        drained.set()
+                    try:
+                        item = self._encode(event_type, data, timestamp)
+                    except Exception as exc:  # noqa: BLE001
+                        logger.error(f"Error encoding {event_type} event: {exc}")
+                        continue
+                    if self.queue:
+                        # Waits if the queue is full and makes its producers wait
+                        await self.queue.put(item)
+                if self._closing:
+                    return
+        finally:
+            # Nobody would wake the producers waiting for the pending events anymore
+            drained.set()
+
+    def _wake_encoder(self) -> None:
+        if self._wakeup is None or self._loop is None:
+            return
+        if threading.get_ident() == self._loop_thread_id:
+            self._wakeup.set()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            logger.debug("Event loop closed before the event could be encoded")
+
+    def enable_token_coalescing(
+        self,
+        window: float = DEFAULT_TOKEN_COALESCING_WINDOW,
+        max_chars: int = DEFAULT_TOKEN_COALESCING_MAX_CHARS,
+    ) -> None:
+        """Merges consecutive token events of the same message into one event.
+
+        Tokens are sent once `window` seconds passed since the first buffered one or once they add up
+        to `max_chars` characters. Any other event, a token of another message or `flush` sends them
+        right away, so they always reach the client before the message ends or the build fails.
+        """
+        if window < 0 or max_chars < 1:
+            msg = "The coalescing window must not be negative and max_chars must be at least 1"
+            raise ValueError(msg)
+        self.coalesce_tokens = True
+        self.token_coalescing_window = window
+        self.token_coalescing_max_chars = max_chars
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Without a loop tokens are only sent when the buffer is full or another event comes in
+            self._loop = None
 
     @staticmethod
     def _validate_callback(callback: EventCallback) -> None:
@@ -71,13 +234,132 @@ class EventManager:
                 pass
         except Exception:  # noqa: BLE001
             logger.debug(f"Error processing event: {event_type}")
+        if not self.coalesce_tokens:
+            self._put_event(event_type, data)
+            return
+        with self._token_lock:
+            if event_type == "token" and self._buffer_token(data):
+                return
+            # Pending tokens always go out before the event that follows them
+            self._flush_tokens()
+            self._put_event(event_type, data)
+
+    def flush(self) -> None:
+        """Sends the buffered token events, if any."""
+        if not self.coalesce_tokens:
+            return
+        with self._token_lock:
+            self._flush_tokens()
+
+    def _buffer_token(self, data: LoggableType) -> bool:
+        """Adds a token to the buffer and returns False if it has to be sent as is."""
+        if not isinstance(data, dict) or set(data) != {"chunk", "id"} or not isinstance(data["chunk"], str):
+            return False
+        now = time.monotonic()
+        buffer = self._token_buffer
+        if buffer is not None and buffer.message_id != data["id"]:
+            self._flush_tokens()
+            buffer = None
+        if buffer is None:
+            buffer = self._token_buffer = _TokenBuffer(data["id"], now)
+        buffer.add(data["chunk"])
+        if buffer.size >= self.token_coalescing_max_chars or now - buffer.started_at >= self.token_coalescing_window:
+            self._flush_tokens()
+        else:
+            self._schedule_flush()
+        return True
+
+    def _flush_tokens(self) -> None:
+        buffer, self._token_buffer = self._token_buffer, None
+        if buffer is not None:
+            self._put_event("token", {"chunk": "".join(buffer.chunks), "id": buffer.message_id})
+
+    def _schedule_flush(self) -> None:
+        """Makes sure the buffered tokens are sent when the window ends, even if no other event comes in."""
+        if self._loop is None or self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        try:
+            if running_loop is self._loop:
+                self._loop.call_later(self.token_coalescing_window, self._timed_flush)
+            else:
+                # Tokens sent from worker threads
+                self._loop.call_soon_threadsafe(self._loop.call_later, self.token_coalescing_window, self._timed_flush)
+        except RuntimeError:
+            # The loop is closed
+            self._flush_scheduled = False
+
+    def _timed_flush(self) -> None:
+        with self._token_lock:
+            self._flush_scheduled = False
+            self._flush_tokens()
+
+    def _put_event(self, event_type: str, data: LoggableType) -> None:
+        if self._encoder_task is not None and not self._encoder_task.done():
+            self._pending.append((event_type, data, time.time()))
+            self._wake_encoder()
+            return
+        self._encode_event(event_type, data, time.time())
+
+    async def wait_for_capacity(self) -> None:
+        """Waits while the queue cannot take more events, for queues that make their producers wait.
+
+        Streaming components call it after each token so that a slow client slows the stream down
+        instead of letting events pile up. Events the encoder task could not put on the queue yet count
+        too: it also waits while more than `max_pending_events` of them are pending.
+        """
+        wait = getattr(self.queue, "wait_for_capacity", None)
+        if wait is None:
+            return
+        await wait()
+        drained = self._drained
+        if drained is None or self._loop is not asyncio.get_running_loop():
+            return
+        while (
+            len(self._pending) > self.max_pending_events
+            and self._encoder_task is not None
+            and not self._encoder_task.done()
+        ):
+            drained.clear()
+            await drained.wait()
+
+    @property
+    def pending_events(self) -> int:
+        """The number of events waiting for the encoder task."""
+        return len(self._pending)
+
+    def pending_size_bytes(self) -> int:
+        """Approximates the size of the events waiting for the encoder task, which are not encoded yet."""
+        size = 0
+        for _, data, _ in list(self._pending):
+            if isinstance(data, bytes):
+                size += len(data)
+            elif isinstance(data, dict) and isinstance(data.get("chunk"), str):
+                size += len(data["chunk"])
+            else:
+                size += len(str(data))
+        return size
+
+    @staticmethod
+    def _encode(event_type: str, data: LoggableType, timestamp: float) -> tuple[str, bytes, float]:
+        event_id = f"{event_type}-{uuid.uuid4()}"
+        if isinstance(data, EncodedEventData):
+            header = '{"event": ' + json.dumps(event_type) + ', "data": '
+            return event_id, b"".join((header.encode("utf-8"), data, b"}\n\n")), timestamp
         jsonable_data = jsonable_encoder(data)
         json_data = {"event": event_type, "data": jsonable_data}
-        event_id = f"{event_type}-{uuid.uuid4()}"
         str_data = json.dumps(json_data) + "\n\n"
+        return event_id, str_data.encode("utf-8"), timestamp
+
+    def _encode_event(self, event_type: str, data: LoggableType, timestamp: float) -> None:
+        item = self._encode(event_type, data, timestamp)
         if self.queue:
             try:
-                self.queue.put_nowait((event_id, str_data.encode("utf-8"), time.time()))
+                self.queue.put_nowait(item)
             except Exception:  # noqa: BLE001
                 logger.debug("Queue not available for event")
 
@@ -95,10 +377,12 @@ def create_default_event_manager(queue=None):
     manager.register_event("on_error", "error")
     manager.register_event("on_end", "end")
     manager.register_event("on_message", "add_message")
+    manager.register_event("on_message_delta", "message_delta")
     manager.register_event("on_remove_message", "remove_message")
     manager.register_event("on_end_vertex", "end_vertex")
     manager.register_event("on_build_start", "build_start")
     manager.register_event("on_build_end", "build_end")
+    manager.register_event("on_profile", "profile")
     return manager
 
 
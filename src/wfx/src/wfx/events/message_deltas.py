@@ -0,0 +1,119 @@
+"""Turns repeated sends of a growing message into small "message_delta" events.
+
+Agents send their message after every tool event while its content blocks keep growing. Once the
+event manager of a build has message deltas enabled, these updates carry only the content blocks and
+contents that changed since the previous send, plus the text when it changed and the properties.
+Every `snapshot_interval` updates the whole message is sent again, so that a client that missed
+earlier events catches up.
+
+A content counts as changed when one of its fields was assigned a new value, which is how the agent
+event handlers update them. Nothing is serialized to find out, so sending an update costs time in
+proportion to what changed rather than to the size of the message.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+    from wfx.schema.message import Message
+
+DEFAULT_SNAPSHOT_INTERVAL = 20
+
+
+def _field_values(model: BaseModel, exclude: str | None = None) -> tuple[Any, ...]:
+    # The values themselves are kept rather than their ids, which could be reused once they are freed
+    return tuple(value for name, value in model.__dict__.items() if name != exclude)
+
+
+def _same_values(values: tuple[Any, ...], previous: tuple[Any, ...]) -> bool:
+    return len(values) == len(previous) and all(a is b for a, b in zip(values, previous, strict=True))
+
+
+@dataclass
+class _SentMessage:
+    text: Any
+    # For each block, the field values of the block without its contents and those of its contents
+    blocks: list[tuple[tuple[Any, ...], list[tuple[Any, ...]]]] = field(default_factory=list)
+    updates: int = 0
+
+
+class MessageDeltaTracker:
+    """Remembers what was sent of each message to compute the next delta."""
+
+    def __init__(self, snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL) -> None:
+        if snapshot_interval < 1:
+            msg = "snapshot_interval must be at least 1"
+            raise ValueError(msg)
+        self.snapshot_interval = snapshot_interval
+        self._sent: dict[str, _SentMessage] = {}
+
+    def diff(self, message_id: str, message: Message) -> dict[str, Any] | None:
+        """Returns the delta of the message since it was last sent, or None if it must be sent whole.
+
+        The message is recorded as sent either way.
+        """
+        previous = self._sent.get(message_id)
+        current = self._record(message)
+        if previous is None or previous.updates + 1 >= self.snapshot_interval:
+            self._sent[message_id] = current
+            return None
+        current.updates = previous.updates + 1
+        self._sent[message_id] = current
+
+        changes: list[dict[str, Any]] = []
+        for block_index, block in enumerate(message.content_blocks):
+            block_values, content_values = current.blocks[block_index]
+            if block_index >= len(previous.blocks):
+                changes.append({"op": "append_block", "block_index": block_index, "block": block.model_dump()})
+                continue
+            previous_block_values, previous_contents = previous.blocks[block_index]
+            if not _same_values(block_values, previous_block_values):
+                data = block.model_dump(exclude={"contents"})
+                changes.append({"op": "update_block", "block_index": block_index, "block": data})
+            for content_index, content in enumerate(block.contents):
+                if content_index >= len(previous_contents):
+                    operation = "append"
+                elif not _same_values(content_values[content_index], previous_contents[content_index]):
+                    operation = "update"
+                else:
+                    continue
+                changes.append(
+                    {
+                        "op": operation,
+                        "block_index": block_index,
+                        "content_index": content_index,
+                        "content": content.model_dump(),
+                    }
+                )
+            if len(block.contents) < len(previous_contents):
+                # Contents were removed, which deltas do not describe
+                current.updates = 0
+                return None
+        if len(message.content_blocks) < len(previous.blocks):
+            current.updates = 0
+            return None
+
+        properties = message.properties
+        delta: dict[str, Any] = {
+            "id": message_id,
+            "properties": properties if isinstance(properties, dict) else properties.model_dump(),
+            "changes": changes,
+        }
+        if message.text is not previous.text:
+            delta["text"] = message.text
+        return delta
+
+    def forget(self, message_id: str) -> None:
+        self._sent.pop(message_id, None)
+
+    @staticmethod
+    def _record(message: Message) -> _SentMessage:
+        blocks = [
+            (_field_values(block, exclude="contents"), [_field_values(content) for content in block.contents])
+            for block in message.content_blocks
+        ]
+        return _SentMessage(text=message.text, blocks=blocks)
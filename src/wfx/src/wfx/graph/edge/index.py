@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from wfx.graph.edge.base import CycleEdge
+
+
+class EdgeIndex:
+    """The edges of a graph, indexed by source vertex, target vertex and target handle.
+
+    Edges are kept in insertion order and duplicates are ignored. Lookups by vertex return the
+    edges in the order they were added, so they match a scan of the full edge list while only
+    costing O(degree).
+    """
+
+    def __init__(self, edges: Iterable[CycleEdge] = ()) -> None:
+        # Maps each edge to its insertion number, which keeps lookups in insertion order.
+        self._edges: dict[CycleEdge, int] = {}
+        self._next_position = 0
+        self._edge_list: list[CycleEdge] | None = None
+        self._by_source: dict[str, list[CycleEdge]] = defaultdict(list)
+        self._by_target: dict[str, list[CycleEdge]] = defaultdict(list)
+        self._by_source_and_target: dict[tuple[str, str], list[CycleEdge]] = defaultdict(list)
+        self._by_target_param: dict[tuple[str, str | None], list[CycleEdge]] = defaultdict(list)
+        for edge in edges:
+            self.add(edge)
+
+    @property
+    def edges(self) -> list[CycleEdge]:
+        """All edges in insertion order. The list is cached and must not be modified."""
+        if self._edge_list is None:
+            self._edge_list = list(self._edges)
+        return self._edge_list
+
+    def add(self, edge: CycleEdge) -> bool:
+        """Adds an edge, returning False if an equal edge is already indexed."""
+        if edge in self._edges:
+            return False
+        self._edges[edge] = self._next_position
+        self._next_position += 1
+        self._edge_list = None
+        self._by_source[edge.source_id].append(edge)
+        self._by_target[edge.target_id].append(edge)
+        self._by_source_and_target[edge.source_id, edge.target_id].append(edge)
+        self._by_target_param[edge.target_id, edge.target_param].append(edge)
+        return True
+
+    def remove(self, edge: CycleEdge) -> None:
+        if edge not in self._edges:
+            return
+        del self._edges[edge]
+        self._edge_list = None
+        self._remove_from(self._by_source, edge.source_id, edge)
+        self._remove_from(self._by_target, edge.target_id, edge)
+        self._remove_from(self._by_source_and_target, (edge.source_id, edge.target_id), edge)
+        self._remove_from(self._by_target_param, (edge.target_id, edge.target_param), edge)
+
+    def remove_vertex(self, vertex_id: str) -> list[CycleEdge]:
+        """Removes every edge that starts or ends at the vertex and returns them."""
+        removed = self.get_vertex_edges(vertex_id)
+        for edge in removed:
+            self.remove(edge)
+        return removed
+
+    @staticmethod
+    def _remove_from(index: dict, key, edge: CycleEdge) -> None:
+        edges = index.get(key)
+        if not edges:
+            return
+        # Edges compare by their handles, so look the object up by identity first.
+        for position, indexed_edge in enumerate(edges):
+            if indexed_edge is edge:
+                del edges[position]
+                break
+        else:
+            edges.remove(edge)
+        if not edges:
+            del index[key]
+
+    def get_vertex_edges(
+        self, vertex_id: str, *, is_target: bool | None = None, is_source: bool | None = None
+    ) -> list[CycleEdge]:
+        """Returns the edges that have the vertex as source or target, in insertion order.
+
+        Passing `is_source=False` or `is_target=False` leaves out the edges where the vertex is only
+        the source or only the target, respectively.
+        """
+        outgoing = self._by_source.get(vertex_id, []) if is_source is not False else []
+        incoming = self._by_target.get(vertex_id, []) if is_target is not False else []
+        if not outgoing:
+            return list(incoming)
+        if not incoming:
+            return list(outgoing)
+        # An edge from the vertex to itself is in both lists
+        merged = dict.fromkeys([*outgoing, *incoming])
+        return sorted(merged, key=self._edges.__getitem__)
+
+    def get_source_edges(self, vertex_id: str) -> list[CycleEdge]:
+        """Returns the edges that start at the vertex."""
+        return list(self._by_source.get(vertex_id, []))
+
+    def get_target_edges(self, vertex_id: str) -> list[CycleEdge]:
+        """Returns the edges that end at the vertex."""
+        return list(self._by_target.get(vertex_id, []))
+
+    def get_edges_between(self, source_id: str, target_id: str) -> list[CycleEdge]:
+        return list(self._by_source_and_target.get((source_id, target_id), []))
+
+    def get_edges_by_target_param(self, target_id: str, target_param: str) -> list[CycleEdge]:
+        """Returns the edges connected to a given input of the target vertex."""
+        return list(self._by_target_param.get((target_id, target_param), []))
+
+    def __contains__(self, edge: object) -> bool:
+        return edge in self._edges
+
+    def __len__(self) -> int:
+        return len(self._edges)
@@ -4,6 +4,7 @@ import asyncio
 import contextlib
 import contextvars
 import copy
+import hashlib
 import json
 import queue
 import threading
@@ -11,16 +12,20 @@ import traceback
 import uuid
 from collections import defaultdict, deque
 from datetime import datetime, timezone
-from functools import partial
 from itertools import chain
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Any, Literal, cast
 
+import orjson
 from ag_ui.core import RunFinishedEvent, RunStartedEvent
 
 from wfx.events.observability.lifecycle_events import observable
 from wfx.exceptions.component import ComponentBuildError
 from wfx.graph.edge.base import CycleEdge, Edge
+from wfx.graph.edge.index import EdgeIndex
 from wfx.graph.graph.constants import Finish, lazy_load_vertex_dict
+from wfx.graph.graph.profiler import RunProfiler, profile_phase
+from wfx.graph.graph.resource_limits import ResourceLimiter, get_resource_limiter, resource_slot
+from wfx.graph.graph.run_state import RUN_STATE_VERSION
 from wfx.graph.graph.runnable_vertices_manager import RunnableVerticesManager
 from wfx.graph.graph.schema import GraphData, GraphDump, StartConfigDict, VertexBuildResult
 from wfx.graph.graph.state_model import create_state_model_from_graph
@@ -35,6 +40,7 @@ from wfx.graph.graph.utils import (
 from wfx.graph.schema import InterfaceComponentTypes, RunOutputs
 from wfx.graph.utils import log_vertex_build
 from wfx.graph.vertex.base import Vertex, VertexStates
+from wfx.graph.vertex.result_cache import get_vertex_result_cache
 from wfx.graph.vertex.schema import NodeData, NodeTypeEnum
 from wfx.graph.vertex.vertex_types import ComponentVertex, InterfaceVertex, StateVertex
 from wfx.log.logger import LogConfig, configure, logger
@@ -45,13 +51,16 @@ from wfx.services.deps import get_chat_service, get_tracing_service
 from wfx.utils.async_helpers import run_until_complete
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Generator, Iterable
+    from collections.abc import AsyncIterator, Callable, Generator, Iterable
+    from contextlib import AbstractAsyncContextManager, AbstractContextManager
     from typing import Any
 
     from wfx.custom.custom_component.component import Component
     from wfx.events.event_manager import EventManager
     from wfx.graph.edge.schema import EdgeData
+    from wfx.graph.graph.profiler import ProfileFormat
     from wfx.graph.schema import ResultData
+    from wfx.graph.vertex.result_cache import VertexResultCache
     from wfx.schema.schema import InputValueRequest
     from wfx.services.chat.schema import GetCache, SetCache
     from wfx.services.tracing.service import TracingService
@@ -108,7 +117,7 @@ class Graph:
         # Conditional routing system (separate from ACTIVE/INACTIVE cycle management)
         self.conditionally_excluded_vertices: set = set()  # Vertices excluded by conditional routing
         self.conditional_exclusion_sources: dict[str, set[str]] = {}  # Maps source vertex -> excluded vertices
-        self.edges: list[CycleEdge] = []
+        self._edge_index = EdgeIndex()
         self.vertices: list[Vertex] = []
         self.run_manager = RunnableVerticesManager()
         self._vertices: list[NodeData] = []
@@ -124,12 +133,15 @@ class Graph:
         self._first_layer: list[str] = []
         self._lock: asyncio.Lock | None = None
         self.raw_graph_data: GraphData = {"nodes": [], "edges": []}
+        self._graph_data_hash: str | None = None
         self._is_cyclic: bool | None = None
         self._cycles: list[tuple[str, str]] | None = None
         self._cycle_vertices: set[str] | None = None
         self._call_order: list[str] = []
         self._snapshots: list[dict[str, Any]] = []
         self._end_trace_tasks: set[asyncio.Task] = set()
+        self.resource_limiter = ResourceLimiter()
+        self.profiler: RunProfiler | None = None
 
         if context and not isinstance(context, dict):
             msg = "Context must be a dictionary"
@@ -152,6 +164,19 @@ class Graph:
             self._lock = asyncio.Lock()
         return self._lock
 
+    @property
+    def edges(self) -> list[CycleEdge]:
+        """The edges of the graph in insertion order.
+
+        The list is shared with the edge index, so add and remove edges through the graph
+        (or assign a new list) instead of modifying it in place.
+        """
+        return self._edge_index.edges
+
+    @edges.setter
+    def edges(self, edges: Iterable[CycleEdge]) -> None:
+        self._edge_index = EdgeIndex(edges)
+
     @property
     def context(self) -> dotdict:
         if isinstance(self._context, dotdict):
@@ -237,6 +262,7 @@ class Graph:
             nodes = [node.to_data() for node in self.vertices]
             edges = [edge.to_data() for edge in self.edges]
             self.raw_graph_data = {"nodes": nodes, "edges": edges}
+            self._graph_data_hash = None
             data_dict = self.raw_graph_data
         graph_dict: GraphDump = {
             "data": data_dict,
@@ -253,10 +279,19 @@ class Graph:
         graph_dict["endpoint_name"] = str(endpoint_name)
         return graph_dict
 
+    @property
+    def graph_data_hash(self) -> str:
+        """A hash of the flow data this graph was built from, computed once per graph."""
+        if self._graph_data_hash is None:
+            graph_data_bytes = orjson.dumps(self.raw_graph_data, option=orjson.OPT_SORT_KEYS, default=str)
+            self._graph_data_hash = hashlib.sha256(graph_data_bytes).hexdigest()
+        return self._graph_data_hash
+
     def add_nodes_and_edges(self, nodes: list[NodeData], edges: list[EdgeData]) -> None:
         self._vertices = nodes
         self._edges = edges
         self.raw_graph_data = {"nodes": nodes, "edges": edges}
+        self._graph_data_hash = None
         self.top_level_vertices = []
         for vertex in self._vertices:
             if vertex_id := vertex.get("id"):
@@ -781,7 +816,7 @@ class Graph:
         try:
             cache_service = get_chat_service()
             if cache_service and self.flow_id:
-                await cache_service.set_cache(self.flow_id, self)
+                await cache_service.set_graph_cache(self.flow_id, self)
         except Exception:  # noqa: BLE001
             logger.exception("Error setting cache")
 
@@ -827,6 +862,7 @@ class Graph:
         stream: bool = False,
         fallback_to_env_vars: bool = False,
         event_manager: EventManager | None = None,
+        concurrency: int = 1,
     ) -> list[RunOutputs]:
         """Runs the graph with the given inputs.
 
@@ -839,15 +875,63 @@ class Graph:
             stream (bool, optional): Whether to stream the results or not. Defaults to False.
             fallback_to_env_vars (bool, optional): Whether to fallback to environment variables. Defaults to False.
             event_manager (EventManager | None): The event manager for the graph.
+            concurrency (int, optional): How many inputs to run at the same time. See `aiter_runs`. Defaults to 1.
 
         Returns:
-            List[RunOutputs]: The outputs of the graph.
+            List[RunOutputs]: The outputs of the graph, in the order of the inputs.
+        """
+        runs = self.aiter_runs(
+            inputs,
+            inputs_components=inputs_components,
+            types=types,
+            outputs=outputs,
+            session_id=session_id,
+            stream=stream,
+            fallback_to_env_vars=fallback_to_env_vars,
+            event_manager=event_manager,
+            concurrency=concurrency,
+        )
+        vertex_outputs = {index: run_output_object async for index, run_output_object in runs}
+        return [vertex_outputs[index] for index in sorted(vertex_outputs)]
+
+    async def aiter_runs(
+        self,
+        inputs: list[dict[str, str]],
+        *,
+        inputs_components: list[list[str]] | None = None,
+        types: list[InputType | None] | None = None,
+        outputs: list[str] | None = None,
+        session_id: str | None = None,
+        stream: bool = False,
+        fallback_to_env_vars: bool = False,
+        event_manager: EventManager | None = None,
+        concurrency: int = 1,
+    ) -> AsyncIterator[tuple[int, RunOutputs]]:
+        """Runs the graph once per input and yields each run's outputs as soon as the run finishes.
+
+        A single input runs on this graph. When there are several, every input runs on its own
+        clone of the graph (see `clone_for_run`) and at most `concurrency` of them run at the same
+        time, so runs may finish out of order. The index of the input is yielded along with its
+        outputs. If a run fails, the runs still in progress are cancelled and the error is raised.
+
+        Args:
+            inputs (list[Dict[str, str]]): The input values for the graph.
+            inputs_components (Optional[list[list[str]]], optional): Components to run for the inputs. Defaults to None.
+            types (Optional[list[Optional[InputType]]], optional): The types of the inputs. Defaults to None.
+            outputs (Optional[list[str]], optional): The outputs to retrieve from the graph. Defaults to None.
+            session_id (Optional[str], optional): The session ID for the graph. Defaults to None.
+            stream (bool, optional): Whether to stream the results or not. Defaults to False.
+            fallback_to_env_vars (bool, optional): Whether to fallback to environment variables. Defaults to False.
+            event_manager (EventManager | None): The event manager shared by all the runs.
+            concurrency (int, optional): How many inputs to run at the same time. Defaults to 1.
+
+        Yields:
+            tuple[int, RunOutputs]: The index of the input and the outputs of its run.
         """
         # inputs is {"message": "Hello, world!"}
         # we need to go through self.inputs and update the self.raw_params
         # of the vertices that are inputs
         # if the value is a list, we need to run multiple times
-        vertex_outputs = []
         if not isinstance(inputs, list):
             inputs = [inputs]
         elif not inputs:
@@ -864,21 +948,43 @@ class Graph:
             self.session_id = session_id
         for _ in range(len(inputs) - len(types)):
             types.append("chat")  # default to chat
-        for run_inputs, components, input_type in zip(inputs, inputs_components, types, strict=True):
-            run_outputs = await self._run(
-                inputs=run_inputs,
-                input_components=components,
-                input_type=input_type,
+
+        async def run_input(graph: Graph, index: int) -> tuple[int, RunOutputs]:
+            run_outputs = await graph._run(
+                inputs=inputs[index],
+                input_components=inputs_components[index],
+                input_type=types[index],
                 outputs=outputs or [],
                 stream=stream,
                 session_id=session_id or "",
                 fallback_to_env_vars=fallback_to_env_vars,
                 event_manager=event_manager,
             )
-            run_output_object = RunOutputs(inputs=run_inputs, outputs=run_outputs)
+            run_output_object = RunOutputs(inputs=inputs[index], outputs=run_outputs)
             await logger.adebug(f"Run outputs: {run_output_object}")
-            vertex_outputs.append(run_output_object)
-        return vertex_outputs
+            return index, run_output_object
+
+        if len(inputs) == 1:
+            yield await run_input(self, 0)
+            return
+
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def run_isolated(index: int) -> tuple[int, RunOutputs]:
+            async with semaphore:
+                # Clone inside the semaphore so only the running inputs hold a copy of the graph
+                graph = self.clone_for_run()
+                graph.session_id = self.session_id
+                return await run_input(graph, index)
+
+        tasks = [asyncio.create_task(run_isolated(index)) for index in range(len(inputs))]
+        try:
+            for next_finished in asyncio.as_completed(tasks):
+                yield await next_finished
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     def next_vertex_to_build(self):
         """Returns the next vertex to be built.
@@ -1028,10 +1134,12 @@ class Graph:
 
     def get_edge(self, source_id: str, target_id: str) -> CycleEdge | None:
         """Returns the edge between two vertices."""
-        for edge in self.edges:
-            if edge.source_id == source_id and edge.target_id == target_id:
-                return edge
-        return None
+        edges = self._edge_index.get_edges_between(source_id, target_id)
+        return edges[0] if edges else None
+
+    def get_edges_by_target_param(self, target_id: str, target_param: str) -> list[CycleEdge]:
+        """Returns the edges connected to the `target_param` input of a vertex."""
+        return self._edge_index.get_edges_by_target_param(target_id, target_param)
 
     def build_parent_child_map(self, vertices: list[Vertex]):
         parent_child_map = defaultdict(list)
@@ -1057,6 +1165,8 @@ class Graph:
             "description": self.description,
             "user_id": self.user_id,
             "raw_graph_data": self.raw_graph_data,
+            "_graph_data_hash": self._graph_data_hash,
+            "resource_limiter": self.resource_limiter,
             "top_level_vertices": self.top_level_vertices,
             "inactivated_vertices": self.inactivated_vertices,
             "run_manager": self.run_manager.to_dict(),
@@ -1107,18 +1217,116 @@ class Graph:
             # Deep copy vertices and edges
             new_graph.add_nodes_and_edges(copy.deepcopy(self._vertices, memo), copy.deepcopy(self._edges, memo))
 
+        new_graph.resource_limiter = ResourceLimiter(self.resource_limiter.limits)
+
         # Store the newly created object in memo
         memo[id(self)] = new_graph
 
         return new_graph
 
+    def resource_slot(self, resource_class: str | None) -> AbstractAsyncContextManager[None]:
+        """Waits for a slot of the resource class in this flow's limits and in the worker-wide limits.
+
+        Flow limits come from the `resource_limits` key of the flow data (or `resource_limiter.set_limits`)
+        and are shared by the clones of this graph. Worker-wide limits come from the
+        `resource_class_limits` setting.
+        """
+        return resource_slot(resource_class, self.resource_limiter, get_resource_limiter())
+
+    def enable_profiling(self) -> RunProfiler:
+        """Starts recording where the time of the vertex builds goes, see `wfx.graph.graph.profiler`.
+
+        Profiling applies to this graph only: clones made for batch runs are not profiled.
+        """
+        self.profiler = RunProfiler()
+        return self.profiler
+
+    def profile_phase(self, vertex_id: str, phase: str) -> AbstractContextManager[None]:
+        """Times the block as a phase of the vertex if profiling is enabled."""
+        return profile_phase(self, vertex_id, phase)
+
+    def get_profile(self, profile_format: ProfileFormat = "summary") -> dict[str, Any] | None:
+        """Returns the profile of the builds so far in the given format, or None if profiling is disabled."""
+        if self.profiler is None:
+            return None
+        # The run consumes the lists of predecessor_map, so the dependencies are read from the edges
+        predecessor_map, _ = self.build_adjacency_maps(self.edges)
+        return self.profiler.export(profile_format, predecessor_map)
+
+    def clone_for_run(self, *, user_id: str | None = None, context: dict[str, Any] | None = None) -> Graph:
+        """Returns a graph that can be run independently of this one.
+
+        Unlike `copy.deepcopy`, the flow payload is not processed again: the processed node and
+        edge data, the parsed vertex data and the cycle analysis are shared with this graph, since
+        none of them change while a graph runs. Only the run state is created anew (vertex params,
+        component instances, cycle edge results and the adjacency maps), so this graph can be
+        kept as a template and cloned once per run.
+
+        For graphs built from components, each vertex gets a deep copy of its component instance,
+        so runs of different clones never share component state.
+
+        Args:
+            user_id: The user ID for the new graph. Defaults to this graph's user ID.
+            context: The context for the new graph. Defaults to a copy of this graph's context.
+
+        Returns:
+            Graph: A new graph with the same vertices and edges and a clean run state.
+        """
+        new_graph = type(self)(
+            flow_id=self.flow_id,
+            flow_name=self.flow_name,
+            description=self.description,
+            user_id=user_id if user_id is not None else self.user_id,
+            context=context if context is not None else dict(self.context),
+        )
+        vars(new_graph).update(
+            {
+                "raw_graph_data": self.raw_graph_data,
+                "_graph_data_hash": self._graph_data_hash,
+                "resource_limiter": self.resource_limiter,
+                "_vertices": self._vertices,
+                "_edges": self._edges,
+                "top_level_vertices": list(self.top_level_vertices),
+                "_is_cyclic": self._is_cyclic,
+                "_cycles": self._cycles,
+                "_cycle_vertices": self._cycle_vertices,
+            }
+        )
+        new_graph.vertices = [vertex.clone_for_graph(new_graph) for vertex in self.vertices]
+        components_memo: dict[int, Any] = {}
+        for vertex, new_vertex in zip(self.vertices, new_graph.vertices, strict=True):
+            if vertex.custom_component is not None and self._start is not None:
+                new_vertex.add_component_instance(copy.deepcopy(vertex.custom_component, components_memo))
+        new_graph.vertex_map = {vertex.id: vertex for vertex in new_graph.vertices}
+        new_graph.edges = [self._clone_edge_for_run(edge) for edge in self.edges]
+        new_graph._prepare_vertices()  # noqa: SLF001
+        new_graph.build_graph_maps(new_graph.edges)
+        new_graph.define_vertices_lists()
+        return new_graph
+
+    @staticmethod
+    def _clone_edge_for_run(edge: CycleEdge | Edge) -> CycleEdge | Edge:
+        """Plain edges only hold vertex IDs and handle data, so they are shared; cycle edges carry a result."""
+        if not isinstance(edge, CycleEdge):
+            return edge
+        new_edge = object.__new__(type(edge))
+        new_edge.__dict__.update(edge.__dict__)
+        new_edge.is_fulfilled = False
+        new_edge.result = None
+        return new_edge
+
     def __setstate__(self, state):
         run_manager = state["run_manager"]
         if isinstance(run_manager, RunnableVerticesManager):
             state["run_manager"] = run_manager
         else:
             state["run_manager"] = RunnableVerticesManager.from_dict(run_manager)
+        edges = state.pop("edges", [])
+        state.setdefault("_graph_data_hash", None)
+        state.setdefault("resource_limiter", ResourceLimiter())
+        state.setdefault("profiler", None)
         self.__dict__.update(state)
+        self.edges = edges
         self.vertex_map = {vertex.id: vertex for vertex in self.vertices}
         # Tracing service will be lazily initialized via property when needed
         self.set_run_id(self._run_id)
@@ -1151,6 +1359,8 @@ class Graph:
             edges = payload["edges"]
             graph = cls(flow_id=flow_id, flow_name=flow_name, user_id=user_id, context=context)
             graph.add_nodes_and_edges(vertices, edges)
+            if resource_limits := payload.get("resource_limits"):
+                graph.resource_limiter.set_limits(resource_limits)
         except KeyError as exc:
             logger.exception(exc)
             if "nodes" not in payload and "edges" not in payload:
@@ -1175,13 +1385,9 @@ class Graph:
 
     def update_edges_from_vertex(self, other_vertex: Vertex) -> None:
         """Updates the edges of a vertex in the Graph."""
-        new_edges = []
-        for edge in self.edges:
-            if other_vertex.id in {edge.source_id, edge.target_id}:
-                continue
-            new_edges.append(edge)
-        new_edges += other_vertex.edges
-        self.edges = new_edges
+        self._edge_index.remove_vertex(other_vertex.id)
+        for edge in other_vertex.edges:
+            self._edge_index.add(edge)
 
     def vertex_data_is_identical(self, vertex: Vertex, other_vertex: Vertex) -> bool:
         data_is_equivalent = vertex == other_vertex
@@ -1290,15 +1496,18 @@ class Graph:
         """Updates the edges of a vertex."""
         # Vertex has edges, so we need to update the edges
         for edge in vertex.edges:
-            if edge not in self.edges and edge.source_id in self.vertex_map and edge.target_id in self.vertex_map:
-                self.edges.append(edge)
+            if edge.source_id in self.vertex_map and edge.target_id in self.vertex_map:
+                self._edge_index.add(edge)
 
     def _build_graph(self) -> None:
         """Builds the graph from the vertices and edges."""
         self.vertices = self._build_vertices()
         self.vertex_map = {vertex.id: vertex for vertex in self.vertices}
         self.edges = self._build_edges()
+        self._prepare_vertices()
 
+    def _prepare_vertices(self) -> None:
+        """Builds the params and component instances of the vertices, which hold their run state."""
         # This is a hack to make sure that the LLM vertex is sent to
         # the toolkit vertex
         self._build_vertex_params()
@@ -1353,7 +1562,7 @@ class Graph:
             return
         self.vertices.remove(vertex)
         self.vertex_map.pop(vertex_id)
-        self.edges = [edge for edge in self.edges if vertex_id not in {edge.source_id, edge.target_id}]
+        self._edge_index.remove_vertex(vertex_id)
 
     def _build_vertex_params(self) -> None:
         """Identifies and handles the LLM vertex within the graph."""
@@ -1447,7 +1656,7 @@ class Graph:
         self.reset_activated_vertices()
 
         if chat_service is not None:
-            await chat_service.set_cache(str(self.flow_id or self._run_id), self)
+            await chat_service.set_graph_cache(str(self.flow_id or self._run_id), self)
         self._record_snapshot(vertex_id)
         return vertex_build_result
 
@@ -1468,6 +1677,123 @@ class Graph:
         if vertex_id:
             self._call_order.append(vertex_id)
 
+    def get_run_state(self) -> dict[str, Any]:
+        """Returns a compact, JSON-serializable snapshot of the run state of the graph.
+
+        The snapshot holds the run manager state, the run queue and layers and the state of each
+        vertex, but none of the vertices, edges or built objects. Results of built vertices are
+        referenced by vertex ID, since `build_vertex` already caches them under that key. The graph
+        itself is rebuilt from a template with `clone_for_run` and `apply_run_state`.
+        """
+        run_manager = self.run_manager.to_dict()
+        return {
+            "run_state_version": RUN_STATE_VERSION,
+            "flow_id": self.flow_id,
+            "flow_name": self.flow_name,
+            "user_id": self.user_id,
+            "graph_data_hash": self.graph_data_hash,
+            "run_id": self._run_id,
+            "session_id": self._session_id,
+            "prepared": self._prepared,
+            "runs": self._runs,
+            "run_manager": {
+                "run_map": run_manager["run_map"],
+                "run_predecessors": run_manager["run_predecessors"],
+                "vertices_to_run": sorted(run_manager["vertices_to_run"]),
+                "vertices_being_run": sorted(run_manager["vertices_being_run"]),
+                "ran_at_least_once": sorted(run_manager["ran_at_least_once"]),
+            },
+            "run_queue": list(self._run_queue),
+            "first_layer": list(self._first_layer),
+            "sorted_vertices_layers": self._sorted_vertices_layers,
+            "vertices_layers": self.vertices_layers,
+            "vertices_to_run": sorted(self.vertices_to_run),
+            "stop_vertex": self.stop_vertex,
+            "inactivated_vertices": sorted(self.inactivated_vertices),
+            "activated_vertices": list(self.activated_vertices),
+            "inactive_vertices": sorted(self.inactive_vertices),
+            "conditionally_excluded_vertices": sorted(self.conditionally_excluded_vertices),
+            "conditional_exclusion_sources": {
+                vertex_id: sorted(excluded) for vertex_id, excluded in self.conditional_exclusion_sources.items()
+            },
+            "vertex_states": {vertex.id: vertex.state.name for vertex in self.vertices},
+            "built_vertices": [vertex.id for vertex in self.vertices if vertex.built],
+        }
+
+    def apply_run_state(self, run_state: dict[str, Any]) -> None:
+        """Restores a snapshot taken with `get_run_state` onto a graph built from the same flow data.
+
+        Vertices are left unbuilt; use `restore_vertex_results` to load the results of the vertices
+        that were built when the snapshot was taken.
+
+        Raises:
+            ValueError: If the snapshot was taken from a graph built from different flow data.
+        """
+        if run_state["graph_data_hash"] != self.graph_data_hash:
+            msg = "The run state was taken from a graph built from different flow data"
+            raise ValueError(msg)
+        run_manager = run_state["run_manager"]
+        self.run_manager = RunnableVerticesManager.from_dict(
+            {
+                "run_map": run_manager["run_map"],
+                "run_predecessors": run_manager["run_predecessors"],
+                "vertices_to_run": set(run_manager["vertices_to_run"]),
+                "vertices_being_run": set(run_manager["vertices_being_run"]),
+                "ran_at_least_once": set(run_manager["ran_at_least_once"]),
+            }
+        )
+        self._prepared = run_state["prepared"]
+        self._runs = run_state["runs"]
+        self._run_queue = deque(run_state["run_queue"])
+        self._first_layer = list(run_state["first_layer"])
+        self._sorted_vertices_layers = run_state["sorted_vertices_layers"]
+        self.vertices_layers = run_state["vertices_layers"]
+        self.vertices_to_run = set(run_state["vertices_to_run"])
+        self.stop_vertex = run_state["stop_vertex"]
+        self.inactivated_vertices = set(run_state["inactivated_vertices"])
+        self.activated_vertices = list(run_state["activated_vertices"])
+        self.inactive_vertices = set(run_state["inactive_vertices"])
+        self.conditionally_excluded_vertices = set(run_state["conditionally_excluded_vertices"])
+        self.conditional_exclusion_sources = {
+            vertex_id: set(excluded) for vertex_id, excluded in run_state["conditional_exclusion_sources"].items()
+        }
+        for vertex_id, state in run_state["vertex_states"].items():
+            if vertex := self.vertex_map.get(vertex_id):
+                vertex.state = VertexStates[state]
+        if session_id := run_state["session_id"]:
+            self.session_id = session_id
+            for vertex_id in self.has_session_id_vertices:
+                vertex = self.vertex_map[vertex_id]
+                if not vertex.raw_params.get("session_id"):
+                    vertex.update_raw_params({"session_id": session_id}, overwrite=True)
+        if run_state["run_id"]:
+            self.set_run_id(run_state["run_id"])
+
+    async def restore_vertex_results(self, vertex_ids: Iterable[str], get_cache: GetCache) -> list[str]:
+        """Loads the cached build results of the given vertices, as stored by `build_vertex`.
+
+        Vertices whose results are no longer cached stay unbuilt and are built again when needed.
+
+        Returns:
+            list[str]: The IDs of the vertices that were restored.
+        """
+        restored = []
+        for vertex_id in vertex_ids:
+            vertex = self.vertex_map.get(vertex_id)
+            if vertex is None:
+                continue
+            cached_result = await get_cache(key=vertex_id)
+            if isinstance(cached_result, CacheMiss) or not isinstance(cached_result, dict):
+                continue
+            try:
+                vertex.restore_build_result(cached_result["result"])
+            except Exception:  # noqa: BLE001
+                logger.debug(f"Error restoring the cached result of {vertex_id}", exc_info=True)
+                vertex.built = False
+                continue
+            restored.append(vertex_id)
+        return restored
+
     def step(
         self,
         inputs: InputValueRequest | None = None,
@@ -1518,6 +1844,30 @@ class Graph:
         Raises:
             ValueError: If no result is found for the vertex.
         """
+        with self.profile_phase(vertex_id, "vertex"):
+            return await self._build_vertex(
+                vertex_id,
+                get_cache=get_cache,
+                set_cache=set_cache,
+                inputs_dict=inputs_dict,
+                files=files,
+                user_id=user_id,
+                fallback_to_env_vars=fallback_to_env_vars,
+                event_manager=event_manager,
+            )
+
+    async def _build_vertex(
+        self,
+        vertex_id: str,
+        *,
+        get_cache: GetCache | None,
+        set_cache: SetCache | None,
+        inputs_dict: dict[str, str] | None,
+        files: list[str] | None,
+        user_id: str | None,
+        fallback_to_env_vars: bool,
+        event_manager: EventManager | None,
+    ) -> VertexBuildResult:
         vertex = self.get_vertex(vertex_id)
         self.run_manager.add_to_vertices_being_run(vertex_id)
         try:
@@ -1538,35 +1888,40 @@ class Graph:
                     should_build = True
                 else:
                     try:
-                        cached_vertex_dict = cached_result["result"]
-                        # Now set update the vertex with the cached vertex
-                        vertex.built = cached_vertex_dict["built"]
-                        vertex.artifacts = cached_vertex_dict["artifacts"]
-                        vertex.built_object = cached_vertex_dict["built_object"]
-                        vertex.built_result = cached_vertex_dict["built_result"]
-                        vertex.full_data = cached_vertex_dict["full_data"]
-                        vertex.results = cached_vertex_dict["results"]
-                        try:
-                            vertex.finalize_build()
-
-                            if vertex.result is not None:
-                                vertex.result.used_frozen_result = True
-                        except Exception:  # noqa: BLE001
-                            logger.debug("Error finalizing build", exc_info=True)
-                            vertex.built = False
-                            should_build = True
+                        vertex.restore_build_result(cached_result["result"])
+                        if vertex.result is not None:
+                            vertex.result.used_frozen_result = True
                     except KeyError:
                         vertex.built = False
                         should_build = True
+                    except Exception:  # noqa: BLE001
+                        logger.debug("Error finalizing build", exc_info=True)
+                        vertex.built = False
+                        should_build = True
 
             if should_build:
-                await vertex.build(
-                    user_id=user_id,
-                    inputs=inputs_dict,
-                    fallback_to_env_vars=fallback_to_env_vars,
-                    files=files,
-                    event_manager=event_manager,
-                )
+                result_cache = get_vertex_result_cache()
+                result_cache_key = None
+                if result_cache.is_enabled_for(vertex):
+                    result_cache_key = await result_cache.make_key(
+                        vertex,
+                        user_id=user_id,
+                        inputs=inputs_dict,
+                        files=files,
+                        fallback_to_env_vars=fallback_to_env_vars,
+                    )
+                if result_cache_key is None or not await self._restore_cached_result(
+                    vertex, result_cache, result_cache_key
+                ):
+                    await vertex.build(
+                        user_id=user_id,
+                        inputs=inputs_dict,
+                        fallback_to_env_vars=fallback_to_env_vars,
+                        files=files,
+                        event_manager=event_manager,
+                    )
+                    if result_cache_key is not None and vertex.is_active():
+                        await result_cache.set(result_cache_key, vertex)
                 if set_cache is not None:
                     vertex_dict = {
                         "built": vertex.built,
@@ -1597,6 +1952,20 @@ class Graph:
             result_dict=result_dict, params=params, valid=valid, artifacts=artifacts, vertex=vertex
         )
 
+    @staticmethod
+    async def _restore_cached_result(vertex: Vertex, result_cache: VertexResultCache, key: str) -> bool:
+        """Restores the vertex from the result cache, returning False if it has to be built."""
+        cached_vertex_dict = await result_cache.get(key)
+        if cached_vertex_dict is None:
+            return False
+        try:
+            vertex.restore_build_result({**cached_vertex_dict, "full_data": vertex.full_data})
+        except Exception:  # noqa: BLE001
+            logger.debug(f"Error restoring the cached result of {vertex.id}", exc_info=True)
+            vertex.built = False
+            return False
+        return True
+
     def get_vertex_edges(
         self,
         vertex_id: str,
@@ -1607,22 +1976,16 @@ class Graph:
         """Returns a list of edges for a given vertex."""
         # The idea here is to return the edges that have the vertex_id as source or target
         # or both
-        return [
-            edge
-            for edge in self.edges
-            if (edge.source_id == vertex_id and is_source is not False)
-            or (edge.target_id == vertex_id and is_target is not False)
-        ]
+        return self._edge_index.get_vertex_edges(vertex_id, is_target=is_target, is_source=is_source)
 
     def get_vertices_with_target(self, vertex_id: str) -> list[Vertex]:
         """Returns the vertices connected to a vertex."""
         vertices: list[Vertex] = []
-        for edge in self.edges:
-            if edge.target_id == vertex_id:
-                vertex = self.get_vertex(edge.source_id)
-                if vertex is None:
-                    continue
-                vertices.append(vertex)
+        for edge in self._edge_index.get_target_edges(vertex_id):
+            vertex = self.get_vertex(edge.source_id)
+            if vertex is None:
+                continue
+            vertices.append(vertex)
         return vertices
 
     async def process(
@@ -1631,8 +1994,17 @@ class Graph:
         fallback_to_env_vars: bool,
         start_component_id: str | None = None,
         event_manager: EventManager | None = None,
+        scheduler: Literal["layered", "dependency"] | None = None,
     ) -> Graph:
-        """Processes the graph with vertices in each layer run in parallel."""
+        """Processes the graph, running independent vertices in parallel.
+
+        With the "layered" scheduler every vertex of a layer must finish before the next layer starts.
+        With the "dependency" scheduler a vertex starts as soon as its own predecessors are fulfilled,
+        so a slow vertex only delays the vertices that depend on it. When no scheduler is given the
+        `graph_scheduler` setting is used.
+        """
+        if scheduler is None:
+            scheduler = self._get_default_scheduler()
         has_webhook_component = "webhook" in start_component_id.lower() if start_component_id else False
         first_layer = self.sort_vertices(start_component_id=start_component_id)
         vertex_task_run_count: dict[str, int] = {}
@@ -1654,6 +2026,23 @@ class Graph:
 
         await self.initialize_run()
         lock = asyncio.Lock()
+        if scheduler == "dependency":
+            await self._process_by_dependencies(
+                first_layer,
+                lock=lock,
+                build_kwargs={
+                    "user_id": self.user_id,
+                    "inputs_dict": {},
+                    "fallback_to_env_vars": fallback_to_env_vars,
+                    "get_cache": get_cache_func,
+                    "set_cache": set_cache_func,
+                    "event_manager": event_manager,
+                },
+                has_webhook_component=has_webhook_component,
+            )
+            await logger.adebug("Graph processing complete")
+            return self
+
         while to_process:
             current_batch = list(to_process)  # Copy current deque items to a list
             to_process.clear()  # Clear the deque for new items
@@ -1733,8 +2122,7 @@ class Graph:
                 else:
                     self.run_manager.add_to_vertices_being_run(next_v_id)
             if cache and self.flow_id is not None:
-                set_cache_coro = partial(get_chat_service().set_cache, key=self.flow_id)
-                await set_cache_coro(data=self, lock=lock)
+                await get_chat_service().set_graph_cache(self.flow_id, self, lock=lock)
         if vertex.is_state:
             next_runnable_vertices.extend(self.activated_vertices)
         return next_runnable_vertices
@@ -1808,14 +2196,15 @@ class Graph:
                 raise result
             if isinstance(result, VertexBuildResult):
                 if self.flow_id is not None:
-                    await log_vertex_build(
-                        flow_id=self.flow_id,
-                        vertex_id=result.vertex.id,
-                        valid=result.valid,
-                        params=result.params,
-                        data=result.result_dict,
-                        artifacts=result.artifacts,
-                    )
+                    with self.profile_phase(result.vertex.id, "log"):
+                        await log_vertex_build(
+                            flow_id=self.flow_id,
+                            vertex_id=result.vertex.id,
+                            valid=result.valid,
+                            params=result.params,
+                            data=result.result_dict,
+                            artifacts=result.artifacts,
+                        )
 
                 vertices.append(result.vertex)
             else:
@@ -1835,6 +2224,98 @@ class Graph:
             results.extend(next_runnable_vertices)
         return list(set(results))
 
+    @staticmethod
+    def _get_default_scheduler() -> Literal["layered", "dependency"]:
+        """Returns the scheduler configured in the settings, falling back to "layered"."""
+        from wfx.services.deps import get_settings_service
+
+        settings_service = get_settings_service()
+        if settings_service is None:
+            return "layered"
+        return getattr(settings_service.settings, "graph_scheduler", "layered")
+
+    async def _process_by_dependencies(
+        self,
+        first_layer: list[str],
+        *,
+        lock: asyncio.Lock,
+        build_kwargs: dict[str, Any],
+        has_webhook_component: bool = False,
+    ) -> None:
+        """Runs every vertex as soon as all of its predecessors are fulfilled.
+
+        Instead of waiting for a whole layer, the runnable vertices are recomputed each time a single
+        build finishes, using the same RunnableVerticesManager bookkeeping as the layered scheduler,
+        so cycles, loops and conditional routing behave the same way. If any build fails, every build
+        still in flight is cancelled and the exception is raised.
+
+        Args:
+            first_layer: The vertex IDs to start with.
+            lock: Async lock for synchronization.
+            build_kwargs: Keyword arguments forwarded to `build_vertex`.
+            has_webhook_component: Whether the graph has a webhook component.
+        """
+        vertex_task_run_count: dict[str, int] = {}
+        running: dict[asyncio.Task, str] = {}
+        # Vertices requested again while a build of theirs is still in flight
+        rerun_requested: set[str] = set()
+
+        def start_vertex(vertex_id: str) -> None:
+            if vertex_id in running.values():
+                rerun_requested.add(vertex_id)
+                return
+            run_count = vertex_task_run_count.get(vertex_id, 0)
+            self.run_manager.add_to_vertices_being_run(vertex_id)
+            task = asyncio.create_task(
+                self.build_vertex(vertex_id=vertex_id, **build_kwargs),
+                name=f"{vertex_id} Run {run_count}",
+            )
+            vertex_task_run_count[vertex_id] = run_count + 1
+            running[task] = vertex_id
+
+        for vertex_id in first_layer:
+            start_vertex(vertex_id)
+
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: t.get_name()):
+                    vertex_id = running.pop(task)
+                    result = task.exception() or task.result()
+                    if isinstance(result, BaseException):
+                        await logger.aerror(f"Task {task.get_name()} failed with exception: {result}")
+                        if has_webhook_component and isinstance(result, Exception):
+                            await self._log_vertex_build_from_exception(vertex_id, result)
+                        raise result
+                    if not isinstance(result, VertexBuildResult):
+                        msg = f"Invalid result from task {task.get_name()}: {result}"
+                        raise TypeError(msg)
+                    if self.flow_id is not None:
+                        with self.profile_phase(vertex_id, "log"):
+                            await log_vertex_build(
+                                flow_id=self.flow_id,
+                                vertex_id=result.vertex.id,
+                                valid=result.valid,
+                                params=result.params,
+                                data=result.result_dict,
+                                artifacts=result.artifacts,
+                            )
+                    self.run_manager.remove_vertex_from_runnables(vertex_id)
+                    next_runnable_vertices = await self.get_next_runnable_vertices(
+                        lock, vertex=result.vertex, cache=False
+                    )
+                    await logger.adebug(f"Vertex {vertex_id} finished, starting {next_runnable_vertices}")
+                    if vertex_id in rerun_requested:
+                        rerun_requested.discard(vertex_id)
+                        start_vertex(vertex_id)
+                    for next_v_id in next_runnable_vertices:
+                        start_vertex(next_v_id)
+        except BaseException:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            raise
+
     def topological_sort(self) -> list[Vertex]:
         """Performs a topological sort of the vertices in the graph.
 
@@ -1955,7 +2436,7 @@ class Graph:
         The count reflects the number of edges between the input vertex and each neighbor.
         """
         neighbors: dict[Vertex, int] = {}
-        for edge in self.edges:
+        for edge in self.get_vertex_edges(vertex.id):
             if edge.source_id == vertex.id:
                 neighbor = self.get_vertex(edge.target_id)
                 if neighbor is None:
@@ -2162,7 +2643,6 @@ class Graph:
             cycle_vertices=self.cycle_vertices,
             stop_component_id=stop_component_id,
             start_component_id=start_component_id,
-            graph_dict=self.__to_dict(),
             in_degree_map=self.in_degree_map,
             successor_map=self.successor_map,
             predecessor_map=self.predecessor_map,
@@ -2304,16 +2784,6 @@ class Graph:
             successor_map[edge.source_id].append(edge.target_id)
         return predecessor_map, successor_map
 
-    def __to_dict(self) -> dict[str, dict[str, list[str]]]:
-        """Converts the graph to a dictionary."""
-        result: dict = {}
-        for vertex in self.vertices:
-            vertex_id = vertex.id
-            sucessors = [i.id for i in self.get_all_successors(vertex)]
-            predecessors = [i.id for i in self.get_predecessors(vertex)]
-            result |= {vertex_id: {"successors": sucessors, "predecessors": predecessors}}
-        return result
-
     def raw_event_metrics(self, optional_fields: dict | None = None) -> dict:
         if optional_fields is None:
             optional_fields = {}
@@ -0,0 +1,307 @@
+"""Opt-in profiler that records where the time of a graph run goes.
+
+When a graph has a profiler (see `Graph.enable_profiling`), every vertex build records timed spans
+for its phases:
+
+- "vertex": the whole build of the vertex, as scheduled by the graph.
+- "params": resolving the params that come from other vertices.
+- "instantiate": evaluating the component code and creating the component.
+- "resource_wait": waiting for a slot of the component's resource class.
+- "build": building the component results, which contains:
+    - "load_from_db": fetching the `load_from_db` variables.
+    - "component": the component's own build.
+- "log": logging transactions and vertex builds.
+- "events": serializing and sending the build events (recorded by the API).
+
+Vertices that stream messages also report how long the event loop was blocked while they streamed.
+
+The report derives from the spans the scheduling gap of each vertex (the time between its last
+predecessor finishing and its own build starting) and the critical path of the run, and can be
+exported as a summary, a Chrome trace (chrome://tracing, Perfetto) or a speedscope profile.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Literal, get_args
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+    from contextlib import AbstractContextManager
+
+ProfileFormat = Literal["summary", "chrome", "speedscope"]
+PROFILE_FORMATS: tuple[str, ...] = get_args(ProfileFormat)
+VERTEX_PHASE = "vertex"
+
+_TRUTHY_FLAGS = {"1", "true", "yes", "on"}
+_FALSY_FLAGS = {"", "0", "false", "no", "off"}
+
+
+@dataclass(frozen=True)
+class ProfileSpan:
+    vertex_id: str
+    phase: str
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class RunProfiler:
+    """Collects the phase spans of the vertex builds of a run.
+
+    Times come from `time.perf_counter` and are reported relative to the start of the profiler.
+    """
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.spans: list[ProfileSpan] = []
+        self.loop_blocking: dict[str, dict[str, float | int]] = {}
+
+    def reset(self) -> None:
+        """Drops the recorded spans and starts measuring again."""
+        self.started_at = time.perf_counter()
+        self.spans = []
+        self.loop_blocking = {}
+
+    def record(self, vertex_id: str, phase: str, start: float, end: float) -> None:
+        self.spans.append(ProfileSpan(vertex_id, phase, start, end))
+
+    def record_loop_blocking(self, vertex_id: str, metrics: dict[str, float | int]) -> None:
+        """Adds the metrics of a `LoopBlockMonitor` to those of the vertex's other streamed messages."""
+        totals = self.loop_blocking.setdefault(
+            vertex_id, {"loop_blocked_time": 0.0, "max_loop_block": 0.0, "loop_blocks": 0}
+        )
+        totals["loop_blocked_time"] += metrics["loop_blocked_time"]
+        totals["max_loop_block"] = max(totals["max_loop_block"], metrics["max_loop_block"])
+        totals["loop_blocks"] += metrics["loop_blocks"]
+
+    @contextmanager
+    def phase(self, vertex_id: str, phase: str) -> Iterator[None]:
+        """Records the time spent in the block as a span of the vertex, even if the block raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(vertex_id, phase, start, time.perf_counter())
+
+    def _relative(self, value: float) -> float:
+        return value - self.started_at
+
+    def _vertex_spans(self) -> list[ProfileSpan]:
+        return sorted((span for span in self.spans if span.phase == VERTEX_PHASE), key=lambda span: span.start)
+
+    @staticmethod
+    def _ready_at(
+        span: ProfileSpan, vertex_spans: list[ProfileSpan], predecessor_map: Mapping[str, list[str]]
+    ) -> ProfileSpan | None:
+        """Returns the build of a predecessor that finished last before the span started."""
+        predecessors = set(predecessor_map.get(span.vertex_id, []))
+        candidates = [
+            other
+            for other in vertex_spans
+            if other.vertex_id in predecessors and other.end <= span.start and other is not span
+        ]
+        return max(candidates, key=lambda other: other.end, default=None)
+
+    def critical_path(self, predecessor_map: Mapping[str, list[str]]) -> list[ProfileSpan]:
+        """Returns the chain of vertex builds that determined the length of the run.
+
+        Starting from the build that finished last, it walks back through the predecessor whose
+        build finished last before each build started.
+        """
+        vertex_spans = self._vertex_spans()
+        if not vertex_spans:
+            return []
+        current: ProfileSpan | None = max(vertex_spans, key=lambda span: span.end)
+        path: list[ProfileSpan] = []
+        while current is not None and current not in path:
+            path.append(current)
+            current = self._ready_at(current, vertex_spans, predecessor_map)
+        return path[::-1]
+
+    def summary(self, predecessor_map: Mapping[str, list[str]]) -> dict[str, Any]:
+        """Returns the per-vertex phase breakdown, the totals per phase and the critical path, in seconds."""
+        vertex_spans = self._vertex_spans()
+        end = max((span.end for span in self.spans), default=self.started_at)
+        vertices: dict[str, dict[str, Any]] = {}
+        for span in self.spans:
+            entry = vertices.setdefault(
+                span.vertex_id, {"builds": 0, "total_time": 0.0, "scheduling_gap": 0.0, "phases": {}}
+            )
+            if span.phase == VERTEX_PHASE:
+                entry["builds"] += 1
+                entry["total_time"] += span.duration
+                predecessor = self._ready_at(span, vertex_spans, predecessor_map)
+                ready_at = predecessor.end if predecessor is not None else self.started_at
+                entry["scheduling_gap"] += max(span.start - ready_at, 0.0)
+            else:
+                entry["phases"][span.phase] = entry["phases"].get(span.phase, 0.0) + span.duration
+
+        phases: dict[str, float] = {}
+        for span in self.spans:
+            phases[span.phase] = phases.get(span.phase, 0.0) + span.duration
+
+        path = self.critical_path(predecessor_map)
+        return {
+            "total_time": _round(end - self.started_at),
+            "phases": {phase: _round(duration) for phase, duration in phases.items()},
+            "vertices": {
+                vertex_id: {
+                    "builds": entry["builds"],
+                    "total_time": _round(entry["total_time"]),
+                    "scheduling_gap": _round(entry["scheduling_gap"]),
+                    "phases": {phase: _round(duration) for phase, duration in entry["phases"].items()},
+                    **({"loop_blocking": self._loop_blocking(vertex_id)} if vertex_id in self.loop_blocking else {}),
+                }
+                for vertex_id, entry in vertices.items()
+            },
+            "critical_path": {
+                "vertices": [span.vertex_id for span in path],
+                "duration": _round(path[-1].end - self.started_at) if path else 0.0,
+                "build_time": _round(sum(span.duration for span in path)),
+            },
+        }
+
+    def _loop_blocking(self, vertex_id: str) -> dict[str, float | int]:
+        totals = self.loop_blocking[vertex_id]
+        return {
+            "loop_blocked_time": _round(totals["loop_blocked_time"]),
+            "max_loop_block": _round(totals["max_loop_block"]),
+            "loop_blocks": totals["loop_blocks"],
+        }
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Returns the spans in the Chrome trace event format, with one thread per vertex."""
+        thread_ids: dict[str, int] = {}
+        events: list[dict[str, Any]] = []
+        for span in sorted(self.spans, key=lambda span: (span.start, -span.end)):
+            if span.vertex_id not in thread_ids:
+                thread_ids[span.vertex_id] = len(thread_ids) + 1
+                events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": 1,
+                        "tid": thread_ids[span.vertex_id],
+                        "args": {"name": span.vertex_id},
+                    }
+                )
+            events.append(
+                {
+                    "name": span.phase,
+                    "cat": "vertex",
+                    "ph": "X",
+                    "ts": round(self._relative(span.start) * 1_000_000, 3),
+                    "dur": round(span.duration * 1_000_000, 3),
+                    "pid": 1,
+                    "tid": thread_ids[span.vertex_id],
+                    "args": {"vertex_id": span.vertex_id},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_speedscope(self, name: str = "Graph run") -> dict[str, Any]:
+        """Returns the spans as a speedscope file with one evented profile per vertex, in milliseconds."""
+        frames: list[dict[str, str]] = []
+        frame_indexes: dict[str, int] = {}
+        spans_by_vertex: dict[str, list[ProfileSpan]] = {}
+        for span in self.spans:
+            spans_by_vertex.setdefault(span.vertex_id, []).append(span)
+            if span.phase not in frame_indexes:
+                frame_indexes[span.phase] = len(frames)
+                frames.append({"name": span.phase})
+
+        end = max((span.end for span in self.spans), default=self.started_at)
+        profiles = []
+        for vertex_id, spans in spans_by_vertex.items():
+            profiles.append(
+                {
+                    "type": "evented",
+                    "name": vertex_id,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": _to_ms(self._relative(end)),
+                    "events": self._speedscope_events(spans, frame_indexes),
+                }
+            )
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "wfx",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def _speedscope_events(self, spans: list[ProfileSpan], frame_indexes: dict[str, int]) -> list[dict[str, Any]]:
+        """Turns the spans of a vertex into open and close events that are always properly nested."""
+        events: list[dict[str, Any]] = []
+        # Each entry is the frame index and the time it closes at
+        stack: list[tuple[int, float]] = []
+
+        def close_until(at: float) -> None:
+            while stack and stack[-1][1] <= at:
+                frame, closes_at = stack.pop()
+                events.append({"type": "C", "frame": frame, "at": _to_ms(self._relative(closes_at))})
+
+        for span in sorted(spans, key=lambda span: (span.start, -span.end)):
+            close_until(span.start)
+            # A span outliving the one it started in is clipped to it
+            end = min(span.end, stack[-1][1]) if stack else span.end
+            frame = frame_indexes[span.phase]
+            events.append({"type": "O", "frame": frame, "at": _to_ms(self._relative(span.start))})
+            stack.append((frame, end))
+        close_until(float("inf"))
+        return events
+
+    def export(self, profile_format: ProfileFormat, predecessor_map: Mapping[str, list[str]]) -> dict[str, Any]:
+        if profile_format == "summary":
+            return self.summary(predecessor_map)
+        if profile_format == "chrome":
+            return self.to_chrome_trace()
+        if profile_format == "speedscope":
+            return self.to_speedscope()
+        msg = f"Unknown profile format '{profile_format}'. Expected one of: {', '.join(PROFILE_FORMATS)}"
+        raise ValueError(msg)
+
+
+def _round(value: float) -> float:
+    return round(value, 6)
+
+
+def _to_ms(value: float) -> float:
+    return round(value * 1000, 3)
+
+
+def profile_phase(graph: Any, vertex_id: str, phase: str) -> AbstractContextManager[None]:
+    """Times the block as a phase of the vertex when the graph is being profiled, and does nothing otherwise."""
+    profiler = getattr(graph, "profiler", None)
+    if not isinstance(profiler, RunProfiler):
+        return nullcontext()
+    return profiler.phase(vertex_id, phase)
+
+
+def parse_profile_format(value: str | None) -> ProfileFormat | None:
+    """Parses a profiling flag from a header or query param.
+
+    Boolean-like values turn profiling on with the summary format or off, and format names pick
+    the format.
+
+    Raises:
+        ValueError: If the value is neither a boolean nor a profile format.
+    """
+    if value is None:
+        return None
+    normalized = value.strip().lower()
+    if normalized in _FALSY_FLAGS:
+        return None
+    if normalized in _TRUTHY_FLAGS:
+        return "summary"
+    if normalized in PROFILE_FORMATS:
+        return normalized  # type: ignore[return-value]
+    msg = f"Invalid profile value '{value}'. Expected a boolean or one of: {', '.join(PROFILE_FORMATS)}"
+    raise ValueError(msg)
@@ -0,0 +1,114 @@
+"""Limits on how many vertices of a resource class build at the same time.
+
+Components declare the resource their build consumes with the `resource_class` attribute
+(e.g. "llm", "embedding", "http" or "cpu"), and a node can override it with a `resource_class`
+key in its data. Every runnable vertex still gets its own task, but before a vertex builds its
+component it takes a slot of its resource class: first from its flow's limiter, then from the
+worker-wide limiter configured with the `resource_class_limits` setting. Resource classes without
+a limit are never queued.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+
+class ResourceLimiter:
+    """Named semaphores bounding how many builds of each resource class run at the same time.
+
+    Semaphores are created lazily and per event loop, so one limiter can be shared by graphs that
+    run on different loops (e.g. the worker-wide limiter in tests or in threads).
+    """
+
+    def __init__(self, limits: dict[str, int] | None = None) -> None:
+        self._lock = threading.Lock()
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._limits: dict[str, int] = {}
+        self.set_limits(limits or {})
+
+    @property
+    def limits(self) -> dict[str, int]:
+        return dict(self._limits)
+
+    def set_limits(self, limits: dict[str, int]) -> None:
+        """Replaces the limits. Builds already holding a slot keep it; new builds use the new limits."""
+        for resource_class, limit in limits.items():
+            if not isinstance(limit, int) or limit < 1:
+                msg = f"The limit of resource class '{resource_class}' must be a positive integer. Got {limit!r}"
+                raise ValueError(msg)
+        with self._lock:
+            self._limits = dict(limits)
+            self._semaphores = weakref.WeakKeyDictionary()
+
+    def _get_semaphore(self, resource_class: str) -> asyncio.Semaphore | None:
+        limit = self._limits.get(resource_class)
+        if limit is None:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._semaphores.setdefault(loop, {})
+            if resource_class not in semaphores:
+                semaphores[resource_class] = asyncio.Semaphore(limit)
+            return semaphores[resource_class]
+
+    @asynccontextmanager
+    async def slot(self, resource_class: str | None) -> AsyncIterator[None]:
+        """Waits for a free slot of the resource class and holds it until the block exits."""
+        semaphore = self._get_semaphore(resource_class) if resource_class else None
+        if semaphore is None:
+            yield
+            return
+        async with semaphore:
+            yield
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"limits": self._limits}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self._lock = threading.Lock()
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._limits = dict(state["limits"])
+
+
+@asynccontextmanager
+async def resource_slot(resource_class: str | None, *limiters: ResourceLimiter) -> AsyncIterator[None]:
+    """Holds a slot of the resource class in every limiter, acquired in the order given."""
+    if not resource_class:
+        yield
+        return
+    async with AsyncExitStack() as stack:
+        for limiter in limiters:
+            await stack.enter_async_context(limiter.slot(resource_class))
+        yield
+
+
+def _get_configured_limits() -> dict[str, int]:
+    from wfx.services.deps import get_settings_service
+
+    settings_service = get_settings_service()
+    if settings_service is None:
+        return {}
+    return dict(getattr(settings_service.settings, "resource_class_limits", {}) or {})
+
+
+_resource_limiter: ResourceLimiter | None = None
+_resource_limiter_lock = threading.Lock()
+
+
+def get_resource_limiter() -> ResourceLimiter:
+    """Returns the worker-wide resource limiter, creating it from the settings on first use."""
+    global _resource_limiter  # noqa: PLW0603
+    if _resource_limiter is None:
+        with _resource_limiter_lock:
+            if _resource_limiter is None:
+                _resource_limiter = ResourceLimiter(_get_configured_limits())
+    return _resource_limiter
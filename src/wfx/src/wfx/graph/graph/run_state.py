@@ -0,0 +1,81 @@
+"""Compact run state snapshots used to cache a graph between build requests.
+
+Caching a whole `Graph` means serializing every vertex, edge and built object each time the
+cache is written, which dominates the latency of a step for large flows when the cache backend
+pickles its values. A snapshot from `Graph.get_run_state` only holds the run manager state, the
+vertex states and the IDs of the built vertices, whose results `Graph.build_vertex` already caches
+one entry per vertex. The graph itself is kept once per process in the graph template cache.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from wfx.graph.graph.template_cache import GraphTemplateCache, get_graph_template_cache
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from wfx.graph.graph.base import Graph
+    from wfx.graph.graph.template_cache import GraphTemplateKey
+    from wfx.services.chat.schema import GetCache
+
+RUN_STATE_VERSION = 1
+
+
+def is_run_state(data: Any) -> bool:
+    """Returns True if data is a snapshot from `Graph.get_run_state`."""
+    return isinstance(data, dict) and data.get("run_state_version") == RUN_STATE_VERSION
+
+
+def _template_key(flow_id: str | None, graph_data_hash: str) -> GraphTemplateKey:
+    return GraphTemplateCache.make_key(str(flow_id), graph_data_hash)
+
+
+def snapshot_graph(graph: Graph) -> dict[str, Any]:
+    """Returns the run state of the graph, keeping a template of it so the graph can be restored.
+
+    The template is a clean copy of the graph, stored once per flow data in this process.
+    """
+    run_state = graph.get_run_state()
+    template_cache = get_graph_template_cache()
+    key = _template_key(graph.flow_id, run_state["graph_data_hash"])
+    if key not in template_cache:
+        template_cache.set(key, graph.clone_for_run())
+    return run_state
+
+
+async def restore_graph(
+    run_state: dict[str, Any],
+    get_cache: GetCache,
+    load_graph: Callable[[], Awaitable[Graph | None]] | None = None,
+) -> Graph | None:
+    """Rebuilds the graph a snapshot from `snapshot_graph` was taken from.
+
+    The graph is cloned from the template cache, or from `load_graph` when this process has no
+    template for the flow data (for instance when the snapshot was written by another worker).
+    Built vertices get their results back from their own cache entries.
+
+    Args:
+        run_state: The snapshot.
+        get_cache: The coroutine used to read the cached vertex results.
+        load_graph: An optional coroutine that builds the graph from the stored flow.
+
+    Returns:
+        Graph | None: The restored graph, or None if no graph built from the same flow data is
+        available.
+    """
+    template_cache = get_graph_template_cache()
+    key = _template_key(run_state["flow_id"], run_state["graph_data_hash"])
+    template = template_cache.get(key)
+    if template is None:
+        if load_graph is None:
+            return None
+        template = await load_graph()
+        if template is None or template.graph_data_hash != run_state["graph_data_hash"]:
+            return None
+        template_cache.set(key, template)
+    graph = template.clone_for_run(user_id=run_state["user_id"])
+    graph.apply_run_state(run_state)
+    await graph.restore_vertex_results(run_state["built_vertices"], get_cache)
+    return graph
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+import orjson
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from datetime import datetime
+
+    from wfx.graph.graph.base import Graph
+
+DEFAULT_GRAPH_TEMPLATE_CACHE_SIZE = 64
+
+GraphTemplateKey = tuple[str, str, str]
+
+
+class GraphTemplateCache:
+    """A per-process LRU cache of graphs built from stored flows.
+
+    Building a graph from a flow payload processes group nodes, parses every vertex, validates every
+    edge and creates the components. For a given flow version and set of tweaks the result is always
+    the same, so the built graph is kept as a template and every run gets a cheap copy of it from
+    `Graph.clone_for_run`.
+
+    Templates are keyed by the flow id, the flow's `updated_at` timestamp and a hash of the tweaks
+    (and streaming flag), so saving the flow or sending different tweaks never returns a stale graph.
+
+    Attributes:
+        max_size (int): Maximum number of templates to keep. 0 disables the cache.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that had to build the graph.
+        evictions (int): Number of templates dropped to honour max_size.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_GRAPH_TEMPLATE_CACHE_SIZE) -> None:
+        self._cache: OrderedDict[GraphTemplateKey, Graph] = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        flow_id: str, updated_at: datetime | str, tweaks: dict[str, Any] | None = None, *, stream: bool = False
+    ) -> GraphTemplateKey:
+        """Builds the cache key for a flow version, a set of tweaks and the streaming flag."""
+        tweaks_bytes = orjson.dumps([tweaks or {}, stream], option=orjson.OPT_SORT_KEYS, default=str)
+        version = updated_at if isinstance(updated_at, str) else updated_at.isoformat()
+        return str(flow_id), version, hashlib.sha256(tweaks_bytes).hexdigest()
+
+    def get(self, key: GraphTemplateKey) -> Graph | None:
+        """Returns the template stored under key, or None if it is not cached."""
+        with self._lock:
+            graph = self._cache.get(key)
+            if graph is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return graph
+
+    def set(self, key: GraphTemplateKey, graph: Graph) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._cache[key] = graph
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_build(self, key: GraphTemplateKey, build: Callable[[], Graph]) -> Graph:
+        """Returns the cached template for key, building and storing it with `build` on a miss.
+
+        The returned graph is shared and must not be run; use `Graph.clone_for_run` on it.
+        """
+        if (graph := self.get(key)) is not None:
+            return graph
+        graph = build()
+        self.set(key, graph)
+        return graph
+
+    def invalidate_flow(self, flow_id: str) -> None:
+        """Drops every template built from the given flow."""
+        flow_id = str(flow_id)
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == flow_id]:
+                del self._cache[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, key: GraphTemplateKey) -> bool:
+        return key in self._cache
+
+
+def _get_configured_cache_size() -> int:
+    from wfx.services.deps import get_settings_service
+
+    settings_service = get_settings_service()
+    if settings_service is None:
+        return DEFAULT_GRAPH_TEMPLATE_CACHE_SIZE
+    return getattr(settings_service.settings, "graph_template_cache_size", DEFAULT_GRAPH_TEMPLATE_CACHE_SIZE)
+
+
+_graph_template_cache: GraphTemplateCache | None = None
+_graph_template_cache_lock = threading.Lock()
+
+
+def get_graph_template_cache() -> GraphTemplateCache:
+    """Returns the process-wide graph template cache, creating it on first use."""
+    global _graph_template_cache  # noqa: PLW0603
+    if _graph_template_cache is None:
+        with _graph_template_cache_lock:
+            if _graph_template_cache is None:
+                _graph_template_cache = GraphTemplateCache(max_size=_get_configured_cache_size())
+    return _graph_template_cache
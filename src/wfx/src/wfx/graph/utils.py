@@ -201,9 +201,6 @@ async def log_vertex_build(
             if isinstance(flow_id, str):
                 flow_id = UUID(flow_id)
 
-            from primeagent.services.database.models.vertex_builds.crud import (
-                log_vertex_build as crud_log_vertex_build,
-            )
             from primeagent.services.database.models.vertex_builds.model import VertexBuildBase
 
             # Convert data to dict if it's a pydantic model
@@ -234,8 +231,8 @@ async def log_vertex_build(
             if db_service is None:
                 return
 
-            async with db_service._with_session() as session:  # noqa: SLF001
-                await crud_log_vertex_build(session, vertex_build)
+            # Written behind the build, in batches
+            db_service.vertex_build_writer.add(vertex_build)
 
         except ImportError:
             # Fallback for standalone wfx usage (without primeagent)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import copy
 import inspect
+import time
 import traceback
 import types
 from collections.abc import AsyncIterator, Callable, Iterator, Mapping
@@ -107,6 +109,7 @@ class Vertex:
 
         self.use_result = False
         self.build_times: list[float] = []
+        self.queue_wait_time: float | None = None
         self.state = VertexStates.ACTIVE
         self.output_names: list[str] = [
             output["name"] for output in self.outputs if isinstance(output, dict) and "name" in output
@@ -195,18 +198,19 @@ class Vertex:
     @property
     def outgoing_edges(self) -> list[CycleEdge]:
         if self._outgoing_edges is None:
-            self._outgoing_edges = [edge for edge in self.edges if edge.source_id == self.id]
+            self._outgoing_edges = self.graph.get_vertex_edges(self.id, is_target=False)
         return self._outgoing_edges
 
     @property
     def incoming_edges(self) -> list[CycleEdge]:
         if self._incoming_edges is None:
-            self._incoming_edges = [edge for edge in self.edges if edge.target_id == self.id]
+            self._incoming_edges = self.graph.get_vertex_edges(self.id, is_source=False)
         return self._incoming_edges
 
     # Get edge connected to an output of a certain name
     def get_incoming_edge_by_target_param(self, target_param: str) -> str | None:
-        return next((edge.source_id for edge in self.incoming_edges if edge.target_param == target_param), None)
+        edges = self.graph.get_edges_by_target_param(self.id, target_param)
+        return edges[0].source_id if edges else None
 
     @property
     def edges_source_names(self) -> set[str | None]:
@@ -237,6 +241,51 @@ class Vertex:
         self.built_object = state.get("built_object") or UnbuiltObject()
         self.built_result = state.get("built_result") or UnbuiltResult()
 
+    def clone_for_graph(self, graph: Graph) -> Vertex:
+        """Returns a copy of this vertex bound to `graph`, with a clean run state.
+
+        The parsed node data (outputs, input types, display data) is shared with this vertex. The
+        template gets its own copy because params are built from its values, which components may
+        modify in place. Params and the component instance are left empty so the new graph can
+        rebuild them against its own vertices.
+        """
+        node = self.data["node"]
+        data = {**self.data, "node": {**node, "template": copy.deepcopy(node["template"])}}
+        new_vertex = object.__new__(type(self))
+        new_vertex.__dict__.update(
+            self.__dict__,
+            graph=graph,
+            data=data,
+            full_data={**self.full_data, "data": data},
+            _lock=None,
+            steps_ran=[],
+            custom_component=None,
+            params={},
+            raw_params={},
+            updated_raw_params=False,
+            load_from_db_fields=[],
+            built_object=UnbuiltObject(),
+            built_result=None,
+            built=False,
+            will_stream=False,
+            artifacts={},
+            artifacts_raw={},
+            artifacts_type={},
+            result=None,
+            results={},
+            outputs_logs={},
+            logs={},
+            build_times=[],
+            queue_wait_time=None,
+            state=VertexStates.ACTIVE,
+            task_id=None,
+            _successors_ids=None,
+            _incoming_edges=None,
+            _outgoing_edges=None,
+        )
+        new_vertex.steps = [types.MethodType(step.__func__, new_vertex) for step in self.steps]
+        return new_vertex
+
     def set_top_level(self, top_level_vertices: list[str]) -> None:
         self.parent_is_top_level = self.parent_node_id in top_level_vertices
 
@@ -256,6 +305,8 @@ class Vertex:
 
         self.description: str = self.data["node"].get("description", "")
         self.frozen: bool = self.data["node"].get("frozen", False)
+        self.cache_results: bool = self.data["node"].get("cache_results", False)
+        self.resource_class_override: str | None = self.data["node"].get("resource_class")
 
         self.is_input = self.data["node"].get("is_input") or self.is_input
         self.is_output = self.data["node"].get("is_output") or self.is_output
@@ -393,27 +444,40 @@ class Vertex:
     ) -> None:
         """Initiate the build process."""
         await logger.adebug(f"Building {self.display_name}")
-        await self._build_each_vertex_in_params_dict()
+        with self.graph.profile_phase(self.id, "params"):
+            await self._build_each_vertex_in_params_dict()
         if self.base_type is None:
             msg = f"Base type for vertex {self.display_name} not found"
             raise ValueError(msg)
 
         if not self.custom_component:
-            custom_component, custom_params = initialize.loading.instantiate_class(
-                user_id=user_id, vertex=self, event_manager=event_manager
-            )
+            with self.graph.profile_phase(self.id, "instantiate"):
+                custom_component, custom_params = initialize.loading.instantiate_class(
+                    user_id=user_id, vertex=self, event_manager=event_manager
+                )
         else:
             custom_component = self.custom_component
             if hasattr(self.custom_component, "set_event_manager"):
                 self.custom_component.set_event_manager(event_manager)
             custom_params = initialize.loading.get_params(self.params)
 
-        await self._build_results(
-            custom_component=custom_component,
-            custom_params=custom_params,
-            fallback_to_env_vars=fallback_to_env_vars,
-            base_type=self.base_type,
-        )
+        resource_class = self.resource_class_override or getattr(custom_component, "resource_class", None)
+        queued_at = time.perf_counter()
+        async with self.graph.resource_slot(resource_class):
+            self.queue_wait_time = time.perf_counter() - queued_at
+            if resource_class:
+                await logger.adebug(
+                    f"Vertex {self.id} waited {self.queue_wait_time:.3f}s for a '{resource_class}' slot"
+                )
+                if self.graph.profiler is not None:
+                    self.graph.profiler.record(self.id, "resource_wait", queued_at, queued_at + self.queue_wait_time)
+            with self.graph.profile_phase(self.id, "build"):
+                await self._build_results(
+                    custom_component=custom_component,
+                    custom_params=custom_params,
+                    fallback_to_env_vars=fallback_to_env_vars,
+                    base_type=self.base_type,
+                )
 
         self._validate_built_object()
 
@@ -473,9 +537,24 @@ class Vertex:
             messages=messages,
             component_display_name=self.display_name,
             component_id=self.id,
+            queue_wait_time=self.queue_wait_time,
         )
         self.set_result(result_dict)
 
+    def restore_build_result(self, cached_vertex_dict: dict[str, Any]) -> None:
+        """Restores a build result cached by `Graph.build_vertex` and finalizes the build.
+
+        Raises:
+            KeyError: If the cached result is missing a field.
+        """
+        self.built = cached_vertex_dict["built"]
+        self.artifacts = cached_vertex_dict["artifacts"]
+        self.built_object = cached_vertex_dict["built_object"]
+        self.built_result = cached_vertex_dict["built_result"]
+        self.full_data = cached_vertex_dict["full_data"]
+        self.results = cached_vertex_dict["results"]
+        self.finalize_build()
+
     async def _build_each_vertex_in_params_dict(self) -> None:
         """Iterates over each vertex in the params dictionary and builds it."""
         for key, value in self.raw_params.items():
@@ -698,6 +777,7 @@ class Vertex:
         self.built_result = UnbuiltResult()
         self.artifacts = {}
         self.steps_ran = []
+        self.queue_wait_time = None
         self.build_params()
 
     def _is_chat_input(self) -> bool:
@@ -781,9 +861,10 @@ class Vertex:
                     outputs_dict = {
                         k: v.model_dump() if hasattr(v, "model_dump") else v for k, v in self.outputs_logs.items()
                     }
-                await self._log_transaction_async(
-                    str(flow_id), source=self, target=None, status="success", outputs=outputs_dict
-                )
+                with self.graph.profile_phase(self.id, "log"):
+                    await self._log_transaction_async(
+                        str(flow_id), source=self, target=None, status="success", outputs=outputs_dict
+                    )
 
         return await self.get_requester_result(requester)
 
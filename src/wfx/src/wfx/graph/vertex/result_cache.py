@@ -0,0 +1,315 @@
+"""A persistent cache of vertex results keyed by what the vertex is built from.
+
+The key of a vertex is a hash of its code, its resolved parameters, the results of the vertices
+connected to it, the run inputs and the user. A vertex opted in to the cache is only built when
+no result is stored under its key, so expensive deterministic steps such as parsing documents or
+computing embeddings are skipped while their inputs are unchanged, across runs, restarts and
+workers depending on the store.
+
+Values the key can't be computed from reliably (iterators, live clients, arbitrary objects) make
+the vertex uncacheable for that build instead of risking a stale result.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import threading
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+import orjson
+from pydantic import BaseModel
+
+from wfx.log.logger import logger
+from wfx.schema.message import Message
+from wfx.services.cache.result_store import DiskResultStore, MemoryResultStore, RedisResultStore, ResultStore
+from wfx.services.deps import get_settings_service, get_variable_service, session_scope
+from wfx.services.session import NoopSession
+
+if TYPE_CHECKING:
+    from wfx.graph.vertex.base import Vertex
+
+RESULT_CACHE_VERSION = 1
+
+DEFAULT_RESULT_CACHE_TTL = 24 * 60 * 60
+DEFAULT_RESULT_CACHE_MAX_SIZE = 256 * 1024 * 1024
+
+# Message fields that change on every build without changing what downstream components see
+_VOLATILE_MESSAGE_FIELDS = {"id", "timestamp", "flow_id"}
+
+
+class UncacheableValueError(ValueError):
+    """Raised when a value can't be reduced to a stable fingerprint."""
+
+
+def fingerprint_value(value: Any) -> Any:
+    """Reduces a value to JSON-serializable data that only depends on its content.
+
+    Raises:
+        UncacheableValueError: If the value has no stable representation.
+    """
+    if value is None or isinstance(value, str | bool | int | float):
+        return value
+    if isinstance(value, bytes):
+        return {"__bytes__": hashlib.sha256(value).hexdigest()}
+    if isinstance(value, list | tuple):
+        return [fingerprint_value(item) for item in value]
+    if isinstance(value, set | frozenset):
+        return sorted((fingerprint_value(item) for item in value), key=orjson.dumps)
+    if isinstance(value, dict):
+        return {str(key): fingerprint_value(item) for key, item in value.items()}
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, UUID | Path):
+        return str(value)
+    if isinstance(value, Enum):
+        return fingerprint_value(value.value)
+    if isinstance(value, Message):
+        # The serializer of Data adds the fields back, so `exclude` can't drop them
+        message_data = value.model_dump()
+        # Messages also mirror their fields in `data`
+        for fields in (message_data, message_data.get("data")):
+            if isinstance(fields, dict):
+                for key in _VOLATILE_MESSAGE_FIELDS:
+                    fields.pop(key, None)
+        return {"__type__": "Message", "data": fingerprint_value(message_data)}
+    if isinstance(value, BaseModel):
+        return {"__type__": type(value).__qualname__, "data": fingerprint_value(value.model_dump())}
+    if hasattr(value, "to_json") and hasattr(value, "columns"):
+        # pandas DataFrames, including wfx's DataFrame
+        return {"__type__": type(value).__qualname__, "data": value.to_json(orient="split", date_format="iso")}
+    msg = f"Can't fingerprint a value of type {type(value).__qualname__}"
+    raise UncacheableValueError(msg)
+
+
+def _fingerprint_upstream(vertex: Vertex) -> Any:
+    if not vertex.built:
+        msg = f"Vertex {vertex.id} has not been built"
+        raise UncacheableValueError(msg)
+    return {"__vertex__": fingerprint_value(vertex.results)}
+
+
+def _fingerprint_param(value: Any) -> Any:
+    from wfx.graph.vertex.base import Vertex
+
+    if isinstance(value, Vertex):
+        return _fingerprint_upstream(value)
+    if isinstance(value, list) and value and all(isinstance(item, Vertex) for item in value):
+        return [_fingerprint_upstream(item) for item in value]
+    if isinstance(value, dict) and any(isinstance(item, Vertex) for item in value.values()):
+        return {key: _fingerprint_param(item) for key, item in value.items()}
+    return fingerprint_value(value)
+
+
+def _fingerprint_file(path: Any) -> Any:
+    """Adds the size and modification time of local files, so replacing a file changes the key."""
+    if isinstance(path, list):
+        return [_fingerprint_file(item) for item in path]
+    if not isinstance(path, str) or not path:
+        return path
+    try:
+        stat = Path(path).stat()
+    except (OSError, ValueError):
+        return path
+    return [path, stat.st_size, stat.st_mtime_ns]
+
+
+async def _fingerprint_variables(vertex: Vertex, user_id: str | None, *, fallback_to_env_vars: bool) -> dict[str, Any]:
+    """Hashes the values of the vertex's load_from_db fields, whose parameters only name the variables.
+
+    The values are resolved as `update_params_with_load_from_db_fields` resolves them for the build,
+    so updating a variable changes the key.
+    """
+    fingerprints: dict[str, Any] = {}
+    if not vertex.load_from_db_fields:
+        return fingerprints
+    context = getattr(vertex.graph, "context", None) or {}
+    request_variables = context.get("request_variables") or {}
+    async with session_scope() as session:
+        settings_service = get_settings_service()
+        is_noop_session = isinstance(session, NoopSession) or (
+            settings_service and settings_service.settings.use_noop_database
+        )
+        for field in vertex.load_from_db_fields:
+            if field.startswith("table:"):
+                msg = f"Variables of table field {field[6:]} are not resolved for the key"
+                raise UncacheableValueError(msg)
+            name = vertex.raw_params.get(field)
+            if not name:
+                continue
+            if name in request_variables:
+                value = request_variables[name]
+            elif is_noop_session:
+                value = os.getenv(name)
+            else:
+                if not user_id:
+                    msg = f"Variable {name} can't be resolved without a user"
+                    raise UncacheableValueError(msg)
+                try:
+                    value = await get_variable_service().get_variable(
+                        user_id=UUID(str(user_id)), name=name, field=field, session=session
+                    )
+                except ValueError:
+                    value = None
+                if value is None and fallback_to_env_vars:
+                    value = os.getenv(name)
+            fingerprints[field] = None if value is None else hashlib.sha256(str(value).encode()).hexdigest()
+    return fingerprints
+
+
+class VertexResultCache:
+    """Stores vertex build results under a hash of the vertex's inputs.
+
+    Attributes:
+        store (ResultStore): Where the serialized results are kept.
+        ttl (float | None): Seconds after which stored results expire. None keeps them until evicted.
+        component_types (set[str]): Component types whose vertices use the cache without being opted
+            in one by one.
+    """
+
+    def __init__(
+        self,
+        store: ResultStore | None = None,
+        ttl: float | None = DEFAULT_RESULT_CACHE_TTL,
+        component_types: set[str] | None = None,
+    ) -> None:
+        self.store = store or MemoryResultStore()
+        self.ttl = ttl or None
+        self.component_types = component_types or set()
+        self.uncacheable = 0
+
+    def is_enabled_for(self, vertex: Vertex) -> bool:
+        """Returns True if the vertex is opted in with `cache_results` or by its component type."""
+        if vertex.is_loop or vertex.display_name == "Loop" or not vertex.is_active():
+            return False
+        return vertex.cache_results or vertex.id.split("-", maxsplit=1)[0] in self.component_types
+
+    async def make_key(
+        self,
+        vertex: Vertex,
+        *,
+        user_id: str | None = None,
+        inputs: dict[str, Any] | None = None,
+        files: list[str] | None = None,
+        fallback_to_env_vars: bool = False,
+    ) -> str | None:
+        """Returns the cache key of the vertex, or None if its inputs can't be fingerprinted.
+
+        The run inputs only take part in the key of the vertices that read them: chat inputs get the
+        input value and files, and vertices with a session ID get the session. The values of the
+        variables the vertex loads are hashed into the key, not only their names.
+        """
+        template = vertex.data["node"]["template"]
+        code_field = template.get("code")
+        if vertex.is_input:
+            run_inputs = {"inputs": inputs or {}, "files": files or []}
+        elif vertex.has_session_id:
+            run_inputs = {"session": (inputs or {}).get("session")}
+        else:
+            run_inputs = {}
+        try:
+            params = {}
+            for key, value in vertex.raw_params.items():
+                field = template.get(key)
+                if isinstance(field, dict) and field.get("type") == "file":
+                    params[key] = _fingerprint_file(value)
+                else:
+                    params[key] = _fingerprint_param(value)
+            key_data = {
+                "version": RESULT_CACHE_VERSION,
+                "vertex_type": vertex.vertex_type,
+                "code": code_field.get("value") if isinstance(code_field, dict) else None,
+                "params": params,
+                "variables": await _fingerprint_variables(vertex, user_id, fallback_to_env_vars=fallback_to_env_vars),
+                "run_inputs": fingerprint_value(run_inputs),
+                "user_id": str(user_id) if user_id else None,
+            }
+            key_bytes = orjson.dumps(key_data, option=orjson.OPT_SORT_KEYS)
+        except (UncacheableValueError, TypeError, orjson.JSONEncodeError) as exc:
+            self.uncacheable += 1
+            logger.debug(f"Not caching the result of {vertex.id}: {exc}")
+            return None
+        return hashlib.sha256(key_bytes).hexdigest()
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        """Returns the cached build result stored under key, in the format `Vertex.restore_build_result` takes."""
+        data = await self.store.get(key)
+        if data is None:
+            return None
+        try:
+            return pickle.loads(data)  # noqa: S301
+        except Exception:  # noqa: BLE001
+            logger.debug("Discarding a vertex result that can't be loaded", exc_info=True)
+            await self.store.delete(key)
+            return None
+
+    async def set(self, key: str, vertex: Vertex) -> bool:
+        """Stores the build result of the vertex under key. Returns False if it can't be serialized."""
+        # full_data is the vertex's own data, which the key already pins down
+        result = {
+            "built": vertex.built,
+            "results": vertex.results,
+            "artifacts": vertex.artifacts,
+            "built_object": vertex.built_object,
+            "built_result": vertex.built_result,
+        }
+        try:
+            data = pickle.dumps(result)
+        except Exception:  # noqa: BLE001
+            self.uncacheable += 1
+            logger.debug(f"Not caching the result of {vertex.id}: it can't be pickled", exc_info=True)
+            return False
+        await self.store.set(key, data, ttl=self.ttl)
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.store.stats(), "uncacheable": self.uncacheable}
+
+
+def _create_configured_cache() -> VertexResultCache:
+    settings_service = get_settings_service()
+    if settings_service is None:
+        return VertexResultCache()
+    settings = settings_service.settings
+    backend = getattr(settings, "vertex_result_cache_backend", "memory")
+    max_size = getattr(settings, "vertex_result_cache_max_size", DEFAULT_RESULT_CACHE_MAX_SIZE)
+    store: ResultStore
+    if backend == "disk":
+        directory = getattr(settings, "vertex_result_cache_dir", None) or Path(settings.config_dir) / "vertex_results"
+        store = DiskResultStore(directory, max_size_bytes=max_size)
+    elif backend == "redis":
+        url = settings.redis_url or f"redis://{settings.redis_host}:{settings.redis_port}/{settings.redis_db}"
+        store = RedisResultStore(url)
+    else:
+        store = MemoryResultStore(max_size_bytes=max_size)
+    return VertexResultCache(
+        store,
+        ttl=getattr(settings, "vertex_result_cache_ttl", DEFAULT_RESULT_CACHE_TTL),
+        component_types=set(getattr(settings, "vertex_result_cache_components", [])),
+    )
+
+
+_vertex_result_cache: VertexResultCache | None = None
+_vertex_result_cache_lock = threading.Lock()
+
+
+def get_vertex_result_cache() -> VertexResultCache:
+    """Returns the process-wide vertex result cache, creating it from the settings on first use."""
+    global _vertex_result_cache  # noqa: PLW0603
+    if _vertex_result_cache is None:
+        with _vertex_result_cache_lock:
+            if _vertex_result_cache is None:
+                _vertex_result_cache = _create_configured_cache()
+    return _vertex_result_cache
+
+
+def set_vertex_result_cache(cache: VertexResultCache | None) -> None:
+    """Replaces the process-wide vertex result cache. Passing None rebuilds it from the settings on next use."""
+    global _vertex_result_cache  # noqa: PLW0603
+    with _vertex_result_cache_lock:
+        _vertex_result_cache = cache
@@ -24,6 +24,7 @@ from wfx.utils.util import unescape_string
 
 if TYPE_CHECKING:
     from wfx.graph.edge.base import CycleEdge
+    from wfx.graph.graph.base import Graph
     from wfx.graph.vertex.schema import NodeData
     from wfx.inputs.inputs import InputTypes
 
@@ -195,6 +196,7 @@ class ComponentVertex(Vertex):
             messages=messages,
             component_display_name=self.display_name,
             component_id=self.id,
+            queue_wait_time=self.queue_wait_time,
         )
         self.set_result(result_dict)
 
@@ -206,6 +208,11 @@ class InterfaceVertex(ComponentVertex):
         self.steps = [self._build, self._run]
         self.is_interface_component = True
 
+    def clone_for_graph(self, graph: Graph) -> InterfaceVertex:
+        new_vertex = super().clone_for_graph(graph)
+        new_vertex.added_message = None
+        return new_vertex
+
     def build_stream_url(self) -> str:
         return f"/api/v1/build/{self.graph.flow_id}/{self.id}/stream"
 
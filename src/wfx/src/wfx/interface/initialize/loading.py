@@ -9,6 +9,7 @@ import orjson
 from pydantic import PydanticDeprecatedSince20
 
 from wfx.custom.eval import eval_custom_component_code
+from wfx.graph.graph.profiler import profile_phase
 from wfx.log.logger import logger
 from wfx.schema.artifact import get_artifact_type, post_process_raw
 from wfx.schema.data import Data
@@ -62,13 +63,14 @@ async def get_instance_results(
     fallback_to_env_vars: bool = False,
     base_type: str = "component",
 ):
-    custom_params = await update_params_with_load_from_db_fields(
-        custom_component,
-        custom_params,
-        vertex.load_from_db_fields,
-        fallback_to_env_vars=fallback_to_env_vars,
-    )
-    with warnings.catch_warnings():
+    with profile_phase(vertex.graph, vertex.id, "load_from_db"):
+        custom_params = await update_params_with_load_from_db_fields(
+            custom_component,
+            custom_params,
+            vertex.load_from_db_fields,
+            fallback_to_env_vars=fallback_to_env_vars,
+        )
+    with warnings.catch_warnings(), profile_phase(vertex.graph, vertex.id, "component"):
         warnings.filterwarnings("ignore", category=PydanticDeprecatedSince20)
         if base_type == "custom_components":
             return await build_custom_component(params=custom_params, custom_component=custom_component)
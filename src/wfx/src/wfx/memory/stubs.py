@@ -98,11 +98,13 @@ def store_message(
     return run_until_complete(astore_message(message, flow_id=flow_id))
 
 
-async def aupdate_messages(messages: Message | list[Message]) -> list[Message]:
+async def aupdate_messages(messages: Message | list[Message], *, debounce: bool = False) -> list[Message]:  # noqa: ARG001
     """Update stored messages.
 
     Args:
         messages: Message or list of messages to update.
+        debounce: Whether the update may be merged with the next updates of the same messages before it is
+            written. The standalone implementation always writes it.
 
     Returns:
         List[Message]: Updated messages.
@@ -170,6 +172,7 @@ async def aget_messages(
     order: str | None = "DESC",  # noqa: ARG001
     flow_id: UUID | None = None,  # noqa: ARG001
     limit: int | None = None,  # noqa: ARG001
+    after: UUID | str | None = None,  # noqa: ARG001
 ) -> list[Message]:
     """Retrieve messages based on the provided filters.
 
@@ -182,6 +185,7 @@ async def aget_messages(
         order (Optional[str]): The order in which to retrieve the messages. Defaults to "DESC".
         flow_id (Optional[UUID]): The flow ID associated with the messages.
         limit (Optional[int]): The maximum number of messages to retrieve.
+        after (Optional[UUID]): The id of the last message of the previous page.
 
     Returns:
         List[Message]: A list of Message objects representing the retrieved messages.
@@ -6,9 +6,11 @@ import sys
 import time
 from io import StringIO
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from wfx.cli.script_loader import (
     extract_structured_result,
+    extract_structured_run_outputs,
     extract_text_from_result,
     find_graph_variable,
     load_graph_from_script,
@@ -17,6 +19,10 @@ from wfx.cli.validation import validate_global_variables_for_env
 from wfx.log.logger import logger
 from wfx.schema.schema import InputValueRequest
 
+if TYPE_CHECKING:
+    from wfx.graph import Graph
+    from wfx.graph.graph.profiler import ProfileFormat
+
 # Verbosity level constants
 VERBOSITY_DETAILED = 2
 VERBOSITY_FULL = 3
@@ -64,6 +70,9 @@ async def run_flow(
     verbose_full: bool = False,
     timing: bool = False,
     global_variables: dict[str, str] | None = None,
+    input_values: list[str] | None = None,
+    concurrency: int = 1,
+    profile: "ProfileFormat | None" = None,
 ) -> dict:
     """Execute a Primeagent graph script or JSON flow and return the result.
 
@@ -83,6 +92,9 @@ async def run_flow(
         verbose_full: Show full debugging output including component logs
         timing: Include detailed timing information in output
         global_variables: Dict of global variables to inject into the graph context
+        input_values: Input values for a batch run; the graph runs once per value
+        concurrency: How many inputs of a batch run to run at the same time
+        profile: Profile the run and add the profile in this format to the JSON output
 
     Returns:
         dict: Result data containing the execution results, logs, and optionally timing info
@@ -111,6 +123,11 @@ async def run_flow(
     # Use either positional input_value or --input-value option
     final_input_value = input_value or input_value_option
 
+    if input_values is not None and final_input_value:
+        error_msg = "Cannot use an input value together with batch input values. Choose one."
+        output_error(error_msg, verbose=verbose)
+        raise RunError(error_msg, None)
+
     # Validate input sources - exactly one must be provided
     input_sources = [script_path is not None, flow_json is not None, bool(stdin)]
     if sum(input_sources) != 1:
@@ -298,7 +315,24 @@ async def run_flow(
         output_error(error_msg, verbose=verbose, exception=e)
         raise RunError(error_msg, e) from e
 
+    if input_values is not None:
+        if profile is not None:
+            error_msg = "Profiling is not supported for batch runs"
+            output_error(error_msg, verbose=verbose)
+            raise RunError(error_msg, None)
+        return await _run_batch(
+            graph,
+            input_values,
+            output_format=output_format,
+            concurrency=concurrency,
+            verbosity=verbosity,
+            start_time=start_time,
+            load_end_time=load_end_time,
+        )
+
     logger.info("Executing graph...")
+    if profile is not None:
+        graph.enable_profiling()
     execution_start_time = time.time() if timing else None
     if verbose:
         logger.debug("Setting up execution environment")
@@ -449,6 +483,8 @@ async def run_flow(
         result_data["logs"] = captured_logs
         if timing_metadata:
             result_data["timing"] = timing_metadata
+        if profile is not None:
+            result_data["profile"] = graph.get_profile(profile)
         return result_data
     if output_format in {"text", "message"}:
         result_data = extract_structured_result(results)
@@ -461,4 +497,68 @@ async def run_flow(
     result_data["logs"] = captured_logs
     if timing_metadata:
         result_data["timing"] = timing_metadata
+    if profile is not None:
+        result_data["profile"] = graph.get_profile(profile)
+    return result_data
+
+
+async def _run_batch(
+    graph: "Graph",
+    input_values: list[str],
+    *,
+    output_format: str,
+    concurrency: int,
+    verbosity: int,
+    start_time: float | None,
+    load_end_time: float | None,
+) -> dict:
+    """Run the graph once per input value and return the results in the order of the inputs."""
+    logger.info(f"Executing graph for {len(input_values)} inputs with a concurrency of {concurrency}...")
+    execution_start_time = time.time()
+    captured_stdout = StringIO()
+    captured_stderr = StringIO()
+    original_stdout = sys.stdout
+    original_stderr = sys.stderr
+    try:
+        sys.stdout = captured_stdout
+        if verbosity < VERBOSITY_FULL:
+            sys.stderr = captured_stderr
+        run_outputs = await graph.arun(
+            [{"input_value": input_value} for input_value in input_values],
+            concurrency=concurrency,
+        )
+    except Exception as e:
+        sys.stdout = original_stdout
+        sys.stderr = original_stderr
+        if verbosity >= VERBOSITY_DETAILED:
+            logger.exception("Failed to execute graph - full traceback:")
+        error_msg = f"Failed to execute graph: {e}"
+        output_error(error_msg, verbose=verbosity > 0, exception=e)
+        raise RunError(error_msg, e) from e
+    finally:
+        sys.stdout = original_stdout
+        sys.stderr = original_stderr
+    execution_end_time = time.time()
+    logger.info(f"Graph execution completed for {len(run_outputs)} inputs")
+
+    results = [
+        {"input_value": input_value, **extract_structured_run_outputs(run_output)}
+        for input_value, run_output in zip(input_values, run_outputs, strict=True)
+    ]
+    if output_format in {"text", "message", "result"}:
+        output_text = "\n".join(str(result.get("result", result.get("text", ""))) for result in results)
+        return {"output": output_text, "format": output_format}
+
+    result_data = {
+        "success": all(result["success"] for result in results),
+        "type": "batch",
+        "results": results,
+        "logs": captured_stdout.getvalue() + captured_stderr.getvalue(),
+    }
+    if start_time is not None and load_end_time is not None:
+        result_data["timing"] = {
+            "load_time": round(load_end_time - start_time, 3),
+            "execution_time": round(execution_end_time - execution_start_time, 3),
+            "total_time": round(execution_end_time - start_time, 3),
+        }
     return result_data
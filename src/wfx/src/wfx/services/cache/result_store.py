@@ -0,0 +1,276 @@
+"""Byte stores with TTLs and size accounting, used by the vertex result cache.
+
+Every store keeps serialized values under string keys and counts hits, misses, evictions and
+the bytes it holds. `MemoryResultStore` is a per-process LRU, `DiskResultStore` keeps one file
+per entry so results survive restarts, and `RedisResultStore` shares results between workers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+# Disk entries start with their expiry time as a float, 0 meaning no expiry
+_EXPIRY_HEADER = struct.Struct("<d")
+
+
+class ResultStore(ABC):
+    """A store of serialized results.
+
+    Attributes:
+        hits (int): Number of lookups that found a live entry.
+        misses (int): Number of lookups that found nothing or an expired entry.
+        evictions (int): Number of entries dropped to honour the size limit.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Returns the value stored under key, or None if there is no live entry."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        """Stores value under key, expiring it after ttl seconds if given."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+    @property
+    @abstractmethod
+    def size_bytes(self) -> int:
+        """The number of bytes of the values held by the store."""
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size_bytes": self.size_bytes,
+        }
+
+
+class MemoryResultStore(ResultStore):
+    """A per-process LRU store bounded by the total size of its values."""
+
+    def __init__(self, max_size_bytes: int = 256 * 1024 * 1024) -> None:
+        super().__init__()
+        self.max_size_bytes = max_size_bytes
+        # key -> (value, expires_at or None)
+        self._entries: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        if len(value) > self.max_size_bytes:
+            return
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (value, expires_at)
+            self._size_bytes += len(value)
+            while self._size_bytes > self.max_size_bytes:
+                oldest_key = next(iter(self._entries))
+                self._pop(oldest_key)
+                self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            self._pop(key)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size_bytes -= len(entry[0])
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskResultStore(ResultStore):
+    """Keeps one file per entry in a directory, evicting the least recently used files over the size limit.
+
+    Reads touch the file, so the modification time orders entries by last use.
+    """
+
+    def __init__(self, directory: str | Path, max_size_bytes: int = 1024 * 1024 * 1024) -> None:
+        super().__init__()
+        self.directory = Path(directory)
+        self.max_size_bytes = max_size_bytes
+        self._sizes: dict[str, int] | None = None
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.bin"
+
+    def _load_sizes(self) -> dict[str, int]:
+        # Called with the lock held
+        if self._sizes is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._sizes = {path.stem: path.stat().st_size for path in self.directory.glob("*.bin")}
+            self._size_bytes = sum(self._sizes.values())
+        return self._sizes
+
+    def _get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        with self._lock:
+            sizes = self._load_sizes()
+            if key not in sizes:
+                self.misses += 1
+                return None
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                self._size_bytes -= sizes.pop(key)
+                self.misses += 1
+                return None
+            (expires_at,) = _EXPIRY_HEADER.unpack_from(data)
+            if expires_at and expires_at <= time.time():
+                self._remove(key)
+                self.misses += 1
+                return None
+            os.utime(path)
+            self.hits += 1
+            return data[_EXPIRY_HEADER.size :]
+
+    def _set(self, key: str, value: bytes, ttl: float | None) -> None:
+        data = _EXPIRY_HEADER.pack(time.time() + ttl if ttl else 0) + value
+        if len(data) > self.max_size_bytes:
+            return
+        path = self._path(key)
+        with self._lock:
+            sizes = self._load_sizes()
+            temp_path = path.with_suffix(".tmp")
+            temp_path.write_bytes(data)
+            temp_path.replace(path)
+            self._size_bytes += len(data) - sizes.get(key, 0)
+            sizes[key] = len(data)
+            if self._size_bytes > self.max_size_bytes:
+                self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        # Called with the lock held
+        by_last_use = sorted(
+            (key for key in self._load_sizes() if key != keep), key=lambda key: self._path(key).stat().st_mtime
+        )
+        for key in by_last_use:
+            if self._size_bytes <= self.max_size_bytes:
+                break
+            self._remove(key)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        # Called with the lock held
+        self._size_bytes -= self._load_sizes().pop(key, 0)
+        self._path(key).unlink(missing_ok=True)
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _clear(self) -> None:
+        with self._lock:
+            for key in list(self._load_sizes()):
+                self._remove(key)
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            self._load_sizes()
+            return self._size_bytes
+
+
+class RedisResultStore(ResultStore):
+    """Shares results between workers through Redis.
+
+    Entries expire through Redis TTLs and the size limit is left to the server's `maxmemory`
+    policy, so `size_bytes` only counts the bytes written by this process.
+    """
+
+    def __init__(self, url: str, prefix: str = "wfx:vertex_result:") -> None:
+        super().__init__()
+        try:
+            from redis.asyncio import StrictRedis
+        except ImportError as exc:
+            msg = "The Redis result store requires the redis package. Install it with `pip install redis`."
+            raise ImportError(msg) from exc
+        self._client = StrictRedis.from_url(url)
+        self.prefix = prefix
+        self._bytes_written = 0
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self._client.get(self.prefix + key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        if ttl:
+            await self._client.set(self.prefix + key, value, px=int(ttl * 1000))
+        else:
+            await self._client.set(self.prefix + key, value)
+        self._bytes_written += len(value)
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self.prefix + key)
+
+    async def clear(self) -> None:
+        keys = [key async for key in self._client.scan_iter(match=f"{self.prefix}*")]
+        if keys:
+            await self._client.delete(*keys)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes_written
@@ -98,6 +98,11 @@ class ChatServiceProtocol(Protocol):
         """Set cached value."""
         ...
 
+    @abstractmethod
+    async def set_graph_cache(self, key: str, graph: Any, lock: asyncio.Lock | None = None) -> bool:
+        """Cache a graph between build requests, possibly as a run state snapshot."""
+        ...
+
 
 class TracingServiceProtocol(Protocol):
     """Protocol for tracing service."""
@@ -278,6 +278,28 @@ class Settings(BaseSettings):
     """The maximum number of vertex builds to keep in the database."""
     max_vertex_builds_per_vertex: int = 2
     """The maximum number of builds to keep per vertex. Older builds will be deleted."""
+    vertex_builds_batch_size: int = Field(default=100, gt=0)
+    """The number of vertex builds written to the database at once."""
+    vertex_builds_flush_interval: float = 1.0
+    """The maximum time, in seconds, a vertex build waits in memory before it is written to the database."""
+    vertex_builds_max_pending: int = 10000
+    """The maximum number of vertex builds waiting to be written. Builds logged beyond it are dropped."""
+    vertex_builds_prune_interval: float = 60.0
+    """How often, in seconds, vertex builds beyond `max_vertex_builds_to_keep` and `max_vertex_builds_per_vertex` are
+    deleted."""
+    transactions_batch_size: int = Field(default=100, gt=0)
+    """The number of transactions written to the database at once."""
+    transactions_flush_interval: float = 1.0
+    """The maximum time, in seconds, a transaction waits in memory before it is written to the database."""
+    transactions_max_pending: int = 10000
+    """The maximum number of transactions waiting to be written. Transactions logged beyond it are dropped."""
+    transactions_prune_interval: float = 60.0
+    """How often, in seconds, the transactions of each flow beyond `max_transactions_to_keep` are deleted."""
+    message_update_debounce: float = 0.5
+    """The time, in seconds, during which the updates of a message that is still being produced, such as an agent's
+    message, are merged into a single write."""
+    message_insert_batch_size: int = 500
+    """The maximum number of messages inserted at once when concurrent sessions store messages at the same time."""
     webhook_polling_interval: int = 5000
     """The polling interval for the webhook in ms."""
     fs_flows_polling_interval: int = 10000
@@ -326,9 +348,83 @@ class Settings(BaseSettings):
     Default is 24 hours (86400 seconds). Minimum is 600 seconds (10 minutes)."""
     event_delivery: Literal["polling", "streaming", "direct"] = "streaming"
     """How to deliver build events to the frontend. Can be 'polling', 'streaming' or 'direct'."""
+    event_token_coalescing: bool = False
+    """If set to True, consecutive token events of a message are merged into one event before they are sent to
+    the client. Clients can also turn it on or off per build with the 'coalesce_tokens' query param."""
+    event_token_coalescing_window_ms: int = 30
+    """How long, in milliseconds, token events are buffered before they are sent when coalescing is on."""
+    event_token_coalescing_max_chars: int = 256
+    """How many characters of buffered tokens are sent at once when coalescing is on."""
+    event_message_deltas: bool = False
+    """If set to True, updates of agent messages are sent as 'message_delta' events carrying only the content
+    blocks that changed. Clients can also turn it on or off per build with the 'message_deltas' query param."""
+    event_message_delta_snapshot_interval: int = 20
+    """Every how many updates the whole message is sent again when message deltas are on."""
+    job_queue_policy: Literal["block", "coalesce", "drop_intermediate"] = "coalesce"
+    """What happens to token events of a build job when its event queue is full: 'block' makes the build wait
+    for the client, 'coalesce' merges them into the last queued token and 'drop_intermediate' drops them.
+    Other events, such as 'end_vertex', 'end' and 'error', are always queued."""
+    job_queue_max_events: int = 10_000
+    """The number of events a build job queue holds before it is full. 0 means no limit."""
+    job_queue_max_bytes: int = 32 * 1024 * 1024
+    """The size in bytes of the events a build job queue holds before it is full. 0 means no limit."""
+    job_queue_finished_ttl: int = 300
+    """How many seconds the queue of a build job that finished is kept before it is removed."""
+    job_queue_replay_events: int = 1000
+    """The number of events already sent that a build job keeps, so that a client that reconnects to its
+    events with `after` or a `Last-Event-ID` header gets the ones it missed. 0 disables replaying events."""
+    job_queue_replay_max_bytes: int = 16 * 1024 * 1024
+    """The size in bytes of the events already sent that a build job keeps. 0 means no limit."""
+    job_disconnect_grace_period: float = 30.0
+    """How many seconds a build job keeps running after the client streaming its events disconnects, so that
+    the client can reconnect. 0 cancels the build as soon as the client disconnects."""
+    job_event_bus: Literal["memory", "redis"] = "memory"
+    """Where the events of build jobs are read from. 'memory' serves them from the worker that runs the job only,
+    'redis' publishes them to Redis streams using the Redis settings, so that any worker can serve them."""
+    job_event_bus_ttl: int = 3600
+    """How many seconds the Redis stream of a build job that is still running is kept after its last event."""
+    job_poll_max_wait: float = 25.0
+    """How many seconds a poll of the events of a build job waits for one before it answers with none. Clients
+    can ask to wait less with the 'max_wait' query param."""
+    job_poll_max_events: int = 1000
+    """The number of events a poll of the events of a build job returns at most. Clients can ask for fewer
+    with the 'max_events' query param. 0 means no limit."""
     lazy_load_components: bool = False
     """If set to True, Primeagent will only partially load components at startup and fully load them on demand.
     This significantly reduces startup time but may cause a slight delay when a component is first used."""
+    graph_scheduler: Literal["layered", "dependency"] = "layered"
+    """How Graph.process schedules vertices. 'layered' runs one layer at a time and waits for the whole layer
+    to finish; 'dependency' starts each vertex as soon as its own predecessors have finished."""
+    compiled_class_cache_size: int = 256
+    """The maximum number of compiled component codes to keep in memory per process. They are keyed by a hash of
+    the code. Set to 0 to compile the code on every use."""
+    graph_template_cache_size: int = 64
+    """The maximum number of flow graphs /api/v1/run keeps built in memory per process.
+    Runs get a cheap copy of the cached graph instead of building it from the flow data.
+    Set to 0 to build the graph on every request."""
+    vertex_result_cache_backend: Literal["memory", "disk", "redis"] = "memory"
+    """Where the results of vertices opted in to result caching are stored. 'memory' keeps them per process,
+    'disk' keeps them in vertex_result_cache_dir across restarts and 'redis' shares them between workers
+    using the Redis settings."""
+    vertex_result_cache_ttl: int = 86400
+    """Seconds after which a cached vertex result expires. Set to 0 to keep results until they are evicted."""
+    vertex_result_cache_max_size: int = 256 * 1024 * 1024
+    """The maximum size in bytes of the memory and disk vertex result caches. The least recently used results
+    are evicted first. The Redis cache relies on the server's memory policy instead."""
+    vertex_result_cache_dir: str | None = None
+    """Directory of the disk vertex result cache. Defaults to a 'vertex_results' directory in config_dir."""
+    vertex_result_cache_components: list[str] = []
+    """Component types (e.g. 'File', 'SplitText') whose vertices always use the result cache. Other vertices
+    opt in with the 'cache_results' flag of their node. A vertex is only built again when its code,
+    parameters or upstream results change."""
+    resource_class_limits: dict[str, int] = {}
+    """The maximum number of vertex builds of each resource class (e.g. {"llm": 8, "embedding": 4}) that run at
+    the same time in this worker, across all flows. Components declare their resource class, e.g. "llm" for models
+    and agents and "embedding" for vector stores; a node can override it. Classes without a limit are not limited.
+    Flows can set stricter limits with a 'resource_limits' key in their data."""
+    max_batch_run_concurrency: int = 8
+    """The maximum number of inputs of a batch /api/v1/run request that are run at the same time.
+    Each input runs on its own copy of the graph. Requests asking for more are capped at this value."""
 
     # Starter Projects
     create_starter_projects: bool = True
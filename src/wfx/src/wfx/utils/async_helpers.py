@@ -1,5 +1,16 @@
 import asyncio
+import contextlib
+import contextvars
+import threading
+from collections.abc import AsyncIterator, Iterator
 from contextlib import asynccontextmanager
+from typing import TypeVar
+
+from typing_extensions import Self
+
+T = TypeVar("T")
+
+DEFAULT_THREAD_BUFFER_SIZE = 64
 
 if hasattr(asyncio, "timeout"):
 
@@ -40,3 +51,117 @@ def run_until_complete(coro):
     with concurrent.futures.ThreadPoolExecutor() as executor:
         future = executor.submit(run_in_new_loop)
         return future.result()
+
+
+async def iterate_in_thread(iterator: Iterator[T], max_buffer: int = DEFAULT_THREAD_BUFFER_SIZE) -> AsyncIterator[T]:
+    """Iterates a synchronous iterator from a dedicated thread, so that its blocking reads do not block the loop.
+
+    The thread reads at most `max_buffer` items ahead of the consumer and runs in a copy of the caller's
+    context. Exceptions raised by the iterator are raised to the consumer. If the consumer stops early,
+    the thread stops after its current read and closes the iterator.
+    """
+    loop = asyncio.get_running_loop()
+    channel: asyncio.Queue[tuple[str, object]] = asyncio.Queue()
+    slots = threading.Semaphore(max_buffer)
+    stopped = threading.Event()
+
+    def send(kind: str, value: object) -> bool:
+        try:
+            loop.call_soon_threadsafe(channel.put_nowait, (kind, value))
+        except RuntimeError:
+            # The loop was closed, nobody is left to consume
+            stopped.set()
+            return False
+        return True
+
+    def pump() -> None:
+        try:
+            while True:
+                slots.acquire()
+                if stopped.is_set():
+                    return
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    send("end", None)
+                    return
+                if not send("item", item):
+                    return
+        except BaseException as exc:  # noqa: BLE001
+            send("error", exc)
+        finally:
+            close = getattr(iterator, "close", None)
+            if stopped.is_set() and callable(close):
+                close()
+
+    context = contextvars.copy_context()
+    thread = threading.Thread(target=context.run, args=(pump,), name="iterate-in-thread", daemon=True)
+    thread.start()
+    try:
+        while True:
+            kind, value = await channel.get()
+            if kind == "end":
+                return
+            if kind == "error":
+                raise value  # type: ignore[misc]
+            slots.release()
+            yield value  # type: ignore[misc]
+    finally:
+        stopped.set()
+        slots.release()
+
+
+class LoopBlockMonitor:
+    """Measures how long the event loop is blocked while the monitor is entered.
+
+    A task wakes up every `interval` seconds, and every time it wakes up late the loop was busy with
+    code that did not yield for that long. Lateness below `threshold` is timer noise and is ignored,
+    and blocks that end between two wake-ups may go unnoticed. A block still running when the monitor
+    exits is counted too, so code that never yields is measured in full.
+    """
+
+    def __init__(self, interval: float = 0.01, threshold: float = 0.005) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.blocked_time = 0.0
+        self.max_block = 0.0
+        self.blocks = 0
+        self._expected_at: float | None = None
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> Self:
+        loop = asyncio.get_running_loop()
+        self._expected_at = loop.time() + self.interval
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._expected_at is not None:
+            self._record(asyncio.get_running_loop().time() - self._expected_at)
+            self._expected_at = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(max(self._expected_at - loop.time(), 0))
+            self._record(loop.time() - self._expected_at)
+            self._expected_at = loop.time() + self.interval
+
+    def _record(self, lag: float) -> None:
+        if lag > self.threshold:
+            self.blocked_time += lag
+            self.max_block = max(self.max_block, lag)
+            self.blocks += 1
+
+    def metrics(self) -> dict[str, float | int]:
+        """Returns the total and longest blocking times, in seconds, and the number of blocks."""
+        return {
+            "loop_blocked_time": round(self.blocked_time, 6),
+            "max_loop_block": round(self.max_block, 6),
+            "loop_blocks": self.blocks,
+        }
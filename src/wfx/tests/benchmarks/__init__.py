@@ -0,0 +1 @@
+# Benchmarks for the wfx graph engine
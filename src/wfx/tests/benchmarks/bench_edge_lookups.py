@@ -0,0 +1,54 @@
+"""Times Graph.from_payload and a full Graph.process on synthetic layered graphs.
+
+Run from src/wfx with:
+
+    python -m tests.benchmarks.bench_edge_lookups --nodes 500
+"""
+
+import argparse
+import asyncio
+import copy
+import statistics
+import time
+
+from wfx.graph.graph.base import Graph
+
+from tests.benchmarks.graph_generators import layered_payload
+
+
+def time_from_payload(payload: dict, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        data = copy.deepcopy(payload)
+        start = time.perf_counter()
+        Graph.from_payload(data)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_process(payload: dict, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        graph = Graph.from_payload(copy.deepcopy(payload))
+        start = time.perf_counter()
+        asyncio.run(graph.process(fallback_to_env_vars=False))
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for num_nodes in args.nodes:
+        payload = layered_payload(num_nodes, width=args.width)
+        for name, func in (("from_payload", time_from_payload), ("process", time_process)):
+            timings = func(payload, args.repeat)
+            print(f"{name:>12} nodes={num_nodes:<5} median={statistics.median(timings) * 1000:9.1f} ms")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
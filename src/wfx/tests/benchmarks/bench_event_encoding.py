@@ -0,0 +1,100 @@
+"""Compares the CPU time of sending an end_vertex event with a large DataFrame output in two ways.
+
+- "reencoded": the build response is dumped to JSON, loaded back into a dict and encoded again by the
+  event manager, as the build API used to do.
+- "encoded": the JSON of the build response is sent as is with `EncodedEventData`.
+
+Run from src/wfx with:
+
+    python -m tests.benchmarks.bench_event_encoding --rows 100 1000 10000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel
+from wfx.events.event_manager import EncodedEventData, EventManager, create_default_event_manager
+
+
+class BuildResponse(BaseModel):
+    """Same shape as the build API's VertexBuildResponse."""
+
+    id: str
+    valid: bool
+    params: str | None = None
+    next_vertices_ids: list[str] = []
+    data: dict[str, Any]
+
+
+def make_response(num_rows: int, num_columns: int) -> BuildResponse:
+    rows = [
+        {f"column_{column}": f"value {row}-{column}" if column % 2 else row * column for column in range(num_columns)}
+        for row in range(num_rows)
+    ]
+    return BuildResponse(
+        id="DataFrameComponent-abc12",
+        valid=True,
+        next_vertices_ids=["ChatOutput-def34"],
+        data={
+            "results": {"dataframe": rows},
+            "outputs": {"dataframe": {"message": rows, "type": "dataframe"}},
+            "timedelta": 0.5,
+            "duration": "500 ms",
+        },
+    )
+
+
+def send_reencoded(manager: EventManager, response: BuildResponse) -> None:
+    build_data = json.loads(response.model_dump_json())
+    manager.on_end_vertex(data={"build_data": build_data})
+
+
+def send_encoded(manager: EventManager, response: BuildResponse) -> None:
+    build_data = response.model_dump_json().encode("utf-8")
+    manager.on_end_vertex(data=EncodedEventData(b'{"build_data": ' + build_data + b"}"))
+
+
+SENDERS: dict[str, Callable[[EventManager, BuildResponse], None]] = {
+    "reencoded": send_reencoded,
+    "encoded": send_encoded,
+}
+
+
+def time_sender(sender: Callable[[EventManager, BuildResponse], None], response: BuildResponse, repeat: int):
+    """Returns the CPU time of each send and the size of the event."""
+    queue: asyncio.Queue = asyncio.Queue()
+    manager = create_default_event_manager(queue)
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        sender(manager, response)
+        timings.append(time.process_time() - start)
+    _, event, _ = queue.get_nowait()
+    return timings, len(event)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for num_rows in args.rows:
+        response = make_response(num_rows, args.columns)
+        medians = {}
+        for name, sender in SENDERS.items():
+            timings, size = time_sender(sender, response, args.repeat)
+            medians[name] = statistics.median(timings)
+            print(f"rows={num_rows:<6} {name:>10} median={medians[name] * 1000:9.2f} ms cpu  event={size:>10} bytes")  # noqa: T201
+        if medians["encoded"]:
+            print(f"rows={num_rows:<6} {'speedup':>10} {medians['reencoded'] / medians['encoded']:.1f}x")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Times the graph engine on synthetic graphs of several shapes and sizes.
+
+Run from src/wfx with:
+
+    python -m tests.benchmarks.bench_graph_engine --output graph_engine.json
+
+Every operation is timed `--repeat` times for each shape and size, and the results are printed and,
+with `--output`, saved as JSON so runs can be compared with each other.
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import pickle
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+from wfx.graph.graph.base import Graph
+from wfx.graph.graph.utils import layered_topological_sort
+
+from tests.benchmarks.graph_generators import GENERATORS
+
+# Operation name -> function taking the payload and returning the duration of one timed call
+Operation = Callable[[dict], float]
+
+
+def _build(payload: dict) -> Graph:
+    return Graph.from_payload(copy.deepcopy(payload))
+
+
+def time_from_payload(payload: dict) -> float:
+    data = copy.deepcopy(payload)
+    start = time.perf_counter()
+    Graph.from_payload(data)
+    return time.perf_counter() - start
+
+
+def time_sort_vertices(payload: dict) -> float:
+    graph = _build(payload)
+    start = time.perf_counter()
+    graph.sort_vertices()
+    return time.perf_counter() - start
+
+
+def time_layered_topological_sort(payload: dict) -> float:
+    graph = _build(payload)
+    start = time.perf_counter()
+    layered_topological_sort(
+        vertices_ids=set(graph.get_vertex_ids()),
+        in_degree_map=graph.in_degree_map,
+        successor_map=graph.successor_map,
+        predecessor_map=graph.predecessor_map,
+        cycle_vertices=graph.cycle_vertices,
+        is_cyclic=graph.is_cyclic,
+    )
+    return time.perf_counter() - start
+
+
+def time_process(payload: dict) -> float:
+    graph = _build(payload)
+
+    async def process() -> float:
+        start = time.perf_counter()
+        await graph.process(fallback_to_env_vars=False)
+        return time.perf_counter() - start
+
+    return asyncio.run(process())
+
+
+def time_deepcopy(payload: dict) -> float:
+    graph = _build(payload)
+    start = time.perf_counter()
+    copy.deepcopy(graph)
+    return time.perf_counter() - start
+
+
+def _get_serializer():
+    """The backend caches graphs with dill, which can serialize the classes built from component code."""
+    try:
+        import dill
+    except ImportError:
+        return pickle
+    return dill
+
+
+def time_pickle(payload: dict) -> float:
+    graph = _build(payload)
+    serializer = _get_serializer()
+    start = time.perf_counter()
+    serializer.loads(serializer.dumps(graph))
+    return time.perf_counter() - start
+
+
+OPERATIONS: dict[str, Operation] = {
+    "from_payload": time_from_payload,
+    "sort_vertices": time_sort_vertices,
+    "layered_topological_sort": time_layered_topological_sort,
+    "process": time_process,
+    "deepcopy": time_deepcopy,
+    "pickle": time_pickle,
+}
+
+# No-op cycles never end without a loop controller, so cyclic graphs are not processed
+SKIPPED = {("cyclic", "process")}
+
+
+def run_benchmark(shape: str, num_nodes: int, operation: str, repeat: int) -> dict:
+    payload = GENERATORS[shape](num_nodes)
+    result = {
+        "shape": shape,
+        "nodes": len(_build(payload).vertices),
+        "requested_nodes": num_nodes,
+        "operation": operation,
+    }
+    if (shape, operation) in SKIPPED:
+        return {**result, "skipped": True}
+    try:
+        timings = [OPERATIONS[operation](payload) for _ in range(repeat)]
+    except Exception as exc:
+        return {**result, "error": f"{type(exc).__name__}: {exc}"}
+    return {
+        **result,
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3),
+        "timings_ms": [round(timing * 1000, 3) for timing in timings],
+    }
+
+
+def get_metadata(repeat: int) -> dict:
+    try:
+        wfx_version = version("wfx")
+    except PackageNotFoundError:
+        wfx_version = None
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "wfx_version": wfx_version,
+        "repeat": repeat,
+        "pickle_module": _get_serializer().__name__,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shapes", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--nodes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--operations", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Save the results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    for shape in args.shapes:
+        for num_nodes in args.nodes:
+            for operation in args.operations:
+                result = run_benchmark(shape, num_nodes, operation, args.repeat)
+                results.append(result)
+                if "median_ms" in result:
+                    summary = f"median={result['median_ms']:10.1f} ms"
+                else:
+                    summary = result.get("error", "skipped")
+                print(f"{shape:>8} nodes={num_nodes:<5} {operation:>24} {summary}")  # noqa: T201
+
+    if args.output is not None:
+        args.output.write_text(json.dumps({"metadata": get_metadata(args.repeat), "results": results}, indent=2))
+        print(f"Saved {len(results)} results to {args.output}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Synthetic flow payloads built from lightweight no-op components."""
+
+import copy
+import itertools
+from textwrap import dedent
+
+NOOP_COMPONENT_CODE = dedent("""
+from wfx.custom.custom_component.component import Component
+from wfx.io import MessageTextInput, Output
+from wfx.schema.message import Message
+
+
+class NoopComponent(Component):
+    display_name = "Noop"
+    description = "Joins its inputs without doing any work."
+
+    inputs = [
+        MessageTextInput(name="first", display_name="First"),
+        MessageTextInput(name="second", display_name="Second"),
+    ]
+    outputs = [Output(display_name="Message", name="message", method="build_message")]
+
+    def build_message(self) -> Message:
+        return Message(text=f"{self.first or ''}{self.second or ''}"[:64])
+""")
+
+_node_template: dict | None = None
+
+
+def _get_node_template() -> dict:
+    """Builds the frontend node of the no-op component once and returns it."""
+    global _node_template  # noqa: PLW0603
+    if _node_template is None:
+        from wfx.custom.eval import eval_custom_component_code
+
+        component_class = eval_custom_component_code(NOOP_COMPONENT_CODE)
+        component = component_class(_code=NOOP_COMPONENT_CODE)
+        _node_template = component.to_frontend_node()
+    return _node_template
+
+
+def make_node(node_id: str) -> dict:
+    node = copy.deepcopy(_get_node_template())
+    node["id"] = node_id
+    node["data"]["id"] = node_id
+    return node
+
+
+def make_edge(source_id: str, target_id: str, field_name: str, *, proxy_id: str | None = None) -> dict:
+    """An edge from the message output of `source_id` to the `field_name` input of `target_id`.
+
+    `proxy_id` is the vertex inside a group node that the input of the group `target_id` stands for.
+    """
+    source_handle = {
+        "dataType": "NoopComponent",
+        "id": source_id,
+        "name": "message",
+        "output_types": ["Message"],
+    }
+    target_handle = {
+        "fieldName": field_name,
+        "id": target_id,
+        "inputTypes": ["Message"],
+        "type": "str",
+    }
+    if proxy_id is not None:
+        target_handle["proxy"] = {"field": field_name, "id": proxy_id}
+    return {
+        "id": f"reactflow__edge-{source_id}-{target_id}-{field_name}",
+        "source": source_id,
+        "target": target_id,
+        "sourceHandle": "",
+        "targetHandle": "",
+        "data": {"sourceHandle": source_handle, "targetHandle": target_handle},
+    }
+
+
+def layered_payload(num_nodes: int, width: int = 10) -> dict:
+    """A DAG of `num_nodes` vertices in layers of `width`, each vertex fed by two vertices of the previous layer."""
+    node_ids = [f"NoopComponent-{index:05d}" for index in range(num_nodes)]
+    edges = []
+    for index in range(width, num_nodes):
+        layer_start = (index // width - 1) * width
+        position = index % width
+        edges.append(make_edge(node_ids[layer_start + position], node_ids[index], "first"))
+        edges.append(make_edge(node_ids[layer_start + (position + 1) % width], node_ids[index], "second"))
+    return {"data": {"nodes": [make_node(node_id) for node_id in node_ids], "edges": edges}}
+
+
+def _node_ids(num_nodes: int, prefix: str = "NoopComponent") -> list[str]:
+    return [f"{prefix}-{index:05d}" for index in range(num_nodes)]
+
+
+def _chain_edges(node_ids: list[str]) -> list[dict]:
+    return [make_edge(source_id, target_id, "first") for source_id, target_id in itertools.pairwise(node_ids)]
+
+
+def deep_payload(num_nodes: int) -> dict:
+    """A single chain of `num_nodes` vertices: one vertex per layer."""
+    node_ids = _node_ids(num_nodes)
+    return {"data": {"nodes": [make_node(node_id) for node_id in node_ids], "edges": _chain_edges(node_ids)}}
+
+
+def wide_payload(num_nodes: int) -> dict:
+    """One vertex feeding `num_nodes - 1` independent vertices: a single very wide layer."""
+    node_ids = _node_ids(num_nodes)
+    edges = [make_edge(node_ids[0], node_id, "first") for node_id in node_ids[1:]]
+    return {"data": {"nodes": [make_node(node_id) for node_id in node_ids], "edges": edges}}
+
+
+def diamond_payload(num_nodes: int) -> dict:
+    """A chain of diamonds (top -> left, right -> bottom), the bottom of each being the top of the next."""
+    node_ids = _node_ids(max(num_nodes, 4))
+    edges = []
+    top = 0
+    while top + 3 < len(node_ids):
+        left, right, bottom = top + 1, top + 2, top + 3
+        edges.append(make_edge(node_ids[top], node_ids[left], "first"))
+        edges.append(make_edge(node_ids[top], node_ids[right], "first"))
+        edges.append(make_edge(node_ids[left], node_ids[bottom], "first"))
+        edges.append(make_edge(node_ids[right], node_ids[bottom], "second"))
+        top = bottom
+    # Leftover vertices hang off the last bottom
+    edges.extend(make_edge(node_ids[top], node_id, "first") for node_id in node_ids[top + 1 :])
+    return {"data": {"nodes": [make_node(node_id) for node_id in node_ids], "edges": edges}}
+
+
+def cyclic_payload(num_nodes: int, cycle_length: int = 5) -> dict:
+    """A chain cut in segments of `cycle_length` vertices, the last vertex of each looping back to the second one.
+
+    The first vertex of every segment stays out of the cycle so that each cycle has an entry point.
+    """
+    node_ids = _node_ids(num_nodes)
+    edges = _chain_edges(node_ids)
+    nodes = [make_node(node_id) for node_id in node_ids]
+    for start in range(0, num_nodes - cycle_length + 1, cycle_length):
+        edges.append(make_edge(node_ids[start + cycle_length - 1], node_ids[start + 1], "second"))
+        nodes[start + 1]["data"]["node"]["outputs"][0]["allows_loop"] = True
+    return {"data": {"nodes": nodes, "edges": edges}}
+
+
+def make_group_node(group_id: str, inner_node_ids: list[str]) -> dict:
+    """A group node holding a chain of no-op vertices, whose "first" input feeds the first vertex of the chain."""
+    inner_nodes = [make_node(node_id) for node_id in inner_node_ids]
+    first_field = copy.deepcopy(inner_nodes[0]["data"]["node"]["template"]["first"])
+    first_field["proxy"] = {"field": "first", "id": inner_node_ids[0]}
+    return {
+        "id": group_id,
+        "type": "genericNode",
+        "data": {
+            "id": group_id,
+            "type": "GroupNode",
+            "node": {
+                "display_name": "Group",
+                "template": {"first": first_field},
+                "flow": {"data": {"nodes": inner_nodes, "edges": _chain_edges(inner_node_ids)}},
+            },
+        },
+    }
+
+
+def nested_payload(num_nodes: int, group_size: int = 10) -> dict:
+    """A chain of group nodes (subflows), each holding a chain of `group_size` vertices."""
+    num_groups = max(num_nodes // group_size, 1)
+    group_ids = _node_ids(num_groups, prefix="GroupNode")
+    nodes = []
+    inner_first_ids = []
+    for group_index, group_id in enumerate(group_ids):
+        inner_node_ids = [f"NoopComponent-{group_index:05d}{index:03d}" for index in range(group_size)]
+        inner_first_ids.append(inner_node_ids[0])
+        nodes.append(make_group_node(group_id, inner_node_ids))
+    edges = [
+        make_edge(source_id, target_id, "first", proxy_id=proxy_id)
+        for (source_id, target_id), proxy_id in zip(itertools.pairwise(group_ids), inner_first_ids[1:], strict=True)
+    ]
+    return {"data": {"nodes": nodes, "edges": edges}}
+
+
+GENERATORS = {
+    "layered": layered_payload,
+    "deep": deep_payload,
+    "wide": wide_payload,
+    "diamond": diamond_payload,
+    "cyclic": cyclic_payload,
+    "nested": nested_payload,
+}
+"""Payload generators by shape. Each takes the number of vertices of the graph."""
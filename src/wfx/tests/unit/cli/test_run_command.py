@@ -479,3 +479,101 @@ chat_input = ChatInput(
                 assert isinstance(output_data, dict)
             except json.JSONDecodeError:
                 assert len(captured.out.strip()) >= 0
+
+    def test_execute_batch_inputs_file(self, simple_chat_script, tmp_path, capsys):
+        """Test running the graph once per input of an inputs file."""
+        inputs_file = tmp_path / "inputs.json"
+        inputs_file.write_text(json.dumps(["first", "second", "third"]))
+
+        run(
+            script_path=simple_chat_script,
+            input_value=None,
+            input_value_option=None,
+            verbose=False,
+            output_format="json",
+            flow_json=None,
+            stdin=False,
+            check_variables=False,
+            timing=False,
+            inputs_file=inputs_file,
+            concurrency=2,
+        )
+
+        output_data = json.loads(capsys.readouterr().out)
+        assert output_data["type"] == "batch"
+        assert output_data["success"] is True
+        assert [result["result"] for result in output_data["results"]] == ["first", "second", "third"]
+        assert [result["input_value"] for result in output_data["results"]] == ["first", "second", "third"]
+
+    def test_execute_batch_inputs_file_with_one_input_per_line(self, simple_chat_script, tmp_path, capsys):
+        """Test that an inputs file can hold one input per line."""
+        inputs_file = tmp_path / "inputs.txt"
+        inputs_file.write_text("first\n\nsecond\n")
+
+        run(
+            script_path=simple_chat_script,
+            input_value=None,
+            input_value_option=None,
+            verbose=False,
+            output_format="text",
+            flow_json=None,
+            stdin=False,
+            check_variables=False,
+            timing=False,
+            inputs_file=inputs_file,
+            concurrency=1,
+        )
+
+        assert capsys.readouterr().out.strip() == "first\nsecond"
+
+    @pytest.mark.parametrize("profile_format", ["summary", "chrome", "speedscope"])
+    def test_execute_with_profile(self, simple_chat_script, capsys, profile_format):
+        """Test that --profile adds the profile of the run to the JSON output."""
+        run(
+            script_path=simple_chat_script,
+            input_value="Hello",
+            input_value_option=None,
+            verbose=False,
+            output_format="json",
+            flow_json=None,
+            stdin=False,
+            check_variables=False,
+            timing=False,
+            inputs_file=None,
+            concurrency=1,
+            profile=True,
+            profile_format=profile_format,
+        )
+
+        profile = json.loads(capsys.readouterr().out)["profile"]
+        if profile_format == "summary":
+            assert len(profile["vertices"]) == 2
+            assert [vertex_id.split("-")[0] for vertex_id in profile["critical_path"]["vertices"]] == [
+                "ChatInput",
+                "ChatOutput",
+            ]
+        elif profile_format == "chrome":
+            assert {event["name"] for event in profile["traceEvents"] if event["ph"] == "X"} >= {"vertex", "build"}
+        else:
+            assert len(profile["profiles"]) == 2
+
+    def test_execute_with_invalid_profile_format(self, simple_chat_script, capsys):
+        """Test that an unknown --profile-format is reported as an error."""
+        with pytest.raises(typer.Exit):
+            run(
+                script_path=simple_chat_script,
+                input_value="Hello",
+                input_value_option=None,
+                verbose=False,
+                output_format="json",
+                flow_json=None,
+                stdin=False,
+                check_variables=False,
+                timing=False,
+                inputs_file=None,
+                concurrency=1,
+                profile=True,
+                profile_format="flamegraph",
+            )
+
+        assert "Invalid profile format" in json.loads(capsys.readouterr().out)["exception_message"]
@@ -1,6 +1,7 @@
 """Unit tests for streaming functionality in multi-serve app."""
 
 import asyncio
+import copy
 import tempfile
 from pathlib import Path
 from unittest.mock import patch
@@ -45,6 +46,9 @@ class MockGraph:
         }
         self.edges = edges or [MockEdge("input_node", "output_node")]
 
+    def clone_for_run(self):
+        return copy.deepcopy(self)
+
 
 @pytest.fixture
 def mock_graphs():
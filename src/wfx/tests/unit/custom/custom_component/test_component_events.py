@@ -1,4 +1,5 @@
 import asyncio
+import json
 import time
 from typing import Any
 from unittest.mock import MagicMock
@@ -6,7 +7,8 @@ from uuid import uuid4
 
 import pytest
 from wfx.custom.custom_component.component import Component
-from wfx.events.event_manager import EventManager
+from wfx.events.event_manager import EventManager, create_default_event_manager
+from wfx.graph.graph.profiler import RunProfiler
 from wfx.schema.content_block import ContentBlock
 from wfx.schema.content_types import TextContent, ToolContent
 from wfx.schema.message import Message
@@ -251,6 +253,8 @@ async def test_component_streaming_message():
     # Verify the message
     assert sent_message.id is not None
     assert sent_message.text == "Hello World!"
+    # The graph is not profiled, so loop blocking was not measured
+    assert component._stream_metrics is None
 
     # Check tokens in queue
     tokens = []
@@ -261,3 +265,81 @@ async def test_component_streaming_message():
             tokens.append(event)
 
     assert len(tokens) > 0
+
+
+async def test_component_message_updates_as_deltas():
+    """Updates of a stored message only carry what changed once message deltas are enabled."""
+    queue = asyncio.Queue()
+    event_manager = create_default_event_manager(queue)
+    event_manager.enable_message_deltas()
+
+    component = ComponentForTesting()
+    component.set_event_manager(event_manager)
+
+    message = Message(
+        sender="Machine",
+        session_id="test_session",
+        sender_name="Agent",
+        content_blocks=[ContentBlock(title="Agent Steps", contents=[TextContent(text="Input: hi")])],
+    )
+    message = await component.send_message(message)
+    message = await component.send_message(message, skip_db_update=True)
+    message.content_blocks[0].contents.append(ToolContent(name="search", tool_input={"q": "x"}))
+    message = await component.send_message(message, skip_db_update=True)
+
+    events = []
+    while not queue.empty():
+        _, event_data, _ = queue.get_nowait()
+        events.append(json.loads(event_data))
+    assert [event["event"] for event in events] == ["add_message", "add_message", "message_delta"]
+    delta = events[-1]["data"]
+    assert delta["id"] == str(message.id)
+    assert [change["op"] for change in delta["changes"]] == ["append"]
+    assert delta["changes"][0]["content"]["name"] == "search"
+
+
+async def test_component_streaming_sync_iterator_does_not_block_the_loop():
+    """Sync streams are read from a thread, so the loop keeps serving other tasks meanwhile."""
+    queue = asyncio.Queue()
+    event_manager = create_default_event_manager(queue)
+
+    vertex = MagicMock()
+    vertex.id = "streaming-vertex"
+    vertex.graph.flow_id = str(uuid4())
+    # Loop blocking is measured in profiled runs
+    vertex.graph.profiler = RunProfiler()
+    component = ComponentForTesting(_vertex=vertex)
+    component.set_event_manager(event_manager)
+
+    class StreamChunk:
+        def __init__(self, content: str):
+            self.content = content
+
+    def slow_stream():
+        for chunk in ["Hello", " ", "World", "!"]:
+            time.sleep(0.05)
+            yield StreamChunk(chunk)
+
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    message = Message(sender="Machine", session_id="test_session", sender_name="AI", text=slow_stream())
+    sent_message = await component.send_message(message)
+    ticker.cancel()
+
+    assert sent_message.text == "Hello World!"
+    assert ticks >= 10
+    assert component._stream_metrics["max_loop_block"] < 0.05
+    assert vertex.graph.profiler.loop_blocking["streaming-vertex"]["max_loop_block"] < 0.05
+
+    events = []
+    while not queue.empty():
+        _, event_data, _ = queue.get_nowait()
+        events.append(json.loads(event_data))
+    assert "".join(event["data"]["chunk"] for event in events if event["event"] == "token") == "Hello World!"
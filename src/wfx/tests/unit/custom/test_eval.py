@@ -0,0 +1,104 @@
+from textwrap import dedent
+from unittest.mock import patch
+
+import pytest
+from wfx.custom import validate
+from wfx.custom.eval import CompiledClassCache, eval_custom_component_code, get_compiled_class_cache
+
+CODE = dedent("""
+from wfx.custom import Component
+
+class CachedComponent(Component):
+    display_name = "Cached"
+""")
+
+
+@pytest.fixture(autouse=True)
+def clear_compiled_class_cache():
+    get_compiled_class_cache().clear()
+    yield
+    get_compiled_class_cache().clear()
+
+
+def test_same_code_is_compiled_once():
+    with patch.object(validate, "compile_class", wraps=validate.compile_class) as compile_class:
+        first = eval_custom_component_code(CODE)
+        second = eval_custom_component_code(CODE)
+
+    assert compile_class.call_count == 1
+    stats = get_compiled_class_cache().stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert first.display_name == second.display_name == "Cached"
+
+
+def test_classes_of_the_same_code_do_not_share_class_attributes():
+    code = dedent("""
+    from wfx.custom import Component
+    from wfx.io import MessageTextInput
+
+    class InputsComponent(Component):
+        inputs = [MessageTextInput(name="text")]
+    """)
+    first = eval_custom_component_code(code)
+    second = eval_custom_component_code(code)
+
+    assert first is not second
+    first()._get_or_create_input("extra")
+    assert [input_.name for input_ in first.inputs] == ["text", "extra"]
+    assert [input_.name for input_ in second.inputs] == ["text"]
+
+
+def test_changed_code_gets_a_new_class():
+    first = eval_custom_component_code(CODE)
+    second = eval_custom_component_code(CODE.replace('"Cached"', '"Changed"'))
+
+    assert first is not second
+    assert second.display_name == "Changed"
+
+
+def test_use_cache_false_recompiles_and_replaces_entry():
+    eval_custom_component_code(CODE)
+    with patch.object(validate, "compile_class", wraps=validate.compile_class) as compile_class:
+        eval_custom_component_code(CODE, use_cache=False)
+        eval_custom_component_code(CODE)
+
+    assert compile_class.call_count == 1
+
+
+def test_invalidate_forces_recompilation():
+    eval_custom_component_code(CODE)
+    get_compiled_class_cache().invalidate(CODE)
+
+    assert CODE not in get_compiled_class_cache()
+    eval_custom_component_code(CODE)
+    assert get_compiled_class_cache().stats()["misses"] == 2
+
+
+def test_invalid_code_is_not_cached():
+    code = "class Broken(Component):\n    def method(self\n"
+    with pytest.raises(ValueError):  # noqa: PT011
+        eval_custom_component_code(code)
+
+    assert code not in get_compiled_class_cache()
+
+
+def test_lru_eviction():
+    cache = CompiledClassCache(max_size=2)
+    cache.set("a", int)
+    cache.set("b", str)
+    assert cache.get("a") is int
+    cache.set("c", float)
+
+    assert "b" not in cache
+    assert cache.get("a") is int
+    assert cache.get("c") is float
+    assert cache.stats()["evictions"] == 1
+
+
+def test_zero_size_disables_cache():
+    cache = CompiledClassCache(max_size=0)
+    cache.set("a", int)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
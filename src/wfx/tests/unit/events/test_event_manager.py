@@ -6,6 +6,7 @@ from unittest.mock import MagicMock
 
 import pytest
 from wfx.events.event_manager import (
+    EncodedEventData,
     EventManager,
     create_default_event_manager,
     create_stream_tokens_event_manager,
@@ -212,6 +213,22 @@ class TestEventManager:
         assert parsed_data["data"] == complex_data
 
 
+class TestEncodedEventData:
+    """Test sending data that is already serialized."""
+
+    def test_encoded_data_is_sent_as_is(self):
+        queue = asyncio.Queue()
+        manager = create_default_event_manager(queue)
+        data = {"build_data": {"id": "vertex", "results": [1.5, "ü", None]}}
+
+        manager.on_end_vertex(data=EncodedEventData(json.dumps(data).encode("utf-8")))
+        manager.on_end_vertex(data=data)
+
+        encoded, regular = (queue.get_nowait()[1] for _ in range(2))
+        assert json.loads(encoded) == json.loads(regular) == {"event": "end_vertex", "data": data}
+        assert encoded.endswith(b"\n\n")
+
+
 class TestEventManagerFactories:
     """Test cases for EventManager factory functions."""
 
@@ -230,10 +247,12 @@ class TestEventManagerFactories:
             "on_error",
             "on_end",
             "on_message",
+            "on_message_delta",
             "on_remove_message",
             "on_end_vertex",
             "on_build_start",
             "on_build_end",
+            "on_profile",
         ]
 
         for event_name in expected_events:
@@ -368,3 +387,194 @@ class TestEventManagerAsync:
         for sent, received in zip(events_to_send, received_events, strict=False):
             assert sent[0] == received[0]  # event type
             assert sent[1] == received[1]  # data
+
+
+def _drain(queue: asyncio.Queue) -> list[tuple[str, object]]:
+    events = []
+    while not queue.empty():
+        _, data_bytes, _ = queue.get_nowait()
+        parsed_data = json.loads(data_bytes.decode("utf-8"))
+        events.append((parsed_data["event"], parsed_data["data"]))
+    return events
+
+
+class TestTokenCoalescing:
+    """Test merging consecutive token events."""
+
+    def test_tokens_are_not_coalesced_by_default(self):
+        queue = asyncio.Queue()
+        manager = create_default_event_manager(queue)
+
+        manager.on_token(data={"chunk": "a", "id": "m1"})
+        manager.on_token(data={"chunk": "b", "id": "m1"})
+
+        assert queue.qsize() == 2
+
+    def test_tokens_of_a_message_are_merged_until_flushed(self):
+        queue = asyncio.Queue()
+        manager = create_default_event_manager(queue)
+        manager.enable_token_coalescing(window=60)
+
+        for chunk in ("Hel", "lo", " world"):
+            manager.on_token(data={"chunk": chunk, "id": "m1"})
+        assert queue.empty()
+        manager.flush()
+
+        assert _drain(queue) == [("token", {"chunk": "Hello world", "id": "m1"})]
+
+    def test_full_buffer_is_sent(self):
+        queue = asyncio.Queue()
+        manager = create_default_event_manager(queue)
+        manager.enable_token_coalescing(window=60, max_chars=4)
+
+        for chunk in ("ab", "cd", "e"):
+            manager.on_token(data={"chunk": chunk, "id": "m1"})
+
+        assert _drain(queue) == [("token", {"chunk": "abcd", "id": "m1"})]
+
+    def test_other_events_flush_the_tokens_first(self):
+        queue = asyncio.Queue()
+        manager = create_default_event_manager(queue)
+        manager.enable_token_coalescing(window=60)
+
+        manager.on_token(data={"chunk": "a", "id": "m1"})
+        manager.on_token(data={"chunk": "b", "id": "m2"})
+        manager.on_token(data={"chunk": "c", "id": "m2"})
+        manager.on_error(data={"error": "boom"})
+        manager.on_token(data={"chunk": "d", "id": "m2"})
+        manager.on_end(data={})
+
+        assert _drain(queue) == [
+            ("token", {"chunk": "a", "id": "m1"}),
+            ("token", {"chunk": "bc", "id": "m2"}),
+            ("error", {"error": "boom"}),
+            ("token", {"chunk": "d", "id": "m2"}),
+            ("end", {}),
+        ]
+
+    def test_tokens_with_other_data_are_sent_as_is(self):
+        queue = asyncio.Queue()
+        manager = create_default_event_manager(queue)
+        manager.enable_token_coalescing(window=60)
+
+        manager.on_token(data={"chunk": "a", "id": "m1", "extra": True})
+
+        assert _drain(queue) == [("token", {"chunk": "a", "id": "m1", "extra": True})]
+
+    def test_invalid_settings_are_rejected(self):
+        manager = EventManager(None)
+
+        with pytest.raises(ValueError, match="max_chars must be at least 1"):
+            manager.enable_token_coalescing(max_chars=0)
+
+    async def test_tokens_are_sent_when_the_window_ends(self):
+        queue = asyncio.Queue()
+        manager = create_default_event_manager(queue)
+        manager.enable_token_coalescing(window=0.1)
+
+        manager.on_token(data={"chunk": "a", "id": "m1"})
+        await asyncio.to_thread(manager.on_token, data={"chunk": "b", "id": "m1"})
+        assert queue.empty()
+        await asyncio.sleep(0.3)
+
+        assert _drain(queue) == [("token", {"chunk": "ab", "id": "m1"})]
+
+
+class TestEventEncoder:
+    """Test encoding events in the encoder task."""
+
+    async def test_events_are_encoded_by_the_encoder_task_in_order(self):
+        queue = asyncio.Queue()
+        manager = create_default_event_manager(queue)
+        manager.start_encoder()
+
+        manager.on_token(data={"chunk": "a", "id": "m1"})
+        manager.on_end(data={})
+        assert queue.empty()
+        await asyncio.sleep(0)
+
+        assert _drain(queue) == [("token", {"chunk": "a", "id": "m1"}), ("end", {})]
+        await manager.aclose()
+
+    async def test_events_sent_from_threads_are_encoded(self):
+        queue = asyncio.Queue()
+        manager = create_default_event_manager(queue)
+        manager.start_encoder()
+
+        await asyncio.to_thread(manager.on_message, data={"text": "hi"})
+        await manager.aclose()
+
+        assert _drain(queue) == [("add_message", {"text": "hi"})]
+
+    async def test_aclose_sends_pending_events_and_buffered_tokens(self):
+        queue = asyncio.Queue()
+        manager = create_default_event_manager(queue)
+        manager.enable_token_coalescing(window=60)
+        manager.start_encoder()
+
+        manager.on_token(data={"chunk": "a", "id": "m1"})
+        manager.on_token(data={"chunk": "b", "id": "m1"})
+        await manager.aclose()
+        manager.on_end(data={})
+
+        assert _drain(queue) == [("token", {"chunk": "ab", "id": "m1"}), ("end", {})]
+
+    async def test_encoding_errors_do_not_stop_the_encoder(self):
+        queue = asyncio.Queue()
+        manager = create_default_event_manager(queue)
+        manager.start_encoder()
+
+        manager.on_message(data={"unserializable": object()})
+        manager.on_end(data={})
+        await manager.aclose()
+
+        assert _drain(queue) == [("end", {})]
+
+    async def test_encoder_waits_for_room_in_a_bounded_queue(self):
+        queue = asyncio.Queue(maxsize=1)
+        manager = create_default_event_manager(queue)
+        manager.start_encoder()
+
+        manager.on_token(data={"chunk": "a", "id": "m1"})
+        manager.on_end(data={})
+        await asyncio.sleep(0.01)
+        assert queue.qsize() == 1
+        first = _drain(queue)
+        await manager.aclose()
+
+        assert first + _drain(queue) == [("token", {"chunk": "a", "id": "m1"}), ("end", {})]
+
+    async def test_waiting_for_capacity_bounds_the_pending_events(self):
+        class BlockingQueue(asyncio.Queue):
+            async def wait_for_capacity(self):
+                return
+
+        queue = BlockingQueue(maxsize=1)
+        manager = create_default_event_manager(queue)
+        manager.max_pending_events = 2
+        manager.start_encoder()
+        for index in range(5):
+            manager.on_token(data={"chunk": str(index), "id": "m1"})
+
+        wait = asyncio.create_task(manager.wait_for_capacity())
+        await asyncio.sleep(0.01)
+        # "0" is queued, the encoder waits to queue "1" and three events are pending
+        assert not wait.done()
+        assert manager.pending_events == 3
+
+        queue.get_nowait()
+        await asyncio.wait_for(wait, timeout=1)
+        assert manager.pending_events == 2
+        await manager.aclose(drain=False)
+
+    async def test_aclose_without_drain_drops_pending_events(self):
+        queue = asyncio.Queue(maxsize=1)
+        manager = create_default_event_manager(queue)
+        manager.start_encoder()
+        manager.on_token(data={"chunk": "a", "id": "m1"})
+        manager.on_token(data={"chunk": "b", "id": "m1"})
+        await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(manager.aclose(drain=False), timeout=1)
+
+        assert _drain(queue) == [("token", {"chunk": "a", "id": "m1"})]
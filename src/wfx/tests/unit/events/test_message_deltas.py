@@ -0,0 +1,122 @@
+import pytest
+from wfx.events.message_deltas import MessageDeltaTracker
+from wfx.schema.content_block import ContentBlock
+from wfx.schema.content_types import TextContent, ToolContent
+from wfx.schema.message import Message
+
+
+def make_agent_message() -> Message:
+    return Message(
+        text="",
+        sender="Machine",
+        sender_name="Agent",
+        content_blocks=[ContentBlock(title="Agent Steps", contents=[TextContent(text="Input: hi")])],
+    )
+
+
+def test_first_send_is_whole():
+    tracker = MessageDeltaTracker()
+
+    assert tracker.diff("1", make_agent_message()) is None
+
+
+def test_appended_content():
+    tracker = MessageDeltaTracker()
+    message = make_agent_message()
+    tracker.diff("1", message)
+
+    message.content_blocks[0].contents.append(ToolContent(name="search", tool_input={"q": "x"}))
+    delta = tracker.diff("1", message)
+
+    assert delta["id"] == "1"
+    assert "text" not in delta
+    assert delta["changes"] == [
+        {
+            "op": "append",
+            "block_index": 0,
+            "content_index": 1,
+            "content": message.content_blocks[0].contents[1].model_dump(),
+        }
+    ]
+
+
+def test_reassigned_content_field():
+    tracker = MessageDeltaTracker()
+    message = make_agent_message()
+    message.content_blocks[0].contents.append(ToolContent(name="search", tool_input={"q": "x"}))
+    tracker.diff("1", message)
+
+    tool_content = message.content_blocks[0].contents[1]
+    tool_content.output = "found"
+    delta = tracker.diff("1", message)
+
+    assert [(change["op"], change["content_index"]) for change in delta["changes"]] == [("update", 1)]
+    assert delta["changes"][0]["content"]["output"] == "found"
+
+
+def test_unchanged_message_has_no_changes():
+    tracker = MessageDeltaTracker()
+    message = make_agent_message()
+    tracker.diff("1", message)
+
+    assert tracker.diff("1", message)["changes"] == []
+
+
+def test_new_block_and_block_field():
+    tracker = MessageDeltaTracker()
+    message = make_agent_message()
+    tracker.diff("1", message)
+
+    message.content_blocks[0].title = "Done"
+    message.content_blocks.append(ContentBlock(title="Sources", contents=[]))
+    changes = tracker.diff("1", message)["changes"]
+
+    assert changes == [
+        {"op": "update_block", "block_index": 0, "block": {"title": "Done", "allow_markdown": True, "media_url": None}},
+        {"op": "append_block", "block_index": 1, "block": message.content_blocks[1].model_dump()},
+    ]
+
+
+def test_changed_text_is_sent():
+    tracker = MessageDeltaTracker()
+    message = make_agent_message()
+    tracker.diff("1", message)
+
+    message.text = "Final answer"
+
+    assert tracker.diff("1", message)["text"] == "Final answer"
+
+
+def test_whole_message_is_sent_every_snapshot_interval():
+    tracker = MessageDeltaTracker(snapshot_interval=3)
+    message = make_agent_message()
+
+    sends = [tracker.diff("1", message) for _ in range(7)]
+
+    assert [delta is None for delta in sends] == [True, False, False, True, False, False, True]
+
+
+def test_removed_contents_send_the_whole_message():
+    tracker = MessageDeltaTracker()
+    message = make_agent_message()
+    tracker.diff("1", message)
+
+    message.content_blocks[0].contents.clear()
+
+    assert tracker.diff("1", message) is None
+    assert tracker.diff("1", message) == {"id": "1", "properties": message.properties.model_dump(), "changes": []}
+
+
+def test_forget():
+    tracker = MessageDeltaTracker()
+    message = make_agent_message()
+    tracker.diff("1", message)
+
+    tracker.forget("1")
+
+    assert tracker.diff("1", message) is None
+
+
+def test_snapshot_interval_must_be_positive():
+    with pytest.raises(ValueError, match="snapshot_interval"):
+        MessageDeltaTracker(snapshot_interval=0)
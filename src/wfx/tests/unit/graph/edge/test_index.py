@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+
+from wfx.components.input_output import ChatInput, ChatOutput
+from wfx.graph.edge.index import EdgeIndex
+from wfx.graph.graph.base import Graph
+
+
+@dataclass(frozen=True)
+class FakeEdge:
+    source_id: str
+    target_id: str
+    target_param: str = "input_value"
+
+
+def test_lookups_follow_insertion_order():
+    edges = [FakeEdge("a", "b"), FakeEdge("b", "c"), FakeEdge("c", "b", "other"), FakeEdge("b", "d")]
+    index = EdgeIndex(edges)
+
+    assert index.edges == edges
+    assert index.get_vertex_edges("b") == edges
+    assert index.get_vertex_edges("b", is_target=False) == [edges[1], edges[3]]
+    assert index.get_vertex_edges("b", is_source=False) == [edges[0], edges[2]]
+    assert index.get_source_edges("b") == [edges[1], edges[3]]
+    assert index.get_target_edges("b") == [edges[0], edges[2]]
+    assert index.get_edges_between("a", "b") == [edges[0]]
+    assert index.get_edges_by_target_param("b", "other") == [edges[2]]
+
+
+def test_duplicates_are_ignored():
+    index = EdgeIndex()
+
+    assert index.add(FakeEdge("a", "b")) is True
+    assert index.add(FakeEdge("a", "b")) is False
+    assert len(index) == 1
+
+
+def test_self_loop_is_returned_once():
+    loop = FakeEdge("a", "a")
+    index = EdgeIndex([FakeEdge("x", "a"), loop])
+
+    assert index.get_vertex_edges("a") == [FakeEdge("x", "a"), loop]
+
+
+def test_remove_vertex_drops_all_its_edges():
+    edges = [FakeEdge("a", "b"), FakeEdge("b", "c"), FakeEdge("c", "d")]
+    index = EdgeIndex(edges)
+
+    removed = index.remove_vertex("b")
+
+    assert removed == edges[:2]
+    assert index.edges == [edges[2]]
+    assert index.get_vertex_edges("a") == []
+    assert index.get_edges_between("b", "c") == []
+    assert FakeEdge("a", "b") not in index
+
+
+def test_graph_lookups_match_a_full_scan():
+    chat_input = ChatInput(_id="chat_input")
+    chat_output = ChatOutput(_id="chat_output")
+    chat_output.set(input_value=chat_input.message_response)
+    graph = Graph(chat_input, chat_output)
+
+    [edge] = graph.edges
+    assert graph.get_vertex_edges("chat_output") == [edge]
+    assert graph.get_edge("chat_input", "chat_output") is edge
+    assert graph.get_edge("chat_output", "chat_input") is None
+    assert graph.get_vertex("chat_output").incoming_edges == [edge]
+    assert graph.get_vertex("chat_input").outgoing_edges == [edge]
+    assert graph.get_vertex("chat_output").get_incoming_edge_by_target_param("input_value") == "chat_input"
+    assert graph.get_vertices_with_target("chat_output") == [graph.get_vertex("chat_input")]
+
+    graph.remove_vertex("chat_input")
+
+    assert graph.edges == []
+    assert graph.get_vertex_edges("chat_output") == []
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from wfx.components.input_output import ChatInput, ChatOutput
+from wfx.custom.custom_component.component import Component
+from wfx.graph.graph.base import Graph
+from wfx.io import MessageTextInput, Output
+from wfx.schema.message import Message
+
+
+class SleepComponent(Component):
+    display_name = "Sleep"
+    description = "Sleeps for the number of seconds it receives and echoes them"
+    inputs = [MessageTextInput(name="input_value", display_name="Seconds")]
+    outputs = [Output(display_name="Message", name="message", method="sleep")]
+    running = 0
+    max_running = 0
+    # When set, runs wait until this many of them are running at once, so the tests don't depend on timing
+    hold_until = 0
+    all_running: asyncio.Event
+
+    async def sleep(self) -> Message:
+        cls = type(self)
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        try:
+            if cls.hold_until:
+                if cls.running >= cls.hold_until:
+                    cls.all_running.set()
+                await asyncio.wait_for(cls.all_running.wait(), timeout=5)
+            if self.input_value == "fail":
+                msg = "Sleep failed"
+                raise ValueError(msg)
+            await asyncio.sleep(float(self.input_value))
+        finally:
+            cls.running -= 1
+        return Message(text=f"slept {self.input_value}")
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    SleepComponent.running = 0
+    SleepComponent.max_running = 0
+    SleepComponent.hold_until = 0
+    SleepComponent.all_running = asyncio.Event()
+
+
+def make_graph() -> Graph:
+    chat_input = ChatInput(_id="chat_input")
+    sleeper = SleepComponent(_id="sleeper")
+    sleeper.set(input_value=chat_input.message_response)
+    chat_output = ChatOutput(_id="chat_output")
+    chat_output.set(input_value=sleeper.sleep)
+    return Graph(chat_input, chat_output)
+
+
+def texts(run_outputs) -> list[str]:
+    return [run_output.outputs[0].results["message"].text for run_output in run_outputs]
+
+
+async def test_concurrent_runs_keep_input_order():
+    delays = ["0.3", "0.1", "0.2", "0"]
+    SleepComponent.hold_until = 4
+
+    run_outputs = await make_graph().arun([{"input_value": delay} for delay in delays], concurrency=4)
+
+    assert texts(run_outputs) == [f"slept {delay}" for delay in delays]
+    assert [run_output.inputs["input_value"] for run_output in run_outputs] == delays
+    assert SleepComponent.max_running == 4
+
+
+async def test_concurrency_limits_simultaneous_runs():
+    inputs = [{"input_value": "0.05"} for _ in range(6)]
+    SleepComponent.hold_until = 2
+
+    run_outputs = await make_graph().arun(inputs, concurrency=2)
+
+    assert len(run_outputs) == 6
+    assert SleepComponent.max_running == 2
+
+
+async def test_runs_are_yielded_as_they_finish():
+    delays = ["0.3", "0", "0.15"]
+
+    indexes = [index async for index, _ in make_graph().aiter_runs([{"input_value": d} for d in delays], concurrency=3)]
+
+    assert indexes == [1, 2, 0]
+
+
+async def test_each_input_runs_on_its_own_clone():
+    graph = make_graph()
+
+    run_outputs = await graph.arun([{"input_value": "0"}, {"input_value": "0.01"}])
+
+    assert texts(run_outputs) == ["slept 0", "slept 0.01"]
+    assert SleepComponent.max_running == 1
+    assert not graph.get_vertex("sleeper").built
+
+
+async def test_a_single_input_runs_on_the_graph_itself():
+    graph = make_graph()
+
+    run_outputs = await graph.arun([{"input_value": "0"}], concurrency=4)
+
+    assert texts(run_outputs) == ["slept 0"]
+    assert graph.get_vertex("sleeper").built
+
+
+async def test_failed_run_cancels_the_others():
+    inputs = [{"input_value": "fail"}, {"input_value": "5"}]
+
+    with pytest.raises(ValueError, match="Sleep failed"):
+        await asyncio.wait_for(make_graph().arun(inputs, concurrency=2), timeout=2)
+    assert SleepComponent.running == 0
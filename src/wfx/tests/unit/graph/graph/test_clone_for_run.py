@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+
+import pytest
+from wfx.graph.graph.base import Graph
+from wfx.graph.graph.template_cache import GraphTemplateCache
+
+
+@pytest.fixture
+def simple_chat_payload():
+    data_path = Path(__file__).parents[3] / "data" / "simple_chat_no_llm.json"
+    return json.loads(data_path.read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def template(simple_chat_payload):
+    return Graph.from_payload(simple_chat_payload, flow_id="flow", flow_name="Simple Chat", user_id="user")
+
+
+def get_output_text(run_outputs) -> str:
+    [run_output] = run_outputs
+    [result] = run_output.outputs
+    return result.results["message"].text
+
+
+def test_clone_has_its_own_vertices_and_components(template):
+    clone = template.clone_for_run()
+
+    assert [vertex.id for vertex in clone.vertices] == [vertex.id for vertex in template.vertices]
+    for vertex in clone.vertices:
+        original = template.get_vertex(vertex.id)
+        assert vertex is not original
+        assert vertex.graph is clone
+        assert vertex.custom_component is not original.custom_component
+        assert vertex.custom_component.get_vertex() is vertex
+        assert vertex.outputs is original.outputs
+        assert vertex.data["node"]["template"] is not original.data["node"]["template"]
+    assert clone.raw_graph_data is template.raw_graph_data
+    assert clone.predecessor_map == template.predecessor_map
+    assert clone.successor_map == template.successor_map
+    assert clone.in_degree_map == template.in_degree_map
+
+
+def test_clone_uses_given_user_and_context(template):
+    clone = template.clone_for_run(user_id="other-user", context={"request": "value"})
+
+    assert clone.user_id == "other-user"
+    assert clone.context == {"request": "value"}
+    assert template.user_id == "user"
+    assert "request" not in template.context
+
+
+async def test_clones_run_independently(template, simple_chat_payload):
+    first = template.clone_for_run()
+    second = template.clone_for_run()
+
+    first_outputs = await first.arun([{"input_value": "first"}])
+    second_outputs = await second.arun([{"input_value": "second"}])
+    fresh_outputs = await Graph.from_payload(simple_chat_payload).arun([{"input_value": "first"}])
+
+    assert get_output_text(first_outputs) == "first"
+    assert get_output_text(second_outputs) == "second"
+    assert get_output_text(fresh_outputs) == "first"
+    assert all(not vertex.built for vertex in template.vertices)
+
+
+def test_template_cache_key_changes_with_version_and_tweaks():
+    key = GraphTemplateCache.make_key("flow", "2024-01-01T00:00:00", {"a": {"x": 1, "y": 2}})
+
+    assert key == GraphTemplateCache.make_key("flow", "2024-01-01T00:00:00", {"a": {"y": 2, "x": 1}})
+    assert key != GraphTemplateCache.make_key("flow", "2024-01-02T00:00:00", {"a": {"x": 1, "y": 2}})
+    assert key != GraphTemplateCache.make_key("flow", "2024-01-01T00:00:00", {"a": {"x": 2, "y": 2}})
+    assert key != GraphTemplateCache.make_key("flow", "2024-01-01T00:00:00", {"a": {"x": 1, "y": 2}}, stream=True)
+
+
+def test_template_cache_builds_once_and_invalidates_by_flow(template):
+    cache = GraphTemplateCache(max_size=4)
+    key = cache.make_key("flow", "2024-01-01T00:00:00")
+    builds = []
+
+    def build():
+        builds.append(1)
+        return template
+
+    assert cache.get_or_build(key, build) is template
+    assert cache.get_or_build(key, build) is template
+    assert len(builds) == 1
+    assert cache.stats()["hits"] == 1
+
+    cache.invalidate_flow("flow")
+    assert key not in cache
+
+
+def test_template_cache_lru_eviction(template):
+    cache = GraphTemplateCache(max_size=1)
+    first_key = cache.make_key("first", "v1")
+    second_key = cache.make_key("second", "v1")
+    cache.set(first_key, template)
+    cache.set(second_key, template)
+
+    assert first_key not in cache
+    assert second_key in cache
+    assert cache.stats()["evictions"] == 1
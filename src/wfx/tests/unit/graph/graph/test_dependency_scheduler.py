@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from wfx.custom.custom_component.component import Component
+from wfx.graph.graph.base import Graph
+from wfx.io import MessageTextInput, Output
+from wfx.schema.message import Message
+
+EVENTS: list[tuple[str, str]] = []
+
+
+class DelayComponent(Component):
+    display_name = "Delay"
+    description = "Waits for a while and echoes its inputs"
+
+    inputs = [
+        MessageTextInput(name="first", display_name="First"),
+        MessageTextInput(name="second", display_name="Second"),
+        MessageTextInput(name="delay", display_name="Delay", value="0"),
+        MessageTextInput(name="fail", display_name="Fail", value=""),
+    ]
+    outputs = [
+        Output(display_name="Message", name="message", method="run_delay"),
+    ]
+
+    async def run_delay(self) -> Message:
+        EVENTS.append(("start", self._id))
+        try:
+            await asyncio.sleep(float(self.delay))
+        except asyncio.CancelledError:
+            EVENTS.append(("cancelled", self._id))
+            raise
+        if self.fail:
+            msg = f"{self._id} failed"
+            raise ValueError(msg)
+        EVENTS.append(("end", self._id))
+        return Message(text=f"{self._id}({self.first or ''},{self.second or ''})")
+
+
+def build_fan_out_graph() -> Graph:
+    """Builds source -> slow -> join and source -> fast -> fast_child -> join."""
+    source = DelayComponent(_id="source")
+    slow = DelayComponent(_id="slow", delay="0.3")
+    slow.set(first=source.run_delay)
+    fast = DelayComponent(_id="fast")
+    fast.set(first=source.run_delay)
+    fast_child = DelayComponent(_id="fast_child", delay="0.05")
+    fast_child.set(first=fast.run_delay)
+    join = DelayComponent(_id="join")
+    join.set(first=slow.run_delay, second=fast_child.run_delay)
+    return Graph(source, join)
+
+
+@pytest.fixture(autouse=True)
+def clear_events():
+    EVENTS.clear()
+    yield
+    EVENTS.clear()
+
+
+async def test_dependency_scheduler_does_not_wait_for_slow_sibling():
+    graph = build_fan_out_graph()
+
+    await graph.process(fallback_to_env_vars=False, scheduler="dependency")
+
+    assert EVENTS.index(("end", "fast_child")) < EVENTS.index(("end", "slow"))
+    assert EVENTS[-1] == ("end", "join")
+    assert EVENTS.count(("start", "join")) == 1
+    join_message = graph.get_vertex("join").built_object["message"]
+    assert join_message.text == "join(slow(source(,),),fast_child(fast(source(,),),))"
+
+
+async def test_layered_scheduler_waits_for_whole_layer():
+    graph = build_fan_out_graph()
+
+    await graph.process(fallback_to_env_vars=False, scheduler="layered")
+
+    assert EVENTS.index(("start", "fast_child")) > EVENTS.index(("end", "slow"))
+    assert EVENTS[-1] == ("end", "join")
+
+
+async def test_schedulers_build_the_same_vertices():
+    layered = build_fan_out_graph()
+    await layered.process(fallback_to_env_vars=False, scheduler="layered")
+    layered_events = sorted(EVENTS)
+    EVENTS.clear()
+
+    dependency = build_fan_out_graph()
+    await dependency.process(fallback_to_env_vars=False, scheduler="dependency")
+
+    assert sorted(EVENTS) == layered_events
+
+
+async def test_dependency_scheduler_cancels_in_flight_builds_on_error():
+    source = DelayComponent(_id="source")
+    failing = DelayComponent(_id="failing", delay="0.01", fail="yes")
+    failing.set(first=source.run_delay)
+    slow = DelayComponent(_id="slow", delay="5")
+    slow.set(first=source.run_delay)
+    join = DelayComponent(_id="join")
+    join.set(first=failing.run_delay, second=slow.run_delay)
+    graph = Graph(source, join)
+
+    with pytest.raises(Exception, match="failing failed"):
+        await graph.process(fallback_to_env_vars=False, scheduler="dependency")
+
+    assert ("cancelled", "slow") in EVENTS
+    assert ("start", "join") not in EVENTS
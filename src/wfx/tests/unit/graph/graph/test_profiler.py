@@ -0,0 +1,178 @@
+import asyncio
+import pickle
+
+import pytest
+from wfx.custom.custom_component.component import Component
+from wfx.graph.graph.base import Graph
+from wfx.graph.graph.profiler import RunProfiler, parse_profile_format
+from wfx.io import MessageTextInput, Output
+from wfx.schema.message import Message
+
+
+class DelayComponent(Component):
+    display_name = "Delay"
+    inputs = [
+        MessageTextInput(name="first", display_name="First"),
+        MessageTextInput(name="second", display_name="Second"),
+    ]
+    outputs = [Output(display_name="Message", name="message", method="delay")]
+    delays = {"slow": 0.1}
+
+    async def delay(self) -> Message:
+        await asyncio.sleep(self.delays.get(self._id, 0))
+        return Message(text=self._id)
+
+
+def make_diamond_graph() -> Graph:
+    """Builds source -> (fast, slow) -> join."""
+    source = DelayComponent(_id="source")
+    fast = DelayComponent(_id="fast")
+    fast.set(first=source.delay)
+    slow = DelayComponent(_id="slow")
+    slow.set(first=source.delay)
+    join = DelayComponent(_id="join")
+    join.set(first=fast.delay, second=slow.delay)
+    return Graph(source, join)
+
+
+async def test_profile_breaks_down_the_vertex_builds():
+    graph = make_diamond_graph()
+    graph.enable_profiling()
+
+    await graph.arun([{}])
+    summary = graph.get_profile()
+
+    assert set(summary["vertices"]) == {"source", "fast", "slow", "join"}
+    slow = summary["vertices"]["slow"]
+    assert slow["builds"] == 1
+    assert {"params", "build", "load_from_db", "component"} <= set(slow["phases"])
+    assert slow["phases"]["component"] >= 0.1
+    assert slow["total_time"] >= slow["phases"]["build"] >= slow["phases"]["component"]
+    assert summary["total_time"] >= summary["critical_path"]["duration"]
+
+
+def test_loop_blocking_of_streamed_messages_is_added_up_per_vertex():
+    profiler = RunProfiler()
+    profiler.record("agent", "vertex", profiler.started_at, profiler.started_at + 1)
+    profiler.record_loop_blocking("agent", {"loop_blocked_time": 0.02, "max_loop_block": 0.02, "loop_blocks": 1})
+    profiler.record_loop_blocking("agent", {"loop_blocked_time": 0.03, "max_loop_block": 0.01, "loop_blocks": 2})
+
+    summary = profiler.summary({})
+
+    assert summary["vertices"]["agent"]["loop_blocking"] == {
+        "loop_blocked_time": 0.05,
+        "max_loop_block": 0.02,
+        "loop_blocks": 3,
+    }
+
+
+async def test_critical_path_follows_the_slowest_branch():
+    graph = make_diamond_graph()
+    graph.enable_profiling()
+
+    await graph.arun([{}])
+
+    assert graph.get_profile()["critical_path"]["vertices"] == ["source", "slow", "join"]
+
+
+def test_scheduling_gap_is_measured_from_the_last_predecessor():
+    profiler = RunProfiler()
+    start = profiler.started_at
+    profiler.record("a", "vertex", start, start + 1)
+    profiler.record("b", "vertex", start, start + 2)
+    profiler.record("c", "vertex", start + 2.5, start + 3)
+
+    summary = profiler.summary({"c": ["a", "b"]})
+
+    assert summary["vertices"]["a"]["scheduling_gap"] == 0
+    assert summary["vertices"]["c"]["scheduling_gap"] == 0.5
+    assert summary["critical_path"] == {"vertices": ["b", "c"], "duration": 3.0, "build_time": 2.5}
+
+
+def test_chrome_trace_has_a_thread_per_vertex():
+    profiler = RunProfiler()
+    start = profiler.started_at
+    profiler.record("a", "vertex", start, start + 0.002)
+    profiler.record("a", "build", start + 0.001, start + 0.002)
+    profiler.record("b", "vertex", start + 0.002, start + 0.003)
+
+    events = profiler.to_chrome_trace()["traceEvents"]
+
+    thread_names = {event["tid"]: event["args"]["name"] for event in events if event["ph"] == "M"}
+    assert thread_names == {1: "a", 2: "b"}
+    complete = [event for event in events if event["ph"] == "X"]
+    assert [(thread_names[event["tid"]], event["name"], event["ts"], event["dur"]) for event in complete] == [
+        ("a", "vertex", 0, 2000),
+        ("a", "build", 1000, 1000),
+        ("b", "vertex", 2000, 1000),
+    ]
+
+
+def test_speedscope_events_are_properly_nested():
+    profiler = RunProfiler()
+    start = profiler.started_at
+    profiler.record("a", "vertex", start, start + 0.004)
+    profiler.record("a", "build", start + 0.001, start + 0.003)
+    profiler.record("a", "component", start + 0.002, start + 0.003)
+    # Recorded after the vertex span closed, e.g. the build events sent by the API
+    profiler.record("a", "events", start + 0.004, start + 0.005)
+
+    speedscope = profiler.to_speedscope()
+
+    frames = [frame["name"] for frame in speedscope["shared"]["frames"]]
+    (profile,) = speedscope["profiles"]
+    stack = []
+    for event in profile["events"]:
+        if event["type"] == "O":
+            stack.append(event["frame"])
+        else:
+            assert stack.pop() == event["frame"]
+    assert not stack
+    assert [(event["type"], frames[event["frame"]]) for event in profile["events"]] == [
+        ("O", "vertex"),
+        ("O", "build"),
+        ("O", "component"),
+        ("C", "component"),
+        ("C", "build"),
+        ("C", "vertex"),
+        ("O", "events"),
+        ("C", "events"),
+    ]
+
+
+async def test_graphs_are_not_profiled_by_default():
+    graph = make_diamond_graph()
+
+    await graph.arun([{}])
+
+    assert graph.profiler is None
+    assert graph.get_profile() is None
+
+
+def test_profiler_is_not_pickled_or_cloned():
+    graph = make_diamond_graph()
+    graph.enable_profiling()
+
+    assert graph.clone_for_run().profiler is None
+    assert pickle.loads(pickle.dumps(graph)).profiler is None  # noqa: S301
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (None, None),
+        ("", None),
+        ("false", None),
+        ("1", "summary"),
+        ("True", "summary"),
+        ("chrome", "chrome"),
+        ("speedscope", "speedscope"),
+    ],
+)
+def test_parse_profile_format(value, expected):
+    assert parse_profile_format(value) == expected
+
+
+def test_parse_profile_format_rejects_unknown_values():
+    with pytest.raises(ValueError, match="Invalid profile value"):
+        parse_profile_format("flamegraph")
@@ -0,0 +1,132 @@
+import asyncio
+import pickle
+
+import pytest
+from wfx.custom.custom_component.component import Component
+from wfx.graph.graph.base import Graph
+from wfx.graph.graph.resource_limits import ResourceLimiter, get_resource_limiter
+from wfx.io import MessageTextInput, Output
+from wfx.schema.message import Message
+
+
+class SlowLLMComponent(Component):
+    display_name = "Slow LLM"
+    resource_class = "llm"
+    inputs = [
+        MessageTextInput(name="first", display_name="First"),
+        MessageTextInput(name="second", display_name="Second"),
+        MessageTextInput(name="third", display_name="Third"),
+    ]
+    outputs = [Output(display_name="Message", name="message", method="generate")]
+    running = 0
+    max_running = 0
+
+    async def generate(self) -> Message:
+        cls = type(self)
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            cls.running -= 1
+        return Message(text=self._id)
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    SlowLLMComponent.running = 0
+    SlowLLMComponent.max_running = 0
+    yield
+    get_resource_limiter().set_limits({})
+
+
+def make_fan_out_graph() -> Graph:
+    """Builds source -> (a, b, c) -> join, where the three branches can run at the same time."""
+    source = SlowLLMComponent(_id="source")
+    branches = []
+    for branch_id in ("a", "b", "c"):
+        branch = SlowLLMComponent(_id=branch_id)
+        branch.set(first=source.generate)
+        branches.append(branch)
+    join = SlowLLMComponent(_id="join")
+    join.set(first=branches[0].generate, second=branches[1].generate, third=branches[2].generate)
+    return Graph(source, join)
+
+
+async def run(graph: Graph) -> dict[str, float | None]:
+    await graph.arun([{}])
+    return {vertex.id: vertex.queue_wait_time for vertex in graph.vertices}
+
+
+async def test_limiter_bounds_concurrent_slots():
+    limiter = ResourceLimiter({"llm": 2})
+    running = 0
+    max_running = 0
+
+    async def use_slot():
+        nonlocal running, max_running
+        async with limiter.slot("llm"):
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(use_slot() for _ in range(6)))
+
+    assert max_running == 2
+
+
+async def test_unlimited_resource_classes_are_not_queued():
+    limiter = ResourceLimiter({"llm": 1})
+
+    async with limiter.slot("http"), limiter.slot("http"), limiter.slot(None):
+        pass
+
+
+def test_limits_must_be_positive():
+    with pytest.raises(ValueError, match="positive integer"):
+        ResourceLimiter({"llm": 0})
+
+
+async def test_branches_run_in_parallel_without_limits():
+    await run(make_fan_out_graph())
+
+    assert SlowLLMComponent.max_running == 3
+
+
+async def test_flow_limits_bound_vertex_builds_and_report_wait_time():
+    graph = make_fan_out_graph()
+    graph.resource_limiter.set_limits({"llm": 1})
+
+    wait_times = await run(graph)
+
+    assert SlowLLMComponent.max_running == 1
+    assert max(wait_times[branch_id] for branch_id in ("a", "b", "c")) > 0
+    assert graph.get_vertex("a").result.queue_wait_time == wait_times["a"]
+
+
+async def test_worker_limits_apply_to_every_flow():
+    get_resource_limiter().set_limits({"llm": 2})
+
+    await run(make_fan_out_graph())
+
+    assert SlowLLMComponent.max_running == 2
+
+
+async def test_node_resource_class_overrides_the_component():
+    graph = make_fan_out_graph()
+    graph.resource_limiter.set_limits({"llm": 1})
+    for vertex in graph.vertices:
+        vertex.resource_class_override = "cpu"
+
+    await run(graph)
+
+    assert SlowLLMComponent.max_running == 3
+
+
+def test_flow_limits_survive_clones_and_pickling():
+    graph = make_fan_out_graph()
+    graph.resource_limiter.set_limits({"llm": 1})
+
+    assert graph.clone_for_run().resource_limiter is graph.resource_limiter
+    assert pickle.loads(pickle.dumps(graph.resource_limiter)).limits == {"llm": 1}  # noqa: S301
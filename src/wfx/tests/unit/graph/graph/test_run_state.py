@@ -0,0 +1,133 @@
+import json
+import pickle
+from pathlib import Path
+
+import orjson
+import pytest
+from wfx.graph.graph.base import Graph
+from wfx.graph.graph.run_state import is_run_state, restore_graph, snapshot_graph
+from wfx.graph.graph.template_cache import get_graph_template_cache
+from wfx.services.cache.utils import CACHE_MISS
+
+FLOW_ID = "5f6b2a7e-7d1c-4c55-9a3b-2f1f3e0c9d41"
+
+
+@pytest.fixture
+def simple_chat_payload():
+    data_path = Path(__file__).parents[3] / "data" / "simple_chat_no_llm.json"
+    return json.loads(data_path.read_text(encoding="utf-8"))
+
+
+@pytest.fixture(autouse=True)
+def clear_template_cache():
+    get_graph_template_cache().clear()
+    yield
+    get_graph_template_cache().clear()
+
+
+class DictCache:
+    """Stores values the way the chat service does, pickled like a Redis or disk cache."""
+
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+
+    async def get_cache(self, key, lock=None):  # noqa: ARG002
+        if key not in self.values:
+            return CACHE_MISS
+        return pickle.loads(self.values[key])  # noqa: S301
+
+    async def set_cache(self, key, data, lock=None) -> bool:  # noqa: ARG002
+        self.values[key] = pickle.dumps({"result": data, "type": type(data)})
+        return True
+
+
+async def run_first_vertex(graph: Graph, cache: DictCache) -> str:
+    vertex_id = graph.get_next_in_queue()
+    result = await graph.build_vertex(
+        vertex_id, get_cache=cache.get_cache, set_cache=cache.set_cache, inputs_dict={"input_value": "hello"}
+    )
+    next_vertices = await graph.get_next_runnable_vertices(graph.lock, result.vertex, cache=False)
+    graph.extend_run_queue(next_vertices)
+    return vertex_id
+
+
+@pytest.fixture
+async def half_run_graph(simple_chat_payload):
+    graph = Graph.from_payload(simple_chat_payload, flow_id=FLOW_ID, flow_name="Simple Chat", user_id="user")
+    graph.prepare()
+    graph.set_run_id("run")
+    graph.session_id = "session"
+    cache = DictCache()
+    built_vertex_id = await run_first_vertex(graph, cache)
+    return graph, cache, built_vertex_id
+
+
+async def test_run_state_is_small_and_json_serializable(half_run_graph):
+    graph, _, built_vertex_id = half_run_graph
+
+    run_state = snapshot_graph(graph)
+
+    assert is_run_state(run_state)
+    assert run_state["built_vertices"] == [built_vertex_id]
+    encoded = orjson.dumps(run_state)
+    assert len(encoded) * 10 < len(orjson.dumps(graph.raw_graph_data))
+
+
+async def test_restore_graph_from_the_template(half_run_graph):
+    graph, cache, built_vertex_id = half_run_graph
+    run_state = snapshot_graph(graph)
+
+    restored = await restore_graph(orjson.loads(orjson.dumps(run_state)), cache.get_cache)
+
+    assert restored is not graph
+    assert restored.run_id == "run"
+    assert restored.session_id == "session"
+    assert list(restored._run_queue) == list(graph._run_queue)
+    assert restored.run_manager.to_dict() == graph.run_manager.to_dict()
+    assert restored.vertices_to_run == graph.vertices_to_run
+    assert restored.get_run_state() == run_state
+    restored_vertex = restored.get_vertex(built_vertex_id)
+    assert restored_vertex.built
+    assert restored_vertex.result.results == graph.get_vertex(built_vertex_id).result.results
+
+
+async def test_restored_graph_finishes_the_run(half_run_graph):
+    graph, cache, _ = half_run_graph
+    restored = await restore_graph(snapshot_graph(graph), cache.get_cache)
+
+    while vertex_id := restored.get_next_in_queue():
+        result = await restored.build_vertex(vertex_id, get_cache=cache.get_cache, set_cache=cache.set_cache)
+        restored.extend_run_queue(await restored.get_next_runnable_vertices(restored.lock, result.vertex, cache=False))
+
+    assert all(vertex.built for vertex in restored.vertices)
+    assert restored.get_vertex("ChatOutput-9hGOk").result.results["message"].text == "hello"
+
+
+async def test_missing_template_is_loaded_or_reported(half_run_graph, simple_chat_payload):
+    graph, cache, built_vertex_id = half_run_graph
+    run_state = snapshot_graph(graph)
+    get_graph_template_cache().clear()
+
+    assert await restore_graph(run_state, cache.get_cache) is None
+
+    async def load_graph():
+        return Graph.from_payload(simple_chat_payload, flow_id=FLOW_ID, flow_name="Simple Chat", user_id="user")
+
+    restored = await restore_graph(run_state, cache.get_cache, load_graph)
+    assert restored.get_vertex(built_vertex_id).built
+
+    async def load_changed_graph():
+        changed = Graph.from_payload(simple_chat_payload, flow_id=FLOW_ID)
+        changed.raw_graph_data["nodes"] = changed.raw_graph_data["nodes"][:1]
+        return changed
+
+    get_graph_template_cache().clear()
+    assert await restore_graph(run_state, cache.get_cache, load_changed_graph) is None
+
+
+async def test_vertices_without_cached_results_stay_unbuilt(half_run_graph):
+    graph, _, built_vertex_id = half_run_graph
+
+    restored = await restore_graph(snapshot_graph(graph), DictCache().get_cache)
+
+    assert not restored.get_vertex(built_vertex_id).built
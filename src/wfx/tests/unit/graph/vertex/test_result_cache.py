@@ -0,0 +1,127 @@
+import pytest
+from wfx.components.input_output import ChatInput, ChatOutput
+from wfx.custom.custom_component.component import Component
+from wfx.graph.graph.base import Graph
+from wfx.graph.vertex.result_cache import (
+    UncacheableValueError,
+    VertexResultCache,
+    fingerprint_value,
+    set_vertex_result_cache,
+)
+from wfx.io import MessageTextInput, Output, SecretStrInput
+from wfx.schema.message import Message
+from wfx.services.cache.result_store import MemoryResultStore
+
+
+class CountingComponent(Component):
+    display_name = "Counting"
+    inputs = [MessageTextInput(name="input_value", display_name="Input")]
+    outputs = [Output(display_name="Text", name="text", method="build_text")]
+    builds = 0
+
+    def build_text(self) -> Message:
+        type(self).builds += 1
+        return Message(text=str(self.input_value).upper())
+
+
+class KeyedComponent(Component):
+    display_name = "Keyed"
+    inputs = [
+        MessageTextInput(name="input_value", display_name="Input"),
+        SecretStrInput(name="api_key", display_name="API Key", load_from_db=True),
+    ]
+    outputs = [Output(display_name="Text", name="text", method="build_text")]
+    builds = 0
+
+    def build_text(self) -> Message:
+        type(self).builds += 1
+        return Message(text=f"{self.input_value}:{self.api_key}")
+
+
+@pytest.fixture
+def result_cache():
+    cache = VertexResultCache(MemoryResultStore())
+    set_vertex_result_cache(cache)
+    CountingComponent.builds = 0
+    KeyedComponent.builds = 0
+    yield cache
+    set_vertex_result_cache(None)
+
+
+def make_graph(*, cache_results: bool) -> Graph:
+    chat_input = ChatInput(_id="chat_input")
+    counter = CountingComponent(_id="counter")
+    counter.set(input_value=chat_input.message_response)
+    chat_output = ChatOutput(_id="chat_output")
+    chat_output.set(input_value=counter.build_text)
+    graph = Graph(chat_input, chat_output)
+    graph.get_vertex("counter").cache_results = cache_results
+    return graph
+
+
+async def run(graph: Graph, input_value: str) -> str:
+    [run_output] = await graph.arun([{"input_value": input_value}])
+    [result] = run_output.outputs
+    return result.results["message"].text
+
+
+async def test_opted_in_vertex_is_built_once_per_input(result_cache):
+    assert await run(make_graph(cache_results=True), "hello") == "HELLO"
+    assert await run(make_graph(cache_results=True), "hello") == "HELLO"
+    assert CountingComponent.builds == 1
+
+    assert await run(make_graph(cache_results=True), "other") == "OTHER"
+    assert CountingComponent.builds == 2
+    assert result_cache.stats()["hits"] == 1
+
+
+async def test_vertices_are_not_cached_unless_opted_in(result_cache):
+    await run(make_graph(cache_results=False), "hello")
+    await run(make_graph(cache_results=False), "hello")
+
+    assert CountingComponent.builds == 2
+    assert result_cache.stats()["size_bytes"] == 0
+
+
+async def test_component_types_opt_vertices_in(result_cache):
+    result_cache.component_types = {"counter"}
+
+    await run(make_graph(cache_results=False), "hello")
+    await run(make_graph(cache_results=False), "hello")
+
+    assert CountingComponent.builds == 1
+
+
+def test_message_fingerprint_ignores_volatile_fields():
+    first = Message(text="hello", sender="User")
+    second = Message(text="hello", sender="User", id="other-id", timestamp="2020-01-01 00:00:00 UTC")
+
+    assert fingerprint_value(first) == fingerprint_value(second)
+    assert fingerprint_value(first) != fingerprint_value(Message(text="other", sender="User"))
+
+
+def test_objects_without_a_stable_fingerprint_are_uncacheable():
+    with pytest.raises(UncacheableValueError):
+        fingerprint_value({"client": object()})
+
+
+@pytest.mark.usefixtures("result_cache")
+async def test_changing_a_variable_value_changes_the_key(monkeypatch):
+    def make_keyed_graph() -> Graph:
+        chat_input = ChatInput(_id="chat_input")
+        keyed = KeyedComponent(_id="keyed")
+        keyed.set(input_value=chat_input.message_response, api_key="RESULT_CACHE_API_KEY")
+        chat_output = ChatOutput(_id="chat_output")
+        chat_output.set(input_value=keyed.build_text)
+        graph = Graph(chat_input, chat_output)
+        graph.get_vertex("keyed").cache_results = True
+        return graph
+
+    monkeypatch.setenv("RESULT_CACHE_API_KEY", "first")
+    assert await run(make_keyed_graph(), "hello") == "hello:first"
+    assert await run(make_keyed_graph(), "hello") == "hello:first"
+    assert KeyedComponent.builds == 1
+
+    monkeypatch.setenv("RESULT_CACHE_API_KEY", "second")
+    assert await run(make_keyed_graph(), "hello") == "hello:second"
+    assert KeyedComponent.builds == 2
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+from wfx.services.cache.result_store import DiskResultStore, MemoryResultStore
+
+
+@pytest.fixture(params=["memory", "disk"])
+def make_store(request, tmp_path):
+    def make(max_size_bytes: int = 1024):
+        if request.param == "memory":
+            return MemoryResultStore(max_size_bytes=max_size_bytes)
+        return DiskResultStore(tmp_path / "results", max_size_bytes=max_size_bytes)
+
+    return make
+
+
+async def test_set_get_and_delete(make_store):
+    store = make_store()
+
+    assert await store.get("key") is None
+    await store.set("key", b"value")
+    assert await store.get("key") == b"value"
+    await store.delete("key")
+    assert await store.get("key") is None
+    assert store.stats() == {"hits": 1, "misses": 2, "evictions": 0, "size_bytes": 0}
+
+
+async def test_expired_entries_are_misses(make_store, monkeypatch):
+    store = make_store()
+    await store.set("key", b"value", ttl=10)
+    now = 1e10
+    monkeypatch.setattr("wfx.services.cache.result_store.time.time", lambda: now)
+
+    assert await store.get("key") is None
+    assert store.size_bytes == 0
+
+
+async def test_least_recently_used_entries_are_evicted(make_store, tmp_path):
+    store = make_store(max_size_bytes=250)
+    for key in ("first", "second"):
+        await store.set(key, b"x" * 100)
+        if isinstance(store, DiskResultStore):
+            # Make the modification times distinct on coarse clocks
+            os.utime(tmp_path / "results" / f"{key}.bin", (1, 1 if key == "first" else 2))
+    assert await store.get("first") is not None
+
+    await store.set("third", b"x" * 100)
+
+    assert await store.get("second") is None
+    assert await store.get("first") is not None
+    assert await store.get("third") is not None
+    assert store.evictions == 1
+    assert store.size_bytes <= 250
+
+
+async def test_values_over_the_size_limit_are_not_stored(make_store):
+    store = make_store(max_size_bytes=10)
+
+    await store.set("key", b"x" * 100)
+
+    assert await store.get("key") is None
+
+
+async def test_disk_store_survives_restarts(tmp_path):
+    await DiskResultStore(tmp_path).set("key", b"value")
+
+    store = DiskResultStore(tmp_path)
+
+    assert await store.get("key") == b"value"
+    assert store.size_bytes > len(b"value")
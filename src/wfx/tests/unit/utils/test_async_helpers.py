@@ -0,0 +1,107 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+from wfx.utils.async_helpers import LoopBlockMonitor, iterate_in_thread
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def slow_iterator(items, delay=0.05):
+    for item in items:
+        time.sleep(delay)
+        yield item
+
+
+async def test_iterate_in_thread_yields_every_item():
+    assert [item async for item in iterate_in_thread(iter(range(100)), max_buffer=4)] == list(range(100))
+
+
+async def test_iterate_in_thread_does_not_block_the_loop():
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    items = [item async for item in iterate_in_thread(slow_iterator("abcd"))]
+    ticker.cancel()
+
+    assert items == list("abcd")
+    # The reads take 0.2 s, during which the ticker keeps running
+    assert ticks >= 10
+
+
+async def test_iterate_in_thread_raises_the_iterator_errors():
+    def failing():
+        yield 1
+        msg = "broken stream"
+        raise ValueError(msg)
+
+    items = []
+
+    async def consume():
+        async for item in iterate_in_thread(failing()):
+            items.append(item)  # noqa: PERF401
+
+    with pytest.raises(ValueError, match="broken stream"):
+        await consume()
+    assert items == [1]
+
+
+async def test_iterate_in_thread_closes_the_iterator_when_the_consumer_stops():
+    closed = threading.Event()
+
+    def endless():
+        try:
+            while True:
+                yield "chunk"
+        finally:
+            closed.set()
+
+    chunks = iterate_in_thread(endless(), max_buffer=2)
+    async for _ in chunks:
+        break
+    await chunks.aclose()
+
+    assert await asyncio.to_thread(closed.wait, 1)
+
+
+async def test_iterate_in_thread_runs_in_the_caller_context():
+    def read_context():
+        yield request_id.get()
+
+    request_id.set("abc")
+
+    assert [item async for item in iterate_in_thread(read_context())] == ["abc"]
+
+
+async def test_loop_block_monitor_measures_blocking_code():
+    async with LoopBlockMonitor() as monitor:
+        await asyncio.sleep(0.05)
+        time.sleep(0.1)  # noqa: ASYNC251
+        await asyncio.sleep(0.05)
+
+    metrics = monitor.metrics()
+    assert metrics["max_loop_block"] >= 0.08
+    assert metrics["loop_blocked_time"] >= metrics["max_loop_block"]
+    assert metrics["loop_blocks"] >= 1
+
+
+async def test_loop_block_monitor_measures_code_that_never_yields():
+    async with LoopBlockMonitor() as monitor:
+        time.sleep(0.1)  # noqa: ASYNC251
+
+    assert monitor.metrics()["max_loop_block"] >= 0.08
+
+
+async def test_loop_block_monitor_ignores_awaiting():
+    async with LoopBlockMonitor() as monitor:
+        await asyncio.sleep(0.1)
+
+    assert monitor.metrics()["loop_blocked_time"] < 0.05